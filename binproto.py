@@ -0,0 +1,561 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements binary framed protocol over serial port for
+    automation hosts that push hundreds of device updates per second.
+    Enabled with SERIAL_PROTOCOL = "binary" in proj_defines.py.
+
+    Frame (request and response):
+        0xA5 | LEN | OP | SEQ | PAYLOAD (LEN bytes) | CRC16 (LSB first)
+    CRC16 is CRC-CCITT (poly 0x1021, init 0xFFFF) over LEN, OP, SEQ and
+    PAYLOAD. Response has OP | 0x80, same SEQ and first payload byte is
+    status (STATUS_*).
+
+    Bitmaps are (numdevices + 7) / 8 bytes, bit 0 of byte 0 is device 0.
+
+        OP_PING     -                      -> status
+        OP_GET_ALL  -                      -> status, bitmap
+        OP_SET_ALL  bitmap                 -> status
+        OP_DELTA    mask bitmap, bits bitmap -> status
+        OP_SET_ONE  dev (2 bytes LSB first), state -> status
+        OP_GET_ONE  dev (2 bytes LSB first)  -> status, dev (2 bytes), state
+
+    LEN above the longest legal payload for the device count is not a
+    frame (the SYNC byte is skipped), and a partial frame is dropped when
+    no byte came for BINPROTO_FRAME_TIMEOUT_MS, so line noise can't hold
+    the parser. STATUS_BAD_CRC is only sent for a frame that starts where
+    the previous one ended (or after an idle line), not for bytes tried
+    while hunting for SYNC.
+
+    Frames are parsed in place from the receive buffer through memoryview,
+    payloads are never copied. Responses of all frames received in one
+    poll() are written at once. Device states are switched immediately,
+    but saved at most once per BINPROTO_SAVE_INTERVAL_MS.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    binproto.init(on_change)    # on_change(deviceid) after state change
+    binproto.poll()             # from main loop
+    Host side client: tools/relayclient.py
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import gc
+import utime
+
+from array import array
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import deviceconfig
+import devicectrl
+import telemetry
+
+from serialctl import open_port
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+FRAME_SYNC     = 0xA5;
+# SYNC, LEN, OP, SEQ and 2 bytes CRC.
+FRAME_OVERHEAD = 6;
+RESPONSE_FLAG  = 0x80;
+
+# Operation codes.,
+OP_PING    = 0x01;
+OP_GET_ALL = 0x02;
+OP_SET_ALL = 0x03;
+OP_DELTA   = 0x04;
+OP_SET_ONE = 0x05;
+OP_GET_ONE = 0x06;
+
+# Response status.,
+STATUS_OK         = 0;
+STATUS_BAD_CRC    = 1;
+STATUS_BAD_LENGTH = 2;
+STATUS_BAD_DEVICE = 3;
+STATUS_BAD_OP     = 4;
+
+# Serial port object, must provide readinto(buf, nbytes) and write(buf).
+port = None;
+
+# Called as on_change(deviceid) after a device state is changed.,
+on_change = None;
+
+# Receive buffer and its view., frames are parsed in place.
+rxbuf  = bytearray(BINPROTO_RX_BUFFER);
+rxview = memoryview(rxbuf);
+rxlen  = 0;
+
+# Responses of all frames handled in one poll().,
+txbuf  = bytearray(BINPROTO_RX_BUFFER);
+txview = memoryview(txbuf);
+txlen  = 0;
+# Start of the response frame being built.,
+txframe = 0;
+
+# CRC16-CCITT lookup table.,
+crctable = array("H", [0] * 256);
+
+# Preallocated [[deviceid, state], ...] for bulk updates.,
+bulk = [];
+
+# Bitmap size in bytes for numdevices, and longest legal payload (DELTA).,
+bitmapsize = 0;
+maxpayload = 0;
+
+# Time of last received byte (ms)., True -> parser lost the frame boundary
+# and is looking for the next SYNC byte.
+last_rx_ms = 0;
+hunting    = False;
+
+# Device states changed but not saved yet, and time of last save.,
+save_pending = False;
+last_save_ms = 0;
+
+# Frame counters, see stats().
+frames_ok  = 0;
+frames_bad = 0;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function fills the CRC16-CCITT lookup table.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def build_crc_table():
+    for i in range(256):
+        crc = i << 8;
+        for bit in range(8):
+            if (crc & 0x8000):
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF;
+            else:
+                crc = (crc << 1) & 0xFFFF;
+        crctable[i] = crc;
+    # End-of-Function
+
+
+"""
+This function computes CRC16-CCITT of buf[start:start + length].
+
+Args:
+    memoryview/bytearray: buf
+    int: start
+    int: length
+
+Returns:
+    int: CRC16
+
+Raises:
+
+Notes:
+    - Indexes the buffer directly, no slice is created.
+"""
+def crc16(buf, start, length):
+    crc = 0xFFFF;
+    for i in range(start, start + length):
+        crc = ((crc << 8) & 0xFFFF) ^ crctable[((crc >> 8) ^ buf[i]) & 0xFF];
+    return crc;
+    # End-of-Function
+
+
+"""
+Response building helpers., write directly into txbuf.
+"""
+def flush():
+    global txlen;
+    if (txlen > 0):
+        port.write(txview[:txlen]);
+        txlen = 0;
+    # End-of-Function
+
+def begin_response(op, seq, status, length):
+    # length is payload length including status byte.
+    global txlen;
+    global txframe;
+    if (txlen + length + FRAME_OVERHEAD > BINPROTO_RX_BUFFER):
+        flush();
+    txframe = txlen;
+    txbuf[txlen]     = FRAME_SYNC;
+    txbuf[txlen + 1] = length;
+    txbuf[txlen + 2] = op | RESPONSE_FLAG;
+    txbuf[txlen + 3] = seq;
+    txbuf[txlen + 4] = status;
+    txlen = txlen + 5;
+    # End-of-Function
+
+def put_byte(b):
+    global txlen;
+    txbuf[txlen] = b;
+    txlen = txlen + 1;
+    # End-of-Function
+
+def end_response():
+    global txlen;
+    crc = crc16(txbuf, txframe + 1, txlen - txframe - 1);
+    txbuf[txlen]     = crc & 0xFF;
+    txbuf[txlen + 1] = crc >> 8;
+    txlen = txlen + 2;
+    # End-of-Function
+
+def respond(op, seq, status):
+    begin_response(op, seq, status, 1);
+    end_response();
+    # End-of-Function
+
+
+"""
+This function switches devices collected in bulk.
+
+Args:
+    int: count entries of bulk to be applied.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Only devices whose state changes are in bulk.
+    - Save is deferred, see poll().
+"""
+def apply_bulk(count):
+    global save_pending;
+
+    if (0 == count):
+        return;
+
+    devicectrl.set_devices_onoff(bulk, count, False);
+    save_pending = True;
+
+    if (None != on_change):
+        for i in range(count):
+            on_change(bulk[i][0]);
+    # End-of-Function
+
+
+"""
+This function collects devices from bitmaps in the receive buffer into bulk.
+
+Args:
+    int: bits offset of state bitmap in rxbuf.
+    int: mask offset of mask bitmap in rxbuf, -1 -> all devices.
+
+Returns:
+    int: number of devices whose state changes.
+
+Raises:
+
+Notes:
+"""
+def collect_bitmap(bits, mask):
+    devicestatus = deviceconfig.get_device_status();
+    count = 0;
+    for deviceid in range(deviceconfig.get_total_devices()):
+        byte = deviceid >> 3;
+        bit  = deviceid & 7;
+        if (mask >= 0 and 0 == (rxview[mask + byte] >> bit) & 1):
+            continue;
+        state = (rxview[bits + byte] >> bit) & 1;
+        if (state != devicestatus[str(deviceid)]):
+            bulk[count][0] = deviceid;
+            bulk[count][1] = state;
+            count = count + 1;
+    return count;
+    # End-of-Function
+
+
+"""
+This function handles one received frame with valid CRC.
+
+Args:
+    int: op operation code
+    int: seq sequence number, echoed in response
+    int: offset of payload in rxbuf
+    int: length of payload
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def handle_frame(op, seq, offset, length):
+    total = deviceconfig.get_total_devices();
+
+    if (OP_PING == op):
+        respond(op, seq, STATUS_OK);
+
+    elif (OP_GET_ALL == op):
+        devicestatus = deviceconfig.get_device_status();
+        begin_response(op, seq, STATUS_OK, 1 + bitmapsize);
+        for byte in range(bitmapsize):
+            value = 0;
+            for bit in range(8):
+                deviceid = byte * 8 + bit;
+                if (deviceid < total and 1 == devicestatus[str(deviceid)]):
+                    value |= (1 << bit);
+            put_byte(value);
+        end_response();
+
+    elif (OP_SET_ALL == op):
+        if (bitmapsize != length):
+            respond(op, seq, STATUS_BAD_LENGTH);
+            return;
+        apply_bulk(collect_bitmap(offset, -1));
+        respond(op, seq, STATUS_OK);
+
+    elif (OP_DELTA == op):
+        if (2 * bitmapsize != length):
+            respond(op, seq, STATUS_BAD_LENGTH);
+            return;
+        apply_bulk(collect_bitmap(offset + bitmapsize, offset));
+        respond(op, seq, STATUS_OK);
+
+    elif (OP_SET_ONE == op or OP_GET_ONE == op):
+        if ((OP_SET_ONE == op and 3 != length) or (OP_GET_ONE == op and 2 != length)):
+            respond(op, seq, STATUS_BAD_LENGTH);
+            return;
+        deviceid = rxview[offset] | (rxview[offset + 1] << 8);
+        if (deviceid >= total):
+            respond(op, seq, STATUS_BAD_DEVICE);
+            return;
+
+        if (OP_SET_ONE == op):
+            state = 1 if rxview[offset + 2] else 0;
+            if (state != deviceconfig.get_device_status()[str(deviceid)]):
+                bulk[0][0] = deviceid;
+                bulk[0][1] = state;
+                apply_bulk(1);
+            respond(op, seq, STATUS_OK);
+        else:
+            begin_response(op, seq, STATUS_OK, 4);
+            put_byte(deviceid & 0xFF);
+            put_byte(deviceid >> 8);
+            put_byte(deviceconfig.get_device_status()[str(deviceid)]);
+            end_response();
+
+    else:
+        respond(op, seq, STATUS_BAD_OP);
+    # End-of-Function
+
+
+"""
+This function parses all complete frames in the receive buffer.
+
+Args:
+    None
+
+Returns:
+    int: number of frames handled.
+
+Raises:
+
+Notes:
+    - Bytes before SYNC, SYNC with LEN above maxpayload and frames with
+      bad CRC are skipped, parser re-synchronizes on next SYNC byte.
+    - Bad CRC is answered only when not hunting (OP and SEQ of a frame
+      found while hunting are most likely junk).
+    - Incomplete frame is moved to start of the buffer for next poll().
+"""
+def parse_frames():
+    global rxlen;
+    global frames_ok;
+    global frames_bad;
+    global hunting;
+
+    handled = 0;
+    start   = 0;
+    while (start < rxlen):
+        if (FRAME_SYNC != rxview[start]):
+            start = start + 1;
+            hunting = True;
+            continue;
+        if (rxlen - start < 2):
+            break;  # Wait for LEN.
+
+        length = rxview[start + 1];
+        if (length > maxpayload):
+            start = start + 1;
+            hunting = True;
+            continue;
+        if (rxlen - start < length + FRAME_OVERHEAD):
+            break;  # Wait for rest of the frame.
+
+        crcpos = start + 4 + length;
+        if (crc16(rxview, start + 1, length + 3) != (rxview[crcpos] | (rxview[crcpos + 1] << 8))):
+            if not hunting:
+                frames_bad = frames_bad + 1;
+                respond(rxview[start + 2], rxview[start + 3], STATUS_BAD_CRC);
+            start = start + 1;
+            hunting = True;
+            continue;
+
+        handle_frame(rxview[start + 2], rxview[start + 3], start + 4, length);
+        frames_ok = frames_ok + 1;
+        telemetry.count(telemetry.CNT_SERIAL_COMMANDS);
+        handled   = handled + 1;
+        start     = crcpos + 2;
+        hunting   = False;
+
+    # Keep the incomplete frame., (overlapping copy is safe, it moves down)
+    if (start > 0):
+        rxbuf[0:rxlen - start] = rxview[start:rxlen];
+        rxlen = rxlen - start;
+    return handled;
+    # End-of-Function
+
+
+"""
+This function must be called from main loop.
+It reads available bytes, handles complete frames, writes all responses
+at once and saves changed device states when save interval has elapsed.
+
+Args:
+    None
+
+Returns:
+    int: number of frames handled.
+
+Raises:
+
+Notes:
+    - Partial frame is dropped only after all waiting bytes are read, a
+      slow main loop pass doesn't drop frames.
+"""
+def poll():
+    global rxlen;
+    global save_pending;
+    global last_save_ms;
+    global last_rx_ms;
+    global hunting;
+
+    if (None == port):
+        return 0;
+
+    handled = 0;
+    received = False;
+    while True:
+        if (rxlen >= BINPROTO_RX_BUFFER):
+            # Full of garbage (frames are smaller than buffer)., drop it.
+            rxlen = 0;
+        count = port.readinto(rxview[rxlen:], BINPROTO_RX_BUFFER - rxlen);
+        if (not count):
+            break;
+        received = True;
+        rxlen = rxlen + count;
+        handled = handled + parse_frames();
+
+    now = utime.ticks_ms();
+    if received:
+        last_rx_ms = now;
+    elif (rxlen > 0 and utime.ticks_diff(now, last_rx_ms) >= BINPROTO_FRAME_TIMEOUT_MS):
+        # Line idle in the middle of a frame., next byte starts a new one.
+        rxlen   = 0;
+        hunting = False;
+
+    flush();
+
+    if (save_pending and utime.ticks_diff(utime.ticks_ms(), last_save_ms) >= BINPROTO_SAVE_INTERVAL_MS):
+        devicectrl.save_device_state();
+        save_pending = False;
+        last_save_ms = utime.ticks_ms();
+
+    return handled;
+    # End-of-Function
+
+
+"""
+This function returns frame counters.
+
+Args:
+    None
+
+Returns:
+    list: [frames handled, frames with bad CRC]
+
+Raises:
+
+Notes:
+"""
+def stats():
+    return [frames_ok, frames_bad];
+    # End-of-Function
+
+
+"""
+This function initializes binary protocol.
+
+Args:
+    function: device_changed(deviceid) called after device state is
+              changed by a frame, None -> not needed.
+    object: serial_port port to use, None -> serialctl.open_port()
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Call after devicectrl.init().
+"""
+def init(device_changed = None, serial_port = None):
+    global port;
+    global on_change;
+    global bulk;
+    global bitmapsize;
+    global maxpayload;
+    global last_save_ms;
+
+    on_change = device_changed;
+    port = serial_port if None != serial_port else open_port();
+
+    build_crc_table();
+
+    total = deviceconfig.get_total_devices();
+    bitmapsize = (total + 7) // 8;
+    # DELTA (two bitmaps) or SET_ONE (3 bytes), whichever is longer.,
+    maxpayload = max(2 * bitmapsize, 3);
+    bulk = [[0, 0] for i in range(total)];
+    last_save_ms = utime.ticks_ms();
+    gc.collect();
+    # End-of-Function
+
+# End-of-File
\ No newline at end of file
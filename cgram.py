@@ -0,0 +1,330 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file manages the CGRAM_SLOTS custom character slots of the LCD.
+    Glyphs (ON/OFF icon halves, cursor, lock, timer, progress bar) are
+    uploaded lazily, when they are first needed and not already resident.
+    A slot is reused by least recently used order, but only when no cell
+    on screen shows it., 'frame' keeps the custom character code of each
+    screen cell and 'refs' counts the cells per slot.
+    With off-screen pages (display.py) 'frame' covers the hidden DDRAM
+    columns too, a glyph on a hidden page is shown after display shift.
+    When all slots are in use on screen, the glyph's FALLBACK character
+    is returned instead (counted in telemetry CNT_CGRAM_FALLBACKS).
+
+    Drawing order (display.py):
+        codes = cgram.acquire(glyphs);      # Before move_to(), upload moves
+                                            # LCD address to CGRAM.
+        lcd.move_to(x, y);
+        lcd.putraw(codes);
+        cgram.commit(x, y, codes);
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    cgram.init(lcd);                        # After LCD init.
+    codes = cgram.acquire(cgram.ICON_ON);
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+# Import all constants and defines.,
+from proj_defines import *
+
+import telemetry
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Glyph IDs, index in GLYPHS and FALLBACK.,
+GLYPH_ON_LEFT   = 0;
+GLYPH_ON_RIGHT  = 1;
+GLYPH_OFF_LEFT  = 2;
+GLYPH_OFF_RIGHT = 3;
+GLYPH_CURSOR    = 4;
+GLYPH_LOCK      = 5;
+GLYPH_TIMER     = 6;
+GLYPH_BAR_1     = 7;    # Progress bar cell with 1 to 5 columns filled.,
+GLYPH_BAR_2     = 8;
+GLYPH_BAR_3     = 9;
+GLYPH_BAR_4     = 10;
+GLYPH_BAR_5     = 11;
+
+GLYPHS = [
+    bytearray([  0x07,  0x08,  0x13,  0x17,  0x17,  0x13,  0x08,  0x07]),  # ON
+    bytearray([  0x1C,  0x02,  0x19,  0x1D,  0x1D,  0x19,  0x02,  0x1C]),
+    bytearray([  0x07,  0x08,  0x10,  0x10,  0x10,  0x10,  0x08,  0x07]),  # OFF
+    bytearray([  0x1C,  0x02,  0x01,  0x01,  0x01,  0x01,  0x02,  0x1C]),
+    bytearray([  0x18,  0x0C,  0x06,  0x1F,  0x1F,  0x06,  0x0C,  0x18]),  # Cursor
+    bytearray([  0x0E,  0x11,  0x11,  0x1F,  0x1B,  0x1B,  0x1F,  0x00]),  # Lock
+    bytearray([  0x00,  0x0E,  0x15,  0x17,  0x11,  0x0E,  0x00,  0x00]),  # Timer
+    bytearray([  0x10] * 8),
+    bytearray([  0x18] * 8),
+    bytearray([  0x1C] * 8),
+    bytearray([  0x1E] * 8),
+    bytearray([  0x1F] * 8),
+];
+
+# Plain character shown when no slot can be freed, one per glyph.,
+FALLBACK = b"ON-->LT||||#";
+
+# Glyph runs used by display.py
+ICON_ON  = (GLYPH_ON_LEFT,  GLYPH_ON_RIGHT);
+ICON_OFF = (GLYPH_OFF_LEFT, GLYPH_OFF_RIGHT);
+CURSOR   = (GLYPH_CURSOR,);
+TIMER    = (GLYPH_TIMER,);
+
+# Code stored in 'frame' for cells showing ordinary characters.,
+TEXT = 0x20;
+
+lcd = None;
+
+# Slot state: glyph loaded (None -> empty), cells on screen (+ pins taken
+# by acquire() until commit()), last use stamp.
+slot_glyph = [None] * CGRAM_SLOTS;
+refs       = [0] * CGRAM_SLOTS;
+last_used  = [0] * CGRAM_SLOTS;
+
+# Glyph ID -> slot, for resident glyphs.,
+glyph_slot = {};
+
+# Use stamp, wraps at 2^30 to stay small integer (order is only briefly
+# wrong after wrap).
+stamp = 0;
+
+# Custom character code of every screen cell, row major., 'width' cells
+# per row (visible and hidden DDRAM columns), set by init().
+width = I2C_DISPLAY_NUM_COLS;
+frame = bytearray([TEXT] * (I2C_DISPLAY_NUM_ROWS * I2C_DISPLAY_NUM_COLS));
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function returns the slot to load a new glyph into.
+
+Args:
+    None
+
+Returns:
+    int: slot, -1 if every slot is shown on screen.
+
+Raises:
+
+Notes:
+    - Empty slots have stamp 0 and are taken first.
+"""
+def victim():
+    slot = -1;
+    for i in range(CGRAM_SLOTS):
+        if (0 == refs[i] and (slot < 0 or last_used[i] < last_used[slot])):
+            slot = i;
+    return slot;
+    # End-of-Function
+
+
+"""
+This function makes glyphs resident and returns their character codes.
+Each returned slot is pinned until commit() so the next glyph of the
+same run can not evict it.
+
+Args:
+    tuple: glyphs glyph IDs (GLYPH_*)
+
+Returns:
+    bytes: character codes to write
+
+Raises:
+
+Notes:
+    - Must be called before moving the cursor, an upload leaves LCD in
+      CGRAM address mode until the next move_to().
+"""
+def acquire(glyphs):
+    global stamp;
+
+    codes = bytearray(len(glyphs));
+    for i in range(len(glyphs)):
+        glyph = glyphs[i];
+        slot = glyph_slot.get(glyph, -1);
+        if (slot < 0):
+            slot = victim();
+            if (slot < 0):
+                telemetry.count(telemetry.CNT_CGRAM_FALLBACKS);
+                codes[i] = FALLBACK[glyph];
+                continue;
+            if (None != slot_glyph[slot]):
+                del glyph_slot[slot_glyph[slot]];
+            lcd.custom_char(slot, GLYPHS[glyph]);
+            telemetry.count(telemetry.CNT_CGRAM_UPLOADS);
+            slot_glyph[slot] = glyph;
+            glyph_slot[glyph] = slot;
+
+        stamp = (stamp + 1) & 0x3FFFFFFF;
+        last_used[slot] = stamp;
+        refs[slot] = refs[slot] + 1;
+        codes[i] = slot;
+    return codes;
+    # End-of-Function
+
+
+"""
+This function records characters written at given cell in 'frame'.,
+cells wrap to next row like LcdApi.putchar().
+
+Args:
+    int: x column
+    int: y row
+    bytes: codes character codes written
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def mark(x, y, codes):
+    size = len(frame);
+    index = (y * width + x) % size;
+    for code in codes:
+        old = frame[index];
+        if (old < CGRAM_SLOTS):
+            refs[old] = refs[old] - 1;
+        if (code < CGRAM_SLOTS):
+            refs[code] = refs[code] + 1;
+        frame[index] = code;
+        index = (index + 1) % size;
+    # End-of-Function
+
+
+"""
+This function records count ordinary characters written at given cell.,
+(strings, blanks)
+
+Args:
+    int: x column
+    int: y row
+    int: count number of characters
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def overwrite(x, y, count):
+    size = len(frame);
+    index = (y * width + x) % size;
+    for i in range(min(count, size)):
+        old = frame[index];
+        if (old < CGRAM_SLOTS):
+            refs[old] = refs[old] - 1;
+            frame[index] = TEXT;
+        index = (index + 1) % size;
+    # End-of-Function
+
+
+"""
+This function records codes returned by acquire() as written at given
+cell and drops their pins.
+
+Args:
+    int: x column
+    int: y row
+    bytes: codes returned by acquire()
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def commit(x, y, codes):
+    mark(x, y, codes);
+    for code in codes:
+        if (code < CGRAM_SLOTS):
+            refs[code] = refs[code] - 1;
+    # End-of-Function
+
+
+"""
+This function forgets all cells after the screen is cleared., glyphs
+stay resident for the next page.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def clear():
+    for i in range(len(frame)):
+        frame[i] = TEXT;
+    for i in range(CGRAM_SLOTS):
+        refs[i] = 0;
+    # End-of-Function
+
+
+"""
+This function resets the manager for given LCD., CGRAM content is
+unknown after LCD init, so every slot starts empty.
+
+Args:
+    LcdApi: lcd_obj LCD to upload glyphs to.
+    int: columns DDRAM columns drawn per row (visible + hidden).
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def init(lcd_obj, columns = I2C_DISPLAY_NUM_COLS):
+    global lcd;
+    global stamp;
+    global width;
+    global frame;
+
+    lcd = lcd_obj;
+    width = columns;
+    frame = bytearray([TEXT] * (I2C_DISPLAY_NUM_ROWS * columns));
+    stamp = 0;
+    glyph_slot.clear();
+    for i in range(CGRAM_SLOTS):
+        slot_glyph[i] = None;
+        last_used[i] = 0;
+    clear();
+    # End-of-Function
+
+# End-of-File
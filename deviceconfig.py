@@ -38,6 +38,8 @@ import utime
 from proj_defines import *
 # Import error state
 from display import error_state
+# Bad group/scene members are skipped with a warning.,
+import errors
 
 
 """
@@ -53,6 +55,21 @@ devicestatus = None;
 # Total devices connected to the system.
 total_devices = 0;
 
+# Sorted device name index used for jump-by-letter navigation.,
+# Each entry is [<upper case device name>, <device id>], sorted by name.
+name_index   = [];
+
+# Distinct first letters of device names, sorted.,
+name_letters = [];
+
+# Device groups from devices.json, sorted by name.,
+# Each entry is [<group name>, [<device id>, ...]]
+groups = [];
+
+# Device scenes from devices.json, sorted by name.,
+# Each entry is [<scene name>, [[<device id>, <state>], ...]]
+scenes = [];
+
 """
 -------------------------------------------------------------------------------
  Functions 
@@ -107,6 +124,12 @@ def load_device_config():
         # set total_devices to value.,
         total_devices = int(deviceinfo[numdevices]);
 
+    # Names are constant after load., build the lookup index once at boot.
+    build_name_index();
+
+    # Groups and scenes are optional.,
+    load_groups_and_scenes();
+
     gc.collect();
     utime.sleep_ms(50);
     pass; # End-of-Function
@@ -212,8 +235,8 @@ def get_device_name(deviceid):
     global deviceinfo;
 
     if( deviceid < 0 or deviceid >= total_devices):
-        # Return empty string :(.., Silent failure :(..,
-        # Should we call display.error_state() here?
+        # Return empty string, logged as warning (errors.py).,
+        errors.report(errors.SEV_WARN, errors.ERR_DEVICE_ID, deviceid);
         return ""; 
     else:
         # Each element at deviceinfo[deviceid] is a list of device name and gpio pin
@@ -223,6 +246,211 @@ def get_device_name(deviceid):
     # End-of-Function
 
 
+"""
+This function builds the sorted device name index and the list of distinct
+first letters used by the jump-by-letter navigation.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+    
+
+Example:
+
+
+Notes:
+    - This function assumes load_device_config() is successful.
+    - Names are compared case insensitive, hence index keeps upper case names.
+"""
+def build_name_index():
+    global name_index;
+    global name_letters;
+
+    name_index = sorted([[get_device_name(i).upper(), i] for i in range(total_devices)]);
+
+    name_letters = [];
+    for entry in name_index:
+        letter = entry[0][:1];
+        # Index is sorted., so same letters are always adjacent.
+        if (0 == len(name_letters) or name_letters[-1] != letter):
+            name_letters.append(letter);
+    # End-of-Function
+
+
+"""
+This function loads optional device groups and scenes from devices.json
+into sorted lists.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+    
+
+Example:
+    "groups" : { "Lights" : [0, 1] },
+    "scenes" : { "Night"  : {"0": 0, "1": 1} }
+
+Notes:
+    - This function assumes load_device_config() is successful.
+    - Device ids out of range are skipped with a warning (errors.py),
+      the rest of the group or scene is kept.
+    - MicroPython dictionaries are not ordered, hence names are sorted.
+"""
+def load_groups_and_scenes():
+    global deviceinfo;
+    global groups;
+    global scenes;
+
+    groups = [];
+    scenes = [];
+
+    if (groupstag in deviceinfo.keys()):
+        for name in sorted(deviceinfo[groupstag].keys()):
+            members = [];
+            for d in deviceinfo[groupstag][name]:
+                if (int(d) < 0 or int(d) >= total_devices):
+                    print("Invalid device id {0} in group {1}".format(d, name));
+                    errors.report(errors.SEV_WARN, errors.ERR_CONFIG, int(d));
+                    continue;
+                members.append(int(d));
+            groups.append([name, members]);
+
+    if (scenestag in deviceinfo.keys()):
+        for name in sorted(deviceinfo[scenestag].keys()):
+            targets = [];
+            for d in deviceinfo[scenestag][name].keys():
+                if (int(d) < 0 or int(d) >= total_devices):
+                    print("Invalid device id {0} in scene {1}".format(d, name));
+                    errors.report(errors.SEV_WARN, errors.ERR_CONFIG, int(d));
+                    continue;
+                targets.append([int(d), int(deviceinfo[scenestag][name][d])]);
+            scenes.append([name, targets]);
+    # End-of-Function
+
+
+"""
+This function returns device groups.
+
+Args:
+    None
+
+Returns:
+    list: [[<group name>, [<device id>, ...]], ...] sorted by name.
+
+Raises:
+    
+
+Example:
+
+
+Notes:
+    - This function assumes load_device_config() is successful.
+"""
+def get_groups():
+    global groups;
+    return groups;
+    # End-of-Function
+
+
+"""
+This function returns device scenes.
+
+Args:
+    None
+
+Returns:
+    list: [[<scene name>, [[<device id>, <state>], ...]], ...] sorted by name.
+
+Raises:
+    
+
+Example:
+
+
+Notes:
+    - This function assumes load_device_config() is successful.
+"""
+def get_scenes():
+    global scenes;
+    return scenes;
+    # End-of-Function
+
+
+"""
+This function returns distinct first letters of the device names in
+sorted order.
+
+Args:
+    None
+
+Returns:
+    list: first letters (upper case strings).
+
+Raises:
+    
+
+Example:
+
+
+Notes:
+    - This function assumes load_device_config() is successful.
+"""
+def get_name_letters():
+    global name_letters;
+    return name_letters;
+    # End-of-Function
+
+
+"""
+This function returns the device id of the first device (in name order)
+whose name starts with 'prefix'.
+
+Args:
+    str: prefix to look for, case insensitive.
+
+Returns:
+    integer: device id, -1 if no device name starts with 'prefix'.
+
+Raises:
+    
+
+Example:
+    find_device_by_prefix("F") -> 4 ("Fifth Device")
+
+Notes:
+    - Binary search over name_index, O(log n) for n devices.
+    - MicroPython doesn't ship bisect module, hence hand rolled lower bound.
+"""
+def find_device_by_prefix(prefix):
+    global name_index;
+
+    prefix = prefix.upper();
+    low  = 0;
+    high = len(name_index);
+
+    # Lower bound: first entry with name >= prefix.
+    while (low < high):
+        mid = (low + high) // 2;
+        if (name_index[mid][0] < prefix):
+            low = mid + 1;
+        else:
+            high = mid;
+
+    if (low < len(name_index) and name_index[low][0].startswith(prefix)):
+        return name_index[low][1];
+
+    return -1;
+    # End-of-Function
+
+
 """
 This function is the entry function of this module.
 It loads the devices.json and devicestate.json configurations.
@@ -38,16 +38,34 @@ import utime
 import ujson
 
 from machine import Pin
+from machine import mem32
 
 from display import lcd
 from display import error_state
 
+# Non-fatal errors (bad device id, missing FRAM/EEPROM).,
+import errors
+
 # Import all constants and defines.,
 from proj_defines import *
 
 # Import device config., 
 import deviceconfig
 
+# Flash write counters and latency.,
+import telemetry
+import flashwear
+import profiler
+
+# Saves run on core 1 in dual core mode.,
+import iocore
+
+# FRAM/EEPROM state backend.,
+import nvram
+
+# Relay states retained across resets.,
+import watchdog
+
 """
 -------------------------------------------------------------------------------
  Global variables 
@@ -62,9 +80,30 @@ allocated_pins = [I2C_LCD_SDA_PIN,
                   ROTARY_ENCODER_DATA_PIN,
                   ROTARY_ENCODER_SWITCH_PIN];
 
+# Serial control port pins, if UART is used.,
+if ("uart" == SERIAL_PORT):
+    allocated_pins.append(SERIAL_UART_TX_PIN);
+    allocated_pins.append(SERIAL_UART_RX_PIN);
+
+# Power fail monitor input.,
+if ("gpio" == POWERFAIL_MODE):
+    allocated_pins.append(POWERFAIL_GPIO_PIN);
+elif ("adc" == POWERFAIL_MODE):
+    allocated_pins.append(POWERFAIL_ADC_PIN);
+
 # Pin informaton structure.,
 devicepins = [];
 
+# GPIO number of each device, index bound with device ID like devicepins.
+devicegpios = [];
+
+# Deferred saves (power fail monitor, see defer_saves())., 0 -> save at once.
+save_delay_ms = 0;
+save_pending  = False;
+save_due      = None;
+saving        = False;  # write_device_state() in progress.
+urgent        = False;  # Power failing, everything is written at once.
+
 """
 -------------------------------------------------------------------------------
  Functions 
@@ -100,7 +139,9 @@ Notes:
 def init():
     global allocated_pins;
     global devicepins;
+    global devicegpios;
     global devicestatus;
+    global STATE_BACKEND;
     
     # Get the device inforamation dictionary pre-parsed from devices.json file.
     deviceinfo   = deviceconfig.get_device_info();
@@ -121,7 +162,33 @@ def init():
     
     devices = deviceinfo[numdevices];
 
+    # States from FRAM/EEPROM, if used., before pins are set. Without the
+    # memory states are kept in devicestate.json (degraded).
+    if ("file" != STATE_BACKEND and not nvram.init(devicestatus)):
+        STATE_BACKEND = "file";
+
+    # Warm restart: outputs were restored from watchdog scratch at import
+    # of main.py, those are the latest states (a deferred save may not
+    # have been written). Retained pins of another configuration are
+    # released.
+    mask = 0;
+    for i in range(devices):
+        mask = mask | (1 << deviceinfo[i][1]);
+    stale = False;
+    if watchdog.warm:
+        if (watchdog.count == devices and watchdog.pinmask == mask):
+            for i in range(devices):
+                state = (watchdog.states >> i) & 1;
+                stale = stale or (state != devicestatus[str(i)]);
+                devicestatus[str(i)] = state;
+        else:
+            for gpio in range(watchdog.GPIO_COUNT):
+                if (watchdog.pinmask & ~mask & (1 << gpio)):
+                    Pin(gpio, Pin.IN);
+    watchdog.arm(devices, mask);
+
     devicepins.clear();
+    devicegpios.clear();
 
     for i in range(devices):
         gpio = deviceinfo[i][1];
@@ -133,11 +200,22 @@ def init():
             pin = Pin(gpio, Pin.OUT);
 
             devicepins.append(pin);
+            devicegpios.append(gpio);
 
             if devicestatus[str(i)] == 1:
                 pin.value(1);
             else:
                 pin.value(0);
+            watchdog.mark(i, devicestatus[str(i)]);
+
+    watchdog.store();
+    if watchdog.warm:
+        telemetry.count(telemetry.CNT_BOOT_WARM);
+        telemetry.boot_mark(telemetry.CNT_BOOT_OUTPUTS_US, watchdog.restored_us);
+    else:
+        telemetry.boot_mark(telemetry.CNT_BOOT_OUTPUTS_US);
+    if stale:
+        save_device_state();
 
     gc.collect();
     # End-of-Function        
@@ -178,23 +256,90 @@ Example:
 Notes:
      - This function calls save_device_state() and machine.Pin::value to
        turn the device on or off;
+     - Invalid device id is a recoverable error (errors.py), nothing is
+       switched.
 """
 def set_device_onoff(deviceid, state = False):
     global devicestatus;
     global devicepins;
 
-    if ( deviceid >= devicestatus[numdevices] ):
+    if ( deviceid < 0 or deviceid >= devicestatus[numdevices] ):
         print("Invalid device id");
-        error_state( "Device ID");
+        errors.report(errors.SEV_ERROR, errors.ERR_DEVICE_ID, deviceid);
     else:
         devicepins[deviceid].value(int(state == True));
         devicestatus[str(deviceid)] = int((state == True));
+        watchdog.mark(deviceid, state == True);
+        watchdog.store();
         save_device_state(); # Save device status.
     # End-of-Function
 
+"""
+This function turns on/off multiple devices at once., (groups and scenes)
+All GPIOs are switched together with single write to SIO GPIO_OUT_XOR
+register and device status is saved only once.
+
+Args:
+    list: states [[<deviceid>, <state>], ...]
+          state = False/0 -> Turn off the device.,
+          state = True/1  -> Turn on the device.
+    int: count number of entries of 'states' to be used, -1 -> all.
+         (Lets callers reuse a preallocated list.)
+    bool: save False -> caller saves later with save_device_state().,
+          (Lets callers coalesce many updates into one flash write.)
+
+Returns:
+    None
+
+Raises:
+    
+
+Example:
+    set_devices_onoff([[0, True], [3, False]])
+
+Notes:
+     - Cost is one register write and one save_device_state() regardless
+       of number of devices, compared to set_device_onoff() per device.
+     - Entries with invalid device id are reported (errors.py) and skipped.
+     - Only bits of given devices are flipped, other GPIOs are untouched.
+"""
+def set_devices_onoff(states, count = -1, save = True):
+    global devicestatus;
+    global devicegpios;
+
+    onmask  = 0;
+    offmask = 0;
+
+    if (count < 0):
+        count = len(states);
+
+    for i in range(count):
+        [deviceid, state] = states[i];
+        # Invalid entry is skipped, others are switched.,
+        if ( deviceid < 0 or deviceid >= devicestatus[numdevices] ):
+            print("Invalid device id");
+            errors.report(errors.SEV_ERROR, errors.ERR_DEVICE_ID, deviceid);
+            continue;
+
+        if (state == True):
+            onmask  |= (1 << devicegpios[deviceid]);
+        else:
+            offmask |= (1 << devicegpios[deviceid]);
+        devicestatus[str(deviceid)] = int((state == True));
+        watchdog.mark(deviceid, state == True);
+
+    # Flip only the GPIOs which are not in requested state yet.,
+    current = mem32[SIO_BASE + SIO_GPIO_OUT];
+    mem32[SIO_BASE + SIO_GPIO_OUT_XOR] = (onmask & ~current) | (offmask & current);
+    watchdog.store();
+
+    if save:
+        save_device_state(); # Save device status., once for all devices.
+    # End-of-Function
+
 """
 This function saves the device status in devicestate.json
-configuration file.
+configuration file, or FRAM/EEPROM (STATE_BACKEND).
 
 Args:
     None
@@ -211,11 +356,147 @@ Example:
 Notes:
     - This function is vital to ensure state is preserved across
       power failures.
+    - With a power fail monitor (defer_saves()) the write is left to
+      poll_save(), STATE_SAVE_DELAY_MS later, changes made meanwhile are
+      written with it.
 """
 def save_device_state():
+    global save_pending;
+    global save_due;
+
+    # Set first, so a power fail from here on writes this change.,
+    save_pending = True;
+    if (0 == save_delay_ms or urgent):
+        write_device_state();
+    elif (None == save_due):
+        save_due = utime.ticks_add(utime.ticks_ms(), save_delay_ms);
+    # End-of-Function
+
+
+"""
+This function writes the device status to devicestate.json or
+FRAM/EEPROM (STATE_BACKEND).
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+    
+
+Notes:
+    - In dual core mode it is queued to core 1, saves requested while
+      one is already queued are merged into it.
+    - Power fail while it runs (IRQ) leaves the commit to it, see
+      flush_device_state().
+"""
+def write_device_state():
     global devicestatus;
-    with open (devicestatus_cfgfile, "wb") as f:
-        ujson.dump(devicestatus, f);
+    global save_pending;
+    global saving;
+
+    if iocore.offload_once(write_device_state):
+        return;
+
+    saving = True;
+    save_pending = False;
+    t0 = telemetry.start();
+    profiler.enter(profiler.SC_SAVE_STATE);
+    if ("file" != STATE_BACKEND):
+        # Changed bytes only., EEPROM pages may be left to nvram.poll().
+        written = nvram.save(devicestatus);
+    else:
+        with open (devicestatus_cfgfile, "w") as f:
+            written = f.write(ujson.dumps(devicestatus));
+        flashwear.account(flashwear.WEAR_DEVICESTATE, written);
+
+    profiler.leave();
+    telemetry.record(telemetry.HIST_SAVE_STATE, t0);
+    telemetry.trace(telemetry.EV_SAVE, written);
+    saving = False;
+
+    if urgent:
+        # Power fail came during the write, or before it., pending EEPROM
+        # pages too.
+        if ("file" != STATE_BACKEND):
+            nvram.commit();
+    # End-of-Function
+
+
+"""
+This function writes a deferred save when it is due.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called from main loop every pass.
+"""
+def poll_save():
+    global save_due;
+
+    if (None == save_due or utime.ticks_diff(utime.ticks_ms(), save_due) < 0):
+        return;
+    save_due = None;
+    if save_pending:
+        write_device_state();
+    # End-of-Function
+
+
+"""
+This function defers device state saves, used when a power fail
+monitor can commit them in time (powerfail.py).
+
+Args:
+    int: delay_ms time a change may wait for its save., 0 -> no deferral.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def defer_saves(delay_ms):
+    global save_delay_ms;
+
+    save_delay_ms = delay_ms;
+    # End-of-Function
+
+
+"""
+This function commits the device status now, power is failing.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called from the power fail IRQ handler, which can run between any
+      two bytecodes of the main loop. A write it interrupted is completed
+      when the handler returns and commits then (urgent).
+    - State is written even if no save is pending., callers with
+      save = False (binproto bulk) may hold unsaved changes. Only changed
+      bytes go to FRAM/EEPROM.
+    - Saves after this are written at once.
+"""
+def flush_device_state():
+    global urgent;
 
+    urgent = True;
+    if saving:
+        return;
+    write_device_state();
     # End-of-Function
 # End-of-File
@@ -17,6 +17,31 @@ Description:
     draw cursor, draw string, draw ON/OFF state icon special characters.
     Due to tight coupling, it also implements critical error handler., 
 
+    Screen draws in slices:
+    draw_screen() starts drawing a whole screen (cells built in memory with
+    new_cells(), set_text(), set_glyphs()) and returns at once. step(),
+    called from main loop, writes at most LCD_SLICE_FRAMES I2C frames of it
+    (I2cLcd.writer()), so input and serial commands are handled between
+    slices. Rows are written in full, no clear is needed.
+    Other drawing functions still write at once, and update the cells of a
+    draw in progress too, so the draw does not put old content back.
+
+    Off-screen pages (DDRAM_PAGES):
+    HD44780 keeps DDRAM_LINE_LENGTH characters per line, a 16x2 panel shows
+    16 of them. DDRAM columns are split in 'banks' of I2C_DISPLAY_NUM_COLS,
+    bank b starts at column b * I2C_DISPLAY_NUM_COLS. One bank is on screen,
+    the other one can hold a page drawn when idle (draw_screen(hidden)).
+    show_page() then brings it on screen with display shift:
+      - bank 0 -> 1: I2C_DISPLAY_NUM_COLS shift commands,
+      - bank 1 -> 0: one return home command.
+    Column arguments are always screen columns.
+
+    Changed cells only (draw_screen(changed)):
+    Cells written to each bank are kept in 'shadow'. A draw with changed
+    set skips cells that already hold the same code and splits runs at
+    two or more of them, so a screen that differs in a few cells (list
+    scrolled by one row, scroll_screen()) costs a few runs only.
+
 Supported Platforms:
     - MicroPython v1.24.1 on 2024-11-29; 
     - Board: Raspberry Pi Pico with RP2040
@@ -34,6 +59,8 @@ Usage:
 import gc;
 import utime;
 
+from array import array
+
 from machine import Pin
 from machine import I2C
 
@@ -42,6 +69,17 @@ from pico_i2c_lcd import I2cLcd
 
 from proj_defines import *
 
+import cgram
+import panels
+import telemetry
+import profiler
+
+# Non-fatal errors., bad arguments and LCD bus errors don't stop the board.
+import errors
+
+# LCD is owned by core 1 in dual core mode., see iocore.py
+import iocore
+
 """
 -------------------------------------------------------------------------------
  Global variables 
@@ -50,6 +88,27 @@ from proj_defines import *
 i2c = I2C(I2C_CHANNEL_ID, sda = Pin(I2C_LCD_SDA_PIN), scl = Pin(I2C_LCD_SCL_PIN), freq = I2C_BUS_FREQUENCY)
 lcd = I2cLcd(i2c, I2C_ADDR, I2C_DISPLAY_NUM_ROWS, I2C_DISPLAY_NUM_COLS)
 
+# Off-screen pages, set up by init()., 1 bank -> feature is off.
+banks       = 1;
+bank        = 0;        # Bank on screen.
+bank_page   = [-1];     # Page drawn in each bank, -1 -> none or stale.
+cursor_cell = [-1];     # Custom cursor cell (y * cols + x) per bank, -1 -> none.
+# Cell codes written in each bank (panels.GLYPH_CODE coding), for changed
+# cells only draws and mirror panels. Not valid after an LCD write failed.,
+shadow       = [];
+shadow_valid = [];
+
+# Screen draw in progress (draw_screen()), None -> none.,
+job       = None;   # I2cLcd.writer() generator
+job_bank  = 0;
+job_page  = -1;
+job_cells = None;   # Cells being drawn, row major (panels.GLYPH_CODE coding).
+job_index = 0;      # Next cell to write.
+job_changed = False;    # Skip cells already on the LCD (shadow).
+
+# I2C writes of a glyph upload (address, 8 rows, cursor restore).,
+UPLOAD_WRITES = 10;
+
 """
 -------------------------------------------------------------------------------
  Functions 
@@ -69,7 +128,35 @@ Raises:
 Notes:
 """
 def turn_off_display():
-    lcd.hal_backlight_off();
+    if iocore.offload(turn_off_display):
+        return;
+    # backlight_off() also clears lcd.backlight, the flag LcdApi keeps.,
+    lcd.backlight_off();
+    panels.set_backlight(False);
+    # End-of-Function
+
+"""
+This function stops all display traffic., the I2C bus is left to state
+persistence (FRAM/EEPROM).
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Power fail, see powerfail.py. Not offloaded, it runs in place on
+      core 0 while core 1 is stopped.
+    - Screen draw in progress and later display calls write nothing
+      until reset., job is left to step() (it may be in the middle of
+      it).
+"""
+def halt():
+    lcd.detach();
+    panels.halt();
     # End-of-Function
 
 """
@@ -85,7 +172,10 @@ Raises:
 Notes:
 """
 def turn_on_display():
-    lcd.hal_backlight_on();
+    if iocore.offload(turn_on_display):
+        return;
+    lcd.backlight_on();
+    panels.set_backlight(True);
     # End-of-Function
 
 
@@ -101,8 +191,11 @@ Returns:
 Raises:
 
 Notes:
+    - Written from the caller's core., queued LCD requests are served
+      first (dual core mode), core 1 is idle while this runs.
 """
 def greeting():
+    iocore.drain();
     lcd.clear();
     lcd.move_to(2,0);
     lcd.putstr("Relay Control");
@@ -115,7 +208,7 @@ def greeting():
 
 """
 This function shows greetings message and
-calls function to loads to custom characters
+resets custom character manager (cgram.py)
 
 Args:
     
@@ -127,9 +220,122 @@ Raises:
 Notes:
 """
 def init():
+    global banks;
+    global bank_page;
+    global cursor_cell;
+    global shadow;
+    global shadow_valid;
+
     greeting();
-    # Load custom characters in LCD CGRAM
-    define_customcharacters();
+
+    # Hidden DDRAM columns exist on 1 and 2 line panels only., page
+    # bookkeeping must run where LCD is driven, hence not in dual core mode.
+    if (DDRAM_PAGES and not IOCORE_ENABLED and I2C_DISPLAY_NUM_ROWS <= 2
+            and 2 * I2C_DISPLAY_NUM_COLS <= DDRAM_LINE_LENGTH):
+        banks = 2;
+    bank_page   = [-1] * banks;
+    cursor_cell = [-1] * banks;
+
+    # Custom characters are loaded in LCD CGRAM on first use.,
+    cgram.init(lcd, banks * I2C_DISPLAY_NUM_COLS);
+    # Extra panels, if any (EXTRA_PANELS).,
+    panels.init(i2c);
+    # DDRAM is blank after greeting()., lcd.clear()
+    shadow = [array("H", [panels.BLANK] * (I2C_DISPLAY_NUM_ROWS * I2C_DISPLAY_NUM_COLS)) for b in range(banks)];
+    shadow_valid = [True] * banks;
+    # End-of-Function
+
+
+"""
+This function returns DDRAM column of a screen column on screen.
+
+Args:
+    int: x screen column
+    int: b bank, default the one on screen.
+
+Returns:
+    int: DDRAM column
+
+Raises:
+
+Notes:
+"""
+def bank_x(x, b = -1):
+    if (b < 0):
+        b = bank;
+    return x + b * I2C_DISPLAY_NUM_COLS;
+    # End-of-Function
+
+
+"""
+This function records cells written in bank b for changed cells only
+draws, mirror panels and the screen draw in progress.
+
+Args:
+    int: b bank
+    int: x screen column
+    int: y row
+    list: cells cell codes (panels.GLYPH_CODE coding)
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Cells written off-screen reach mirror panels in show_page().
+"""
+def track(b, x, y, cells):
+    count = min(len(cells), I2C_DISPLAY_NUM_COLS - x);
+    base  = y * I2C_DISPLAY_NUM_COLS + x;
+    frame = shadow[b];
+    for i in range(count):
+        frame[base + i] = cells[i];
+    if (None != job and job_bank == b):
+        for i in range(count):
+            job_cells[base + i] = cells[i];
+    if (b == bank):
+        panels.put_cells(x, y, cells);
+    # End-of-Function
+
+
+"""
+This function records text written on screen., (see track())
+
+Args:
+    int: x screen column
+    int: y row
+    str: string text drawn
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def mirror_text(x, y, string):
+    track(bank, x, y, [ord(char) for char in string]);
+    # End-of-Function
+
+
+"""
+This function records glyphs written on screen., (see track())
+
+Args:
+    int: x screen column
+    int: y row
+    tuple: glyphs glyph IDs (cgram.GLYPH_*)
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def mirror_glyphs(x, y, glyphs):
+    track(bank, x, y, [panels.GLYPH_CODE + glyph for glyph in glyphs]);
     # End-of-Function
 
 
@@ -150,29 +356,91 @@ Notes:
 """
 # Custom characters APIs: 
 def show_on_off_charset(x, y, show_on = False):
+    if iocore.offload(show_on_off_charset, (x, y, show_on)):
+        return;
     if (x >= I2C_DISPLAY_NUM_COLS or y >= I2C_DISPLAY_NUM_ROWS):
-        error_state("Arguments");
+        errors.report(errors.SEV_ERROR, errors.ERR_ARGUMENTS, y * 100 + x);
         print("Invalid arguments");
         return;
 
-    if (show_on == True):
-        startindex = 0;
-    else:
-        startindex = 2;
-    
-    for a in range(2):
-        lcd.move_to (a + x, y);
-        lcd.putchar(chr(a + startindex));
+    # One cursor move and one run of data writes.,
+    profiler.enter(profiler.SC_SHOW_ICON);
+    icon = cgram.ICON_ON if (show_on == True) else cgram.ICON_OFF;
+    codes = cgram.acquire(icon);
+    lcd.move_to(bank_x(x), y);
+    lcd.putraw(codes);
+    cgram.commit(bank_x(x), y, codes);
+    mirror_glyphs(x, y, icon);
+    profiler.leave();
+    # End-of-Function
+
+
+"""
+This function shows custom character glyphs (cgram.GLYPH_*) as one run.
+
+Args:
+    int: x column
+    int: y row
+    tuple: glyphs glyph IDs, run must fit in the row.
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def show_glyphs(x, y, glyphs):
+    if iocore.offload(show_glyphs, (x, y, glyphs)):
+        return;
+    if (x + len(glyphs) > I2C_DISPLAY_NUM_COLS or y >= I2C_DISPLAY_NUM_ROWS):
+        errors.report(errors.SEV_ERROR, errors.ERR_ARGUMENTS, y * 100 + x);
+        print("Invalid arguments");
+        return;
+
+    profiler.enter(profiler.SC_SHOW_ICON);
+    codes = cgram.acquire(glyphs);
+    lcd.move_to(bank_x(x), y);
+    lcd.putraw(codes);
+    cgram.commit(bank_x(x), y, codes);
+    mirror_glyphs(x, y, glyphs);
+    profiler.leave();
+    # End-of-Function
+
+
+"""
+This function returns DDRAM address of given column and row.,
+(Same mapping as LcdApi.move_to().)
+
+Args:
+    int: x column
+    int: y row
+
+Returns:
+    int: DDRAM address
+
+Raises:
+
+Notes:
+"""
+def cell_address(x, y):
+    addr = x & 0x3f;
+    if (y & 1):
+        addr = addr + 0x40;
+    if (y & 2):
+        addr = addr + I2C_DISPLAY_NUM_COLS;
+    return addr;
     # End-of-Function
 
 
 """
-This function defines the custom character for On or Off and cursor.
-We can simply show any characters to show ON or OFF and even cursor,
-but having custom characters for ON, OFF and cursor gives us ability
-to customize.
+This function updates many ON/OFF icons in one pass., (scene changes,
+bulk serial commands)
+Cells are written in DDRAM address order and the cursor is moved only
+when the next cell does not follow the previous one.
 
 Args:
+    list: cells [[x, y, show_on], ...], sorted in place.
 
 Returns:
         None
@@ -181,36 +449,33 @@ Raises:
 
 Notes:
 """
-# Modifying total number of characters to represent ONOFF_INDICATOR_NUMCHAR
-def define_customcharacters():
-    # ON custom character set
-    onchars =  [ bytearray([  0x07,  0x08,  0x13,  0x17,  0x17,  0x13,  0x08,  0x07]),
-                 bytearray([  0x1C,  0x02,  0x19,  0x1D,  0x1D,  0x19,  0x02,  0x1C])
-                ];
-    # OFF custom character set
-    offchars = [ bytearray([  0x07,  0x08,  0x10,  0x10,  0x10,  0x10,  0x08,  0x07]),
-                 bytearray([  0x1C,  0x02,  0x01,  0x01,  0x01,  0x01,  0x02,  0x1C])
-                ];
-   
-    # Cursor custom character set
-    cursor = bytearray([  0x18,  0x0C,  0x06,  0x1F,  0x1F,  0x06,  0x0C,  0x18]);
-
-    # Set all custom characters.,
-    custom_char_id = 0;
-
-    for a in onchars:
-        lcd.custom_char(custom_char_id, a);
-        custom_char_id = custom_char_id + 1;
-        
-    for b in offchars:
-        lcd.custom_char(custom_char_id, b);
-        custom_char_id = custom_char_id + 1;
-            
-    # CURSOR_CHARSET_ID must not collide with above., custome chars.,
-    # Setting last custom character as a cursor., 
-    lcd.custom_char(CURSOR_CHARSET_ID, cursor);
+def update_status_cells(cells):
+    if iocore.offload(update_status_cells, (cells,)):
+        return;
+
+    profiler.enter(profiler.SC_SHOW_ICON);
+    cells.sort(key = lambda cell: cell_address(cell[0], cell[1]));
+
+    nextaddr = -1;
+    for [x, y, show_on] in cells:
+        # Cell out of screen is skipped, others are drawn.,
+        if (x >= I2C_DISPLAY_NUM_COLS or y >= I2C_DISPLAY_NUM_ROWS):
+            errors.report(errors.SEV_ERROR, errors.ERR_ARGUMENTS, y * 100 + x);
+            continue;
+        addr = cell_address(x, y);
+        icon = cgram.ICON_ON if show_on else cgram.ICON_OFF;
+        codes = cgram.acquire(icon);
+        # Glyph upload restores the cursor (LcdApi.custom_char()).,
+        if (addr != nextaddr):
+            lcd.move_to(bank_x(x), y);
+        lcd.putraw(codes);
+        cgram.commit(bank_x(x), y, codes);
+        mirror_glyphs(x, y, icon);
+        nextaddr = addr + ONOFF_INDICATOR_NUMCHAR;
+    profiler.leave();
     # End-of-Function
 
+
 """
 This function shows the custom cursor at given row and column
 
@@ -226,14 +491,28 @@ Raises:
 Notes:
 """
 def show_cursor(x, y):
+    if iocore.offload(show_cursor, (x, y)):
+        return;
     if (x >= I2C_DISPLAY_NUM_COLS or y >= I2C_DISPLAY_NUM_ROWS):
-        error_state(lcd, "Arguments");
+        errors.report(errors.SEV_ERROR, errors.ERR_ARGUMENTS, y * 100 + x);
         print("Invalid arguments");
         return;
+    # A page shown from off-screen DDRAM may still have the cursor it had
+    # when it went off-screen., only one cursor per bank.
+    old = cursor_cell[bank];
+    if (old >= 0 and old != y * I2C_DISPLAY_NUM_COLS + x):
+        hide_cursor(old % I2C_DISPLAY_NUM_COLS, old // I2C_DISPLAY_NUM_COLS);
+
     # Show cursor at given XY, User is smart., 
-    lcd.move_to(x,y);
-    lcd.putchar(chr(CURSOR_CHARSET_ID));
-    gc.collect();
+    profiler.enter(profiler.SC_SHOW_CURSOR);
+    codes = cgram.acquire(cgram.CURSOR);
+    lcd.move_to(bank_x(x), y);
+    lcd.putraw(codes);
+    cgram.commit(bank_x(x), y, codes);
+    mirror_glyphs(x, y, cgram.CURSOR);
+    cursor_cell[bank] = y * I2C_DISPLAY_NUM_COLS + x;
+    profiler.leave();
+    telemetry.gc_collect();
     # End-of-Function
 
 """
@@ -251,14 +530,22 @@ Raises:
 Notes:
 """
 def hide_cursor(x, y):
+    if iocore.offload(hide_cursor, (x, y)):
+        return;
     if (x >= I2C_DISPLAY_NUM_COLS or y >= I2C_DISPLAY_NUM_ROWS):
-        error_state(lcd, "Arguments");
+        errors.report(errors.SEV_ERROR, errors.ERR_ARGUMENTS, y * 100 + x);
         print("Invalid arguments");
         return;
     # Show cursor at given XY, User is smart., 
-    lcd.move_to(x,y);
-    lcd.putchar(' ');
-    gc.collect();
+    profiler.enter(profiler.SC_SHOW_CURSOR);
+    lcd.move_to(bank_x(x), y);
+    lcd.putraw(b" ");
+    cgram.overwrite(bank_x(x), y, 1);
+    mirror_text(x, y, ' ');
+    if (cursor_cell[bank] == y * I2C_DISPLAY_NUM_COLS + x):
+        cursor_cell[bank] = -1;
+    profiler.leave();
+    telemetry.gc_collect();
     # End-of-Function
 
 
@@ -275,7 +562,393 @@ Raises:
 Notes:
 """
 def clear():
+    global bank;
+    global job;
+
+    if iocore.offload(clear):
+        return;
+    # Clears all DDRAM and sets display shift back to bank 0.,
+    job = None;
     lcd.clear();
+    cgram.clear();
+    panels.clear();
+    bank = 0;
+    for b in range(banks):
+        bank_page[b]   = -1;
+        cursor_cell[b] = -1;
+    for b in range(banks):
+        panels.fill(shadow[b], panels.BLANK);
+        shadow_valid[b] = True;
+    # End-of-Function
+
+
+"""
+This function returns blank cells of a whole screen, for draw_screen().
+
+Args:
+    None
+
+Returns:
+    array: cells row major, I2C_DISPLAY_NUM_COLS per row.
+
+Raises:
+
+Notes:
+"""
+def new_cells():
+    return array("H", [panels.BLANK] * (I2C_DISPLAY_NUM_ROWS * I2C_DISPLAY_NUM_COLS));
+    # End-of-Function
+
+
+"""
+This function puts text into screen cells (memory only).
+
+Args:
+    array: cells from new_cells()
+    int: x column
+    int: y row
+    str: string text, clipped to the row.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def set_text(cells, x, y, string):
+    base = y * I2C_DISPLAY_NUM_COLS + x;
+    for i in range(min(len(string), I2C_DISPLAY_NUM_COLS - x)):
+        cells[base + i] = ord(string[i]);
+    # End-of-Function
+
+
+"""
+This function puts glyphs into screen cells (memory only).
+
+Args:
+    array: cells from new_cells()
+    int: x column
+    int: y row
+    tuple: glyphs glyph IDs (cgram.GLYPH_*)
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def set_glyphs(cells, x, y, glyphs):
+    base = y * I2C_DISPLAY_NUM_COLS + x;
+    for i in range(min(len(glyphs), I2C_DISPLAY_NUM_COLS - x)):
+        cells[base + i] = panels.GLYPH_CODE + glyphs[i];
+    # End-of-Function
+
+
+"""
+This function returns the next run of the screen draw for I2cLcd.writer().
+
+Args:
+    int: max_codes largest run the slice has room for.
+
+Returns:
+    tuple: (DDRAM column, row, codes), None when the draw is complete.
+
+Raises:
+
+Notes:
+    - Run is built from job_cells when it is written, so changes made
+      between slices are drawn.
+    - A run stays in one row. A glyph upload counts UPLOAD_WRITES, the
+      first cell of a run is always taken.
+    - job_changed: cells equal to the shadow are skipped., a run ends
+      before two unchanged cells (one is cheaper to write than a cursor
+      move) or an unchanged last cell of the row.
+"""
+def next_run(max_codes):
+    global job_index;
+
+    frame = shadow[job_bank] if job_changed else None;
+    if job_changed:
+        while (job_index < len(job_cells) and job_cells[job_index] == frame[job_index]):
+            job_index = job_index + 1;
+    if (job_index >= len(job_cells)):
+        return None;
+    x = job_index % I2C_DISPLAY_NUM_COLS;
+    y = job_index // I2C_DISPLAY_NUM_COLS;
+
+    codes = bytearray();
+    left  = max_codes;
+    while (x + len(codes) < I2C_DISPLAY_NUM_COLS):
+        at   = job_index + len(codes);
+        cell = job_cells[at];
+        if (job_changed and cell == frame[at] and
+                (x + len(codes) + 1 == I2C_DISPLAY_NUM_COLS or job_cells[at + 1] == frame[at + 1])):
+            break;
+        cost = 1;
+        if (cell >= panels.GLYPH_CODE and (cell - panels.GLYPH_CODE) not in cgram.glyph_slot):
+            cost = 1 + UPLOAD_WRITES;
+        if (len(codes) > 0 and cost > left):
+            break;
+        left = left - cost;
+        if (cell >= panels.GLYPH_CODE):
+            codes.extend(cgram.acquire((cell - panels.GLYPH_CODE,)));
+        else:
+            codes.append(cell);
+
+    cgram.commit(bank_x(x, job_bank), y, codes);
+    track(job_bank, x, y, job_cells[job_index:job_index + len(codes)]);
+    job_index = job_index + len(codes);
+    return (bank_x(x, job_bank), y, codes);
+    # End-of-Function
+
+
+"""
+This function starts drawing a whole screen in slices, see step().
+
+Args:
+    array: cells from new_cells()
+    int: page page number, any caller defined number >= 0.
+    bool: hidden draw into off-screen DDRAM (see show_page()).
+    bool: changed write only cells that differ from the bank's shadow.
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - A draw in progress is dropped., its cells are drawn over anyway.
+      Changed cells only draw still writes all of it, as the shadow
+      holds what was written.
+    - In dual core mode the draw runs to the end on core 1.
+    - Screen updates must keep the page current (icons, timer marks),
+      use drop_page() for changes that are not drawn.
+"""
+def draw_screen(cells, page, hidden = False, changed = False):
+    global job;
+    global job_bank;
+    global job_page;
+    global job_cells;
+    global job_index;
+    global job_changed;
+
+    if iocore.offload(draw_screen, (cells, page, hidden, changed)):
+        return;
+    job_bank  = (1 - bank) if (hidden and banks > 1) else bank;
+    job_page  = page;
+    job_cells = cells;
+    job_index = 0;
+    job_changed = changed and shadow_valid[job_bank];
+    bank_page[job_bank]   = -1;
+    cursor_cell[job_bank] = -1;
+    job = lcd.writer(next_run, LCD_SLICE_FRAMES);
+    if iocore.running:
+        finish();
+    # End-of-Function
+
+
+"""
+This function scrolls the screen on by whole rows and draws it, changed
+cells only (see draw_screen()).
+
+Args:
+    array: cells from new_cells(), with the rows scrolled in.
+    int: rows +n -> content moves up n rows (last n rows are new),
+              -n -> content moves down (first n rows are new).
+    int: page page number of the scrolled screen.
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Rows kept are taken from the draw in progress on screen, if any,
+      otherwise from the shadow., the custom cursor is not kept.
+    - HD44780 has no vertical scroll, rows kept are drawn again where
+      they differ.
+"""
+def scroll_screen(cells, rows, page):
+    if iocore.offload(scroll_screen, (cells, rows, page)):
+        return;
+    source = job_cells if (None != job and job_bank == bank) else shadow[bank];
+    moved  = rows * I2C_DISPLAY_NUM_COLS;
+    kept   = len(cells) - abs(moved);
+    first  = max(0, -moved);
+    for i in range(first, first + kept):
+        cells[i] = source[i + moved];
+    cursor = cursor_cell[bank] - moved;
+    if (cursor_cell[bank] >= 0 and cursor >= first and cursor < first + kept):
+        cells[cursor] = panels.BLANK;
+    draw_screen(cells, page, False, True);
+    # End-of-Function
+
+
+"""
+This function writes one slice of the screen draw in progress.
+
+Args:
+    None
+
+Returns:
+    bool: True if the draw is not complete yet.
+
+Raises:
+
+Notes:
+    - A slice is at most LCD_SLICE_FRAMES I2C frames, plus one glyph
+      upload (UPLOAD_WRITES) if the slice starts with it.
+"""
+def step():
+    global job;
+
+    # Dual core mode: draw_screen() completes on core 1.,
+    if (None == job or iocore.offload_once(step)):
+        return False;
+    profiler.enter(profiler.SC_DRAW_PAGE);
+    try:
+        next(job);
+    except StopIteration:
+        job = None;
+        bank_page[job_bank] = job_page;
+        shadow_valid[job_bank] = True;
+        if (job_bank != bank):
+            telemetry.count(telemetry.CNT_PAGE_RENDERS);
+    except OSError:
+        # LCD didn't ACK., draw is dropped, the page is drawn again when
+        # shown next time. Shadow has the run that failed, next draw of
+        # the bank writes all cells.
+        job = None;
+        bank_page[job_bank] = -1;
+        shadow_valid[job_bank] = False;
+        errors.report(errors.SEV_ERROR, errors.ERR_LCD);
+    profiler.leave();
+    return (None != job);
+    # End-of-Function
+
+
+"""
+This function completes the screen draw in progress, if any.
+
+Args:
+    None
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def finish():
+    while step():
+        pass;
+    # End-of-Function
+
+
+"""
+This function tells if a screen draw is in progress.
+
+Args:
+    None
+
+Returns:
+    bool
+
+Raises:
+
+Notes:
+"""
+def busy():
+    return (None != job and not iocore.running);
+    # End-of-Function
+
+
+"""
+This function tells if given page should be drawn off-screen now.
+
+Args:
+    int: page page number
+
+Returns:
+    bool: True if there is off-screen DDRAM, no draw is in progress and
+          the page is not drawn yet.
+
+Raises:
+
+Notes:
+"""
+def want_page(page):
+    return (banks > 1 and None == job and page not in bank_page);
+    # End-of-Function
+
+
+"""
+This function forgets off-screen page, if it is the given one.
+
+Args:
+    int: page page number, -1 -> any page.
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Call when something shown on the page has changed.
+"""
+def drop_page(page):
+    global job;
+
+    if (1 == banks):
+        return;
+    for b in range(banks):
+        if (b != bank and (page < 0 or page == bank_page[b])):
+            bank_page[b] = -1;
+    # Off-screen draw of the page would be stale too.,
+    if (None != job and job_bank != bank and (page < 0 or page == job_page)):
+        job = None;
+    # End-of-Function
+
+
+"""
+This function shows given page if it is in off-screen DDRAM.
+
+Args:
+    int: page page number
+
+Returns:
+    bool: True if shown, False if the caller has to draw it.
+
+Raises:
+
+Notes:
+    - Off-screen draw of the page in progress is completed first.
+    - Page that was on screen stays in DDRAM and can be shown back.
+"""
+def show_page(page):
+    global bank;
+
+    if (1 == banks or page < 0):
+        return False;
+    if (None != job and job_bank != bank and job_page == page):
+        finish();
+    target = bank_page.index(page) if (page in bank_page) else -1;
+    if (target < 0 or target == bank):
+        return False;
+
+    if (0 == target):
+        # Return home sets display shift back to 0., one command.
+        lcd.hal_write_command(lcd.LCD_HOME);
+    else:
+        for i in range((target - bank) * I2C_DISPLAY_NUM_COLS):
+            lcd.hal_write_command(lcd.LCD_MOVE | lcd.LCD_MOVE_DISP);
+    bank = target;
+    panels.put_frame(shadow[bank], I2C_DISPLAY_NUM_COLS);
+    telemetry.count(telemetry.CNT_PAGE_FLIPS);
+    return True;
     # End-of-Function
 
 
@@ -294,7 +967,9 @@ Raises:
 Notes:
 """
 def moveto(x, y):
-    lcd.move_to(x, y);
+    if iocore.offload(moveto, (x, y)):
+        return;
+    lcd.move_to(bank_x(x), y);
     # End-of-Function
 
 
@@ -314,9 +989,19 @@ Raises:
 Notes:
 """
 def show_string(x, y, string):
+    if iocore.offload(show_string, (x, y, string)):
+        return;
     if (x < I2C_DISPLAY_NUM_COLS and y < I2C_DISPLAY_NUM_ROWS and None != string):
-        lcd.move_to(x, y);
-        lcd.putstr(string);
+        profiler.enter(profiler.SC_SHOW_STRING);
+        # One run, clipped to the row., (putstr() moves the cursor after
+        # every character and wraps at screen width, off-screen columns
+        # can not be reached with it.)
+        string = string[:I2C_DISPLAY_NUM_COLS - x];
+        lcd.move_to(bank_x(x), y);
+        lcd.putraw(string.encode());
+        cgram.overwrite(bank_x(x), y, len(string));
+        mirror_text(x, y, string);
+        profiler.leave();
     # End-of-Function
 
 
@@ -325,7 +1010,7 @@ def show_string(x, y, string):
 
 """
 This function shows error message on display.
-It is used for critical error., 
+It is used for critical error., (errors.py for recoverable ones)
 
 Args:
     msg: string to show
@@ -336,11 +1021,17 @@ Raises:
 
 Notes:
 It shows the messge and turns backlight on and off for error
+With WDT_ENABLED the watchdog (not fed here) resets the board after
+WDT_TIMEOUT_MS, relays are restored from watchdog scratch (watchdog.py).
+Core 1 worker is stopped first (dual core mode), it owns the I2C bus.,
+its request in progress is completed, queued ones are dropped.
 """
 def error_state(msg):
+    errors.report(errors.SEV_FATAL, errors.ERR_FATAL);
+    iocore.halt();
     msg = msg[:I2C_DISPLAY_NUM_COLS-4]; # Restrict to display length., 
     print("Unrecoverable error occured");
-    lcd.move_to(0,0)
+    lcd.move_to(bank * I2C_DISPLAY_NUM_COLS, 0)
     lcd.putstr("ERR:");
     lcd.putstr(msg);
     while True:
@@ -0,0 +1,356 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements non-fatal error reporting.
+    Severity decides what happens after report():
+      SEV_WARN  -> logged and counted (configuration entry skipped, ...).
+      SEV_ERROR -> logged, counted and shown as a transient notice on the
+                   LCD., the call is abandoned and the main loop goes on
+                   serving relay commands (degraded mode).
+      SEV_FATAL -> logged and counted, caller stops in
+                   display.error_state() (watchdog reset, WDT_ENABLED).
+    Last ERRORS_RING_SIZE reports are kept in a ring buffer of
+    preallocated arrays (time, severity, code, argument), reporting doesn't
+    allocate memory. Each core has its own ring, head and pending notice
+    (core 1 reports from the iocore worker in dual core mode), so each
+    index is written by one core only and no lock is needed. Counts per severity are telemetry counters ("Q"
+    serial command), every report is an "error" trace event too.
+
+    Main loop passes that end with an exception are reported as
+    ERR_HANDLER., after ERROR_RESET_COUNT of them in a row the exception
+    is raised again (board reset, see main.run()).
+
+    The module doesn't import display (display reports through it)., the
+    notice is drawn by callbacks given to init() from main.py.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    errors.init(show_notice, clear_notice);
+    errors.report(errors.SEV_ERROR, errors.ERR_PAGE, page);
+    errors.poll();                  # From main loop., draws the notice.
+    errors.dump();                  # From REPL.
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import sys
+import utime
+
+from array import array
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import telemetry
+# Which core is reporting (iocore worker -> core 1).,
+import iocore
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Severity levels.,
+SEV_WARN  = 1;
+SEV_ERROR = 2;
+SEV_FATAL = 3;
+SEV_NAMES = ["", "warn", "error", "fatal"];
+
+# Error codes., arg of report() in comment.
+ERR_ARGUMENTS = 1;  # Display call with cell out of screen, arg: y * 100 + x
+ERR_PAGE      = 2;  # Page number out of range, arg: page
+ERR_DEVICE_ID = 3;  # Device id out of range, arg: device id
+ERR_CONFIG    = 4;  # Bad group/scene entry skipped, arg: device id
+ERR_NVRAM     = 5;  # FRAM/EEPROM doesn't answer, arg: image offset
+ERR_LCD       = 6;  # LCD write failed (I2C), page draw dropped
+ERR_HANDLER   = 7;  # Exception in main loop pass, arg: passes failed in a row
+ERR_FATAL     = 8;  # display.error_state()
+ERR_FILE      = 9;  # Saved file short or invalid (power loss), ignored, arg: flashwear.WEAR_*
+# Also the notice text, at most I2C_DISPLAY_NUM_COLS - 4 characters.,
+ERR_NAMES = ["", "Arguments", "Page No.", "Device ID", "Config",
+             "NVRAM", "LCD bus", "Handler", "Fatal", "Saved file"];
+
+# Ring buffer per core, entries of core c start at c * ERRORS_RING_SIZE.,
+# err_head[c] is next entry to be written by core c.
+err_time     = array("L", [0] * (2 * ERRORS_RING_SIZE));
+err_severity = bytearray(2 * ERRORS_RING_SIZE);
+err_code     = bytearray(2 * ERRORS_RING_SIZE);
+err_arg      = array("l", [0] * (2 * ERRORS_RING_SIZE));
+err_head     = [0, 0];
+
+# Notice callbacks (main.py)., show(text), clear()
+on_show  = None;
+on_clear = None;
+
+# Code of notice to be shown by poll() per core, 0 -> none.,
+notice_code = bytearray(2);
+# Notice on screen since (ms), None -> no notice.
+notice_at   = None;
+
+# Main loop passes failed in a row.,
+failed_passes = 0;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function records an error.
+
+Args:
+    int: severity SEV_*
+    int: code ERR_*
+    int: arg code specific value
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Safe to call from any module and from core 1 (no display calls,
+      no allocation, own ring of the core)., the notice is drawn later
+      by poll().
+"""
+def report(severity, code, arg = 0):
+    core  = iocore.core();
+    index = core * ERRORS_RING_SIZE + err_head[core];
+    err_time[index]     = utime.ticks_ms() & telemetry.COUNTER_MASK;
+    err_severity[index] = severity;
+    err_code[index]     = code;
+    err_arg[index]      = arg;
+    err_head[core] = (err_head[core] + 1) % ERRORS_RING_SIZE;
+
+    if (SEV_WARN == severity):
+        telemetry.count(telemetry.CNT_WARNINGS);
+    elif (SEV_ERROR == severity):
+        telemetry.count(telemetry.CNT_ERRORS);
+        notice_code[core] = code;
+    else:
+        telemetry.count(telemetry.CNT_FATAL_ERRORS);
+    telemetry.trace(telemetry.EV_ERROR, code * 10 + severity);
+    # End-of-Function
+
+
+"""
+This function reports an exception that ended a main loop pass.
+
+Args:
+    Exception: e
+
+Returns:
+    None
+
+Raises:
+    Exception: e again after ERROR_RESET_COUNT failed passes in a row.
+
+Notes:
+    - Traceback is printed (allocates)., the pass failed anyway.
+"""
+def handler_failed(e):
+    global failed_passes;
+
+    failed_passes = failed_passes + 1;
+    report(SEV_ERROR, ERR_HANDLER, failed_passes);
+    print("Main loop pass failed ({0} in a row)".format(failed_passes));
+    sys.print_exception(e);
+    if (failed_passes >= ERROR_RESET_COUNT):
+        raise e;
+    # End-of-Function
+
+
+"""
+This function marks a main loop pass as completed.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def pass_done():
+    global failed_passes;
+
+    failed_passes = 0;
+    # End-of-Function
+
+
+"""
+This function shows a pending notice and clears it after ERROR_NOTICE_MS.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called from main loop while the display is awake., a notice of an
+      error that comes while one is shown is shown after it.
+    - Core 0 notice first, core 1 notice is taken from its own slot.
+"""
+def poll():
+    global notice_at;
+
+    if (None == on_show):
+        return;
+    if (None != notice_at):
+        if (utime.ticks_diff(utime.ticks_ms(), notice_at) < ERROR_NOTICE_MS):
+            return;
+        notice_at = None;
+        on_clear();
+        return;
+    for core in range(2):
+        code = notice_code[core];
+        if (0 != code):
+            notice_code[core] = 0;
+            notice_at = utime.ticks_ms();
+            on_show("ERR:" + ERR_NAMES[code]);
+            return;
+    # End-of-Function
+
+
+"""
+This function drops the pending notice., the screen is being redrawn
+anyway (display wake).
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def dismiss():
+    global notice_at;
+
+    notice_code[0] = 0;
+    notice_code[1] = 0;
+    notice_at      = None;
+    # End-of-Function
+
+
+"""
+This function returns the number of reports of given code in the rings.
+
+Args:
+    int: code ERR_*
+
+Returns:
+    int
+
+Raises:
+
+Notes:
+"""
+def get_count(code):
+    n = 0;
+    for i in range(2 * ERRORS_RING_SIZE):
+        if (code == err_code[i]):
+            n = n + 1;
+    return n;
+    # End-of-Function
+
+
+"""
+This function clears the ring buffers and the pending notice.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def reset():
+    global failed_passes;
+
+    for i in range(2 * ERRORS_RING_SIZE):
+        err_code[i] = 0;
+    err_head[0] = 0;
+    err_head[1] = 0;
+    failed_passes = 0;
+    dismiss();
+    # End-of-Function
+
+
+"""
+This function prints the ring buffers., meant for REPL.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def dump():
+    print("Errors (oldest first): ms severity code arg");
+    for core in range(2):
+        for i in range(ERRORS_RING_SIZE):
+            index = core * ERRORS_RING_SIZE + (err_head[core] + i) % ERRORS_RING_SIZE;
+            if (0 != err_code[index]):
+                print("  {0} {1} {2} {3}{4}".format(err_time[index], SEV_NAMES[err_severity[index]],
+                      ERR_NAMES[err_code[index]], err_arg[index], " (core 1)" if core else ""));
+    # End-of-Function
+
+
+"""
+This function sets the notice callbacks.
+
+Args:
+    function: show called with notice text.
+    function: clear called when the notice is to be removed.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def init(show, clear):
+    global on_show;
+    global on_clear;
+
+    on_show  = show;
+    on_clear = clear;
+    # End-of-Function
+
+# End-of-File
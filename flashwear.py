@@ -0,0 +1,371 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file keeps persistent flash write counters per file and estimates
+    remaining flash life.
+    For every write it counts bytes and estimates erase blocks used with a
+    simple model of LittleFS (the filesystem MicroPython uses on RP2040):
+      - Files up to FLASH_INLINE_MAX bytes live inside the directory
+        metadata block, a rewrite costs one metadata commit (data + tags,
+        rounded up to FLASH_PROG_SIZE).
+      - Bigger files are copy-on-write, every rewrite erases and programs
+        all data blocks again plus one metadata commit.
+    Metadata blocks are erased when they fill up, so a commit of n bytes is
+    counted as n / FLASH_BLOCK_SIZE erase blocks.
+    Counters are saved to flashwear_cfgfile every FLASHWEAR_SAVE_EVERY
+    writes (counter file writes are accounted too) and on power fail
+    (powerfail.py)., at most that many writes are lost on a power loss
+    without a monitor. The file is written to a temporary file and renamed
+    over the old one, a cut short or invalid file counts from zero.
+    tools/lfs_model.py models the same in more detail on host and compares
+    alternative persistence formats.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    flashwear.init();
+    flashwear.account(flashwear.WEAR_DEVICESTATE, written);
+    flashwear.report();
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import os
+import gc
+import utime
+import struct
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import telemetry
+# Short or invalid counters file is reported, not fatal.,
+import errors
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Accounted files.,
+WEAR_DEVICESTATE = 0;
+WEAR_SCHEDULE    = 1;
+WEAR_COUNTERS    = 2;
+WEAR_NAMES = [devicestatus_cfgfile, schedule_cfgfile, flashwear_cfgfile];
+
+# Erase is counted in FLASH_PROG_SIZE units, 32 bit counters are enough
+# for whole life of the flash.,
+UNITS_PER_BLOCK = FLASH_BLOCK_SIZE // FLASH_PROG_SIZE;
+
+# File: header, then <writes, bytes, erase units> per file, then uptime.,
+WEAR_MAGIC     = b"FW";
+WEAR_VERSION   = 1;
+HEADER_FORMAT  = "<2sBB";
+RECORD_FORMAT  = "<III";
+UPTIME_FORMAT  = "<I";
+
+# [[writes, bytes, erase units], ...] indexed by WEAR_*.,
+wear = [[0, 0, 0] for i in range(len(WEAR_NAMES))];
+
+# Seconds of operation covered by the counters.,
+uptime_s = 0;
+last_ms  = 0;
+
+# Writes since counters were saved.,
+pending = 0;
+
+# Erase blocks available to filesystem, updated in init().,
+fs_blocks = 0;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function returns estimated erase cost of one file rewrite.
+
+Args:
+    int: nbytes file size written
+
+Returns:
+    int: erase units (FLASH_PROG_SIZE bytes each)
+
+Raises:
+
+Notes:
+"""
+def erase_units(nbytes):
+    if (nbytes <= FLASH_INLINE_MAX):
+        commit = nbytes + FLASH_COMMIT_OVERHEAD;
+        data_blocks = 0;
+    else:
+        commit = FLASH_COMMIT_OVERHEAD;
+        data_blocks = (nbytes + FLASH_BLOCK_SIZE - 1) // FLASH_BLOCK_SIZE;
+
+    return ((commit + FLASH_PROG_SIZE - 1) // FLASH_PROG_SIZE) + data_blocks * UNITS_PER_BLOCK;
+    # End-of-Function
+
+
+"""
+This function accounts one file write.
+
+Args:
+    int: fileid WEAR_*
+    int: nbytes file size written
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Also counts telemetry CNT_FLASH_WRITES/CNT_FLASH_BYTES.
+    - Saves counters every FLASHWEAR_SAVE_EVERY writes.
+"""
+def account(fileid, nbytes):
+    global pending;
+
+    counters = wear[fileid];
+    counters[0] = counters[0] + 1;
+    counters[1] = counters[1] + nbytes;
+    counters[2] = counters[2] + erase_units(nbytes);
+
+    telemetry.count(telemetry.CNT_FLASH_WRITES);
+    telemetry.count(telemetry.CNT_FLASH_BYTES, nbytes);
+
+    pending = pending + 1;
+    if (pending >= FLASHWEAR_SAVE_EVERY):
+        save_counters();
+    # End-of-Function
+
+
+"""
+This function saves counters to flashwear_cfgfile.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Written to a temporary file and renamed, a power loss leaves either
+      the old or the new file.
+"""
+def save_counters():
+    global pending;
+    global uptime_s;
+    global last_ms;
+
+    now = utime.ticks_ms();
+    seconds = utime.ticks_diff(now, last_ms) // 1000;
+    uptime_s = uptime_s + seconds;
+    last_ms = utime.ticks_add(last_ms, seconds * 1000);
+
+    pending = 0;
+    written = struct.calcsize(HEADER_FORMAT) + len(wear) * struct.calcsize(RECORD_FORMAT) + struct.calcsize(UPTIME_FORMAT);
+    # Account own write before saving, so that it is part of the file.,
+    counters = wear[WEAR_COUNTERS];
+    counters[0] = counters[0] + 1;
+    counters[1] = counters[1] + written;
+    counters[2] = counters[2] + erase_units(written);
+
+    temp = flashwear_cfgfile + ".tmp";
+    with open(temp, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, WEAR_MAGIC, WEAR_VERSION, len(wear)));
+        for counters in wear:
+            f.write(struct.pack(RECORD_FORMAT, counters[0], counters[1], counters[2]));
+        f.write(struct.pack(UPTIME_FORMAT, uptime_s));
+    os.rename(temp, flashwear_cfgfile);
+    # End-of-Function
+
+
+"""
+This function loads counters saved by save_counters().
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Missing or invalid file means counting starts from zero., a short
+      or invalid one is reported (errors.ERR_FILE).
+"""
+def load_counters():
+    global uptime_s;
+
+    header_size = struct.calcsize(HEADER_FORMAT);
+    record_size = struct.calcsize(RECORD_FORMAT);
+    try:
+        with open(flashwear_cfgfile, "rb") as f:
+            data = f.read();
+    except OSError:
+        return;
+
+    valid = (len(data) == header_size + len(wear) * record_size + struct.calcsize(UPTIME_FORMAT));
+    if valid:
+        [magic, version, count] = struct.unpack_from(HEADER_FORMAT, data, 0);
+        valid = (WEAR_MAGIC == magic and WEAR_VERSION == version and count == len(wear));
+    if not valid:
+        print("Ignoring invalid {0}".format(flashwear_cfgfile));
+        errors.report(errors.SEV_ERROR, errors.ERR_FILE, WEAR_COUNTERS);
+        return;
+    offset = header_size;
+    for counters in wear:
+        counters[0:3] = list(struct.unpack_from(RECORD_FORMAT, data, offset));
+        offset = offset + record_size;
+    uptime_s = struct.unpack_from(UPTIME_FORMAT, data, offset)[0];
+    # End-of-Function
+
+
+"""
+This function returns total estimated erase blocks used so far.
+
+Args:
+    None
+
+Returns:
+    int: erase blocks
+
+Raises:
+
+Notes:
+"""
+def get_erased_blocks():
+    units = 0;
+    for counters in wear:
+        units = units + counters[2];
+    return units // UNITS_PER_BLOCK;
+    # End-of-Function
+
+
+"""
+This function returns estimated remaining flash life.
+
+Args:
+    None
+
+Returns:
+    int: remaining life in percent (0 to 100)
+
+Raises:
+
+Notes:
+    - LittleFS spreads erases over all filesystem blocks (dynamic wear
+      leveling), budget is fs_blocks * FLASH_ENDURANCE_CYCLES.
+"""
+def get_remaining_percent():
+    budget = fs_blocks * FLASH_ENDURANCE_CYCLES;
+    if (0 == budget):
+        return 100;
+    used = get_erased_blocks();
+    if (used >= budget):
+        return 0;
+    return 100 - (used * 100) // budget;
+    # End-of-Function
+
+
+"""
+This function returns estimated remaining flash life in days at the
+write rate seen so far.
+
+Args:
+    None
+
+Returns:
+    int: days, -1 if not enough data yet.
+
+Raises:
+
+Notes:
+"""
+def get_remaining_days():
+    used = get_erased_blocks();
+    if (0 == used or 0 == uptime_s):
+        return -1;
+    budget = fs_blocks * FLASH_ENDURANCE_CYCLES;
+    if (used >= budget):
+        return 0;
+    return ((budget - used) * uptime_s) // (used * 86400);
+    # End-of-Function
+
+
+"""
+This function prints counters and life estimate., meant for REPL.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def report():
+    print("Flash writes: file writes bytes erase_blocks");
+    for i in range(len(wear)):
+        counters = wear[i];
+        print("  {0:<18} {1} {2} {3}".format(WEAR_NAMES[i], counters[0], counters[1],
+              counters[2] // UNITS_PER_BLOCK));
+    print("Uptime counted: {0} s".format(uptime_s));
+    print("Flash life: {0}% remaining ({1} of {2} blocks x {3} cycles), ~{4} days".format(
+          get_remaining_percent(), get_erased_blocks(), fs_blocks,
+          FLASH_ENDURANCE_CYCLES, get_remaining_days()));
+    gc.collect();
+    # End-of-Function
+
+
+"""
+This function initializes flash wear accounting.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Call before any module writes flash (before devicectrl.init()).
+"""
+def init():
+    global fs_blocks;
+    global last_ms;
+
+    stat = os.statvfs("/");
+    # f_frsize * f_blocks is filesystem size.,
+    fs_blocks = (stat[1] * stat[2]) // FLASH_BLOCK_SIZE;
+    last_ms = utime.ticks_ms();
+    load_counters();
+    # End-of-Function
+
+# End-of-File
@@ -0,0 +1,301 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements the idle manager.
+    After IDLE_TIMEOUT_MS without encoder input the display goes to sleep:
+      - backlight is turned off (main LCD and extra panels),
+      - main loop stops all LCD rendering (icons, extra panels),
+      - main loop waits IDLE_POLL_MS per pass instead of 10 ms, or
+        sleeps in machine.lightsleep() if IDLE_LIGHTSLEEP.
+    Devices, schedules and serial commands keep working while asleep.
+
+    Encoder pins have interrupts which remember the first edge, so that:
+      - wake latency is measured from the first edge (HIST_WAKE),
+      - a click shorter than IDLE_POLL_MS, released before the main loop
+        looked at the switch, is still reported (missed_press()).
+    The event which wakes the display is handled as usual, it is not lost.
+    Turns are counted by the PIO decoder meanwhile.
+
+    Time asleep and awake is counted in CNT_IDLE_MS and CNT_AWAKE_MS, see
+    idle fraction in telemetry.report().
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    idle.init();                    # After rotary.init().
+    idle.activity();                # Every user event.
+    if idle.expired():
+        idle.sleep();
+    idle.wake(redraw);
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import utime
+import machine
+
+from machine import Pin
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import display
+import telemetry
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+sleeping = False;
+
+# Time of last user event and of last sleep/wake change (ms).,
+last_activity_ms = 0;
+changed_ms       = 0;
+
+# First encoder edge seen by pin interrupts (us), None -> no edge.,
+edge_us = None;
+
+# Switch pressed (interrupt) and not reported by rotary.getUserInput() yet.,
+press_seen = False;
+
+switch_pin = None;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function is the encoder pin interrupt handler.
+
+Args:
+    Pin: pin pin which changed
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Runs as soft interrupt, only flags are set here.
+"""
+def on_edge(pin):
+    global edge_us;
+    global press_seen;
+
+    if (None == edge_us):
+        edge_us = utime.ticks_us();
+    if (pin is switch_pin):
+        press_seen = True;
+    # End-of-Function
+
+
+"""
+This function notes a user event., it restarts the idle timeout.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def activity():
+    global last_activity_ms;
+    global edge_us;
+    global press_seen;
+
+    last_activity_ms = utime.ticks_ms();
+    edge_us    = None;
+    press_seen = False;
+    # End-of-Function
+
+
+"""
+This function tells if the display should go to sleep.
+
+Args:
+    None
+
+Returns:
+    bool: True if awake and no user event for IDLE_TIMEOUT_MS.
+
+Raises:
+
+Notes:
+"""
+def expired():
+    if (sleeping or 0 == IDLE_TIMEOUT_MS):
+        return False;
+    return utime.ticks_diff(utime.ticks_ms(), last_activity_ms) >= IDLE_TIMEOUT_MS;
+    # End-of-Function
+
+
+"""
+This function puts the display to sleep.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Caller stops rendering while 'sleeping' is set.
+"""
+def sleep():
+    global sleeping;
+    global changed_ms;
+    global edge_us;
+    global press_seen;
+
+    now = utime.ticks_ms();
+    telemetry.count(telemetry.CNT_AWAKE_MS, utime.ticks_diff(now, changed_ms));
+    changed_ms = now;
+    sleeping   = True;
+    edge_us    = None;
+    press_seen = False;
+    display.turn_off_display();
+    # End-of-Function
+
+
+"""
+This function returns True once for a click that happened while asleep
+and ended before rotary.getUserInput() saw the switch pressed.
+
+Args:
+    None
+
+Returns:
+    bool
+
+Raises:
+
+Notes:
+"""
+def missed_press():
+    global press_seen;
+
+    if (press_seen and 1 == switch_pin.value()):
+        press_seen = False;
+        return True;
+    return False;
+    # End-of-Function
+
+
+"""
+This function waits one idle main loop pass.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - lightsleep returns early on encoder pin interrupt.
+    - After an edge, main loop polls at normal rate for IDLE_POLL_MS, an
+      edge which brings no event (bounce) is then forgotten.
+"""
+def wait():
+    global edge_us;
+
+    if (None != edge_us):
+        if (utime.ticks_diff(utime.ticks_us(), edge_us) < IDLE_POLL_MS * 1000):
+            utime.sleep_ms(10);
+            return;
+        edge_us = None;
+    if IDLE_LIGHTSLEEP:
+        machine.lightsleep(IDLE_POLL_MS);
+    else:
+        utime.sleep_ms(IDLE_POLL_MS);
+    # End-of-Function
+
+
+"""
+This function wakes the display and redraws it.
+
+Args:
+    function: redraw draws current screen (LCD content was not updated
+              while asleep).
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Wake latency is recorded from the first encoder edge, or from this
+      call if no edge was seen.
+"""
+def wake(redraw):
+    global sleeping;
+    global changed_ms;
+
+    t0 = edge_us if (None != edge_us) else telemetry.start();
+    now = utime.ticks_ms();
+    telemetry.count(telemetry.CNT_IDLE_MS, utime.ticks_diff(now, changed_ms));
+    changed_ms = now;
+    sleeping   = False;
+
+    display.turn_on_display();
+    redraw();
+    telemetry.record(telemetry.HIST_WAKE, t0);
+    activity();
+    # End-of-Function
+
+
+"""
+This function sets up encoder pin interrupts and starts the idle timeout.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def init():
+    global switch_pin;
+    global changed_ms;
+
+    switch_pin = Pin(ROTARY_ENCODER_SWITCH_PIN, Pin.IN, Pin.PULL_UP);
+    switch_pin.irq(handler = on_edge, trigger = Pin.IRQ_FALLING);
+    clock_pin = Pin(ROTARY_ENCODER_CLOCK_PIN, Pin.IN, Pin.PULL_UP);
+    clock_pin.irq(handler = on_edge, trigger = Pin.IRQ_FALLING | Pin.IRQ_RISING);
+
+    changed_ms = utime.ticks_ms();
+    activity();
+    # End-of-Function
+
+# End-of-File
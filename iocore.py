@@ -0,0 +1,323 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements the optional dual core mode (IOCORE_ENABLED).
+    Core 1 runs a worker which owns the LCD I2C bus and device state
+    persistence., core 0 keeps rotary input, serial commands, scheduler
+    and GPIO actuation. Relays switch as soon as core 0 handles the event,
+    LCD updates and flash writes follow on core 1.
+
+    Requests are passed through a lock-free single producer (core 0),
+    single consumer (core 1) ring of IOCORE_QUEUE_SIZE slots:
+      - Producer writes the slot, then moves 'head'.
+      - Consumer reads the slot, then moves 'tail'.
+    Each index is written by one core only, so no lock is needed.
+    Requests are run in the order they were queued.
+
+    display.py and devicectrl.save_device_state() call offload() first.,
+    it returns False when the call must run in place (single core mode,
+    or already on the worker), so they work the same in both modes.
+    Schedules are still saved on core 0, saving walks the live timer table.,
+    new and cancelled ones right away, fired one-shot timers at checkpoints
+    (SCHEDULE_SAVE_MS) and on power fail (powerfail.py).
+    Profiler scope stack is shared by both cores., profile in single core
+    mode for clean stacks.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+    - CPython threading (host tools), _thread is available there too.
+
+Usage:
+    iocore.init();          # After display and devicectrl init.
+
+    def show_string(x, y, string):
+        if iocore.offload(show_string, (x, y, string)):
+            return;
+        ...
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import utime
+import _thread
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import telemetry
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Queue size must be power of 2, one slot is kept empty (full != empty).,
+QUEUE_MASK = IOCORE_QUEUE_SIZE - 1;
+
+# Ring slots, function and its arguments tuple.,
+fns  = [None] * IOCORE_QUEUE_SIZE;
+args = [None] * IOCORE_QUEUE_SIZE;
+
+# head: next slot to write (core 0 only), tail: next slot to read (core 1 only).
+head = 0;
+tail = 0;
+
+# Functions which are queued at most once (coalesced), fn -> queued flag.,
+once = {};
+
+running   = False;
+worker_id = None;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function queues a call for the worker.
+
+Args:
+    function: fn function to call on core 1
+    tuple: fnargs arguments
+
+Returns:
+    bool: True  -> queued, caller must not run it.,
+          False -> caller must run it in place.
+
+Raises:
+
+Notes:
+    - Waits (and counts CNT_IOCORE_STALLS) while queue is full.
+"""
+def offload(fn, fnargs = ()):
+    global head;
+
+    if ((not running) or _thread.get_ident() == worker_id):
+        return False;
+
+    nexthead = (head + 1) & QUEUE_MASK;
+    if (nexthead == tail):
+        telemetry.count(telemetry.CNT_IOCORE_STALLS);
+        while (nexthead == tail):
+            utime.sleep_us(IOCORE_IDLE_US);
+
+    fns[head]  = fn;
+    args[head] = fnargs;
+    # Publish slot only after it is written.,
+    head = nexthead;
+    return True;
+    # End-of-Function
+
+
+"""
+This function queues a call unless the same function is already waiting
+in the queue., used for saves where the latest state is all that matters.
+
+Args:
+    function: fn function to call on core 1, without arguments.
+
+Returns:
+    bool: same as offload()
+
+Raises:
+
+Notes:
+    - Worker clears the flag before the call, so changes made after that
+      queue another call.
+"""
+def offload_once(fn):
+    if ((not running) or _thread.get_ident() == worker_id):
+        return False;
+
+    if once.get(fn, False):
+        return True;
+    once[fn] = True;
+    return offload(fn);
+    # End-of-Function
+
+
+"""
+This function returns the core the caller runs on.
+
+Args:
+    None
+
+Returns:
+    int: 1 on the worker, 0 otherwise.
+
+Raises:
+
+Notes:
+    - For data kept per core (errors.py), no allocation.
+"""
+def core():
+    if (None != worker_id and _thread.get_ident() == worker_id):
+        return 1;
+    return 0;
+    # End-of-Function
+
+
+"""
+This function runs on core 1 and serves the queue.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Exception in a request is printed and the worker continues., LCD
+      or flash failure must not stop relay control on core 0.
+"""
+def worker():
+    global tail;
+    global worker_id;
+
+    worker_id = _thread.get_ident();
+    while running:
+        if (tail == head):
+            utime.sleep_us(IOCORE_IDLE_US);
+            continue;
+
+        fn = fns[tail];
+        fnargs = args[tail];
+        fns[tail]  = None;
+        args[tail] = None;
+        tail = (tail + 1) & QUEUE_MASK;
+
+        if (fn in once):
+            once[fn] = False;
+        try:
+            fn(*fnargs);
+        except Exception as e:
+            print("iocore: {0} failed: {1}".format(fn, e));
+    worker_id = None;
+    # End-of-Function
+
+
+"""
+This function waits until all queued requests are done.
+
+Args:
+    int: timeout_ms maximum wait
+
+Returns:
+    bool: True if queue is empty.
+
+Raises:
+
+Notes:
+    - Last request may still be running when this returns.
+"""
+def drain(timeout_ms = 1000):
+    start = utime.ticks_ms();
+    while (running and tail != head):
+        if (utime.ticks_diff(utime.ticks_ms(), start) > timeout_ms):
+            return False;
+        utime.sleep_us(IOCORE_IDLE_US);
+    return True;
+    # End-of-Function
+
+
+"""
+This function starts the worker on core 1 when IOCORE_ENABLED is set.
+
+Args:
+    bool: enable None -> IOCORE_ENABLED
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Call after display and devicectrl are initialized., everything
+      before is run on core 0.
+"""
+def init(enable = None):
+    global running;
+
+    if (None == enable):
+        enable = IOCORE_ENABLED;
+    if ((not enable) or running):
+        return;
+
+    running = True;
+    _thread.start_new_thread(worker, ());
+    # Requests are offloaded only after worker knows its id.,
+    while (None == worker_id):
+        utime.sleep_us(IOCORE_IDLE_US);
+    # End-of-Function
+
+
+"""
+This function stops the worker without serving the queue.
+
+Args:
+    int: timeout_ms maximum wait for the request in progress
+
+Returns:
+    bool: True if the worker has stopped.
+
+Raises:
+
+Notes:
+    - Power fail, see powerfail.py. Request in progress is completed,
+      queued ones are dropped., after this everything runs on core 0.
+"""
+def halt(timeout_ms = 100):
+    global running;
+
+    running = False;
+    start = utime.ticks_ms();
+    while (None != worker_id):
+        if (utime.ticks_diff(utime.ticks_ms(), start) > timeout_ms):
+            return False;
+        utime.sleep_us(IOCORE_IDLE_US);
+    return True;
+    # End-of-Function
+
+
+"""
+This function stops the worker after the queue is drained.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Meant for host tools, board keeps the worker running.
+"""
+def stop():
+    global running;
+
+    drain();
+    running = False;
+    # End-of-Function
+
+# End-of-File
@@ -0,0 +1,124 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file computes the device list layout from the display geometry
+    (I2C_DISPLAY_NUM_ROWS x I2C_DISPLAY_NUM_COLS) once at boot.
+    The screen is split in device slots:
+      - One slot per row, or several side by side when the panel is at
+        least 2 * LAYOUT_MIN_SLOT_WIDTH wide (40x2 -> 2 columns of 20).
+      - Slots are numbered down the first column, then the next one.
+    Each slot is laid out as:
+        <cursor><name ...........><timer><icon icon>
+    Timer mark column exists only if LAYOUT_SHOW_TIMERS and the name
+    keeps LAYOUT_MIN_NAME_WIDTH characters.
+        16x2 -> 2 devices/page, name 13, no timer mark
+        20x4 -> 4 devices/page, name 16, timer mark
+        40x2 -> 4 devices/page, name 16, timer mark
+    Device names are cut to the name width here too, so page redraw only
+    looks up precomputed strings and columns.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    layout.init(deviceconfig.get_total_devices());  # After deviceconfig.
+    slot = listview.slot_of(deviceid);
+    display.show_string(layout.name_x[slot], layout.row[slot], layout.names[deviceid]);
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+# Import all constants and defines.,
+from proj_defines import *
+
+import deviceconfig
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Devices shown on one page, slot columns and width of device name.,
+per_page   = 0;
+per_row    = 1;
+name_width = 0;
+
+# Per slot templates, index is the on screen index of the device.,
+# info_x is -1 when there is no room for the timer mark.
+row      = [];
+cursor_x = [];
+name_x   = [];
+info_x   = [];
+icon_x   = [];
+
+# Device names cut to name_width, index is device id.,
+names = [];
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function computes slot templates for the configured geometry and
+cuts device names to fit.
+
+Args:
+    int: total_devices number of devices in devices.json
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Must be called after deviceconfig.init().
+"""
+def init(total_devices):
+    global per_page;
+    global per_row;
+    global name_width;
+    global names;
+
+    per_row    = max(1, I2C_DISPLAY_NUM_COLS // LAYOUT_MIN_SLOT_WIDTH);
+    slot_width = I2C_DISPLAY_NUM_COLS // per_row;
+    per_page   = per_row * I2C_DISPLAY_NUM_ROWS;
+
+    # Cursor + name + icon, then one name character goes for timer mark.,
+    name_width = slot_width - 1 - ONOFF_INDICATOR_NUMCHAR;
+    with_info  = LAYOUT_SHOW_TIMERS and (name_width - 1 >= LAYOUT_MIN_NAME_WIDTH);
+    if with_info:
+        name_width = name_width - 1;
+
+    for lst in (row, cursor_x, name_x, info_x, icon_x):
+        lst.clear();
+    for slot in range(per_page):
+        left = (slot // I2C_DISPLAY_NUM_ROWS) * slot_width;
+        row.append(slot % I2C_DISPLAY_NUM_ROWS);
+        cursor_x.append(left);
+        name_x.append(left + 1);
+        icon_x.append(left + slot_width - ONOFF_INDICATOR_NUMCHAR);
+        info_x.append(left + slot_width - ONOFF_INDICATOR_NUMCHAR - 1 if with_info else -1);
+
+    names = [deviceconfig.get_device_name(d)[:name_width] for d in range(total_devices)];
+    # End-of-Function
+
+# End-of-File
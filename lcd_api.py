@@ -1,5 +1,7 @@
 import time
 
+import profiler
+
 class LcdApi:
     
     # Implements the API for talking with HD44780 compatible character LCDs.
@@ -114,6 +116,7 @@ class LcdApi:
     def move_to(self, cursor_x, cursor_y):
         # Moves the cursor position to the indicated position. The cursor
         # position is zero based (i.e. cursor_x == 0 indicates first column).
+        profiler.enter(profiler.SC_LCD_MOVE_TO)
         self.cursor_x = cursor_x
         self.cursor_y = cursor_y
         addr = cursor_x & 0x3f
@@ -122,6 +125,7 @@ class LcdApi:
         if cursor_y & 2:    # Lines 2 & 3 add number of columns
             addr += self.num_columns
         self.hal_write_command(self.LCD_DDRAM | addr)
+        profiler.leave()
 
     def putchar(self, char):
         # Writes the indicated character to the LCD at the current cursor
@@ -147,8 +151,18 @@ class LcdApi:
     def putstr(self, string):
         # Write the indicated string to the LCD at the current cursor
         # position and advances the cursor position appropriately.
+        profiler.enter(profiler.SC_LCD_PUTSTR)
         for char in string:
             self.putchar(char)
+        profiler.leave()
+
+    def putraw(self, codes):
+        # Writes character codes (bytes) as one run starting at the current
+        # cursor position. The LCD advances its address after each write, so
+        # no cursor move is sent between them. The run must fit in the line.
+        for code in codes:
+            self.hal_write_data(code)
+        self.cursor_x += len(codes)
 
     def custom_char(self, location, charmap):
         # Write a character to one of the 8 CGRAM locations, available
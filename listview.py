@@ -0,0 +1,357 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements a virtual list view: a window of 'size' slots
+    over 'total' items (devices), item 'top' is in slot 0.
+    Only the window bookkeeping is here, nothing is drawn., main.py
+    renders the slots and the caller decides what to redraw from the
+    result of move_to() / select():
+      MOVE_CURSOR -> window is the same, only the cursor moves.
+      MOVE_SCROLL -> window moved by one item (SCROLL_ROW), one slot is
+                     newly exposed: first one going up, last one going down.
+      MOVE_JUMP   -> new window (page flip, wrap around, jump).
+    Scroll modes (LISTVIEW_SCROLL):
+      SCROLL_PAGE -> windows start at multiples of size (pages).
+      SCROLL_ROW  -> window follows the selection one item at a time.,
+                     needs one slot per screen row (single column layout).
+    Item to (page, slot) mapping is arithmetic, O(1) for any total.
+
+    Window 'top' is the page number given to display.draw_screen(), so
+    off-screen DDRAM pages work in both modes.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    listview.init(total_devices, layout.per_page, layout.per_row == 1);
+    action = listview.move_to(deviceid, 1);    # Rotary down
+    slot   = listview.slot_of(deviceid);       # -1 -> not on screen
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+# Import all constants and defines.,
+from proj_defines import *
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Scroll modes.,
+SCROLL_PAGE = 0;
+SCROLL_ROW  = 1;
+
+# Results of move_to() and select().,
+MOVE_CURSOR = 0;
+MOVE_SCROLL = 1;
+MOVE_JUMP   = 2;
+
+mode     = SCROLL_PAGE;
+total    = 0;   # Items in the list.
+size     = 1;   # Slots in the window.
+top      = 0;   # Item in slot 0.
+selected = 0;   # Item under the cursor.
+# Direction of last window move (+1 down, -1 up)., see next_top()
+step     = 1;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function sets up the list view, first item selected.
+
+Args:
+    int: count number of items
+    int: slots slots in the window (layout.per_page)
+    bool: rows_only True if slots are screen rows (single column layout),
+          SCROLL_ROW is used only then.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Scroll mode comes from LISTVIEW_SCROLL.
+"""
+def init(count, slots, rows_only = True):
+    global mode;
+    global total;
+    global size;
+    global top;
+    global selected;
+    global step;
+
+    mode     = SCROLL_ROW if ("row" == LISTVIEW_SCROLL and rows_only) else SCROLL_PAGE;
+    total    = count;
+    size     = max(1, slots);
+    top      = 0;
+    selected = 0;
+    step     = 1;
+    # End-of-Function
+
+
+"""
+This function returns the number of pages (SCROLL_PAGE windows).
+
+Args:
+    None
+
+Returns:
+    int
+
+Raises:
+
+Notes:
+"""
+def pages():
+    return (total + size - 1) // size;
+    # End-of-Function
+
+
+"""
+This function returns the page an item is on.
+
+Args:
+    int: item
+
+Returns:
+    int: page number
+
+Raises:
+
+Notes:
+    - Page numbering of SCROLL_PAGE, window top is page * size.
+"""
+def page_of(item):
+    return item // size;
+    # End-of-Function
+
+
+"""
+This function returns the slot an item is shown in.
+
+Args:
+    int: item
+
+Returns:
+    int: slot, -1 if the item is not in the window.
+
+Raises:
+
+Notes:
+"""
+def slot_of(item):
+    slot = item - top;
+    if (slot < 0 or slot >= size or item >= total):
+        return -1;
+    return slot;
+    # End-of-Function
+
+
+"""
+This function returns the item shown in a slot.
+
+Args:
+    int: slot
+
+Returns:
+    int: item, -1 if the slot is empty (end of list).
+
+Raises:
+
+Notes:
+"""
+def item_at(slot):
+    item = top + slot;
+    return item if (item < total) else -1;
+    # End-of-Function
+
+
+"""
+This function returns the number of slots in use for a window.
+
+Args:
+    int: first window top, default the current one.
+
+Returns:
+    int
+
+Raises:
+
+Notes:
+    - Last page may not have enough items to fill all the slots.
+"""
+def visible(first = -1):
+    if (first < 0):
+        first = top;
+    return max(0, min(size, total - first));
+    # End-of-Function
+
+
+"""
+This function returns the window that an item may be drawn in
+off-screen., for display.drop_page().
+
+Args:
+    int: item
+
+Returns:
+    int: window top, -1 -> any (SCROLL_ROW, windows overlap).
+
+Raises:
+
+Notes:
+"""
+def window_of(item):
+    if (SCROLL_ROW == mode):
+        return -1;
+    return item - item % size;
+    # End-of-Function
+
+
+"""
+This function returns the top of the window after the current one in the
+direction of the last move, wrapping around., see main.prerender_page()
+
+Args:
+    None
+
+Returns:
+    int: window top, -1 if the whole list fits in one window.
+
+Raises:
+
+Notes:
+"""
+def next_top():
+    if (total <= size):
+        return -1;
+    if (SCROLL_PAGE == mode):
+        return ((top // size + step) % pages()) * size;
+    first = top + step;
+    if (first < 0):
+        return total - size;
+    if (first > total - size):
+        return 0;
+    return first;
+    # End-of-Function
+
+
+"""
+This function sets the window top and tells what has to be redrawn.
+
+Args:
+    int: first new window top
+
+Returns:
+    int: MOVE_CURSOR, MOVE_SCROLL or MOVE_JUMP
+
+Raises:
+
+Notes:
+    - On MOVE_SCROLL step is the direction the window moved in.
+"""
+def set_top(first):
+    global top;
+    global step;
+
+    moved = first - top;
+    if (0 == moved):
+        return MOVE_CURSOR;
+    top = first;
+    if (SCROLL_ROW == mode and (1 == moved or -1 == moved)):
+        step = moved;
+        return MOVE_SCROLL;
+    return MOVE_JUMP;
+    # End-of-Function
+
+
+"""
+This function moves the selection one item (rotary up/down).
+
+Args:
+    int: item newly selected item, wrapped around by the rotary driver.
+    int: direction +1 down, -1 up.
+
+Returns:
+    int: MOVE_CURSOR, MOVE_SCROLL or MOVE_JUMP
+
+Raises:
+
+Notes:
+    - SCROLL_PAGE: window is the page of the item.
+    - SCROLL_ROW: item becomes the first slot going up, the last one going
+      down., wrap around shows the first/last full window.
+"""
+def move_to(item, direction):
+    global selected;
+    global step;
+
+    selected = item;
+    if (SCROLL_PAGE == mode):
+        first = item - item % size;
+    elif (item < top):
+        first = item;
+    elif (item >= top + size):
+        first = item - size + 1;
+    else:
+        first = top;
+    action = set_top(first);
+    # Scroll keeps the direction the window moved in (set_top()).,
+    if (MOVE_JUMP == action):
+        step = direction;
+    return action;
+    # End-of-Function
+
+
+"""
+This function selects an item anywhere in the list (jump).
+
+Args:
+    int: item
+
+Returns:
+    int: MOVE_CURSOR, MOVE_SCROLL or MOVE_JUMP
+
+Raises:
+
+Notes:
+    - SCROLL_ROW: window is kept if the item is in it, otherwise the item
+      becomes the first slot (as far as the list goes).
+"""
+def select(item):
+    global selected;
+
+    selected = item;
+    if (SCROLL_PAGE == mode):
+        first = item - item % size;
+    elif (slot_of(item) >= 0):
+        first = top;
+    else:
+        first = min(item, max(0, total - size));
+    return set_top(first);
+    # End-of-Function
+
+# End-of-File
@@ -0,0 +1,79 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file is the boot loader for precompiled deployments., it is
+    uploaded to the board as main.py and the application (main.py of this
+    project) as app.py / app.mpy (see tools/build_mpy.py).
+
+    Modules are imported from the first place that has them:
+      1. /mpy         -> .mpy files, if built for this firmware's .mpy version
+      2. .frozen      -> modules frozen into the firmware
+      3. / (source)   -> .py files, compiled on every boot
+    A stale or missing /mpy is skipped, so the board still starts from
+    source after a firmware update.
+
+    Sources deployed as usual (main.py is the application) don't need
+    this file.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    Upload as /main.py, see tools/build_mpy.py
+
+-------------------------------------------------------------------------------
+"""
+import sys
+
+# Directory of .mpy files and build stamp written by tools/build_mpy.py.,
+MPY_DIR   = "/mpy"
+MPY_STAMP = "/mpy/BUILD"
+
+"""
+This function tells if /mpy was built for this firmware.
+
+Args:
+    None
+
+Returns:
+    bool
+
+Raises:
+
+Notes:
+    - Stamp holds the .mpy major version, e.g. "6".
+"""
+def mpy_usable():
+    try:
+        with open(MPY_STAMP) as f:
+            version = int(f.read().split()[0]);
+    except (OSError, ValueError, IndexError):
+        return False;
+    return (version == (sys.implementation._mpy & 0xff));
+    # End-of-Function
+
+
+# Frozen modules before source., then .mpy before both.
+if ".frozen" in sys.path:
+    sys.path.remove(".frozen");
+    sys.path.insert(0, ".frozen");
+if mpy_usable():
+    sys.path.insert(0, MPY_DIR);
+
+import app
+app.run();
+
+# End-of-File
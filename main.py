@@ -33,10 +33,15 @@ Usage:
  Modules
 -------------------------------------------------------------------------------
 """
+# Relays back in their last state first after a watchdog or soft reset.,
+# (before the display and configuration are loaded)
+import watchdog
+watchdog.restore();
+
 import gc
+import sys
 import utime
-
-from math import ceil
+import machine
 
 from machine import Pin
 
@@ -45,6 +50,16 @@ import rotary
 
 # Custom Character APIs
 import display
+import cgram
+
+# Device list layout for the configured display geometry
+import layout
+
+# Device list window and selection (page flip or row scroll)
+import listview
+
+# Extra LCD panels (mirror or summary views)
+import panels
 
 # Import device control
 import devicectrl
@@ -52,6 +67,37 @@ import devicectrl
 # Import device json configuration module
 import deviceconfig
 
+# Scheduled and delayed device actions
+import scheduler
+
+# Remote control over serial port
+import serialctl
+import binproto
+
+# Latency histograms, counters and event trace
+import telemetry
+
+# Flash write accounting and life estimate
+import flashwear
+
+# Opt-in sampling profiler
+import profiler
+
+# Optional I/O worker on core 1
+import iocore
+
+# Backlight off and slow polling when nobody uses the encoder
+import idle
+
+# Device states in FRAM/EEPROM (STATE_BACKEND)
+import nvram
+
+# Brownout detection and emergency state commit
+import powerfail
+
+# Non-fatal error log and on-screen notice
+import errors
+
 # Project configuration is the only module where everything is taken directly.,
 from proj_defines import *;
 
@@ -60,14 +106,30 @@ from proj_defines import *;
  Global variables 
 -------------------------------------------------------------------------------
 """
-# Menu Navigation., 
-CurrentPage = 0;
-TotalPages  = 0;
+# Menu Navigation.,
+# Device list window (first device on screen, selected device, direction
+# of last move) is kept by listview.py., slot of a device on screen is
+# listview.slot_of(deviceid), in range 0 to (layout.per_page - 1).
+
+# Serial control protocol module (serialctl or binproto)., see SERIAL_PROTOCOL
+remote = binproto if ("binary" == SERIAL_PROTOCOL) else serialctl;
+
+# Quick menu., opened with long press.
+# It lists jump-by-letter entries (click jumps directly to the page of first
+# device with that letter), device groups and scenes from devices.json.
+QUICK_JUMP  = 0;
+QUICK_GROUP = 1;
+QUICK_SCENE = 2;
+
+QuickMenu  = False;
+QuickIndex = 0;
+QuickItems = [];
+# Device selected before opening quick menu, restored on cancel.,
+QuickFromDevice = 0;
 
-# OSI (On Screen Index)
-# It indicate cursor position on the "screen"., 
-# Since it is 16xN display, OSI will be in range 0 to (I2C_DISPLAY_NUM_ROWS - 1)
-OnScreenIndex = 0;
+# Slots whose ON/OFF icon must be redrawn, see flush_device_icons().,
+# Sized by init_system() from layout.
+IconDirty = [];
 
 
 """
@@ -91,32 +153,65 @@ Notes:
 """
 
 def init_system():
-    global CurrentPage;
-    global TotalPages;
+    global IconDirty;
+    # Hangs from here on reset the board., error_state() too (not fed).
+    watchdog.start();
+
     # Initialize display first., (error message are routed to display).
     display.init();
 
+    # Flash wear counters, before anything writes to flash.,
+    flashwear.init();
+
+    # Sampling profiler, only if PROFILER_AUTOSTART.,
+    profiler.init();
+
     # Load device configuration, <name : gpio> pair and last status.,
     # Other sub-systems depends on this module., hence,
     # just after display, we are initializing device configuration.,
     deviceconfig.init();
 
+    # Row templates and cut device names for this display.,
+    layout.init(deviceconfig.get_total_devices());
+    IconDirty = [False] * layout.per_page;
+
     # Setup GPIO
     devicectrl.init();
+    # Relays are in their last state from here., startup time report.
+    telemetry.boot_mark(telemetry.CNT_BOOT_RESTORED_MS);
 
     # Initialize rotary encoder
     rotary.init(deviceconfig.get_total_devices());
 
-    # Set page details for device list navigation.,
-    CurrentPage = 0;
+    # Encoder pin interrupts wake the display., after rotary has the pins.
+    idle.init();
+
+    # Restore pending schedules, timers switch devices., hence after devicectrl.
+    scheduler.init(handler_scheduled_event);
 
+    # Serial commands switch devices through devicectrl too.,
+    remote.init(refresh_device_icon);
+
+    # Recoverable errors are shown on the LCD for a while.,
+    errors.init(show_error_notice, redraw_screen);
+
+    # From here LCD and saves go to core 1, if IOCORE_ENABLED.,
+    iocore.init();
+
+    # Power fail monitor., saves are deferred from here if it is used.
+    powerfail.init();
+
+    # Device list window for navigation, first device selected.,
     total_devices = deviceconfig.get_total_devices();
 
-    if(0 == I2C_DISPLAY_NUM_ROWS):
+    if(0 == layout.per_page):
         print("Invalid number of rows..,");
         error_state("Div by 0");
 
-    TotalPages  = ceil(total_devices / I2C_DISPLAY_NUM_ROWS);
+    listview.init(total_devices, layout.per_page, 1 == layout.per_row);
+
+    # Long press menu items (letters, groups and scenes).,
+    build_quick_menu();
     # End-of-Function
 
 
@@ -124,57 +219,178 @@ def init_system():
 This function draws the requested page on display.
 
 Args:
-    
+    int: page page number (pages of layout.per_page devices)
+
 Returns:
         None
 
 Raises:
 
 Notes:
-    - It limits the number of characters of devce name to
-      total columns on screen - reserved space for ON/OFF and cursor.,
-    - It doesn't handle "cursor" draw as it is not it's core task.,
+    - Same as draw_window(page * layout.per_page), page is checked.
 """
 
 # Menu navigation and control logic
 def draw_page(page):
-    global TotalPages;
-   
-    devicestatus = deviceconfig.get_device_status();
-
-    if (page < 0 or page >= TotalPages):
+    if (page < 0 or page >= listview.pages()):
         print("Invliad page number {0}".format(page));
-        error_state("Page No.");
+        errors.report(errors.SEV_ERROR, errors.ERR_PAGE, page);
+        return;
+
+    draw_window(page * layout.per_page);
+    # End-of-Function
+
+
+"""
+This function draws the device list window starting at given device.
+
+Args:
+    int: top device in the first slot (listview.top)
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Returns before the window is on the LCD., main loop writes it in
+      slices and handles input in between (see display.step()).
+    - It doesn't handle "cursor" draw as it is not it's core task.,
+    - Window top is the page number of display.draw_screen().
+"""
+def draw_window(top):
+    t0 = telemetry.start();
+    profiler.enter(profiler.SC_DRAW_PAGE);
+
+    # Window drawn off-screen when idle is shown with display shift.,
+    # Otherwise it is drawn in slices from main loop (display.step()).
+    if not display.show_page(top):
+        display.draw_screen(render_window(top), top);
+
+    telemetry.gc_collect();
+    profiler.leave();
+    telemetry.record(telemetry.HIST_DRAW_PAGE, t0);
+    pass;
+    # End-of-Function
+
+
+"""
+This function draws the window moved by one device (listview.MOVE_SCROLL).
+Only the device scrolled in is rendered, the other rows are moved.
+
+Args:
     
-    # If last page., total to print = Total Devices % I2C_DISPLAY_NUM_ROWS
-    if ((TotalPages - 1) == page and 0 != (deviceconfig.get_total_devices() % I2C_DISPLAY_NUM_ROWS)):
-        # This is the last page., and it doesn't have enough devices to fill all the rows., 
-        num_devices_to_show = deviceconfig.get_total_devices() % I2C_DISPLAY_NUM_ROWS;
-    else:
-        # draw full page as its not the last page.,
-        num_devices_to_show = I2C_DISPLAY_NUM_ROWS;
- 
-    device_id = page * I2C_DISPLAY_NUM_ROWS; # Device start.,
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Single column layout only (listview.SCROLL_ROW), a slot is a row.
+    - Changed LCD cells only are written, see display.scroll_screen().
+"""
+def scroll_window():
+    t0 = telemetry.start();
+    profiler.enter(profiler.SC_DRAW_PAGE);
+
+    top = listview.top;
+    if not display.show_page(top):
+        # First slot is new going up, last one going down.,
+        slot  = (layout.per_page - 1) if (listview.step > 0) else 0;
+        cells = display.new_cells();
+        render_slot(cells, slot, top + slot, deviceconfig.get_device_status());
+        display.scroll_screen(cells, listview.step, top);
+
+    telemetry.gc_collect();
+    profiler.leave();
+    telemetry.record(telemetry.HIST_DRAW_PAGE, t0);
+    # End-of-Function
+
+
+"""
+This function builds screen cells of a window: device names, timer marks
+and ON/OFF icons.
+
+Args:
+    int: top device in the first slot
     
-    # Clear screen., 
-    display.clear();
+Returns:
+    array: cells for display.draw_screen()
 
-    # Display device list
-    for i in range(num_devices_to_show):
-        DeviceName = deviceconfig.get_device_name(device_id);
-        
-        display.show_string(1, i, DeviceName[:I2C_DISPLAY_NUM_COLS - 1 - ONOFF_INDICATOR_NUMCHAR]);
-
-        # Show device status icon too., (on/off)
-        if devicestatus[str(device_id)] == 1:
-            display.show_on_off_charset( 14, i, True);
-        else:
-            display.show_on_off_charset( 14, i, False);
-        
-        device_id = device_id + 1;
-
-    gc.collect();
-    pass;
+Raises:
+
+Notes:
+    - Memory only, nothing is written to LCD here.
+    - Columns and cut device names come from layout., (see layout.py)
+"""
+def render_window(top):
+    devicestatus = deviceconfig.get_device_status();
+
+    # Display device list., last page may not fill all the slots.
+    cells = display.new_cells();
+    for slot in range(listview.visible(top)):
+        render_slot(cells, slot, top + slot, devicestatus);
+
+    return cells;
+    # End-of-Function
+
+
+"""
+This function puts one device into its slot of screen cells.
+
+Args:
+    array: cells from display.new_cells()
+    int: slot layout slot
+    int: device_id
+    dict: devicestatus
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Timer mark only if layout has the timer mark column., has_timer()
+      is O(1) for any number of pending timers.
+"""
+def render_slot(cells, slot, device_id, devicestatus):
+    display.set_text(cells, layout.name_x[slot], layout.row[slot], layout.names[device_id]);
+
+    if (layout.info_x[slot] >= 0 and scheduler.has_timer(device_id)):
+        display.set_glyphs(cells, layout.info_x[slot], layout.row[slot], cgram.TIMER);
+
+    # Device status icon too., (on/off)
+    icon = cgram.ICON_ON if (1 == devicestatus[str(device_id)]) else cgram.ICON_OFF;
+    display.set_glyphs(cells, layout.icon_x[slot], layout.row[slot], icon);
+    # End-of-Function
+
+
+"""
+This function draws the window the user is likely to move to next into
+off-screen DDRAM, so that the move is only a display shift.
+
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Called from main loop when idle., does nothing if the window is
+      already there, a draw is in progress or the display has no
+      off-screen columns. Window is drawn in slices like any page.
+    - One off-screen window fits in DDRAM (16x2, 20x2)., it is the next
+      one in the direction of the last move (listview.next_top()).
+    - Only cells that differ from what the hidden columns hold are
+      written., consecutive row scroll windows share all but one row.
+"""
+def prerender_page():
+    if QuickMenu:
+        return;
+    top = listview.next_top();
+    if (top >= 0 and display.want_page(top)):
+        display.draw_screen(render_window(top), top, True, True);
     # End-of-Function
 
 
@@ -197,47 +413,14 @@ Notes:
 
 
 def handler_up_event(deviceid):
-    global OnScreenIndex;
-    global CurrentPage;
-    global TotalPages;
-
-    # If user pressed up on first element on screen.,
-    if(0 == OnScreenIndex):
-        
-        # if we are on first device and this is first page.,
-        if(0 == CurrentPage):
-            # Set current page to last page
-            CurrentPage = TotalPages  - 1;
-        else:
-            # Set current page to previous page., 
-            CurrentPage = CurrentPage - 1;
-        
-        # Draw new page
-        draw_page(CurrentPage);
-        
-        #Set On Screen Index to last item.,
-        total_devices = deviceconfig.get_total_devices();
-        
-        # Select last element of the current page
-        # if there are not enough devices to fill complete page and
-        # we are on the last page.
-        if (0 != total_devices % I2C_DISPLAY_NUM_ROWS and (TotalPages  - 1) == CurrentPage):
-            OnScreenIndex = (total_devices % I2C_DISPLAY_NUM_ROWS) - 1;
-        else:
-            OnScreenIndex = I2C_DISPLAY_NUM_ROWS - 1;
-        
-        display.show_cursor(0, OnScreenIndex);
-
-    # else of if(0 == OnScreenIndex):
-    else:
-        # This is not first element on screen., so we don't need to go to previous page.,
-        # Just move the cursor up., 
-        display.hide_cursor(0, OnScreenIndex);
-        
-        OnScreenIndex = OnScreenIndex - 1;
-        
-        display.show_cursor(0, OnScreenIndex);
-    gc.collect();
+    t0 = telemetry.start();
+    profiler.enter(profiler.SC_NAVIGATE);
+
+    navigate(deviceid, -1);
+
+    telemetry.gc_collect();
+    profiler.leave();
+    telemetry.record(telemetry.HIST_NAVIGATE, t0);
     pass;
     # End-of-Function
 
@@ -254,53 +437,58 @@ Returns:
 Raises:
 
 Notes:
-    - Up event will receive deviceid as 'next' element we need to navigate to.,
+    - Down event will receive deviceid as 'next' element we need to navigate to.,
+      (first device after the last one).
 
 """
 
 def handler_down_event(deviceid):
-    global OnScreenIndex;
-    global CurrentPage;
-    global TotalPages;
-
-    # If user pressed down on last page or last element., 
-    if ((I2C_DISPLAY_NUM_ROWS - 1) == OnScreenIndex) or (0 == deviceid):
-        
-        # if we are on last device or this is last page.,
-        # We were on last already and pressing down, rotary encoder sent first device.,
-        if(0 == deviceid or (TotalPages -1) == CurrentPage):
-            # Set current page to last page
-            CurrentPage = 0;
-        else:
-            # Set current page to previous page., 
-            CurrentPage = CurrentPage + 1;
-        
-        # Draw new page
-        draw_page(CurrentPage);
-        
-        #Set On Screen Index to last item.,
-        total_devices = deviceconfig.get_total_devices();
-        
-        # Select first element of the current page
-        OnScreenIndex = 0;
-        
-        display.show_cursor(0, OnScreenIndex);
-
-    # else of if(0 == OnScreenIndex):
-    else:
-        # Tis is not first element on screen., so we don't need to go to previous page.,
-        # Just move the cursor up., 
-        display.hide_cursor(0, OnScreenIndex);
-        
-        OnScreenIndex = OnScreenIndex + 1;
-        
-        display.show_cursor(0, OnScreenIndex);
-
-    gc.collect();
+    t0 = telemetry.start();
+    profiler.enter(profiler.SC_NAVIGATE);
+
+    navigate(deviceid, 1);
+
+    telemetry.gc_collect();
+    profiler.leave();
+    telemetry.record(telemetry.HIST_NAVIGATE, t0);
     pass;
     # End-of-Function
 
 
+"""
+This function moves the selection to given device and redraws what the
+list view move needs: cursor only, one row scrolled in or a new window.
+
+Args:
+    int: deviceid device to navigate to.
+    int: direction +1 down, -1 up.
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def navigate(deviceid, direction):
+    # Row scroll moves rows as they are on the LCD., pending icons first.
+    if (listview.SCROLL_ROW == listview.mode):
+        flush_device_icons();
+    action = listview.move_to(deviceid, direction);
+
+    # Same window (MOVE_CURSOR): only the cursor moves, show_cursor()
+    # hides the old one.
+    if (listview.MOVE_SCROLL == action):
+        scroll_window();
+    elif (listview.MOVE_JUMP == action):
+        # Page turn or wrap around.,
+        draw_window(listview.top);
+
+    slot = listview.slot_of(deviceid);
+    display.show_cursor(layout.cursor_x[slot], layout.row[slot]);
+    # End-of-Function
+
+
 """
 This function handles "Button Press"/"Clicked" event received from rotary encoder
 It takes care of changing state of GPIO pin and showing respective ON/OFF icon
@@ -320,63 +508,587 @@ Notes:
 
 
 def handler_clicked_event(deviceid):
-    global OnScreenIndex;
-    global DeviceIndex;
+    t0 = telemetry.start();
+    profiler.enter(profiler.SC_CLICK);
 
     devicestatus = deviceconfig.get_device_status();
+    slot = listview.slot_of(deviceid);
 
     # Toggle device status and reflect it in icon too., (on/off)
     if devicestatus[str(deviceid)] == 1:
         # It is ON., so turn it off
         devicectrl.set_device_onoff(deviceid, False);
-        display.show_on_off_charset( 14, OnScreenIndex, False);
+        display.show_on_off_charset(layout.icon_x[slot], layout.row[slot], False);
     else:
         # It is OFF., so turn it on
         devicectrl.set_device_onoff(deviceid, True);
-        display.show_on_off_charset( 14, OnScreenIndex, True);
+        display.show_on_off_charset(layout.icon_x[slot], layout.row[slot], True);
+    panels.device_changed(deviceid);
+    # Off-screen window may show the device too (row scroll).,
+    display.drop_page(listview.window_of(deviceid));
+
+    profiler.leave();
+    telemetry.record(telemetry.HIST_CLICK, t0);
     pass;
     # End-of-Function
 
 
+"""
+This function selects given device, draws its window and shows the
+cursor on it.
+
+Args:
+    int: deviceid device to be selected.
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - It keeps the rotary encoder count in sync with the selection as
+      navigation logic depends on it.
+"""
+def select_device(deviceid):
+    # Screen is redrawn in any case (quick menu was on it).,
+    listview.select(deviceid);
+    slot = listview.slot_of(deviceid);
+
+    draw_window(listview.top);
+    display.show_cursor(layout.cursor_x[slot], layout.row[slot]);
+
+    rotary.set_value(deviceid);
+    # End-of-Function
+
+
+"""
+This function builds the quick menu item list shown on long press.
+Items are jump-by-letter entries followed by groups and scenes.
+
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Item is [<kind>, <item>], kind is one of QUICK_JUMP, QUICK_GROUP,
+      QUICK_SCENE. Item is the letter for QUICK_JUMP and index in
+      respective list for groups and scenes.
+"""
+def build_quick_menu():
+    global QuickItems;
+
+    QuickItems = [];
+    for letter in deviceconfig.get_name_letters():
+        QuickItems.append([QUICK_JUMP, letter]);
+
+    for i in range(len(deviceconfig.get_groups())):
+        QuickItems.append([QUICK_GROUP, i]);
+
+    for i in range(len(deviceconfig.get_scenes())):
+        QuickItems.append([QUICK_SCENE, i]);
+    # End-of-Function
+
+
+"""
+This function draws the quick menu item at QuickIndex.
+First row shows the item, next row shows the details.
+
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def draw_quick_menu():
+    global QuickIndex;
+    global QuickItems;
+
+    profiler.enter(profiler.SC_QUICK_MENU);
+    [kind, item] = QuickItems[QuickIndex];
+
+    if (QUICK_JUMP == kind):
+        title  = "Jump to: " + item;
+        detail = deviceconfig.get_device_name(deviceconfig.find_device_by_prefix(item));
+    elif (QUICK_GROUP == kind):
+        [name, members] = deviceconfig.get_groups()[item];
+        devicestatus    = deviceconfig.get_device_status();
+        title  = "Grp: " + name;
+        detail = "{0} dev, {1} on".format(len(members), sum([devicestatus[str(d)] for d in members]));
+    else:
+        [name, targets] = deviceconfig.get_scenes()[item];
+        title  = "Scn: " + name;
+        detail = "{0} dev".format(len(targets));
+
+    display.clear();
+    display.show_string(0, 0, title[:I2C_DISPLAY_NUM_COLS]);
+
+    if (I2C_DISPLAY_NUM_ROWS > 1):
+        display.show_cursor(0, 1);
+        display.show_string(1, 1, detail[:I2C_DISPLAY_NUM_COLS - 1]);
+    telemetry.gc_collect();
+    profiler.leave();
+    # End-of-Function
+
+
+"""
+This function handles "Long Press" event received from rotary encoder
+It opens quick menu, or closes it without any action if already open.
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Quick menu starts at the first letter of the device under the cursor.
+
+"""
+def handler_long_pressed_event(deviceid):
+    global QuickMenu;
+    global QuickIndex;
+    global QuickItems;
+    global QuickFromDevice;
+
+    if QuickMenu:
+        # Cancel, go back to where we were.,
+        # (encoder count has moved while browsing the menu).
+        QuickMenu = False;
+        select_device(QuickFromDevice);
+        return;
+
+    if (0 == len(QuickItems)):
+        return;
+
+    QuickMenu       = True;
+    QuickFromDevice = deviceid;
+
+    current = deviceconfig.get_device_name(deviceid).upper()[:1];
+    QuickIndex = 0;
+    for i in range(len(QuickItems)):
+        if (QUICK_JUMP == QuickItems[i][0] and current == QuickItems[i][1]):
+            QuickIndex = i;
+            break;
+
+    draw_quick_menu();
+    # End-of-Function
+
+
+"""
+This function handles "UP" event in quick menu, selects previous item.
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def handler_quick_up_event(deviceid):
+    global QuickIndex;
+
+    QuickIndex = (QuickIndex - 1) % len(QuickItems);
+    draw_quick_menu();
+    # End-of-Function
+
+
+"""
+This function handles "DOWN" event in quick menu, selects next item.
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+"""
+def handler_quick_down_event(deviceid):
+    global QuickIndex;
+
+    QuickIndex = (QuickIndex + 1) % len(QuickItems);
+    draw_quick_menu();
+    # End-of-Function
+
+
+"""
+This function handles "Clicked" event in quick menu.
+It closes the menu and performs selected item:
+    - Jump  : selects first device starting with selected letter.
+    - Group : turns all group devices on, or off if all of them are on.
+    - Scene : applies scene device states.
+
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Device lookup is O(log n), see deviceconfig.find_device_by_prefix()
+    - Groups and scenes switch all devices with one GPIO write and one
+      devicestate.json write, see devicectrl.set_devices_onoff()
+
+"""
+def handler_quick_clicked_event(deviceid):
+    global QuickMenu;
+    global QuickIndex;
+    global QuickItems;
+    global QuickFromDevice;
+
+    QuickMenu = False;
+
+    [kind, item] = QuickItems[QuickIndex];
+    target = QuickFromDevice;
+
+    if (QUICK_JUMP == kind):
+        found = deviceconfig.find_device_by_prefix(item);
+        # Should not happen as letters are built from names., stay where we were.
+        if (found >= 0):
+            target = found;
+    elif (QUICK_GROUP == kind):
+        members      = deviceconfig.get_groups()[item][1];
+        devicestatus = deviceconfig.get_device_status();
+        # All on -> turn all off, otherwise turn all on.,
+        state = not all([1 == devicestatus[str(d)] for d in members]);
+        devicectrl.set_devices_onoff([[d, state] for d in members]);
+        panels.device_changed(-1);
+    else:
+        devicectrl.set_devices_onoff(deviceconfig.get_scenes()[item][1]);
+        panels.device_changed(-1);
+
+    # Back to device list, page redraw shows new states.
+    select_device(target);
+    # End-of-Function
+
+
+"""
+This function marks the ON/OFF icon of a device switched from outside
+the menu (scheduler, serial commands) for redraw if the device is on screen.
+Args:
+    int: deviceid device whose state has changed.
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Icons are drawn by flush_device_icons() from main loop, so that a
+      bulk change (scene, mask command) is drawn in one pass.
+"""
+def refresh_device_icon(deviceid):
+    global IconDirty;
+
+    panels.device_changed(deviceid);
+
+    # Off-screen copy of its window is stale now.,
+    display.drop_page(listview.window_of(deviceid));
+
+    # Quick menu is on screen, page will be redrawn when it is closed.,
+    slot = listview.slot_of(deviceid);
+    if (not QuickMenu and slot >= 0):
+        IconDirty[slot] = True;
+    # End-of-Function
+
+
+"""
+This function draws ON/OFF icons marked by refresh_device_icon() with
+single display.update_status_cells() call.
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Timer mark of the slot is redrawn too, timers fire and are added
+      along with these changes.
+"""
+def flush_device_icons():
+    global IconDirty;
+
+    if (True not in IconDirty):
+        return;
+
+    devicestatus = deviceconfig.get_device_status();
+    cells = [];
+    for slot in range(layout.per_page):
+        if IconDirty[slot]:
+            IconDirty[slot] = False;
+            deviceid = listview.item_at(slot);
+            if (deviceid >= 0 and not QuickMenu):
+                cells.append([layout.icon_x[slot], layout.row[slot], 1 == devicestatus[str(deviceid)]]);
+                if (layout.info_x[slot] >= 0 and scheduler.has_timer(deviceid)):
+                    display.show_glyphs(layout.info_x[slot], layout.row[slot], cgram.TIMER);
+                elif (layout.info_x[slot] >= 0):
+                    display.show_string(layout.info_x[slot], layout.row[slot], " ");
+    if cells:
+        display.update_status_cells(cells);
+    # End-of-Function
+
+
+"""
+This function draws the current screen again, e.g. after display sleep.
+
+Args:
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Icons are drawn by draw_window(), pending icon updates are dropped.
+"""
+def redraw_screen():
+    global IconDirty;
+
+    IconDirty = [False] * layout.per_page;
+    if QuickMenu:
+        draw_quick_menu();
+    else:
+        draw_window(listview.top);
+        slot = listview.slot_of(listview.selected);
+        display.show_cursor(layout.cursor_x[slot], layout.row[slot]);
+    # End-of-Function
+
+
+"""
+This function shows an error notice on the last row (errors.poll()).
+
+Args:
+    str: text
+
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Page draw in progress is completed first, so it doesn't overwrite
+      the notice., redraw_screen() removes it.
+"""
+def show_error_notice(text):
+    display.finish();
+    display.show_string(0, I2C_DISPLAY_NUM_ROWS - 1, text + " " * I2C_DISPLAY_NUM_COLS);
+    # End-of-Function
+
+
+"""
+This function handles timer fired by scheduler.
+It switches the device and updates the ON/OFF icon if device is on screen.
+Args:
+    int: deviceid device to be switched.
+    bool: state new device state.
+    
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - Called from scheduler.poll() in main loop, not from interrupt.
+"""
+def handler_scheduled_event(deviceid, state):
+    telemetry.trace(telemetry.EV_SCHEDULED, deviceid);
+    devicectrl.set_device_onoff(deviceid, state);
+    refresh_device_icon(deviceid);
+    # End-of-Function
+
+
 # Keeping this dictionary of event and handler close to main event handler.,
 # Event handler table
 eventhanders = {
         ROTARY_UP:          handler_up_event,
         ROTARY_DOWN:        handler_down_event,
-        ROTARY_BTN_PRESSED: handler_clicked_event
+        ROTARY_BTN_PRESSED: handler_clicked_event,
+        ROTARY_BTN_LONG_PRESSED: handler_long_pressed_event
+    };
+
+# Event handler table while quick menu is open.,
+quickhandlers = {
+        ROTARY_UP:          handler_quick_up_event,
+        ROTARY_DOWN:        handler_quick_down_event,
+        ROTARY_BTN_PRESSED: handler_quick_clicked_event,
+        ROTARY_BTN_LONG_PRESSED: handler_long_pressed_event
     };
 
 
 """
-Main entry point of system.
+Main entry point of system., runs forever.
+
+Args:
+    None
+
+Returns:
+        None
+
+Raises:
+    KeyboardInterrupt: Ctrl-C, watchdog is stopped for the REPL.
+
+Notes:
+    - Runs when main.py is the script, or from the boot loader (loader.py)
+      when modules are precompiled (.mpy) or frozen into the firmware.
+    - Exception at init, or ERROR_RESET_COUNT main loop passes in a row
+      ended with one (errors.py), resets the board right away (relays are
+      kept, see watchdog.py) instead of waiting for the watchdog.
+"""
+def run():
+    try:
+        serve();
+    except KeyboardInterrupt:
+        # mpremote, tools/deploy.py take over., no reset under them.
+        watchdog.stop();
+        raise;
+    except Exception as e:
+        sys.print_exception(e);
+        machine.reset();
+    # End-of-Function
+
+
 """
+This function initializes the system and runs the main loop.
+
+Args:
+    None
+
+Returns:
+        None
 
-if __name__ == "__main__": 
+Raises:
+
+Notes:
+"""
+def serve():
     init_system();
 
-    # Draw the first page on the screen.,
-    draw_page(0);
+    # Draw the first page on the screen., in one go at boot.
+    draw_window(listview.top);
     # Show cursor
-    display.show_cursor(0, OnScreenIndex);
+    slot = listview.slot_of(listview.selected);
+    display.show_cursor(layout.cursor_x[slot], layout.row[slot]);
+    display.finish();
+    telemetry.boot_mark(telemetry.CNT_BOOT_READY_MS);
 
+    # A pass that ends with an exception is reported and the next one
+    # goes on serving relay commands (errors.py).,
     while True:
-        [event, deviceId] = rotary.getUserInput();
+        try:
+            main_pass();
+            errors.pass_done();
+        except Exception as e:
+            profiler.unwind();
+            errors.handler_failed(e);
+    # End-of-Function
+
+
+"""
+This function runs one main loop pass: timers, serial commands, saves,
+page draw slice and one user input event.
+
+Args:
+    None
+
+Returns:
+        None
+
+Raises:
 
+Notes:
+"""
+def main_pass():
+    watchdog.feed();
+
+    # Fire due timers., cheap unless a scheduler tick has elapsed.
+    profiler.enter(profiler.SC_SCHEDULER);
+    scheduler.poll();
+    profiler.leave();
+
+    # Handle pending serial commands.,
+    profiler.enter(profiler.SC_REMOTE);
+    remote.poll();
+    profiler.leave();
+
+    # FRAM/EEPROM page writes left by saves (EEPROM write cycle).,
+    nvram.poll();
+
+    # Deferred device state save (power fail monitor), restart after
+    # a brownout.
+    devicectrl.poll_save();
+    powerfail.poll();
+
+    # Icons of devices switched by timers and serial commands.,
+    # (not while display sleeps, screen is redrawn on wake).
+    if not idle.sleeping:
+        flush_device_icons();
+        # Error notice shown or removed, if any.,
+        errors.poll();
+        # One slice of page draw in progress, if any.,
+        display.step();
+
+    profiler.enter(profiler.SC_INPUT);
+    [event, deviceId] = rotary.getUserInput();
+    profiler.leave();
+
+    if idle.sleeping:
+        # Short click released before getUserInput() looked at the switch.,
+        if (None == event and idle.missed_press()):
+            event = ROTARY_BTN_PRESSED;
         if (None == event):
-            utime.sleep_ms(10); # If user entered nothing, try after 10 ms.,
-            continue;
-
-        # User event occured.
-        # Just re-assuaring event is correct
-        if( event not in [ROTARY_UP, ROTARY_DOWN, ROTARY_BTN_PRESSED]):
-            # Something is wrong in rotary encoder driver.,
-            utime.sleep_ms(10);
-            continue;
-        
-        # Call the event handler., 
+            idle.wait();
+            return;
+        # Wake up, and handle the event as usual.,
+        idle.wake(redraw_screen);
+
+    if (None == event):
+        if idle.expired():
+            idle.sleep();
+            return;
+        # Page draw in progress goes on right away.,
+        if display.busy():
+            return;
+        # Idle, one slice of extra panel refresh and next page
+        # off-screen., (once per page turn)
+        panels.refresh();
+        prerender_page();
+        utime.sleep_ms(10); # If user entered nothing, try after 10 ms.,
+        return;
+
+    # User event occured.
+    # Just re-assuaring event is correct
+    if( event not in [ROTARY_UP, ROTARY_DOWN, ROTARY_BTN_PRESSED, ROTARY_BTN_LONG_PRESSED]):
+        # Something is wrong in rotary encoder driver.,
+        telemetry.count(telemetry.CNT_DROPPED_EVENTS);
+        telemetry.trace(telemetry.EV_DROPPED, event);
+        utime.sleep_ms(10);
+        return;
+
+    idle.activity();
+    telemetry.count(telemetry.CNT_INPUT_EVENTS);
+    telemetry.trace(telemetry.EV_INPUT, event * 1000 + deviceId);
+    
+    # Call the event handler., 
+    if QuickMenu:
+        quickhandlers[event](deviceId);
+    else:
         eventhanders[event](deviceId);
 
-        # Retry after 5 ms.,
-        utime.sleep_ms(5);
+    # Retry after 5 ms.,
+    utime.sleep_ms(5);
+    # End-of-Function
+
+
+if __name__ == "__main__":
+    run();
 
 # End-of-File
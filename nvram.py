@@ -0,0 +1,564 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements device state persistence in external I2C FRAM
+    (MB85RC..) or EEPROM (24Cxx), STATE_BACKEND = "fram" / "eeprom".
+    Memory holds at fixed addresses from NVRAM_BASE:
+         0  "DS", layout version, reserved
+         4  number of devices (2 bytes, little endian), 2 reserved
+         8  state bitmap, bit n is device n
+         .  switch counter per device (4 bytes, little endian), counted
+            when a save sees the device state changed.
+    A RAM image of the memory is kept. save() compares the new states with
+    it and writes only the changed bytes:
+      - FRAM: each changed byte run written right away, a few bytes on
+        the bus.
+      - EEPROM: changed bytes are collected per page (NVRAM_PAGE_SIZE),
+        one page write per page. After a page write the EEPROM doesn't
+        answer for its write cycle (~5 ms), it is polled (ACK polling)
+        from main loop by poll(), the UI is not blocked meanwhile.
+    Blank or foreign memory is formatted at boot with the states from
+    devicestatus_cfgfile.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    nvram.init(devicestatus);       # Loads states into the dictionary.
+    nvram.save(devicestatus);       # Instead of writing devicestate.json
+    nvram.poll();                   # From main loop.
+    nvram.flush();                  # Blocks until written.
+    nvram.commit();                 # Power fail, see powerfail.py
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import utime
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import display
+import telemetry
+import errors
+
+# Page writes run on core 1 in dual core mode (LCD bus).,
+import iocore
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+MAGIC          = b"DS";
+LAYOUT_VERSION = 1;
+HEADER_SIZE    = 8;
+
+i2c   = None;
+eeprom = False;
+
+# Memory content once pending writes are done, offset 0 is NVRAM_BASE.,
+image       = None;
+bitmap_at   = HEADER_SIZE;
+counters_at = 0;
+total       = 0;
+
+# Device status dictionary keys ("0", "1", ...), made once.,
+keys = [];
+
+# Changed byte range [lo, hi) of each page (image offsets), -1 -> clean.
+page_size = 0;
+first_page = 0;
+dirty_lo = [];
+dirty_hi = [];
+pending  = 0;    # Pages waiting to be written.
+
+# EEPROM in its write cycle (no ACK) after a page write., since (ms)
+busy = False;
+busy_at = 0;
+
+# Pages being written (poll()/flush())., power fail handler must not
+# interleave its own writes (commit()).
+writing = False;
+urgent  = False;    # Power failing, poll() writes everything.
+
+# Last write was not ACKed., reported once until a write goes through.
+failed  = False;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function returns I2C address of the memory byte.
+
+Args:
+    int: addr memory address
+
+Returns:
+    int: I2C address
+
+Raises:
+
+Notes:
+    - With 1 address byte (24C04..24C16) address bits 8-10 are in the
+      I2C address.
+"""
+def device(addr):
+    if (1 == NVRAM_ADDR_BYTES):
+        return NVRAM_I2C_ADDR | ((addr >> 8) & 0x07);
+    return NVRAM_I2C_ADDR;
+    # End-of-Function
+
+
+"""
+This function reads the memory into the image.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+    OSError: memory doesn't answer.
+
+Notes:
+    - Read in 256 byte pieces, 1 address byte reads can't cross them.
+"""
+def load_image():
+    at = 0;
+    while (at < len(image)):
+        addr = NVRAM_BASE + at;
+        n = min(len(image) - at, 256 - (addr & 0xff));
+        i2c.readfrom_mem_into(device(addr), addr & ((1 << (8 * NVRAM_ADDR_BYTES)) - 1),
+                              memoryview(image)[at:at + n], addrsize = 8 * NVRAM_ADDR_BYTES);
+        at = at + n;
+    # End-of-Function
+
+
+"""
+This function marks image bytes [lo, hi) to be written.
+
+Args:
+    int: lo first offset
+    int: hi offset after last
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - FRAM: written right away, unchanged bytes around are not rewritten.
+      A failed write is queued like an EEPROM page (one page) and retried
+      by poll().
+    - EEPROM: range is split at page boundaries, bytes in one page are
+      merged into one page write.
+"""
+def mark(lo, hi):
+    global pending;
+
+    if (not eeprom and 0 == pending):
+        if write_range(lo, hi):
+            return;
+    while (lo < hi):
+        page = (NVRAM_BASE + lo) // page_size - first_page;
+        end  = min(hi, (page + first_page + 1) * page_size - NVRAM_BASE);
+        if (dirty_lo[page] < 0):
+            dirty_lo[page] = lo;
+            dirty_hi[page] = end;
+            pending = pending + 1;
+        else:
+            dirty_lo[page] = min(dirty_lo[page], lo);
+            dirty_hi[page] = max(dirty_hi[page], end);
+        lo = end;
+    # End-of-Function
+
+
+"""
+This function tells if the memory takes a write now.
+
+Args:
+    None
+
+Returns:
+    bool
+
+Raises:
+
+Notes:
+    - EEPROM doesn't ACK its address during write cycle, an empty write
+      is the poll.
+    - No ACK for NVRAM_BUSY_MS is a recoverable error (memory gone),
+      reported once, polling goes on.
+"""
+def ready():
+    global busy;
+    global failed;
+
+    if not busy:
+        return True;
+    try:
+        i2c.writeto(NVRAM_I2C_ADDR, b"");
+    except OSError:
+        if (not failed and utime.ticks_diff(utime.ticks_ms(), busy_at) > NVRAM_BUSY_MS):
+            failed = True;
+            errors.report(errors.SEV_ERROR, errors.ERR_NVRAM, -1);
+        return False;
+    busy = False;
+    return True;
+    # End-of-Function
+
+
+"""
+This function writes image bytes [lo, hi) to the memory.
+
+Args:
+    int: lo first offset
+    int: hi offset after last
+
+Returns:
+    bool: False -> memory didn't answer, nothing written.
+
+Raises:
+
+Notes:
+    - Range must be in one EEPROM page.
+    - A failure is a recoverable error (errors.py), reported once until
+      a write goes through again.
+"""
+def write_range(lo, hi):
+    global busy;
+    global busy_at;
+    global failed;
+
+    addr = NVRAM_BASE + lo;
+    try:
+        i2c.writeto_mem(device(addr), addr & ((1 << (8 * NVRAM_ADDR_BYTES)) - 1),
+                        memoryview(image)[lo:hi], addrsize = 8 * NVRAM_ADDR_BYTES);
+    except OSError:
+        if not failed:
+            failed = True;
+            errors.report(errors.SEV_ERROR, errors.ERR_NVRAM, lo);
+        return False;
+    failed = False;
+    busy = eeprom;
+    busy_at = utime.ticks_ms();
+    telemetry.count(telemetry.CNT_NVRAM_WRITES);
+    telemetry.count(telemetry.CNT_NVRAM_BYTES, hi - lo);
+    return True;
+    # End-of-Function
+
+
+"""
+This function writes the lowest pending EEPROM page.
+
+Args:
+    None
+
+Returns:
+    bool: False -> not written, the page stays pending.
+
+Raises:
+
+Notes:
+"""
+def write_page():
+    global pending;
+
+    page = 0;
+    while (dirty_lo[page] < 0):
+        page = page + 1;
+    if not write_range(dirty_lo[page], dirty_hi[page]):
+        return False;
+    dirty_lo[page] = -1;
+    pending = pending - 1;
+    return True;
+    # End-of-Function
+
+
+"""
+This function writes pending pages the memory takes now.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called from main loop every pass, returns right away when nothing
+      is pending or the EEPROM is in its write cycle.
+    - In dual core mode it runs on core 1 (LCD bus).
+"""
+def poll():
+    global writing;
+
+    if (0 == pending or iocore.offload_once(poll)):
+        return;
+    writing = True;
+    while (pending > 0 and ready()):
+        if not write_page():
+            break;
+    writing = False;
+    if urgent:
+        flush();
+    # End-of-Function
+
+
+"""
+This function writes all pending pages, waiting for the EEPROM.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Blocks up to one write cycle per pending page., at boot, or when
+      the caller can't return to main loop.
+    - Gives up when a write fails or the memory doesn't ACK for
+      NVRAM_BUSY_MS, pages are left to poll().
+"""
+def flush():
+    global writing;
+
+    writing = True;
+    while (pending > 0):
+        if ready():
+            if not write_page():
+                break;
+        elif failed:
+            break;
+        else:
+            utime.sleep_us(200);
+    writing = False;
+    # End-of-Function
+
+
+"""
+This function writes all pending pages now, power is failing.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called from the power fail handler (devicectrl.flush_device_state()).
+      If it interrupted poll() or flush(), that one completes the writes
+      when the handler returns.
+"""
+def commit():
+    global urgent;
+
+    urgent = True;
+    if not writing:
+        flush();
+    # End-of-Function
+
+
+"""
+This function saves the device states, only changed bytes are written.
+
+Args:
+    dictionary: status device status dictionary (deviceconfig)
+
+Returns:
+    int: bytes changed
+
+Raises:
+
+Notes:
+    - Switch counter of every device whose state changed is incremented.
+    - EEPROM pages after the first are written by poll().
+"""
+def save(status):
+    changed = 0;
+    for i in range((len(keys) + 7) // 8):
+        byte = 0;
+        for bit in range(min(8, len(keys) - i * 8)):
+            if (1 == status[keys[i * 8 + bit]]):
+                byte = byte | (1 << bit);
+        at = bitmap_at + i;
+        if (byte != image[at]):
+            flipped = byte ^ image[at];
+            image[at] = byte;
+            mark(at, at + 1);
+            changed = changed + 1;
+            for bit in range(8):
+                if (flipped & (1 << bit)):
+                    changed = changed + count_switch(i * 8 + bit);
+    poll();
+    return changed;
+    # End-of-Function
+
+
+"""
+This function increments the switch counter of a device in the image.
+
+Args:
+    int: deviceid
+
+Returns:
+    int: bytes changed
+
+Raises:
+
+Notes:
+    - Only bytes touched by the carry are marked, usually one.
+"""
+def count_switch(deviceid):
+    at = counters_at + 4 * deviceid;
+    n = 0;
+    while (n < 4):
+        image[at + n] = (image[at + n] + 1) & 0xff;
+        n = n + 1;
+        if (0 != image[at + n - 1]):
+            break;
+    mark(at, at + n);
+    return n;
+    # End-of-Function
+
+
+"""
+This function returns how many times a device was switched.
+
+Args:
+    int: deviceid
+
+Returns:
+    int
+
+Raises:
+
+Notes:
+"""
+def get_switch_count(deviceid):
+    at = counters_at + 4 * deviceid;
+    return (image[at] | (image[at + 1] << 8) | (image[at + 2] << 16) | (image[at + 3] << 24));
+    # End-of-Function
+
+
+"""
+This function formats the memory with given device states.
+
+Args:
+    dictionary: status device status dictionary
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Switch counters start at 0.
+"""
+def format_memory(status):
+    for i in range(len(image)):
+        image[i] = 0;
+    image[0:2] = MAGIC;
+    image[2] = LAYOUT_VERSION;
+    image[4] = total & 0xff;
+    image[5] = total >> 8;
+    for d in range(total):
+        if (1 == status[keys[d]]):
+            image[bitmap_at + d // 8] = image[bitmap_at + d // 8] | (1 << (d % 8));
+    mark(0, len(image));
+    flush();
+    # End-of-Function
+
+
+"""
+This function reads the memory and sets device states from it.
+
+Args:
+    dictionary: status device status dictionary (deviceconfig), states
+                are overwritten.
+
+Returns:
+    bool: False -> memory doesn't answer, states are left as they are.
+
+Raises:
+
+Notes:
+    - Called before GPIOs are set up (devicectrl.init()).
+    - Without the memory devicectrl goes on with devicestate.json.
+"""
+def init(status):
+    global i2c;
+    global eeprom;
+    global image;
+    global counters_at;
+    global total;
+    global keys;
+    global page_size;
+    global first_page;
+    global dirty_lo;
+    global dirty_hi;
+    global pending;
+    global busy;
+
+    i2c    = display.i2c;
+    eeprom = ("eeprom" == STATE_BACKEND);
+    total  = status[numdevices];
+    keys   = [str(d) for d in range(total)];
+    counters_at = bitmap_at + (total + 7) // 8;
+    image  = bytearray(counters_at + 4 * total);
+
+    # FRAM has no pages (writes are queued only when one fails)., whole
+    # image is one.
+    page_size  = NVRAM_PAGE_SIZE if eeprom else (NVRAM_BASE + len(image));
+    first_page = NVRAM_BASE // page_size;
+    pages = (NVRAM_BASE + len(image) - 1) // page_size - first_page + 1;
+    dirty_lo = [-1] * pages;
+    dirty_hi = [0] * pages;
+    pending  = 0;
+    busy     = False;
+
+    try:
+        load_image();
+    except OSError:
+        print("No FRAM/EEPROM at address {0}".format(NVRAM_I2C_ADDR));
+        errors.report(errors.SEV_ERROR, errors.ERR_NVRAM, -1);
+        return False;
+
+    if (MAGIC != image[0:2] or LAYOUT_VERSION != image[2] or
+        total != (image[4] | (image[5] << 8))):
+        print("Formatting FRAM/EEPROM with {0}".format(devicestatus_cfgfile));
+        format_memory(status);
+        return True;
+    for d in range(total):
+        status[keys[d]] = (image[bitmap_at + d // 8] >> (d % 8)) & 1;
+    return True;
+    # End-of-Function
+
+# End-of-File
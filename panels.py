@@ -0,0 +1,517 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file drives extra LCD panels (EXTRA_PANELS) next to the main LCD
+    of display.py, e.g. a second panel on the cabinet door.
+    Main LCD is still written directly, so input latency does not change.
+    Every extra panel has:
+      - target : framebuffer of what it should show (one code per cell)
+      - shown  : framebuffer of what was written to it
+      - its own CGRAM slots (glyphs are uploaded per panel)
+    display.py updates targets of mirror panels (memory writes only).
+    Summary panels are rendered here from device states.
+    refresh() is called from main loop when there is no input., it writes
+    at most PANEL_REFRESH_CELLS changed cells of one panel and moves to the
+    next panel on the next call (round robin), so a user event waits for
+    one such slice at most, however many panels are attached.
+    Frames and refresh time are kept per panel, see report().
+
+    Cell codes: < 0x100 -> character, GLYPH_CODE + glyph -> cgram glyph.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    panels.init(display.i2c);       # From display.init().
+    panels.refresh();               # Main loop, when idle.
+    panels.report(display.lcd);
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import utime
+
+from array import array
+
+from machine import Pin
+from machine import I2C
+
+from pico_i2c_lcd import I2cLcd
+
+# Import all constants and defines.,
+from proj_defines import *
+
+# Glyph bitmaps and fallback characters., slots are managed here per panel.
+import cgram
+import iocore
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+GLYPH_CODE = 0x100;
+BLANK      = 0x20;
+
+VIEW_NAMES = ["mirror", "summary"];
+
+# Per panel state, index is the position in EXTRA_PANELS.,
+lcds      = [];
+views     = [];
+rows      = [];
+cols      = [];
+target    = [];
+shown     = [];
+slots     = [];     # Glyph loaded in each CGRAM slot, None -> empty.
+scan      = [];     # Next cell to compare.
+refresh_us = None;  # array, time spent in refresh() per panel.
+
+# True when at least one panel mirrors the main LCD.,
+mirroring = False;
+
+# Round robin position of refresh().,
+next_panel = 0;
+
+# Summary view: last switched device (-1 none) and redraw flag.,
+summary_device = -1;
+summary_dirty  = True;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function returns I2C bus time (us) of given frames.
+
+Args:
+    int: frames PCF8574 writes
+
+Returns:
+    int: microseconds at I2C_BUS_FREQUENCY
+
+Raises:
+
+Notes:
+"""
+def bus_time_us(frames):
+    return (frames * I2C_FRAME_BITS * 1000000) // I2C_BUS_FREQUENCY;
+    # End-of-Function
+
+
+"""
+This function writes cell codes into target of every mirror panel.
+
+Args:
+    int: x column
+    int: y row
+    list: cells codes (< 0x100 character, GLYPH_CODE + glyph ID)
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def put_cells(x, y, cells):
+    if not mirroring:
+        return;
+    for p in range(len(lcds)):
+        if (PANEL_VIEW_MIRROR != views[p] or y >= rows[p]):
+            continue;
+        base = y * cols[p];
+        for i in range(min(len(cells), cols[p] - x)):
+            target[p][base + x + i] = cells[i];
+    # End-of-Function
+
+
+"""
+This function blanks target of every mirror panel.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Only the target is changed, refresh() sends the difference.
+"""
+def clear():
+    if not mirroring:
+        return;
+    for p in range(len(lcds)):
+        if (PANEL_VIEW_MIRROR == views[p]):
+            fill(target[p], BLANK);
+    # End-of-Function
+
+
+"""
+This function copies a whole screen into target of every mirror panel.,
+(page shown from off-screen DDRAM, see display.show_page())
+
+Args:
+    array: frame cell codes, row major (GLYPH_CODE + glyph for glyphs).
+    int: width cells per row in frame.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def put_frame(frame, width):
+    if not mirroring:
+        return;
+    for p in range(len(lcds)):
+        if (PANEL_VIEW_MIRROR != views[p]):
+            continue;
+        for y in range(min(rows[p], len(frame) // width)):
+            for x in range(min(cols[p], width)):
+                target[p][y * cols[p] + x] = frame[y * width + x];
+    # End-of-Function
+
+
+"""
+This function sets every cell of a framebuffer.
+
+Args:
+    array: frame
+    int: code
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def fill(frame, code):
+    for i in range(len(frame)):
+        frame[i] = code;
+    # End-of-Function
+
+
+"""
+This function turns backlight of every extra panel on or off.
+
+Args:
+    bool: on
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def set_backlight(on):
+    for lcd in lcds:
+        if on:
+            lcd.backlight_on();
+        else:
+            lcd.backlight_off();
+    # End-of-Function
+
+
+"""
+This function stops all I2C traffic to the panels.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Power fail, see powerfail.py., panels are not written again until
+      reset.
+"""
+def halt():
+    for lcd in lcds:
+        lcd.detach();
+    # End-of-Function
+
+
+"""
+This function tells summary panels that a device was switched.
+
+Args:
+    int: deviceid, -1 -> many devices (group, scene), count only.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def device_changed(deviceid):
+    global summary_device;
+    global summary_dirty;
+
+    if (deviceid >= 0):
+        summary_device = deviceid;
+    summary_dirty = True;
+    # End-of-Function
+
+
+"""
+This function renders summary view into target of panel p.
+    Row 0: ON <devices on>/<total>
+    Row 1: last switched device name and its ON/OFF icon.
+
+Args:
+    int: p panel
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def render_summary(p):
+    # deviceconfig imports display, which imports this module.,
+    import deviceconfig
+
+    frame = target[p];
+    width = cols[p];
+    fill(frame, BLANK);
+
+    status = deviceconfig.get_device_status();
+    total  = deviceconfig.get_total_devices();
+    text   = "ON {0}/{1}".format(sum([status[str(d)] for d in range(total)]), total)[:width];
+    for i in range(len(text)):
+        frame[i] = ord(text[i]);
+
+    if (rows[p] < 2 or summary_device < 0):
+        return;
+    name = deviceconfig.get_device_name(summary_device)[:width - 1 - ONOFF_INDICATOR_NUMCHAR];
+    for i in range(len(name)):
+        frame[width + i] = ord(name[i]);
+    icon = cgram.ICON_ON if (1 == status[str(summary_device)]) else cgram.ICON_OFF;
+    for i in range(len(icon)):
+        frame[2 * width - ONOFF_INDICATOR_NUMCHAR + i] = GLYPH_CODE + icon[i];
+    # End-of-Function
+
+
+"""
+This function returns the character code of a glyph on panel p,
+uploading it first if needed.
+
+Args:
+    int: p panel
+    int: glyph glyph ID
+
+Returns:
+    int: character code
+
+Raises:
+
+Notes:
+    - A slot is reused only if its glyph is not in the panel target.
+      Panels are refreshed in slices, so a glyph still shown but already
+      replaced in target may briefly show the new bitmap.
+"""
+def glyph_code(p, glyph):
+    panel_slots = slots[p];
+    if glyph in panel_slots:
+        return panel_slots.index(glyph);
+
+    slot = -1;
+    if None in panel_slots:
+        slot = panel_slots.index(None);
+    else:
+        frame = target[p];
+        for i in range(CGRAM_SLOTS):
+            if (GLYPH_CODE + panel_slots[i]) not in frame:
+                slot = i;
+                break;
+    if (slot < 0):
+        return cgram.FALLBACK[glyph];
+
+    lcds[p].custom_char(slot, cgram.GLYPHS[glyph]);
+    panel_slots[slot] = glyph;
+    return slot;
+    # End-of-Function
+
+
+"""
+This function writes up to budget changed cells of panel p.
+
+Args:
+    int: p panel
+    int: budget maximum cells to write
+
+Returns:
+    int: cells written
+
+Raises:
+
+Notes:
+    - Consecutive changed cells of a row are written as one run.
+"""
+def refresh_panel(p, budget):
+    lcd   = lcds[p];
+    frame = target[p];
+    old   = shown[p];
+    size  = len(frame);
+    index = scan[p];
+    written  = 0;
+    nextcell = -1;
+
+    for n in range(size):
+        if (written >= budget):
+            break;
+        code = frame[index];
+        if (code != old[index]):
+            char = code;
+            if (code >= GLYPH_CODE):
+                # Upload restores the cursor, run goes on. (see custom_char())
+                char = glyph_code(p, code - GLYPH_CODE);
+            if (index != nextcell):
+                lcd.move_to(index % cols[p], index // cols[p]);
+            lcd.hal_write_data(char);
+            lcd.cursor_x = lcd.cursor_x + 1;
+            old[index] = code;
+            written  = written + 1;
+            nextcell = index + 1;
+            if (0 == nextcell % cols[p]):
+                nextcell = -1;
+        index = (index + 1) % size;
+
+    scan[p] = index;
+    return written;
+    # End-of-Function
+
+
+"""
+This function refreshes one extra panel, next call the next one.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Call when main loop is idle., one slice is at most
+      PANEL_REFRESH_CELLS cells (8 frames each incl. cursor moves).
+    - Runs on core 1 in dual core mode, panels share the LCD bus.
+"""
+def refresh():
+    global next_panel;
+    global summary_dirty;
+
+    if (0 == len(lcds)):
+        return;
+    if iocore.offload_once(refresh):
+        return;
+
+    if summary_dirty:
+        summary_dirty = False;
+        for p in range(len(lcds)):
+            if (PANEL_VIEW_SUMMARY == views[p]):
+                render_summary(p);
+
+    p = next_panel;
+    next_panel = (next_panel + 1) % len(lcds);
+    t0 = utime.ticks_us();
+    refresh_panel(p, PANEL_REFRESH_CELLS);
+    refresh_us[p] = refresh_us[p] + utime.ticks_diff(utime.ticks_us(), t0);
+    # End-of-Function
+
+
+"""
+This function prints frames, bus time and refresh time of every panel.
+
+Args:
+    LcdApi: main_lcd main LCD of display.py, reported as panel "main".
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Bus time is computed from frames (I2C_FRAME_BITS per frame)., refresh
+      time is measured and includes the Python overhead.
+"""
+def report(main_lcd):
+    print("panel     addr size   view     frames   bus_ms  refresh_ms");
+    print("main      0x{0:02x} {1:>2}x{2:<3} -        {3:>8} {4:>8} {5:>11}".format(
+        main_lcd.i2c_addr, main_lcd.num_columns, main_lcd.num_lines,
+        main_lcd.frames, bus_time_us(main_lcd.frames) // 1000, "-"));
+    for p in range(len(lcds)):
+        print("extra {0:<3} 0x{1:02x} {2:>2}x{3:<3} {4:<8} {5:>8} {6:>8} {7:>11}".format(
+            p, lcds[p].i2c_addr, cols[p], rows[p], VIEW_NAMES[views[p]], lcds[p].frames,
+            bus_time_us(lcds[p].frames) // 1000, refresh_us[p] // 1000));
+    # End-of-Function
+
+
+"""
+This function brings up EXTRA_PANELS.
+
+Args:
+    I2C: main_i2c bus of the main LCD, shared with panels on same channel.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Panels start blank, mirror panels catch up through refresh().
+"""
+def init(main_i2c):
+    global refresh_us;
+    global mirroring;
+
+    for [channel, sda, scl, addr, nrows, ncols, view] in EXTRA_PANELS:
+        if (I2C_CHANNEL_ID == channel):
+            bus = main_i2c;
+        else:
+            bus = I2C(channel, sda = Pin(sda), scl = Pin(scl), freq = I2C_BUS_FREQUENCY);
+        lcd = I2cLcd(bus, addr, nrows, ncols);
+        lcd.clear();
+        lcds.append(lcd);
+        views.append(view);
+        rows.append(nrows);
+        cols.append(ncols);
+        target.append(array("H", [BLANK] * (nrows * ncols)));
+        shown.append(array("H", [BLANK] * (nrows * ncols)));
+        slots.append([None] * CGRAM_SLOTS);
+        scan.append(0);
+        if (PANEL_VIEW_MIRROR == view):
+            mirroring = True;
+    refresh_us = array("L", [0] * len(lcds));
+    # End-of-Function
+
+# End-of-File
@@ -1,16 +1,52 @@
+import sys
 import utime
 import gc
+import micropython
+
+from micropython import const
 
 from lcd_api import LcdApi
 from machine import I2C
 
+import telemetry
+import profiler
+
 # PCF8574 pin definitions
-MASK_RS = 0x01       # P0
-MASK_RW = 0x02       # P1
-MASK_E  = 0x04       # P2
+MASK_RS = const(0x01)       # P0
+MASK_RW = const(0x02)       # P1
+MASK_E  = const(0x04)       # P2
+
+SHIFT_BACKLIGHT = const(3)  # P3
+SHIFT_DATA      = const(4)  # P4-P7
 
-SHIFT_BACKLIGHT = 3  # P3
-SHIFT_DATA      = 4  # P4-P7
+# Fills buf[0:4] with the PCF8574 writes of one byte: high nibble with E
+# set and cleared, then low nibble. flags carries RS and backlight bits.
+# Viper code on the board, plain Python on the host (no viper emitter).
+if "micropython" == sys.implementation.name:
+    @micropython.viper
+    def encode(buf, value: int, flags: int):
+        p = ptr8(buf)
+        byte = (value & 0xf0) | flags
+        p[0] = byte | MASK_E
+        p[1] = byte
+        byte = ((value & 0x0f) << SHIFT_DATA) | flags
+        p[2] = byte | MASK_E
+        p[3] = byte
+else:
+    def encode(buf, value, flags):
+        byte = (value & 0xf0) | flags
+        buf[0] = byte | MASK_E
+        buf[1] = byte
+        byte = ((value & 0x0f) << SHIFT_DATA) | flags
+        buf[2] = byte | MASK_E
+        buf[3] = byte
+
+class NoBus:
+    # Bus of a detached LCD, writes are dropped.
+    def writeto(self, addr, buf, stop = True):
+        return 0
+
+NO_BUS = NoBus()
 
 class I2cLcd(LcdApi):
     
@@ -19,6 +55,12 @@ class I2cLcd(LcdApi):
     def __init__(self, i2c, i2c_addr, num_lines, num_columns):
         self.i2c = i2c
         self.i2c_addr = i2c_addr
+        self.frames = 0      # I2C frames written, for per panel bus time
+        # Frame buffer reused by every write, one I2C frame per byte.
+        self.buf = bytearray(4)
+        view = memoryview(self.buf)
+        self.frame = (view[0:1], view[1:2], view[2:3], view[3:4])
+        self.light = 1 << SHIFT_BACKLIGHT   # Backlight bit, on at init
         self.i2c.writeto(self.i2c_addr, bytes([0]))
         utime.sleep_ms(20)   # Allow LCD time to powerup
         # Send reset 3 times
@@ -38,49 +80,91 @@ class I2cLcd(LcdApi):
         self.hal_write_command(cmd)
         gc.collect()
 
+    def detach(self):
+        # Stops all I2C traffic of this LCD (power fail), writes after this
+        # go nowhere. A byte being written may still go out (4 frames).
+        self.i2c = NO_BUS
+
     def hal_write_init_nibble(self, nibble):
         # Writes an initialization nibble to the LCD.
         # This particular function is only used during initialization.
         byte = ((nibble >> 4) & 0x0f) << SHIFT_DATA
         self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
         self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        gc.collect()
+        self.frames += 2
+        telemetry.count(telemetry.CNT_I2C_FRAMES, 2)
+        telemetry.gc_collect()
         
     def hal_backlight_on(self):
         # Allows the hal layer to turn the backlight on
+        self.light = 1 << SHIFT_BACKLIGHT
         self.i2c.writeto(self.i2c_addr, bytes([1 << SHIFT_BACKLIGHT]))
-        gc.collect()
+        self.frames += 1
+        telemetry.count(telemetry.CNT_I2C_FRAMES)
+        telemetry.gc_collect()
         
     def hal_backlight_off(self):
         #Allows the hal layer to turn the backlight off
+        self.light = 0
         self.i2c.writeto(self.i2c_addr, bytes([0]))
-        gc.collect()
+        self.frames += 1
+        telemetry.count(telemetry.CNT_I2C_FRAMES)
+        telemetry.gc_collect()
         
+    @micropython.native
+    def hal_write_byte(self, value, flags):
+        # Writes one byte as 4 I2C frames. Data is latched on the falling
+        # edge of E. Nothing is allocated, the frames are views of self.buf.
+        encode(self.buf, value, flags)
+        writeto = self.i2c.writeto
+        addr = self.i2c_addr
+        for frame in self.frame:
+            writeto(addr, frame)
+        self.frames += 4
+        telemetry.count(telemetry.CNT_I2C_FRAMES, 4)
+
     def hal_write_command(self, cmd):
-        # Write a command to the LCD. Data is latched on the falling edge of E.
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                (((cmd >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                ((cmd & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        # Write a command to the LCD.
+        profiler.enter(profiler.SC_HAL_COMMAND)
+        self.hal_write_byte(cmd, self.light)
         if cmd <= 3:
             # The home and clear commands require a worst case delay of 4.1 msec
             utime.sleep_ms(5)
-        gc.collect()
+        profiler.leave()
+
+    def writer(self, next_run, max_frames):
+        # Generator for long writes (a whole screen) that must not block the
+        # caller: writes runs from next_run(max_codes), which returns
+        # (cursor_x, cursor_y, codes) or None when done, and yields after
+        # each slice of about max_frames I2C frames, so the caller can do
+        # other work between slices. A run is asked for only when there is
+        # room for it in the slice, so it reflects changes made meanwhile.
+        start = self.frames
+        while True:
+            # Writes left in the slice, one is kept for the cursor move.
+            left = (max_frames - (self.frames - start)) // 4 - 1
+            if left < 1:
+                yield
+                start = self.frames
+                continue
+            run = next_run(left)
+            if run is None:
+                return
+            self.move_to(run[0], run[1])
+            self.putraw(run[2])
 
     def hal_write_data(self, data):
-        # Write data to the LCD. Data is latched on the falling edge of E.
-        byte = (MASK_RS |
-                (self.backlight << SHIFT_BACKLIGHT) |
-                (((data >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = (MASK_RS |
-                (self.backlight << SHIFT_BACKLIGHT) |
-                ((data & 0x0f) << SHIFT_DATA))      
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        gc.collect()
\ No newline at end of file
+        # Write data to the LCD.
+        profiler.enter(profiler.SC_HAL_DATA)
+        self.hal_write_byte(data, MASK_RS | self.light)
+        profiler.leave()
+
+    def putraw(self, codes):
+        # Same as LcdApi.putraw(), with RS/backlight bits and profiler scope
+        # taken once per run instead of per character.
+        profiler.enter(profiler.SC_HAL_DATA)
+        flags = MASK_RS | self.light
+        for code in codes:
+            self.hal_write_byte(code, flags)
+        self.cursor_x += len(codes)
+        profiler.leave()
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements the optional power fail monitor (POWERFAIL_MODE).
+      "gpio" -> supervisor/comparator output, falling edge interrupt.
+      "adc"  -> VSYS through ADC3, sampled by a periodic timer.
+    With a monitor device state saves are deferred (STATE_SAVE_DELAY_MS,
+    devicectrl.defer_saves()), so the normal path doesn't write on every
+    change. When the supply drops:
+      1. all display traffic is stopped (LCD and extra panels detached
+         from the bus), the bus and the hold-up time go to the save,
+      2. core 1 worker is stopped after its request in progress (dual core
+         mode), queued LCD requests are dropped,
+      3. device states are committed through devicectrl (file or
+         FRAM/EEPROM, all pending EEPROM pages),
+      4. schedules changed since the last checkpoint are saved
+         (scheduler.flush(), O(pending)),
+      5. flash write counters are saved (flashwear.py).
+    Relays keep working, saves after this are written at once.
+    If the supply comes back (brownout) the board is reset after
+    POWERFAIL_RECOVER_MS, to get display and core 1 back.
+
+    Time from detection to committed state is in HIST_POWERFAIL (host
+    tools, RAM is lost on a real power fail).
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    powerfail.init();               # After iocore.init(), last in init.
+    powerfail.poll();               # From main loop.
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import utime
+import machine
+
+from machine import Pin
+from machine import Timer
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import display
+import devicectrl
+import telemetry
+import iocore
+import flashwear
+import scheduler
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# ADC counts (read_u16) of the thresholds, VSYS/3 against 3.3 V.,
+FAIL_COUNTS    = POWERFAIL_VSYS_MV * 65535 // (3 * 3300);
+RECOVER_COUNTS = POWERFAIL_RECOVER_MV * 65535 // (3 * 3300);
+
+sense = None;   # Pin ("gpio") or ADC ("adc")
+timer = None;
+
+failing = False;
+
+# Supply good again since (ms), None -> still low.,
+good_since = None;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function tells if the supply is good.
+
+Args:
+    bool: recover True -> against recovery threshold (hysteresis).
+
+Returns:
+    bool
+
+Raises:
+
+Notes:
+"""
+def power_good(recover = False):
+    if ("gpio" == POWERFAIL_MODE):
+        return (1 == sense.value());
+    return (sense.read_u16() >= (RECOVER_COUNTS if recover else FAIL_COUNTS));
+    # End-of-Function
+
+
+"""
+This function is the comparator pin interrupt handler.
+
+Args:
+    Pin: pin
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Runs as soft interrupt (between bytecodes of the main loop).
+"""
+def on_pin(pin):
+    power_fail();
+    # End-of-Function
+
+
+"""
+This function is the ADC sampling timer callback.
+
+Args:
+    Timer: t
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Runs as soft interrupt, one ADC conversion (~2 us) per call.
+"""
+def on_sample(t):
+    if ((not failing) and (not power_good())):
+        power_fail();
+    # End-of-Function
+
+
+"""
+This function stops the display and commits device states.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Runs once., from an interrupt, it can come in the middle of a save
+      or an LCD write, see devicectrl.flush_device_state().
+"""
+def power_fail():
+    global failing;
+
+    if failing:
+        return;
+    failing = True;
+    t0 = telemetry.start();
+
+    display.halt();
+    iocore.halt();
+    devicectrl.flush_device_state();
+    # Fired one-shot timers not saved yet would fire again after power up.,
+    scheduler.flush();
+    # Writes since the last counters save would be lost otherwise.,
+    flashwear.save_counters();
+
+    telemetry.record(telemetry.HIST_POWERFAIL, t0);
+    # End-of-Function
+
+
+"""
+This function resets the board when the supply is back after a power
+fail (brownout).
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called from main loop every pass.
+"""
+def poll():
+    global good_since;
+
+    if not failing:
+        return;
+    if not power_good(True):
+        good_since = None;
+        return;
+    if (None == good_since):
+        good_since = utime.ticks_ms();
+    elif (utime.ticks_diff(utime.ticks_ms(), good_since) >= POWERFAIL_RECOVER_MS):
+        print("Supply is back, restarting");
+        machine.reset();
+    # End-of-Function
+
+
+"""
+This function starts the power fail monitor when POWERFAIL_MODE is set.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Call last in init., a power fail commits through devicectrl and
+      stops iocore, both must be up.
+"""
+def init():
+    global sense;
+    global timer;
+
+    if ("gpio" == POWERFAIL_MODE):
+        sense = Pin(POWERFAIL_GPIO_PIN, Pin.IN, Pin.PULL_UP);
+        sense.irq(handler = on_pin, trigger = Pin.IRQ_FALLING);
+    elif ("adc" == POWERFAIL_MODE):
+        sense = machine.ADC(POWERFAIL_ADC_PIN);
+        timer = Timer(period = POWERFAIL_SAMPLE_MS, mode = Timer.PERIODIC, callback = on_sample);
+    else:
+        return;
+    devicectrl.defer_saves(STATE_SAVE_DELAY_MS);
+    # End-of-Function
+
+# End-of-File
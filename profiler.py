@@ -0,0 +1,368 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements an opt-in sampling profiler.
+    MicroPython has no cheap way to look at the executing Python frame
+    (sys.settrace is not built for rp2 port), hence hot paths mark their
+    scope with enter()/leave() and a periodic hardware timer copies the
+    current scope stack into a ring buffer.
+    tools/flamegraph.py renders the dump as a flame graph.
+
+    Overhead is bounded:
+      - Not running -> enter()/leave() return after one test.
+      - Running -> each sample copies at most PROFILER_MAX_DEPTH bytes,
+        PROFILER_HZ samples per second. Time spent in sampling and the
+        estimated marker cost are measured and reported in dump().
+    Buffers are allocated in start() only, nothing is allocated per sample.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    profiler.start();       # From REPL, or PROFILER_AUTOSTART = True
+    ... use the board ...
+    profiler.stop();
+    profiler.dump();        # Copy output to a file on host, then
+                            # python tools/flamegraph.py profile.txt
+
+    def hot_function():
+        profiler.enter(profiler.SC_DRAW_PAGE);
+        ...
+        profiler.leave();
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import gc
+import utime
+
+from machine import Timer
+
+# Import all constants and defines.,
+from proj_defines import *
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Scope IDs, 0 is reserved for "no scope"., keep in sync with SCOPE_NAMES.
+SC_DRAW_PAGE   = 1;
+SC_CLICK       = 2;
+SC_NAVIGATE    = 3;
+SC_QUICK_MENU  = 4;
+SC_SCHEDULER   = 5;
+SC_REMOTE      = 6;
+SC_INPUT       = 7;
+SC_SAVE_STATE  = 8;
+SC_SHOW_STRING = 9;
+SC_SHOW_ICON   = 10;
+SC_SHOW_CURSOR = 11;
+SC_LCD_PUTSTR  = 12;
+SC_LCD_MOVE_TO = 13;
+SC_HAL_COMMAND = 14;
+SC_HAL_DATA    = 15;
+SC_GC          = 16;
+SCOPE_NAMES = ["-", "draw_page", "click", "navigate", "quick_menu", "scheduler",
+               "remote", "input", "save_state", "show_string", "show_icon",
+               "show_cursor", "lcd.putstr", "lcd.move_to", "hal_write_command",
+               "hal_write_data", "gc"];
+
+running = False;
+
+# Current scope stack., depth may go above PROFILER_MAX_DEPTH, deeper
+# scopes are not recorded.
+stack = bytearray(PROFILER_MAX_DEPTH);
+depth = 0;
+
+# Sample ring, PROFILER_MAX_DEPTH bytes per sample (root first, 0 padded).,
+ring  = None;
+head  = 0;
+samples = 0;
+
+# Overhead accounting.,
+timer       = None;
+started_us  = 0;
+elapsed_us  = 0;
+sample_us   = 0;
+markers     = 0;
+marker_ns   = 0;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function marks entry into a profiled scope.
+
+Args:
+    int: scope scope ID (SC_*)
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Every enter() must be paired with leave().
+"""
+def enter(scope):
+    global depth;
+    global markers;
+
+    if not running:
+        return;
+    if (depth < PROFILER_MAX_DEPTH):
+        stack[depth] = scope;
+    depth = depth + 1;
+    markers = markers + 1;
+    # End-of-Function
+
+
+"""
+This function marks exit from the current profiled scope.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - leave() for scope entered before start() is ignored.
+"""
+def leave():
+    global depth;
+
+    if (running and depth > 0):
+        depth = depth - 1;
+    # End-of-Function
+
+
+"""
+This function leaves all profiled scopes.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called when a main loop pass ended with an exception, its scopes
+      were not left.
+"""
+def unwind():
+    global depth;
+
+    depth = 0;
+    # End-of-Function
+
+
+"""
+Timer callback., copies the current scope stack into the ring.
+
+Args:
+    object: t timer
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Runs as soft IRQ callback., must not allocate.
+"""
+def sample(t):
+    global head;
+    global samples;
+    global sample_us;
+
+    t0 = utime.ticks_us();
+    base = head * PROFILER_MAX_DEPTH;
+    n = depth;
+    for i in range(PROFILER_MAX_DEPTH):
+        ring[base + i] = stack[i] if (i < n) else 0;
+    head = (head + 1) % PROFILER_RING_SAMPLES;
+    samples = samples + 1;
+    sample_us = sample_us + utime.ticks_diff(utime.ticks_us(), t0);
+    # End-of-Function
+
+
+"""
+This function measures the cost of one enter()/leave() pair.
+
+Args:
+    None
+
+Returns:
+    int: cost in ns
+
+Raises:
+
+Notes:
+    - Must be called with running = True and depth = 0.
+"""
+def calibrate():
+    global markers;
+
+    t0 = utime.ticks_us();
+    for i in range(100):
+        enter(SC_GC);
+        leave();
+    cost = utime.ticks_diff(utime.ticks_us(), t0) * 10;
+    markers = 0;
+    return cost;
+    # End-of-Function
+
+
+"""
+This function starts sampling.
+
+Args:
+    int: hz sampling rate
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Previous samples are discarded.
+"""
+def start(hz = PROFILER_HZ):
+    global running;
+    global ring;
+    global head;
+    global samples;
+    global depth;
+    global timer;
+    global started_us;
+    global elapsed_us;
+    global sample_us;
+    global marker_ns;
+
+    stop();
+    if (None == ring):
+        ring = bytearray(PROFILER_RING_SAMPLES * PROFILER_MAX_DEPTH);
+    head = 0;
+    samples = 0;
+    sample_us = 0;
+    elapsed_us = 0;
+    depth = 0;
+
+    running = True;
+    marker_ns = calibrate();
+    started_us = utime.ticks_us();
+    timer = Timer(mode = Timer.PERIODIC, freq = hz, callback = sample);
+    # End-of-Function
+
+
+"""
+This function stops sampling, samples are kept for dump().
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def stop():
+    global running;
+    global timer;
+    global elapsed_us;
+
+    if (None != timer):
+        timer.deinit();
+        timer = None;
+        elapsed_us = utime.ticks_diff(utime.ticks_us(), started_us);
+    running = False;
+    # End-of-Function
+
+
+"""
+This function prints the samples in the format read by
+tools/flamegraph.py., meant for REPL.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Header lines start with '#', then one line per sample (oldest first)
+      with space separated scope IDs, root first., '-' is empty stack.
+"""
+def dump():
+    elapsed = elapsed_us;
+    if running:
+        elapsed = utime.ticks_diff(utime.ticks_us(), started_us);
+
+    kept = samples if (samples < PROFILER_RING_SAMPLES) else PROFILER_RING_SAMPLES;
+    print("# profile samples={0} kept={1} elapsed_us={2} sample_us={3} markers={4} marker_ns={5}".format(
+          samples, kept, elapsed, sample_us, markers, marker_ns));
+    for i in range(1, len(SCOPE_NAMES)):
+        print("# scope {0} {1}".format(i, SCOPE_NAMES[i]));
+
+    for k in range(kept):
+        index = (head - kept + k) % PROFILER_RING_SAMPLES;
+        base  = index * PROFILER_MAX_DEPTH;
+        ids = [];
+        for i in range(PROFILER_MAX_DEPTH):
+            if (0 == ring[base + i]):
+                break;
+            ids.append(str(ring[base + i]));
+        print(" ".join(ids) if ids else "-");
+    gc.collect();
+    # End-of-Function
+
+
+"""
+This function starts the profiler at boot when PROFILER_AUTOSTART is set.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def init():
+    if PROFILER_AUTOSTART:
+        start();
+    # End-of-Function
+
+# End-of-File
@@ -31,39 +31,157 @@ Usage:
 # Project wide contants/defines.,
 # A place holder for all the constants and defines.,
 
+# Integer constants are const(), folded at compile time where used in this
+# file. Importing modules still look them up as globals, hot paths declare
+# their own const() (see pico_i2c_lcd.py). Flags, strings, lists and
+# SIO_BASE (not a small int) stay plain globals.
+from micropython import const
+
 # LCD display address and configurations
-I2C_ADDR             = 39
-I2C_DISPLAY_NUM_ROWS = 2
-I2C_DISPLAY_NUM_COLS = 16
+I2C_ADDR             = const(39)
+I2C_DISPLAY_NUM_ROWS = const(2)
+I2C_DISPLAY_NUM_COLS = const(16)
+
+# Device list layout (layout.py), computed from the geometry above.,
+# Wide panels (e.g. 40x2) show LAYOUT_MIN_SLOT_WIDTH wide device columns
+# side by side., a timer mark is shown next to the ON/OFF icon when the
+# name keeps at least LAYOUT_MIN_NAME_WIDTH characters (20x4, 40x2).
+LAYOUT_MIN_SLOT_WIDTH  = const(16)
+LAYOUT_MIN_NAME_WIDTH  = const(13)
+LAYOUT_SHOW_TIMERS     = True
+
+# Whole screen draws (page turns) are written in slices of at most
+# LCD_SLICE_FRAMES I2C frames from main loop, input is read between
+# slices. 48 frames -> ~2.4 ms at 400 KHz (I2C_FRAME_BITS per frame).
+LCD_SLICE_FRAMES = const(48)
+
+# Off-screen pages (display.py)., HD44780 keeps DDRAM_LINE_LENGTH characters
+# per line, 16x2 and 20x2 panels show only part of it. The next page is
+# drawn into the hidden columns when idle and shown with display shift.
+# Ignored on 4 line panels (no hidden columns) and with IOCORE_ENABLED.
+DDRAM_PAGES       = True
+DDRAM_LINE_LENGTH = const(40)
+
+# Device list scrolling (listview.py).,
+# "page" -> list moves a page at a time, cursor goes to the first/last row.
+# "row"  -> list moves one row at a time, only the device scrolled in is
+#           rendered and only changed LCD cells are written. Single column
+#           layouts only (16x2, 20x4), others fall back to "page".
+#           More I2C frames per rotary step than "page" (window moves on
+#           almost every step), see tools/bench_listview.py.
+LISTVIEW_SCROLL   = "page"
+
+# Extra LCD panels (panels.py), e.g. a second panel on the cabinet door.,
+# Each entry: [I2C channel, SDA pin, SCL pin, address, rows, cols, view]
+# Panel on the same channel as the main LCD shares its bus (pins ignored).
+#   PANEL_VIEW_MIRROR  -> same screen as the main LCD (clipped to its size)
+#   PANEL_VIEW_SUMMARY -> number of devices ON and last switched device
+# Example: EXTRA_PANELS = [[0, 0, 1, 38, 2, 16, PANEL_VIEW_SUMMARY]]
+PANEL_VIEW_MIRROR  = const(0)
+PANEL_VIEW_SUMMARY = const(1)
+EXTRA_PANELS = []
+
+# Changed cells written to one extra panel per idle main loop pass.,
+PANEL_REFRESH_CELLS = const(8)
+
+# Bit times per PCF8574 write (start, address, data, 2 ACKs, stop), for
+# per panel bus time accounting.
+I2C_FRAME_BITS = const(20)
 
 # I2C channel ID
-I2C_CHANNEL_ID = 0
+I2C_CHANNEL_ID = const(0)
 
 # I2C GPIO pins
-I2C_LCD_SDA_PIN = 0
-I2C_LCD_SCL_PIN = 1
+I2C_LCD_SDA_PIN = const(0)
+I2C_LCD_SCL_PIN = const(1)
 
 #I2C bus frequency., <= 400 KHz
-I2C_BUS_FREQUENCY = 400000
+I2C_BUS_FREQUENCY = const(400000)
 
 # GPIO pins used for rotary encoder
-ROTARY_ENCODER_SWITCH_PIN = 13
-ROTARY_ENCODER_DATA_PIN   = 14
-ROTARY_ENCODER_CLOCK_PIN  = 15
+ROTARY_ENCODER_SWITCH_PIN = const(13)
+ROTARY_ENCODER_DATA_PIN   = const(14)
+ROTARY_ENCODER_CLOCK_PIN  = const(15)
+
+# Quadrature decoding in PIO hardware (see rotary.py)., needs CLOCK pin
+# right after DATA pin. False -> software polling of CLOCK/DATA pins.
+ROTARY_USE_PIO = True
+# State machine 4 is PIO1 SM0., decoder program fills all 32 instruction
+# slots of PIO1, nothing else may use PIO1.
+ROTARY_PIO_SM   = const(4)
+ROTARY_PIO_FREQ = const(1000000)
+# Quadrature steps per detent (click) of the encoder.,
+ROTARY_PIO_STEPS_PER_DETENT = const(4)
+
+# Serial control port (line protocol, see serialctl.py).,
+# "uart" -> UART on SERIAL_UART_TX_PIN/SERIAL_UART_RX_PIN
+# "usb"  -> USB-CDC, same port as REPL and print()., diagnostics (errors,
+#           tracebacks, iocore failures) land between responses and
+#           clients misparse them, use for tests on the bench only.
+# None   -> Disabled
+SERIAL_PORT        = "uart"
+SERIAL_UART_ID     = const(1)
+SERIAL_UART_TX_PIN = const(4)
+SERIAL_UART_RX_PIN = const(5)
+SERIAL_BAUDRATE    = const(115200)
+
+# Runtime telemetry (latency histograms, counters, event trace).,
+# Cheap enough to be left on, set False to skip all recording.
+TELEMETRY_ENABLED    = True
+# Number of recent events kept in trace ring buffer.,
+TELEMETRY_TRACE_SIZE = const(32)
+
+# Protocol on serial control port.,
+# "text"   -> human readable line protocol (serialctl.py)
+# "binary" -> framed binary protocol with CRC16 for automation (binproto.py)
+SERIAL_PROTOCOL    = "text"
+
+# Binary protocol receive buffer, must hold at least one complete frame.,
+BINPROTO_RX_BUFFER = const(512)
+# Device states changed by binary protocol are saved at most once per
+# interval (ms), high rate updates must not write flash on every frame.
+BINPROTO_SAVE_INTERVAL_MS = const(1000)
+# Partial frame is dropped when no byte came for this long (ms)., a stray
+# SYNC byte must not hold the parser until LEN more bytes arrive.
+BINPROTO_FRAME_TIMEOUT_MS = const(20)
+
+# Longest command line accepted, longer lines are rejected.,
+# "M" command needs (numdevices / 4) hex digits twice.
+SERIAL_LINE_MAX    = const(160)
+# Responses are collected and written once per poll., flushed early if full.
+SERIAL_TX_BUFFER   = const(512)
 
 # Roatry encoder event ID
-ROTARY_UP           = 10;
-ROTARY_DOWN         = ROTARY_UP + 1;
-ROTARY_BTN_PRESSED  = ROTARY_UP + 2;
+ROTARY_UP           = const(10);
+ROTARY_DOWN         = const(ROTARY_UP + 1);
+ROTARY_BTN_PRESSED  = const(ROTARY_UP + 2);
+ROTARY_BTN_LONG_PRESSED = const(ROTARY_UP + 3);
+
+# Holding the rotary encoder switch at least this long (in ms) is reported
+# as ROTARY_BTN_LONG_PRESSED instead of ROTARY_BTN_PRESSED.,
+ROTARY_LONG_PRESS_MS = const(1000);
 
-# Custom cursor character ID
-CURSOR_CHARSET_ID = 7;
+# Settle time (in ms) after the rotary encoder switch is released, a press
+# within it is contact bounce.,
+ROTARY_DEBOUNCE_MS   = const(50);
+
+# Idle manager (idle.py): after IDLE_TIMEOUT_MS without encoder input the
+# backlight is turned off, LCD rendering stops and main loop polls every
+# IDLE_POLL_MS. 0 -> never sleep.
+# IDLE_LIGHTSLEEP uses machine.lightsleep() instead of utime.sleep_ms(),
+# encoder pin interrupts wake the board. USB serial is not served during
+# lightsleep, use it with SERIAL_PORT = "uart" or no serial control.
+IDLE_TIMEOUT_MS = const(60000);
+IDLE_POLL_MS    = const(100);
+IDLE_LIGHTSLEEP = False;
+
+# Number of custom character slots in LCD CGRAM (5x8 font)., glyphs are
+# loaded into them on first use by cgram.py
+CGRAM_SLOTS = const(8);
 
 # Total number of characters used for ON/OFF special symbol
-# Must be reflected in define_customcharacters()-> onchars, offchars,
-# Last custom char at CURSOR_CHARSET_ID 7 is set for cursor.,
-# hence, it must be less that that., 
-ONOFF_INDICATOR_NUMCHAR = 2
+# Must be reflected in cgram.ICON_ON and cgram.ICON_OFF
+ONOFF_INDICATOR_NUMCHAR = const(2)
 
 
 # NOTE: Isolating device status and configuration file as configuration is
@@ -84,10 +202,113 @@ deviceinfo_cfgfile  = "devices.json";
 # This allow us to restore the On/Off after power cycle/power loss., 
 # TODO: It wears out flash quicker. We need to find more optimal solution,
 #       Or change this mechanism to use internal/external EEPROM in future.,
+#       flashwear.report() shows writes and estimated flash life used so far.,
 devicestatus_cfgfile = "devicestate.json";
 
+# Device state persistence (nvram.py).,
+# "file"   -> devicestatus_cfgfile in flash, rewritten on every change.
+# "fram"   -> I2C FRAM (MB85RC..), changed bytes written right away.
+# "eeprom" -> I2C EEPROM (24Cxx), changed bytes batched per page, write
+#             cycle polled from main loop.
+# FRAM/EEPROM is on the LCD bus. devicestatus_cfgfile is still read at boot,
+# a blank memory is formatted with its states.
+STATE_BACKEND    = "file"
+NVRAM_I2C_ADDR   = const(0x50)
+NVRAM_ADDR_BYTES = const(2)     # Memory address bytes, 1 for 24C01..24C16.
+NVRAM_PAGE_SIZE  = const(32)    # EEPROM page, see datasheet (24C32: 32, 24C256: 64).
+NVRAM_BASE       = const(0)     # First memory address used.
+NVRAM_BUSY_MS    = const(50)    # No ACK for longer than a write cycle -> error.
+
+# Power fail monitor (powerfail.py).,
+# "off"  -> none, device states are saved on every change.
+# "gpio" -> supervisor/comparator output on POWERFAIL_GPIO_PIN, low when
+#           supply drops, falling edge IRQ.
+# "adc"  -> VSYS on ADC3 (GPIO29, VSYS/3 on Pico) sampled every
+#           POWERFAIL_SAMPLE_MS by a timer, below POWERFAIL_VSYS_MV is a fail.
+#           (Pico W: GPIO29 is shared with the wireless chip, use "gpio".)
+# With a monitor, saves are deferred by STATE_SAVE_DELAY_MS (changes in
+# between are merged) and committed at once when power fails. Needs enough
+# hold-up time on VSYS for one save (FRAM/EEPROM backend recommended).
+POWERFAIL_MODE       = "off"
+POWERFAIL_GPIO_PIN   = const(12)
+POWERFAIL_ADC_PIN    = const(29)
+POWERFAIL_VSYS_MV    = const(4300)
+POWERFAIL_RECOVER_MV = const(4500)   # Board restarts when supply is back.
+POWERFAIL_RECOVER_MS = const(500)
+POWERFAIL_SAMPLE_MS  = const(1)
+STATE_SAVE_DELAY_MS  = const(3000)
+
 # Total number of devices controlled by the system.,
 # This is a tag and it must be present in devices.json and devicestate.json files., 
 numdevices = "numdevices"
 
+# Optional tags in devices.json for device groups and scenes.,
+# "groups" : { <group name> : [<device id>, ...] }
+# "scenes" : { <scene name> : { "<device id>" : <0/1>, ... } }
+groupstag = "groups"
+scenestag = "scenes"
+
+# Scheduler (hashed timer wheel) configuration.,
+# Resolution of scheduled device actions in ms.
+SCHEDULER_TICK_MS     = const(1000)
+# Number of wheel slots, timers are hashed by expiry tick into slots.,
+# Work per tick is (pending timers / slots) on average.
+SCHEDULER_WHEEL_SLOTS = const(256)
+# Fired one-shot timers are saved at most once per SCHEDULE_SAVE_MS
+# (checkpoint), new and cancelled ones at once., a save rewrites all pending
+# timers (12 bytes each).
+SCHEDULE_SAVE_MS      = const(60000)
+
+# Schedule kinds.,
+SCHEDULE_ONCE   = const(0)   # Fire once after delay.
+SCHEDULE_REPEAT = const(1)   # Fire every period after delay.
+SCHEDULE_DAILY  = const(2)   # Fire every day at given time of day (needs RTC set).
+
+# Pending schedules, binary file rewritten only when schedules change.,
+schedule_cfgfile = "schedule.bin";
+
+# Flash wear accounting (flashwear.py).,
+FLASH_BLOCK_SIZE       = const(4096)     # Erase block (sector) size.
+FLASH_PROG_SIZE        = const(256)      # LittleFS program size on rp2.
+FLASH_INLINE_MAX       = const(256)      # Files up to this size are kept inside metadata.
+FLASH_COMMIT_OVERHEAD  = const(32)       # Approx. tags + CRC of one metadata commit.
+FLASH_ENDURANCE_CYCLES = const(100000)   # Erase cycles per block, see flash datasheet.
+# Wear counters are saved after these many file writes.,
+FLASHWEAR_SAVE_EVERY   = const(32)
+flashwear_cfgfile = "flashwear.bin";
+
+# Dual core mode (iocore.py)., core 1 drives LCD and saves device state.
+IOCORE_ENABLED    = False
+IOCORE_QUEUE_SIZE = const(64)     # Requests queued for core 1, power of 2.
+IOCORE_IDLE_US    = const(500)    # Poll interval of idle worker / full queue.
+
+# Sampling profiler (profiler.py), opt-in.,
+PROFILER_AUTOSTART    = False  # Start sampling at boot.
+PROFILER_HZ           = const(250)    # Samples per second.
+PROFILER_MAX_DEPTH    = const(8)      # Deepest scope recorded.
+PROFILER_RING_SAMPLES = const(1024)   # Last samples kept (x PROFILER_MAX_DEPTH bytes).
+
+# RP2040 SIO registers, used to switch many device GPIOs with single write.,
+SIO_BASE         = 0xd0000000
+SIO_GPIO_OUT     = const(0x010)
+SIO_GPIO_OUT_XOR = const(0x01c)
+
+# Watchdog and warm restart (watchdog.py).,
+# Board is reset when main loop doesn't run for WDT_TIMEOUT_MS (hang, crash,
+# error_state()). Relay states are kept in watchdog scratch registers and
+# restored first thing after a reset, before devices.json is read.
+# Ctrl-C (mpremote, tools/deploy.py) stops the watchdog.
+WDT_ENABLED    = True
+WDT_TIMEOUT_MS = const(5000)     # RP2040 maximum is 8388 ms.
+WATCHDOG_BASE  = 0x40058000
+WATCHDOG_CTRL  = const(0x000)
+WATCHDOG_SCRATCH0 = const(0x00c) # Scratch 0-3 used, 4-7 belong to the boot ROM.
+
+# Non-fatal errors (errors.py)., recoverable errors are logged, shown as a
+# notice for ERROR_NOTICE_MS and the main loop goes on. The board is reset
+# after ERROR_RESET_COUNT main loop passes in a row ended with an exception.
+ERRORS_RING_SIZE  = const(16)     # Last reports kept.
+ERROR_NOTICE_MS   = const(2000)
+ERROR_RESET_COUNT = const(10)
+
 # End-of-File
\ No newline at end of file
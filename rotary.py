@@ -17,6 +17,18 @@ Description:
     NOTE: There is a tight logical coupling between menu navigation logic and
     value returned by getUserInput().
 
+    With ROTARY_USE_PIO, a PIO state machine decodes CLOCK/DATA in hardware
+    and keeps the position count, so that no edge is lost while main loop
+    is busy with I2C or flash writes. getUserInput() reads the count and
+    reports one UP/DOWN event per detent moved since last event.
+    tools/pio_encoder_check.py runs the same program in host emulation
+    against synthetic waveforms with contact bounce.
+
+    The switch is polled, getUserInput() never waits for it: a click is
+    reported when the switch is released, a long press as soon as it is
+    held for ROTARY_LONG_PRESS_MS (nothing on its release). Main loop
+    (timers, serial commands, watchdog) goes on while the knob is held.
+
 
 Supported Platforms:
     - MicroPython v1.24.1 on 2024-11-29; 
@@ -33,6 +45,7 @@ Usage:
 """
 import gc
 import utime
+import rp2
 from machine import Pin
 
 from proj_defines import *
@@ -54,6 +67,75 @@ SWITCH_PIN = Pin(ROTARY_ENCODER_SWITCH_PIN, Pin.IN, Pin.PULL_UP);
 value         = 0;
 previousValue = 1;
 
+# PIO decoder state machine (None -> software polling) and position count
+# already reported as events.,
+sm       = None;
+pio_base = 0;
+
+# Switch pressed since (ms), None -> released., long press reported for it.
+pressed_at = None;
+long_sent  = False;
+# Switch released at (ms)., presses within ROTARY_DEBOUNCE_MS are bounce.
+released_at = 0;
+
+"""
+Quadrature decoder, based on quadrature_encoder.pio from pico-examples.
+Y keeps the position count. ISR holds <previous pins, current pins> and
+'mov(pc, isr)' jumps into the 16 entry table at address 0 which picks
+increment, decrement or nothing for that transition. Invalid transitions
+(both pins changed) and bounce back and forth cancel out.
+The count is pushed to RX FIFO (noblock) on every loop.
+
+Table needs the program at address 0, MicroPython has no .origin., hence
+it is padded to 32 instructions which only fit at address 0.
+Pins: in_base = DATA pin, next pin = CLOCK pin.
+"""
+@rp2.asm_pio(in_shiftdir = rp2.PIO.SHIFT_LEFT, out_shiftdir = rp2.PIO.SHIFT_RIGHT)
+def quadrature_decoder():
+    # Previous 00
+    jmp("update")           # read 00
+    jmp("decrement")        # read 01
+    jmp("increment")        # read 10
+    jmp("update")           # read 11
+    # Previous 01
+    jmp("increment")        # read 00
+    jmp("update")           # read 01
+    jmp("update")           # read 10
+    jmp("decrement")        # read 11
+    # Previous 10
+    jmp("decrement")        # read 00
+    jmp("update")           # read 01
+    jmp("update")           # read 10
+    jmp("increment")        # read 11
+    # Previous 11, last two entries are the code itself.
+    jmp("update")           # read 00
+    jmp("increment")        # read 01
+    label("decrement")
+    jmp(y_dec, "update")    # read 10, decrement only (target is next).
+    wrap_target()
+    label("update")
+    mov(isr, y)             # read 11
+    push(noblock)
+    out(isr, 2)             # previous pins from OSR
+    in_(pins, 2)            # current pins
+    mov(osr, isr)
+    mov(pc, isr)
+    label("increment")
+    mov(y, invert(y))       # No increment instruction., ~(~y - 1)
+    jmp(y_dec, "increment_cont")
+    label("increment_cont")
+    mov(y, invert(y))
+    wrap()
+    # Padding to 32 instructions.,
+    nop()
+    nop()
+    nop()
+    nop()
+    nop()
+    nop()
+    nop()
+    nop()
+
 """
 -------------------------------------------------------------------------------
  Functions 
@@ -74,6 +156,9 @@ Notes:
 """
 def init(total : int):
     global TOTAL_DEVICES;
+    global sm;
+    global pio_base;
+
     if (total > 0):
         TOTAL_DEVICES = get_total_devices();
     else:
@@ -81,6 +166,40 @@ def init(total : int):
         print("Error: Invalid arguments");
         error_state("Total <= 0");
 
+    if ROTARY_USE_PIO:
+        if (ROTARY_ENCODER_CLOCK_PIN != ROTARY_ENCODER_DATA_PIN + 1):
+            print("PIO decoder needs CLOCK pin = DATA pin + 1");
+            error_state("Encoder pins");
+        sm = rp2.StateMachine(ROTARY_PIO_SM, quadrature_decoder,
+                              freq = ROTARY_PIO_FREQ, in_base = DATA_PIN);
+        sm.active(1);
+        pio_base = read_position();
+    # End-of-Function
+
+
+"""
+This function returns current position count of the PIO decoder.
+
+Args:
+        None
+Returns:
+        int: signed position count in quadrature steps.
+
+Raises:
+
+Notes:
+    - FIFO keeps old counts when full (push is non blocking), hence it is
+      emptied first and the next (fresh) count is taken.
+"""
+def read_position():
+    while sm.rx_fifo():
+        sm.get();
+    count = sm.get();
+    if (count & 0x80000000):
+        count = count - 0x100000000;
+    return count;
+    # End-of-Function
+
 """
 This function initialize rotary encoder 'total' elements.,
 
@@ -90,20 +209,41 @@ Returns:
         [retval, value]: retval is the event (UP/DOWN/BUTTON PRESSED) event
                          value is the count mainted in the range of
                          0 to total - 1.
+                         Holding the switch for ROTARY_LONG_PRESS_MS reports
+                         ROTARY_BTN_LONG_PRESSED.
 
 Raises:
 
 Notes:
     - 'value' returned is tightly coupuled with menu navigation logic.
+    - Doesn't block., ROTARY_BTN_PRESSED comes on release, long press
+      while the switch is still held.
 """
 def getUserInput():
     global value;
     global previousValue;
     global TOTAL_DEVICES;
     
+    global pio_base;
+    global pressed_at;
+    global long_sent;
+    global released_at;
+    
     retval = None;
 
-    if previousValue != CLOCK_PIN.value():
+    if (None != sm):
+        # One event per detent, remaining detents are reported by next calls.,
+        steps = read_position() - pio_base;
+        if (steps <= -ROTARY_PIO_STEPS_PER_DETENT):
+            pio_base = pio_base - ROTARY_PIO_STEPS_PER_DETENT;
+            value  = (value - 1) % TOTAL_DEVICES;
+            retval = ROTARY_UP;
+        elif (steps >= ROTARY_PIO_STEPS_PER_DETENT):
+            pio_base = pio_base + ROTARY_PIO_STEPS_PER_DETENT;
+            value  = (value + 1) % TOTAL_DEVICES;
+            retval = ROTARY_DOWN;
+
+    elif previousValue != CLOCK_PIN.value():
         if CLOCK_PIN.value() == 0:
             if DATA_PIN.value() == 0:
                 value = (value - 1) % TOTAL_DEVICES;
@@ -117,10 +257,45 @@ def getUserInput():
         previousValue = CLOCK_PIN.value()
 
          
-    if SWITCH_PIN.value() == 0:       
-        retval = ROTARY_BTN_PRESSED;
-        utime.sleep(1)
+    now = utime.ticks_ms();
+    if SWITCH_PIN.value() == 0:
+        if (None == pressed_at):
+            # Contact bounce just after a release is not a new press.,
+            if (utime.ticks_diff(now, released_at) >= ROTARY_DEBOUNCE_MS):
+                pressed_at = now;
+                long_sent  = False;
+        elif ((not long_sent) and
+              utime.ticks_diff(now, pressed_at) >= ROTARY_LONG_PRESS_MS):
+            long_sent = True;
+            retval = ROTARY_BTN_LONG_PRESSED;
+    elif (None != pressed_at):
+        if not long_sent:
+            retval = ROTARY_BTN_PRESSED;
+        pressed_at  = None;
+        released_at = now;
     
     return [retval, value];
 
+"""
+This function sets the count maintained by the rotary encoder.
+Used when menu navigation jumps to a device without rotating the encoder.,
+
+Args:
+        int: new_value in the range of 0 to total - 1.
+Returns:
+        None
+
+Raises:
+
+Notes:
+    - 'value' is tightly coupuled with menu navigation logic, it must match
+      the device id under the cursor.
+"""
+def set_value(new_value):
+    global value;
+    global TOTAL_DEVICES;
+
+    value = new_value % TOTAL_DEVICES;
+    # End-of-Function
+
 # End-of-File
\ No newline at end of file
@@ -0,0 +1,688 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements scheduled and delayed device actions,
+    e.g. "turn off device 3 in 10 minutes" or "turn on device 0 at 18:30".
+    Timers are kept in a hashed timer wheel:
+      - Timer is hashed into slot (expiry tick % SCHEDULER_WHEEL_SLOTS).
+      - Insert and cancel in the wheel are O(1) (new_timer(), drop()).
+      - poll() is O(1) unless a tick boundary is crossed, then only one slot
+        is visited per tick., so thousands of pending timers don't slow
+        down the main loop.
+    Pending schedules are saved to schedule_cfgfile in compact binary form
+    so that they survive power loss. New and cancelled schedules (user
+    commands, rare) are saved right away. Fired one-shot timers (with the
+    countdown of the others) are saved at checkpoints, at most one per
+    SCHEDULE_SAVE_MS: a rewrite is O(pending), writing it on every fired
+    timer would cost flash time and wear per tick. The file is written to
+    a temporary file and renamed over the old one, a power loss leaves
+    either of them whole.
+    Pending timers are counted per device, so has_timer() (timer mark of
+    a device on screen) is O(1) for any number of timers.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    scheduler.init(action)               # action(deviceid, state)
+    scheduler.add_timer(3, False, 10 * 60 * 1000)
+    scheduler.add_daily(0, True, 18, 30)
+    scheduler.poll()                     # from main loop
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import os
+import gc
+import utime
+import struct
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import flashwear
+
+# Short or invalid schedule file is reported, not fatal.,
+import errors
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Timer wheel, each slot is a set of timer ids expiring in that slot.,
+wheel = [];
+
+# Timer id -> [expiry tick, device id, state, kind, value, period ticks]
+# value is delay in ms for SCHEDULE_ONCE/SCHEDULE_REPEAT and
+# seconds since midnight for SCHEDULE_DAILY.
+timers = {};
+
+# Number of ticks elapsed since init() and time (ms) of last tick.,
+current_tick = 0;
+last_tick_ms = 0;
+
+# Next timer id to be given out.,
+next_timer_id = 0;
+
+# Device id -> number of pending timers, devices without timers have no key.,
+device_timers = {};
+
+# Function called for each fired timer as action(deviceid, state).,
+action = None;
+
+# Schedules changed and not saved yet, tick of last save.,
+dirty = False;
+saved_tick = 0;
+
+# Persisted schedule file layout.,
+# Header: magic, version, number of records
+# Record: device id, state, kind, value, period (ms)
+SCHEDULE_MAGIC   = b"TW";
+SCHEDULE_VERSION = 1;
+HEADER_FORMAT    = "<2sBH";
+RECORD_FORMAT    = "<HBBII";
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function converts duration in ms to wheel ticks.
+
+Args:
+    int: ms duration.
+
+Returns:
+    int: number of ticks, at least 1.
+
+Raises:
+
+Notes:
+    - Rounds up, timer never fires before requested time.
+"""
+def ms_to_ticks(ms):
+    ticks = (ms + SCHEDULER_TICK_MS - 1) // SCHEDULER_TICK_MS;
+    if (ticks < 1):
+        ticks = 1;
+    return ticks;
+    # End-of-Function
+
+
+"""
+This function returns delay in ms from now to given time of day.
+
+Args:
+    int: seconds since midnight.
+
+Returns:
+    int: delay in ms, always > 0 (today's time already passed -> tomorrow).
+
+Raises:
+
+Notes:
+    - It relies on RTC (utime.localtime()), RTC must be set from REPL or
+      serial commands after power up for daily schedules to be accurate.
+"""
+def delay_to_time_of_day(seconds):
+    now = utime.localtime();
+    now_seconds = now[3] * 3600 + now[4] * 60 + now[5];
+
+    delay = (seconds - now_seconds) % 86400;
+    if (0 == delay):
+        delay = 86400;
+    return delay * 1000;
+    # End-of-Function
+
+
+"""
+This function puts the timer in its wheel slot.
+
+Args:
+    int: timerid
+    list: timer entry, see timers.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def arm(timerid, entry):
+    global wheel;
+    global timers;
+
+    timers[timerid] = entry;
+    wheel[entry[0] % SCHEDULER_WHEEL_SLOTS].add(timerid);
+    # End-of-Function
+
+
+"""
+This function arms a new timer, without saving.
+
+Args:
+    int: deviceid device to be switched.
+    bool: state to be set when timer fires.
+    int: kind SCHEDULE_ONCE, SCHEDULE_REPEAT or SCHEDULE_DAILY
+    int: value delay in ms or seconds since midnight for SCHEDULE_DAILY
+    int: period in ms for SCHEDULE_REPEAT, 0 otherwise.
+
+Returns:
+    int: timer id
+
+Raises:
+
+Notes:
+    - O(1)., see create()
+"""
+def new_timer(deviceid, state, kind, value, period):
+    global next_timer_id;
+
+    if (SCHEDULE_DAILY == kind):
+        delay  = delay_to_time_of_day(value);
+        period = 86400 * 1000;
+    else:
+        delay  = value;
+
+    timerid = next_timer_id;
+    next_timer_id = next_timer_id + 1;
+
+    arm(timerid, [current_tick + ms_to_ticks(delay), deviceid, int(state == True),
+                  kind, value, ms_to_ticks(period) if period > 0 else 0]);
+    device_timers[deviceid] = device_timers.get(deviceid, 0) + 1;
+    return timerid;
+    # End-of-Function
+
+
+"""
+This function creates new timer and saves the schedules.
+
+Args:
+    Same as new_timer().
+
+Returns:
+    int: timer id, to be used with cancel().
+
+Raises:
+
+Notes:
+    - Saved before returning, the timer id given to the user survives a
+      power loss. O(pending) for the save, user commands are rare.
+"""
+def create(deviceid, state, kind, value, period):
+    timerid = new_timer(deviceid, state, kind, value, period);
+    save_schedules();
+    return timerid;
+    # End-of-Function
+
+
+"""
+This function schedules a device action after given delay.
+
+Args:
+    int: deviceid device to be switched.
+    bool: state to be set.
+    int: delay_ms delay in ms.
+    int: period_ms repeat period in ms, 0 -> fire only once.
+
+Returns:
+    int: timer id, to be used with cancel().
+
+Raises:
+
+Example:
+    add_timer(3, False, 10 * 60 * 1000) -> Turn off device 3 in 10 minutes.
+
+Notes:
+"""
+def add_timer(deviceid, state, delay_ms, period_ms = 0):
+    if (period_ms > 0):
+        return create(deviceid, state, SCHEDULE_REPEAT, delay_ms, period_ms);
+    return create(deviceid, state, SCHEDULE_ONCE, delay_ms, 0);
+    # End-of-Function
+
+
+"""
+This function schedules a device action every day at given time.
+
+Args:
+    int: deviceid device to be switched.
+    bool: state to be set.
+    int: hour 0 - 23
+    int: minute 0 - 59
+
+Returns:
+    int: timer id, to be used with cancel().
+
+Raises:
+
+Notes:
+    - See delay_to_time_of_day() for RTC requirement.
+"""
+def add_daily(deviceid, state, hour, minute):
+    return create(deviceid, state, SCHEDULE_DAILY, hour * 3600 + minute * 60, 0);
+    # End-of-Function
+
+
+"""
+This function takes a timer out of the wheel, without saving.
+
+Args:
+    int: timerid
+
+Returns:
+    bool: True if timer was pending.
+
+Raises:
+
+Notes:
+    - O(1)., see cancel()
+"""
+def drop(timerid):
+    global wheel;
+    global timers;
+
+    entry = timers.pop(timerid, None);
+    if (None == entry):
+        return False;
+
+    wheel[entry[0] % SCHEDULER_WHEEL_SLOTS].discard(timerid);
+    uncount(entry[1]);
+    return True;
+    # End-of-Function
+
+
+"""
+This function decrements the pending timer count of a device.
+
+Args:
+    int: deviceid
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def uncount(deviceid):
+    left = device_timers[deviceid] - 1;
+    if (0 == left):
+        del device_timers[deviceid];
+    else:
+        device_timers[deviceid] = left;
+    # End-of-Function
+
+
+"""
+This function cancels the timer and saves the schedules.
+
+Args:
+    int: timerid returned by add_timer()/add_daily().
+
+Returns:
+    bool: True if timer was pending.
+
+Raises:
+
+Notes:
+    - Saved before returning, see create().
+"""
+def cancel(timerid):
+    if not drop(timerid):
+        return False;
+    save_schedules();
+    return True;
+    # End-of-Function
+
+
+"""
+This function cancels all timers of given device.
+
+Args:
+    int: deviceid
+
+Returns:
+    int: number of cancelled timers.
+
+Raises:
+
+Notes:
+    - O(n) on pending timers, meant for user commands only., saved once.
+"""
+def cancel_device(deviceid):
+    cancelled = 0;
+    for timerid in [t for t in timers if timers[t][1] == deviceid]:
+        drop(timerid);
+        cancelled = cancelled + 1;
+    if (cancelled > 0):
+        save_schedules();
+    return cancelled;
+    # End-of-Function
+
+
+"""
+This function returns pending timers.
+
+Args:
+    None
+
+Returns:
+    dict: timer id -> [expiry tick, device id, state, kind, value, period ticks]
+
+Raises:
+
+Notes:
+    - Do not modify returned dictionary, use add_*()/cancel().
+"""
+def get_timers():
+    global timers;
+    return timers;
+    # End-of-Function
+
+
+"""
+This function tells whether a device has pending timers.
+
+Args:
+    int: deviceid
+
+Returns:
+    bool
+
+Raises:
+
+Notes:
+    - O(1), no allocation., used for timer marks on screen.
+"""
+def has_timer(deviceid):
+    return deviceid in device_timers;
+    # End-of-Function
+
+
+"""
+This function returns devices having pending timers.
+
+Args:
+    None
+
+Returns:
+    set: device ids
+
+Raises:
+
+Notes:
+    - Allocates a set of devices with timers., for REPL and host tools,
+      use has_timer() on screen updates.
+"""
+def get_timed_devices():
+    return set(device_timers);
+    # End-of-Function
+
+
+"""
+This function returns time left before the timer fires.
+
+Args:
+    int: timerid
+
+Returns:
+    int: ms left, -1 if timer is not pending.
+
+Raises:
+
+Notes:
+"""
+def remaining_ms(timerid):
+    if (timerid not in timers):
+        return -1;
+    return (timers[timerid][0] - current_tick) * SCHEDULER_TICK_MS;
+    # End-of-Function
+
+
+"""
+This function advances the wheel by one tick and fires expired timers
+of the current slot.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Timers hashed into this slot but due in later revolutions are
+      left untouched.
+"""
+def tick():
+    global current_tick;
+    global wheel;
+    global timers;
+    global dirty;
+
+    current_tick = current_tick + 1;
+    slot = wheel[current_tick % SCHEDULER_WHEEL_SLOTS];
+
+    if (0 == len(slot)):
+        return;
+
+    due = [t for t in slot if timers[t][0] <= current_tick];
+
+    for timerid in due:
+        slot.discard(timerid);
+        entry = timers.pop(timerid);
+
+        if (entry[5] > 0):
+            # Repeating timer., re-arm from its expiry to avoid drift.
+            entry[0] = entry[0] + entry[5];
+            arm(timerid, entry);
+        else:
+            uncount(entry[1]);
+            dirty = True;
+
+        if (None != action):
+            action(entry[1], entry[2] == 1);
+    # End-of-Function
+
+
+"""
+This function must be called from main loop.
+It fires all timers expired since last call and saves changed schedules.
+
+Args:
+    int: now_ms current time in ms, None -> utime.ticks_ms().
+         (Host benchmarks pass virtual clock here.)
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - O(1) if no tick boundary is crossed., which is most of the calls.
+    - If main loop was blocked for long, missed ticks are caught up.
+    - Fired one-shot timers (and countdown of the others) are saved
+      SCHEDULE_SAVE_MS after the last save at the earliest (checkpoint).
+      One-shot timers that fired after it fire again after a power loss,
+      saved delay left is then already short. New and cancelled timers
+      are saved by create()/cancel().
+"""
+def poll(now_ms = None):
+    global last_tick_ms;
+    global dirty;
+
+    if (None == now_ms):
+        now_ms = utime.ticks_ms();
+
+    if (utime.ticks_diff(now_ms, last_tick_ms) < SCHEDULER_TICK_MS):
+        return;
+
+    while (utime.ticks_diff(now_ms, last_tick_ms) >= SCHEDULER_TICK_MS):
+        last_tick_ms = utime.ticks_add(last_tick_ms, SCHEDULER_TICK_MS);
+        tick();
+
+    if (dirty and (current_tick - saved_tick) * SCHEDULER_TICK_MS >= SCHEDULE_SAVE_MS):
+        save_schedules();
+    # End-of-Function
+
+
+"""
+This function saves changed schedules now, without waiting for the next
+checkpoint.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - For REPL and host tools, e.g. before a planned power off.
+"""
+def flush():
+    if dirty:
+        save_schedules();
+    # End-of-Function
+
+
+"""
+This function saves pending schedules to schedule_cfgfile.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - 5 bytes header + 12 bytes per timer.
+    - Delay of one-shot timers is saved as time left, countdown restarts
+      from that value after power up (no battery backed clock on board).
+    - Written to a temporary file, then renamed over schedule_cfgfile.
+"""
+def save_schedules():
+    global dirty;
+    global saved_tick;
+
+    temp = schedule_cfgfile + ".tmp";
+    with open(temp, "wb") as f:
+        written = f.write(struct.pack(HEADER_FORMAT, SCHEDULE_MAGIC, SCHEDULE_VERSION, len(timers)));
+        for timerid in timers:
+            [expiry, deviceid, state, kind, value, period] = timers[timerid];
+            if (SCHEDULE_DAILY != kind):
+                value = (expiry - current_tick) * SCHEDULER_TICK_MS;
+            written = written + f.write(struct.pack(RECORD_FORMAT, deviceid, state, kind, value,
+                                                    period * SCHEDULER_TICK_MS));
+    os.rename(temp, schedule_cfgfile);
+    flashwear.account(flashwear.WEAR_SCHEDULE, written);
+    dirty = False;
+    saved_tick = current_tick;
+    # End-of-Function
+
+
+"""
+This function loads schedules saved by save_schedules() and arms them.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Missing file means no schedules. Short or invalid file (written by
+      an older build, cut by power loss) means no schedules too, and is
+      reported (errors.ERR_FILE).
+"""
+def load_schedules():
+    header_size = struct.calcsize(HEADER_FORMAT);
+    record_size = struct.calcsize(RECORD_FORMAT);
+    try:
+        with open(schedule_cfgfile, "rb") as f:
+            data = f.read();
+    except OSError:
+        # No schedules saved yet.,
+        return;
+
+    count = -1;
+    if (len(data) >= header_size):
+        [magic, version, count] = struct.unpack_from(HEADER_FORMAT, data, 0);
+        if (SCHEDULE_MAGIC != magic or SCHEDULE_VERSION != version):
+            count = -1;
+    if (count < 0 or len(data) < header_size + count * record_size):
+        print("Ignoring invalid {0}".format(schedule_cfgfile));
+        errors.report(errors.SEV_ERROR, errors.ERR_FILE, flashwear.WEAR_SCHEDULE);
+        return;
+
+    for i in range(count):
+        [deviceid, state, kind, value, period] = struct.unpack_from(RECORD_FORMAT, data, header_size + i * record_size);
+        new_timer(deviceid, state, kind, value, period);
+    # End-of-Function
+
+
+"""
+This function initializes the timer wheel and restores saved schedules.
+
+Args:
+    function: device_action(deviceid, state) called when timer fires.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Call after devicectrl.init(), fired timers switch devices.
+"""
+def init(device_action):
+    global wheel;
+    global timers;
+    global action;
+    global current_tick;
+    global last_tick_ms;
+    global dirty;
+    global saved_tick;
+
+    wheel  = [set() for i in range(SCHEDULER_WHEEL_SLOTS)];
+    timers = {};
+    device_timers.clear();
+    action = device_action;
+    current_tick = 0;
+    saved_tick   = 0;
+    last_tick_ms = utime.ticks_ms();
+
+    load_schedules();
+    # Just loaded., no need to write it back.
+    dirty = False;
+    gc.collect();
+    # End-of-Function
+
+# End-of-File
\ No newline at end of file
@@ -0,0 +1,550 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements remote control of devices over serial port
+    (UART or USB-CDC) with a compact line protocol.
+    UART is the default: USB-CDC is stdout too, print() diagnostics
+    (errors.py tracebacks, iocore failures, ...) would be mixed into
+    responses.
+    Commands go through devicectrl, same as rotary encoder clicks.
+
+    Every command line starts with a request id, which is echoed back in
+    the response, so that clients can pipeline many requests without
+    waiting for each response.
+
+        <id> G <dev>                 -> <id> OK <dev> <state>
+        <id> S <dev> <0|1>           -> <id> OK <dev> <state>
+        <id> M <mask> <bits>         -> <id> OK <states>
+        <id> A                       -> <id> OK <states>
+        <id> T <dev> <0|1> <seconds> -> <id> OK <timer id>
+        <id> N                       -> <id> OK <numdevices>
+        <id> Q                       -> <id> OK <counter> <counter> ...
+        <id> H <hist>                -> <id> OK <max> <bucket> <bucket> ...
+        On error                     -> <id> ERR <code>
+
+    <mask>, <bits> and <states> are hex, bit n is device n.
+    "M" sets every device whose mask bit is 1 to its bit in <bits>, all of
+    them with one GPIO write and one devicestate.json write.
+    "Q" and "H" return telemetry counters and latency histograms, in the
+    order of telemetry.COUNTER_NAMES and telemetry.HIST_NAMES.
+
+    Bytes are collected into preallocated buffers as they arrive and
+    numbers are parsed in place., parser doesn't create objects per command.
+    Responses are formatted into preallocated buffer too.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    serialctl.init(on_change)   # on_change(deviceid) after state change
+    serialctl.poll()            # from main loop
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import gc
+import sys
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import deviceconfig
+import devicectrl
+import scheduler
+import telemetry
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Error codes sent in "ERR" response.,
+ERR_SYNTAX    = 1;
+ERR_DEVICE    = 2;
+ERR_TOO_LONG  = 3;
+ERR_COMMAND   = 4;
+
+# Serial port object, must provide readinto(buf) -> count/None and write(buf).
+port = None;
+
+# Called as on_change(deviceid) after a device state is changed.,
+on_change = None;
+
+# Received bytes are read in chunks into rxchunk, then copied into line.
+rxchunk  = bytearray(64);
+line     = bytearray(SERIAL_LINE_MAX);
+linelen  = 0;
+# Current line exceeded SERIAL_LINE_MAX, it is dropped till end of line.
+overflow = False;
+
+# Parse position in line, bounds of the token found by parse_token().,
+pos = 0;
+tok_start = 0;
+tok_end   = 0;
+
+# Responses of all commands handled in one poll().,
+txbuf = bytearray(SERIAL_TX_BUFFER);
+txlen = 0;
+
+# Preallocated [[deviceid, state], ...] for "M" command.,
+bulk = [];
+
+# Device status keys ("0", "1", ...) by device id, made once in init().,
+statuskeys = [];
+
+HEX_DIGITS = b"0123456789ABCDEF";
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+USB-CDC port adapter., gives sys.stdin the readinto()/write() interface
+of machine.UART without blocking.
+"""
+class UsbCdcPort:
+    def __init__(self):
+        import select
+        self.poller = select.poll();
+        self.poller.register(sys.stdin, select.POLLIN);
+        self.stdin  = sys.stdin.buffer;
+        self.stdout = sys.stdout.buffer;
+        self.byte   = bytearray(1);
+
+    def readinto(self, buf, nbytes = -1):
+        if (nbytes < 0):
+            nbytes = len(buf);
+        count = 0;
+        while (count < nbytes and self.poller.poll(0)):
+            self.stdin.readinto(self.byte);
+            buf[count] = self.byte[0];
+            count = count + 1;
+        if (0 == count):
+            return None;
+        return count;
+
+    def write(self, buf):
+        return self.stdout.write(buf);
+
+
+"""
+This function opens serial port configured with SERIAL_PORT.
+
+Args:
+    None
+
+Returns:
+    object: port, None if serial control is disabled.
+
+Raises:
+
+Notes:
+"""
+def open_port():
+    if ("uart" == SERIAL_PORT):
+        from machine import UART
+        from machine import Pin
+        return UART(SERIAL_UART_ID, baudrate = SERIAL_BAUDRATE,
+                    tx = Pin(SERIAL_UART_TX_PIN), rx = Pin(SERIAL_UART_RX_PIN),
+                    timeout = 0);
+    if ("usb" == SERIAL_PORT):
+        return UsbCdcPort();
+    return None;
+    # End-of-Function
+
+
+"""
+Response formatting helpers., write directly into txbuf.
+"""
+def flush():
+    global txlen;
+    if (txlen > 0):
+        port.write(memoryview(txbuf)[:txlen]);
+        txlen = 0;
+    # End-of-Function
+
+def put_byte(b):
+    global txlen;
+    if (txlen >= SERIAL_TX_BUFFER):
+        flush();
+    txbuf[txlen] = b;
+    txlen = txlen + 1;
+    # End-of-Function
+
+def put_text(text):
+    for b in text:
+        put_byte(b);
+    # End-of-Function
+
+def put_int(value):
+    if (value < 0):
+        put_byte(45); # '-'
+        value = -value;
+    divisor = 1;
+    while (divisor * 10 <= value):
+        divisor = divisor * 10;
+    while (divisor > 0):
+        put_byte(48 + (value // divisor) % 10);
+        divisor = divisor // 10;
+    # End-of-Function
+
+def put_ok(reqid):
+    put_int(reqid);
+    put_text(b" OK");
+    # End-of-Function
+
+def put_error(reqid, code):
+    put_int(reqid);
+    put_text(b" ERR ");
+    put_int(code);
+    put_byte(10);
+    # End-of-Function
+
+
+"""
+This function writes all device states as hex, bit n is device n.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Written one hex digit (4 devices) at a time., no big integers.
+    - Status is looked up with statuskeys, no string per device.
+"""
+def put_states():
+    devicestatus = deviceconfig.get_device_status();
+    total = deviceconfig.get_total_devices();
+
+    digit = (total + 3) // 4 - 1;
+    if (digit < 0):
+        put_byte(48);
+        return;
+
+    while (digit >= 0):
+        nibble = 0;
+        for bit in range(4):
+            deviceid = digit * 4 + bit;
+            if (deviceid < total and 1 == devicestatus[statuskeys[deviceid]]):
+                nibble |= (1 << bit);
+        put_byte(HEX_DIGITS[nibble]);
+        digit = digit - 1;
+    # End-of-Function
+
+
+"""
+Parsing helpers., operate on line from pos.
+"""
+def skip_spaces():
+    global pos;
+    while (pos < linelen and 32 == line[pos]):
+        pos = pos + 1;
+    # End-of-Function
+
+def parse_int():
+    # Returns decimal number at pos, -1 if there is none.
+    global pos;
+    skip_spaces();
+    value = -1;
+    while (pos < linelen and 48 <= line[pos] <= 57):
+        if (value < 0):
+            value = 0;
+        value = value * 10 + line[pos] - 48;
+        pos = pos + 1;
+    return value;
+    # End-of-Function
+
+def parse_token():
+    # Sets tok_start, tok_end to bounds of next token., no list returned.
+    global pos;
+    global tok_start;
+    global tok_end;
+    skip_spaces();
+    tok_start = pos;
+    while (pos < linelen and 32 != line[pos]):
+        pos = pos + 1;
+    tok_end = pos;
+    # End-of-Function
+
+def hex_digit(start, end, k):
+    # Value of k'th hex digit from right of token line[start:end], -1 if invalid.
+    if (k >= end - start):
+        return 0;
+    c = line[end - 1 - k] | 0x20;   # lower case
+    if (48 <= c <= 57):
+        return c - 48;
+    if (97 <= c <= 102):
+        return c - 87;
+    return -1;
+    # End-of-Function
+
+
+"""
+This function handles "M" command, set devices by mask.
+
+Args:
+    int: reqid request id.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def command_mask(reqid):
+    global bulk;
+
+    parse_token();
+    mstart = tok_start;
+    mend   = tok_end;
+    parse_token();
+    bstart = tok_start;
+    bend   = tok_end;
+    total = deviceconfig.get_total_devices();
+
+    if (mstart == mend or bstart == bend or (mend - mstart) * 4 > total + 3):
+        put_error(reqid, ERR_SYNTAX);
+        return;
+
+    count = 0;
+    for k in range(mend - mstart):
+        mask = hex_digit(mstart, mend, k);
+        bits = hex_digit(bstart, bend, k);
+        if (mask < 0 or bits < 0):
+            put_error(reqid, ERR_SYNTAX);
+            return;
+        for bit in range(4):
+            deviceid = k * 4 + bit;
+            if (mask & (1 << bit)):
+                if (deviceid >= total):
+                    put_error(reqid, ERR_DEVICE);
+                    return;
+                bulk[count][0] = deviceid;
+                bulk[count][1] = (bits >> bit) & 1;
+                count = count + 1;
+
+    if (count > 0):
+        devicectrl.set_devices_onoff(bulk, count);
+        if (None != on_change):
+            for i in range(count):
+                on_change(bulk[i][0]);
+
+    put_ok(reqid);
+    put_byte(32);
+    put_states();
+    put_byte(10);
+    # End-of-Function
+
+
+"""
+This function handles one complete command line.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Invalid device ids are reported as error, not sent to devicectrl.,
+      (devicectrl would log them as errors and show a notice).
+"""
+def handle_line():
+    global pos;
+
+    pos = 0;
+    reqid = parse_int();
+    skip_spaces();
+    if (reqid < 0 or pos >= linelen):
+        put_error(0 if reqid < 0 else reqid, ERR_SYNTAX);
+        return;
+
+    command = line[pos];
+    pos = pos + 1;
+    total = deviceconfig.get_total_devices();
+
+    if (65 == command):     # 'A'
+        put_ok(reqid);
+        put_byte(32);
+        put_states();
+        put_byte(10);
+
+    elif (77 == command):   # 'M'
+        command_mask(reqid);
+
+    elif (78 == command):   # 'N'
+        put_ok(reqid);
+        put_byte(32);
+        put_int(total);
+        put_byte(10);
+
+    elif (81 == command):   # 'Q'
+        put_ok(reqid);
+        for i in range(len(telemetry.COUNTER_NAMES)):
+            put_byte(32);
+            put_int(telemetry.get_counter(i));
+        put_byte(10);
+
+    elif (72 == command):   # 'H'
+        hist = parse_int();
+        if (hist < 0 or hist >= len(telemetry.HIST_NAMES)):
+            put_error(reqid, ERR_SYNTAX);
+            return;
+        put_ok(reqid);
+        put_byte(32);
+        put_int(telemetry.hist_max[hist]);
+        for b in range(telemetry.HIST_BUCKETS):
+            put_byte(32);
+            put_int(telemetry.get_bucket(hist, b));
+        put_byte(10);
+
+    elif (71 == command or 83 == command or 84 == command):  # 'G', 'S', 'T'
+        deviceid = parse_int();
+        if (deviceid < 0 or deviceid >= total):
+            put_error(reqid, ERR_DEVICE);
+            return;
+
+        if (71 != command):
+            state = parse_int();
+            if (state < 0 or state > 1):
+                put_error(reqid, ERR_SYNTAX);
+                return;
+
+        if (84 == command):
+            seconds = parse_int();
+            if (seconds < 0):
+                put_error(reqid, ERR_SYNTAX);
+                return;
+            put_ok(reqid);
+            put_byte(32);
+            put_int(scheduler.add_timer(deviceid, state == 1, seconds * 1000));
+            put_byte(10);
+            return;
+
+        if (83 == command):
+            devicectrl.set_device_onoff(deviceid, state == 1);
+            if (None != on_change):
+                on_change(deviceid);
+
+        put_ok(reqid);
+        put_byte(32);
+        put_int(deviceid);
+        put_byte(32);
+        put_int(deviceconfig.get_device_status()[statuskeys[deviceid]]);
+        put_byte(10);
+
+    else:
+        put_error(reqid, ERR_COMMAND);
+    # End-of-Function
+
+
+"""
+This function must be called from main loop.
+It reads all available bytes, handles complete command lines and writes
+their responses at once.
+
+Args:
+    None
+
+Returns:
+    int: number of command lines handled.
+
+Raises:
+
+Notes:
+    - Partial line is kept for next poll().
+"""
+def poll():
+    global linelen;
+    global overflow;
+
+    if (None == port):
+        return 0;
+
+    handled = 0;
+    while True:
+        count = port.readinto(rxchunk);
+        if (not count):
+            break;
+
+        for i in range(count):
+            b = rxchunk[i];
+            if (10 == b):           # '\n'
+                if overflow:
+                    put_error(0, ERR_TOO_LONG);
+                elif (linelen > 0):
+                    handle_line();
+                    telemetry.count(telemetry.CNT_SERIAL_COMMANDS);
+                linelen  = 0;
+                overflow = False;
+                handled  = handled + 1;
+            elif (13 == b):         # '\r', ignored
+                pass;
+            elif (linelen < SERIAL_LINE_MAX):
+                line[linelen] = b;
+                linelen = linelen + 1;
+            else:
+                overflow = True;
+
+    flush();
+    return handled;
+    # End-of-Function
+
+
+"""
+This function initializes serial control.
+
+Args:
+    function: device_changed(deviceid) called after device state is
+              changed by a command, None -> not needed.
+    object: serial_port port to use, None -> open_port() (SERIAL_PORT).
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Call after devicectrl.init() and scheduler.init().
+"""
+def init(device_changed = None, serial_port = None):
+    global port;
+    global on_change;
+    global bulk;
+    global statuskeys;
+
+    on_change = device_changed;
+    port = serial_port if None != serial_port else open_port();
+
+    bulk = [[0, 0] for i in range(deviceconfig.get_total_devices())];
+    statuskeys = [str(i) for i in range(deviceconfig.get_total_devices())];
+    gc.collect();
+    # End-of-Function
+
+# End-of-File
\ No newline at end of file
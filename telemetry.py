@@ -0,0 +1,429 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements runtime telemetry:
+      - Latency histograms with fixed power of 2 buckets (in us).
+      - Counters (I2C frames, flash writes, GC runs, dropped events, ...)
+      - Ring buffer trace of recent events with timestamps.
+    All storage is preallocated arrays., recording doesn't allocate memory
+    and is cheap enough to be left enabled on deployed boards.
+    Data can be printed from REPL (telemetry.report()) or queried with
+    serial commands "Q" and "H" (see serialctl.py).
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    t0 = telemetry.start();
+    ...
+    telemetry.record(telemetry.HIST_DRAW_PAGE, t0);
+    telemetry.count(telemetry.CNT_FLASH_WRITES);
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import gc
+import utime
+
+from array import array
+
+# Import all constants and defines.,
+from proj_defines import *
+
+import profiler
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Histogram IDs.,
+HIST_CLICK      = 0;    # handler_clicked_event
+HIST_NAVIGATE   = 1;    # handler_up_event/handler_down_event
+HIST_DRAW_PAGE  = 2;    # draw_page
+HIST_SAVE_STATE = 3;    # save_device_state
+HIST_WAKE       = 4;    # first encoder edge -> display redrawn (idle.py)
+HIST_POWERFAIL  = 5;    # power fail detected -> device state committed (powerfail.py)
+HIST_NAMES = ["click", "navigate", "draw_page", "save_state", "wake", "powerfail"];
+
+# Counter IDs.,
+CNT_I2C_FRAMES     = 0;
+CNT_FLASH_WRITES   = 1;
+CNT_FLASH_BYTES    = 2;
+CNT_GC_EXPLICIT    = 3;     # gc_collect() calls, automatic GC runs not counted.
+CNT_INPUT_EVENTS   = 4;
+CNT_DROPPED_EVENTS = 5;
+CNT_SERIAL_COMMANDS = 6;
+CNT_IOCORE_STALLS  = 7;
+CNT_CGRAM_UPLOADS  = 8;
+CNT_CGRAM_FALLBACKS = 9;
+CNT_IDLE_MS        = 10;    # Time with display asleep, see idle.py
+CNT_AWAKE_MS       = 11;
+CNT_PAGE_FLIPS     = 12;    # Page turns shown from off-screen DDRAM, see display.py
+CNT_PAGE_RENDERS   = 13;    # Pages drawn off-screen when idle.
+CNT_BOOT_CODE      = 14;    # Modules loaded from, BOOT_CODE_NAMES index.
+CNT_BOOT_RESTORED_MS = 15;  # ms after reset, device states restored.
+CNT_BOOT_READY_MS  = 16;    # ms after reset, first page on screen.
+CNT_NVRAM_WRITES   = 17;    # FRAM/EEPROM writes (EEPROM page writes), see nvram.py
+CNT_NVRAM_BYTES    = 18;
+CNT_BOOT_OUTPUTS_US = 19;   # us after reset, relay outputs in last state.
+CNT_BOOT_WARM      = 20;    # 1 -> outputs restored from watchdog scratch.
+CNT_WARNINGS       = 21;    # Reports per severity, see errors.py
+CNT_ERRORS         = 22;
+CNT_FATAL_ERRORS   = 23;
+COUNTER_NAMES = ["i2c_frames", "flash_writes", "flash_bytes", "gc_explicit",
+                 "input_events", "dropped_events", "serial_commands",
+                 "iocore_stalls", "cgram_uploads", "cgram_fallbacks",
+                 "idle_ms", "awake_ms", "page_flips", "page_renders",
+                 "boot_code", "boot_restored_ms", "boot_ready_ms",
+                 "nvram_writes", "nvram_bytes",
+                 "boot_outputs_us", "boot_warm",
+                 "warnings", "errors", "fatal_errors"];
+
+# Where modules were loaded from at boot (see loader.py).,
+BOOT_CODE_SOURCE = 0;   # .py, compiled on the board at every boot.
+BOOT_CODE_MPY    = 1;   # .mpy from tools/build_mpy.py
+BOOT_CODE_FROZEN = 2;   # Frozen into the firmware.
+BOOT_CODE_NAMES  = ["source", "mpy", "frozen"];
+
+# Trace event IDs.,
+EV_INPUT     = 1;   # arg: rotary event id * 1000 + device id
+EV_SAVE      = 2;   # arg: bytes written
+EV_SCHEDULED = 3;   # arg: device id
+EV_DROPPED   = 4;   # arg: invalid event id
+EV_ERROR     = 5;   # arg: error code * 10 + severity (errors.py)
+TRACE_NAMES  = ["", "input", "save", "scheduled", "dropped", "error"];
+
+# Bucket b counts durations in [2^b, 2^(b+1)) us, last bucket everything above.
+# 20 buckets -> last bucket starts at ~0.5 s.
+HIST_BUCKETS = 20;
+
+# Counters wrap at 2^30 to stay MicroPython small integers (no allocation).
+COUNTER_MASK = 0x3FFFFFFF;
+
+histograms = array("L", [0] * (len(HIST_NAMES) * HIST_BUCKETS));
+hist_max   = array("L", [0] * len(HIST_NAMES));
+counters   = array("L", [0] * len(COUNTER_NAMES));
+
+# Trace ring buffer, trace_head is next entry to be written.,
+trace_time  = array("L", [0] * TELEMETRY_TRACE_SIZE);
+trace_event = bytearray(TELEMETRY_TRACE_SIZE);
+trace_arg   = array("l", [0] * TELEMETRY_TRACE_SIZE);
+trace_head  = 0;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function returns start timestamp for record().
+
+Args:
+    None
+
+Returns:
+    int: utime.ticks_us()
+
+Raises:
+
+Notes:
+"""
+def start():
+    return utime.ticks_us();
+    # End-of-Function
+
+
+"""
+This function records duration since 't0' in the histogram.
+
+Args:
+    int: hist histogram ID (HIST_*)
+    int: t0 value returned by start()
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Bucket is found by shifting, MicroPython int has no bit_length().
+"""
+def record(hist, t0):
+    if not TELEMETRY_ENABLED:
+        return;
+
+    elapsed = utime.ticks_diff(utime.ticks_us(), t0);
+    if (elapsed > hist_max[hist]):
+        hist_max[hist] = elapsed & COUNTER_MASK;
+
+    bucket = 0;
+    while (elapsed > 1 and bucket < HIST_BUCKETS - 1):
+        elapsed = elapsed >> 1;
+        bucket  = bucket + 1;
+
+    index = hist * HIST_BUCKETS + bucket;
+    histograms[index] = (histograms[index] + 1) & COUNTER_MASK;
+    # End-of-Function
+
+
+"""
+This function increments the counter.
+
+Args:
+    int: counter counter ID (CNT_*)
+    int: n increment
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def count(counter, n = 1):
+    if TELEMETRY_ENABLED:
+        counters[counter] = (counters[counter] + n) & COUNTER_MASK;
+    # End-of-Function
+
+
+"""
+This function records time since reset in a boot counter, and where the
+modules were loaded from.
+
+Args:
+    int: counter CNT_BOOT_RESTORED_MS, CNT_BOOT_READY_MS or
+         CNT_BOOT_OUTPUTS_US
+    int: at time stamp taken earlier (ticks_us() for CNT_BOOT_OUTPUTS_US),
+         None -> now.
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - ticks_ms() and ticks_us() start at reset on RP2040.
+    - Module origin is taken from this module's __file__, all modules
+      come from the same place (see loader.py).
+"""
+def boot_mark(counter, at = None):
+    if not TELEMETRY_ENABLED:
+        return;
+    origin = globals().get("__file__", "");
+    code = BOOT_CODE_SOURCE;
+    if origin.endswith(".mpy"):
+        code = BOOT_CODE_MPY;
+    elif origin.startswith(".frozen"):
+        code = BOOT_CODE_FROZEN;
+    counters[CNT_BOOT_CODE] = code;
+    if (None == at):
+        at = utime.ticks_us() if (CNT_BOOT_OUTPUTS_US == counter) else utime.ticks_ms();
+    counters[counter] = at & COUNTER_MASK;
+    # End-of-Function
+
+
+"""
+This function adds an entry to trace ring buffer, oldest entry is
+overwritten.
+
+Args:
+    int: event trace event ID (EV_*)
+    int: arg event specific value
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def trace(event, arg = 0):
+    global trace_head;
+
+    if not TELEMETRY_ENABLED:
+        return;
+
+    trace_time[trace_head]  = utime.ticks_ms() & COUNTER_MASK;
+    trace_event[trace_head] = event;
+    trace_arg[trace_head]   = arg;
+    trace_head = (trace_head + 1) % TELEMETRY_TRACE_SIZE;
+    # End-of-Function
+
+
+"""
+This function runs garbage collection and counts the call.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Use instead of gc.collect() in project code, so that explicit
+      collections are visible in telemetry (gc_explicit)., collections the
+      allocator runs by itself are not seen here.
+"""
+def gc_collect():
+    count(CNT_GC_EXPLICIT);
+    profiler.enter(profiler.SC_GC);
+    gc.collect();
+    profiler.leave();
+    # End-of-Function
+
+
+"""
+This function returns counter value.
+
+Args:
+    int: counter counter ID (CNT_*)
+
+Returns:
+    int: value
+
+Raises:
+
+Notes:
+"""
+def get_counter(counter):
+    return counters[counter];
+    # End-of-Function
+
+
+"""
+This function returns histogram bucket value.
+
+Args:
+    int: hist histogram ID (HIST_*)
+    int: bucket 0 to HIST_BUCKETS - 1
+
+Returns:
+    int: number of samples in bucket.
+
+Raises:
+
+Notes:
+"""
+def get_bucket(hist, bucket):
+    return histograms[hist * HIST_BUCKETS + bucket];
+    # End-of-Function
+
+
+"""
+This function returns the approximate percentile of histogram.
+
+Args:
+    int: hist histogram ID (HIST_*)
+    int: percent 0 to 100
+
+Returns:
+    int: upper bound (us) of bucket containing the percentile, 0 if empty.
+
+Raises:
+
+Notes:
+"""
+def percentile(hist, percent):
+    total = 0;
+    for b in range(HIST_BUCKETS):
+        total = total + get_bucket(hist, b);
+    if (0 == total):
+        return 0;
+
+    seen = 0;
+    for b in range(HIST_BUCKETS):
+        seen = seen + get_bucket(hist, b);
+        if (seen * 100 >= total * percent):
+            return 2 << b;
+    return 2 << (HIST_BUCKETS - 1);
+    # End-of-Function
+
+
+"""
+This function clears all histograms, counters and trace.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def reset():
+    global trace_head;
+
+    for i in range(len(histograms)):
+        histograms[i] = 0;
+    for i in range(len(hist_max)):
+        hist_max[i] = 0;
+    for i in range(len(counters)):
+        counters[i] = 0;
+    for i in range(TELEMETRY_TRACE_SIZE):
+        trace_event[i] = 0;
+    trace_head = 0;
+    # End-of-Function
+
+
+"""
+This function prints all telemetry., meant for REPL.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - It allocates (string formatting)., not to be called from hot paths.
+"""
+def report():
+    print("Counters:");
+    for i in range(len(COUNTER_NAMES)):
+        print("  {0:<16} {1}".format(COUNTER_NAMES[i], counters[i]));
+    asleep = counters[CNT_IDLE_MS];
+    print("  {0:<16} {1}%".format("idle_fraction", (asleep * 100) // max(1, asleep + counters[CNT_AWAKE_MS])));
+    print("  {0:<16} {1}".format("boot_code_from", BOOT_CODE_NAMES[counters[CNT_BOOT_CODE]]));
+
+    print("Latency (us): samples p50 p99 max");
+    for h in range(len(HIST_NAMES)):
+        samples = 0;
+        for b in range(HIST_BUCKETS):
+            samples = samples + get_bucket(h, b);
+        print("  {0:<16} {1} {2} {3} {4}".format(HIST_NAMES[h], samples,
+              percentile(h, 50), percentile(h, 99), hist_max[h]));
+
+    print("Trace (oldest first): ms event arg");
+    for i in range(TELEMETRY_TRACE_SIZE):
+        index = (trace_head + i) % TELEMETRY_TRACE_SIZE;
+        if (0 != trace_event[index]):
+            print("  {0} {1} {2}".format(trace_time[index], TRACE_NAMES[trace_event[index]], trace_arg[index]));
+    gc.collect();
+    # End-of-Function
+
+# End-of-File
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Binary protocol loopback benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Runs binproto on the host behind a socket pair (loopback) and drives it
+    with relayclient. Reports sustained frames per second and latency
+    percentiles for full bitmap (SET_ALL) and delta (DELTA) updates with
+    pipelined requests.
+    Then checks recovery from line noise: a stray SYNC with a large LEN,
+    and a partial frame followed by an idle line, must not hold the next
+    request, junk must not be answered with BAD_CRC, and a whole frame
+    with a bad CRC still is.
+
+Supported Platforms:
+    - CPython 3.8+ on Linux/macOS host PC.
+
+Usage:
+    python tools/bench_binproto.py [--devices N] [--count N] [--depth D]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import time
+import random
+import select
+import socket
+import argparse
+import tempfile
+import threading
+
+import hostsim
+hostsim.install()
+
+import devicectrl
+import deviceconfig
+import binproto
+
+import relayclient
+
+
+def start_board(devices):
+    os.chdir(tempfile.mkdtemp())
+    hostsim.load_devices(devices)
+    devicectrl.init()
+
+    board, host = socket.socketpair()
+    binproto.init(None, hostsim.FdPort(board.fileno()))
+
+    def run():
+        while True:
+            if 0 == binproto.poll():
+                select.select([board], [], [], 0.01)
+
+    threading.Thread(target = run, daemon = True).start()
+    # Keep sockets referenced.,
+    start_board.sockets = (board, host)
+    return host.fileno()
+
+
+def run(client, op, count, depth, devices):
+    rnd = random.Random(op)
+    nbytes = (devices + 7) // 8
+    payloads = []
+    for i in range(64):
+        if op == relayclient.OP_SET_ALL:
+            payloads.append(bytes(rnd.getrandbits(8) for _ in range(nbytes)))
+        else:
+            changes = {rnd.randrange(devices): rnd.getrandbits(1) for _ in range(4)}
+            mask = relayclient.to_bitmap([d in changes for d in range(devices)], devices)
+            bits = relayclient.to_bitmap([changes.get(d, 0) for d in range(devices)], devices)
+            payloads.append(mask + bits)
+
+    sent_at = {}
+    latencies = []
+    sent = 0
+    t0 = time.perf_counter()
+    while len(latencies) < count:
+        while sent < count and len(sent_at) < depth:
+            seq = client.send(op, payloads[sent % len(payloads)])
+            sent_at[seq] = time.perf_counter()
+            sent += 1
+        rop, seq, status, data = client.recv()
+        assert status == 0, relayclient.STATUS_TEXT[status]
+        latencies.append(time.perf_counter() - sent_at.pop(seq))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    name = "SET_ALL" if op == relayclient.OP_SET_ALL else "DELTA"
+    print("{0:>8} | depth {1:>3} | {2:>8.0f} frames/s | p50 {3:6.3f} ms | p99 {4:6.3f} ms".format(
+        name, depth, count / elapsed, pct(0.5), pct(0.99)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 64)
+    parser.add_argument("--count", type = int, default = 5000)
+    parser.add_argument("--depth", type = int, default = 0, help = "0 -> 1, 8 and 32")
+    args = parser.parse_args()
+
+    fd = start_board(args.devices)
+    client = relayclient.RelayClient(fd, args.devices)
+    client.ping()
+
+    print("devices {0}, frames {1}".format(args.devices, args.count))
+    for depth in ([args.depth] if args.depth else [1, 8, 32]):
+        for op in (relayclient.OP_SET_ALL, relayclient.OP_DELTA):
+            run(client, op, args.count, depth, args.devices)
+
+    # Board state must match what was sent last.,
+    assert client.get_all() == [deviceconfig.devicestatus[str(d)] for d in range(args.devices)]
+    print("frames ok/bad crc: {0}".format(binproto.stats()))
+
+    # Line noise., the next request must be answered, junk not.
+    bad = binproto.stats()[1]
+    client.write(b"\xa5\xf0")
+    client.ping()
+    client.write(b"\xa5\x03\x05\x07")
+    time.sleep(binproto.BINPROTO_FRAME_TIMEOUT_MS * 3 / 1000.0)
+    client.ping()
+    assert binproto.stats()[1] == bad, "BAD_CRC sent for junk"
+    frame = bytearray(relayclient.encode_frame(relayclient.OP_PING, 200))
+    frame[-1] ^= 0xFF
+    client.write(bytes(frame))
+    assert (relayclient.OP_PING, 200, 1) == client.recv()[0:3], "bad CRC not answered"
+    client.ping()
+    print("stray SYNC + large LEN, partial frame + idle line: next request answered, no BAD_CRC for junk")
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,84 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Device name index benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Measures build time of deviceconfig name index and jump-by-letter lookup
+    time against a linear scan over get_device_name().
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_deviceindex.py [num_devices]
+
+-------------------------------------------------------------------------------
+"""
+import sys
+import time
+import random
+
+import hostsim
+hostsim.install()
+
+import deviceconfig
+
+WORDS = ["Lamp", "Fan", "Pump", "Heater", "Door", "Valve", "Gate", "Socket",
+         "Blower", "Chiller", "Motor", "Siren", "Light", "Zone", "Kiln", "Oven",
+         "Relay", "Window", "Exhaust", "Yard", "Quench", "Ups", "Inlet", "Jet"]
+
+
+def linear_find(prefix):
+    for i in range(deviceconfig.get_total_devices()):
+        if deviceconfig.get_device_name(i).upper().startswith(prefix):
+            return i
+    return -1
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rnd = random.Random(count)
+    names = ["{0} {1}".format(rnd.choice(WORDS), i) for i in range(count)]
+    hostsim.load_devices(count, names)
+
+    rounds = 50
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        deviceconfig.build_name_index()
+    build_us = (time.perf_counter() - t0) * 1e6 / rounds
+
+    letters = deviceconfig.get_name_letters()
+    # Look up each letter many times, check against linear scan result.,
+    for letter in letters:
+        assert deviceconfig.get_device_name(deviceconfig.find_device_by_prefix(letter))[:1].upper() == letter
+
+    lookups = 20000
+    t0 = time.perf_counter()
+    for i in range(lookups):
+        deviceconfig.find_device_by_prefix(letters[i % len(letters)])
+    index_us = (time.perf_counter() - t0) * 1e6 / lookups
+
+    lookups_lin = 200
+    t0 = time.perf_counter()
+    for i in range(lookups_lin):
+        linear_find(letters[i % len(letters)])
+    linear_us = (time.perf_counter() - t0) * 1e6 / lookups_lin
+
+    print("devices          : {0}".format(count))
+    print("letters          : {0}".format(len(letters)))
+    print("index build      : {0:.1f} us".format(build_us))
+    print("indexed lookup   : {0:.2f} us".format(index_us))
+    print("linear scan      : {0:.2f} us".format(linear_us))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
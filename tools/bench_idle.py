@@ -0,0 +1,147 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Idle manager check and benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Runs the idle part of main.py's loop (idle.py) on virtual time with an
+    HD44780 model and encoder pins driven through hostsim.Pin.drive():
+      1. After IDLE_TIMEOUT_MS the backlight goes off and no LCD frame is
+         written while asleep, timers keep switching devices.
+      2. Loop passes per second while asleep against awake polling (10 ms).
+      3. A short click, released before the loop looked at the switch,
+         wakes the display and is handled as a click (not lost).
+      4. Screen is redrawn on wake with the state switched while asleep.
+    Prints wake latency (HIST_WAKE) and idle fraction from telemetry.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_idle.py [--asleep-s N] [--devices N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+import hostsim
+hostsim.install()
+
+import hd44780
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--asleep-s", type = int, default = 30)
+    parser.add_argument("--devices", type = int, default = 6)
+    args = parser.parse_args()
+
+    model = hd44780.attach()
+
+    import display
+    display.init()
+    hostsim.load_devices(args.devices)
+    os.chdir(tempfile.mkdtemp())
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    import idle
+    import scheduler
+    import deviceconfig
+    import telemetry
+    from proj_defines import (IDLE_TIMEOUT_MS, ROTARY_ENCODER_SWITCH_PIN,
+                              ROTARY_BTN_PRESSED)
+    import devicectrl
+    import rotary
+    import layout
+    import listview
+    devicectrl.init()
+    layout.init(args.devices)
+    rotary.init(args.devices)
+    scheduler.init(ui.handler_scheduled_event)
+    idle.init()
+    ui.IconDirty = [False] * layout.per_page
+    listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+    ui.draw_page(0)
+    display.show_cursor(layout.cursor_x[0], layout.row[0])
+    display.finish()
+
+    def one_pass():
+        # Sleeping branch of main.py's loop, with no encoder event.,
+        scheduler.poll()
+        if not idle.sleeping:
+            ui.flush_device_icons()
+            display.step()
+        event = None
+        if idle.sleeping:
+            if idle.missed_press():
+                event = ROTARY_BTN_PRESSED
+            if event is None:
+                idle.wait()
+                return None
+            idle.wake(ui.redraw_screen)
+        if event is None:
+            if idle.expired():
+                idle.sleep()
+                return None
+            if not display.busy():
+                hostsim.sleep_ms(10)
+        return event
+
+    # 1. Awake polling rate, then display sleep.,
+    t0 = idle.last_activity_ms
+    awake_passes = 0
+    while not idle.sleeping:
+        one_pass()
+        awake_passes += 1
+    awake_ms = hostsim.ticks_ms() - t0
+    assert awake_ms >= IDLE_TIMEOUT_MS
+    assert not model.backlight, "backlight still on"
+
+    # 2. Asleep: a timer switches device 0, no LCD frame is written.,
+    scheduler.add_timer(0, True, 1000)
+    frames = display.lcd.frames
+    t0 = hostsim.ticks_ms()
+    asleep_passes = 0
+    while hostsim.ticks_ms() - t0 < args.asleep_s * 1000:
+        one_pass()
+        asleep_passes += 1
+    assert display.lcd.frames == frames, "LCD written while asleep"
+    assert 1 == deviceconfig.get_device_status()["0"], "timer did not fire while asleep"
+
+    # 3. 5 ms click between two passes., only the interrupt sees it.
+    hostsim.Pin.drive(ROTARY_ENCODER_SWITCH_PIN, 0)
+    hostsim.sleep_ms(5)
+    hostsim.Pin.drive(ROTARY_ENCODER_SWITCH_PIN, 1)
+    event = one_pass()
+    assert ROTARY_BTN_PRESSED == event, "wake click lost"
+    assert model.backlight, "backlight still off"
+    idle.activity()
+
+    # 4. Redrawn screen has the icon switched by the timer.,
+    on_row = model.codes(0)
+    assert on_row != [0x20] * len(on_row)
+    assert display.lcd.frames > frames
+
+    awake_rate  = awake_passes * 1000.0 / awake_ms
+    asleep_rate = asleep_passes * 1000.0 / (args.asleep_s * 1000)
+    print("loop passes/s: awake {0:.0f}, asleep {1:.0f} ({2:.0f}x fewer)".format(
+        awake_rate, asleep_rate, awake_rate / asleep_rate))
+    print("LCD frames while asleep: 0, timer fired while asleep: yes")
+    print("short click while asleep: woke display and handled as click")
+    print()
+    telemetry.report()
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,168 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Dual core (iocore) queue test and benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Exercises iocore.py with CPython threads in place of core 1:
+      1. Queue check: producer offloads numbered requests, worker must run
+         every one of them exactly once and in order., offload_once() must
+         merge repeated saves.
+      2. Relay latency: a stream of rotary events (scroll + click) is fed to
+         main.py handlers with LCD I2C frames and flash saves costing real
+         time. Reports event to relay latency with the worker off (single
+         core) and on (dual core).
+    Threads share the interpreter lock on host, numbers show the trend, not
+    board timings.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_iocore.py [--events N] [--interval-ms MS]
+                                 [--frame-us US] [--save-ms MS]
+
+-------------------------------------------------------------------------------
+"""
+import gc
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import hostsim
+hostsim.install()
+hostsim.real_sleep = True
+
+import iocore
+import display
+import flashwear
+import devicectrl
+import deviceconfig
+
+
+def check_queue(count):
+    seen = []
+    saves = []
+
+    def record(n):
+        seen.append(n)
+
+    def save():
+        saves.append(len(seen))
+
+    iocore.init(True)
+    for n in range(count):
+        assert iocore.offload(record, (n,))
+        iocore.offload_once(save)
+    assert iocore.drain(10000)
+    iocore.stop()
+    time.sleep(0.01)
+
+    assert seen == list(range(count)), "requests lost or reordered"
+    assert 1 <= len(saves) <= count
+    print("queue: {0} requests in order, {1} saves merged into {2}".format(count, count, len(saves)))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run_events(main, events, interval_ms):
+    # Relay latency = arrival of event -> GPIO written.,
+    actuated = []
+    original = hostsim.Pin.value
+
+    def value(pin, v = None):
+        if v is not None:
+            actuated.append(time.perf_counter())
+        return original(pin, v)
+
+    hostsim.Pin.value = value
+    latencies = []
+    start = time.perf_counter()
+    for i in range(events):
+        arrival = start + i * interval_ms / 1000.0
+        while time.perf_counter() < arrival:
+            time.sleep(0.0002)
+        # Next page then click., click toggles the device under the cursor.
+        view = main.listview
+        main.handler_down_event((view.top + view.visible()) % view.total)
+        # Single core: main loop writes one slice of a page draw before it
+        # reads the next input (no-op in dual core mode).
+        main.display.step()
+        before = len(actuated)
+        main.handler_clicked_event(main.listview.selected)
+        if len(actuated) > before:
+            latencies.append((actuated[before] - arrival) * 1000)
+        main.display.finish()
+    iocore.drain(10000)
+    hostsim.Pin.value = original
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type = int, default = 200)
+    parser.add_argument("--interval-ms", type = float, default = 80)
+    parser.add_argument("--frame-us", type = float, default = 75, help = "I2C frame time (3 bytes at 400 kHz)")
+    parser.add_argument("--save-ms", type = float, default = 5, help = "flash save time")
+    parser.add_argument("--count", type = int, default = 100000, help = "queue check requests")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    check_queue(args.count)
+
+    # LCD and flash cost real time, both release the interpreter lock like
+    # the other core would run in parallel.
+    writeto = hostsim.I2C.writeto
+    def slow_writeto(self, addr, buf, stop = True):
+        time.sleep(args.frame_us / 1000000.0)
+        return writeto(self, addr, buf, stop)
+    hostsim.I2C.writeto = slow_writeto
+    account = flashwear.account
+    def slow_account(fileid, nbytes):
+        time.sleep(args.save_ms / 1000.0)
+        account(fileid, nbytes)
+    flashwear.account = slow_account
+    # CPython full collections cost far more than MicroPython ones and
+    # would hide the LCD/flash costs modelled above.,
+    gc.collect = lambda: 0
+
+    display.init()
+    hostsim.load_devices(32)
+    devicectrl.init()
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    ui.layout.init(32)
+    ui.IconDirty = [False] * ui.layout.per_page
+    ui.listview.init(32, ui.layout.per_page, 1 == ui.layout.per_row)
+
+    print("events {0} every {1} ms, I2C frame {2} us, save {3} ms".format(
+        args.events, args.interval_ms, args.frame_us, args.save_ms))
+    for mode in ("single core", "dual core"):
+        if mode == "dual core":
+            iocore.init(True)
+        latencies = run_events(ui, args.events, args.interval_ms)
+        print("{0:>11}: relay latency p50 {1:7.2f} ms, p99 {2:7.2f} ms, max {3:7.2f} ms".format(
+            mode, percentile(latencies, 0.5), percentile(latencies, 0.99), max(latencies)))
+    iocore.stop()
+
+    # Saved state must match the last state after worker is done.,
+    with open("devicestate.json") as f:
+        import json
+        assert json.load(f) == deviceconfig.devicestatus
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
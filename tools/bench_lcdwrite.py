@@ -0,0 +1,158 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - LCD write path microbenchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Characters per second through I2cLcd.putraw(), before and after the
+    nibble encoder (encode(), hal_write_byte()):
+      before    -> hal_write_data() per character, as it was: bytes()
+                   built per I2C frame, attribute lookups, gc.collect()
+                   per character.
+      no gc     -> before, without gc.collect(), to show the encoder part.
+      after     -> current pico_i2c_lcd.py.
+    Bytes sent to the PCF8574 are compared first, both must send the same
+    frames for commands, text and backlight changes.
+    Host numbers are CPU time of plain Python, the encoder runs as viper
+    and hal_write_byte() as native code on the board (not measured here).
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_lcdwrite.py [--chars N]
+
+-------------------------------------------------------------------------------
+"""
+import time
+import argparse
+
+import hostsim
+hostsim.install()
+
+import telemetry
+import profiler
+from pico_i2c_lcd import I2cLcd, MASK_RS, MASK_E, SHIFT_BACKLIGHT, SHIFT_DATA
+
+ADDR = 0x27
+
+
+class Recorder:
+    # PCF8574 stand-in, keeps every byte written.,
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, buf):
+        self.data.extend(buf)
+
+
+class BeforeLcd(I2cLcd):
+    # Write path before the nibble encoder (per character).,
+    gc = True
+
+    def hal_write_command(self, cmd):
+        profiler.enter(profiler.SC_HAL_COMMAND)
+        byte = ((self.backlight << SHIFT_BACKLIGHT) |
+                (((cmd >> 4) & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        byte = ((self.backlight << SHIFT_BACKLIGHT) |
+                ((cmd & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self.frames += 4
+        telemetry.count(telemetry.CNT_I2C_FRAMES, 4)
+        if self.gc:
+            telemetry.gc_collect()
+        profiler.leave()
+
+    def hal_write_data(self, data):
+        profiler.enter(profiler.SC_HAL_DATA)
+        byte = (MASK_RS |
+                (self.backlight << SHIFT_BACKLIGHT) |
+                (((data >> 4) & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        byte = (MASK_RS |
+                (self.backlight << SHIFT_BACKLIGHT) |
+                ((data & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self.frames += 4
+        telemetry.count(telemetry.CNT_I2C_FRAMES, 4)
+        if self.gc:
+            telemetry.gc_collect()
+        profiler.leave()
+
+    def putraw(self, codes):
+        for code in codes:
+            self.hal_write_data(code)
+        self.cursor_x += len(codes)
+
+
+class BeforeNoGcLcd(BeforeLcd):
+    gc = False
+
+
+def sequence(lcd):
+    # Commands, text with all byte values, backlight off and on.,
+    lcd.move_to(0, 1)
+    lcd.putraw(bytes(range(256)))
+    lcd.backlight_off()
+    lcd.putraw(b"Device 0001")
+    lcd.backlight_on()
+    lcd.hal_write_command(lcd.LCD_MOVE | lcd.LCD_MOVE_DISP)
+    lcd.putraw(b"ON")
+
+
+def sent(cls):
+    rec = Recorder()
+    hostsim.I2C.devices[ADDR] = rec
+    lcd = cls(hostsim.I2C(0), ADDR, 2, 16)
+    sequence(lcd)
+    del hostsim.I2C.devices[ADDR]
+    return bytes(rec.data)
+
+
+def chars_per_s(cls, chars):
+    lcd = cls(hostsim.I2C(0), ADDR, 2, 16)
+    run = b"Living room lamp"
+    loops = max(1, chars // len(run))
+    t0 = time.perf_counter()
+    for n in range(loops):
+        lcd.putraw(run)
+    return loops * len(run) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chars", type = int, default = 20000)
+    args = parser.parse_args()
+
+    reference = sent(BeforeNoGcLcd)
+    assert sent(BeforeLcd) == reference
+    assert sent(I2cLcd) == reference, "encoder sends different frames"
+
+    rows = (("before", BeforeLcd, args.chars // 20),
+            ("no gc", BeforeNoGcLcd, args.chars),
+            ("after", I2cLcd, args.chars))
+    rates = {}
+    print("{0:<12} {1:>12}".format("write path", "chars/s"))
+    for label, cls, chars in rows:
+        rates[label] = chars_per_s(cls, chars)
+        print("{0:<12} {1:>12.0f}".format(label, rates[label]))
+    print("after/before {0:.1f}x, after/no gc {1:.1f}x".format(
+        rates["after"] / rates["before"], rates["after"] / rates["no gc"]))
+    print("frames sent: identical ({0} bytes)".format(len(reference)))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
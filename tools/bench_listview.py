@@ -0,0 +1,193 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - List view page flip vs row scroll check and benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Walks main.py's device list down through all devices and back up
+    (wrap around included) with encoder events on an HD44780 model, once
+    per listview.py scroll mode:
+      page -> window flips a page at a time, whole page rendered and drawn
+      row  -> window moves one row, only the device scrolled in is
+              rendered, changed LCD cells only are written
+    Off-screen pages are dropped before every step, so each window move
+    is a redraw. After every step the screen is checked cell by cell
+    against the expected window (names, icons, timer marks, cursor).
+    Prints per window move the slots rendered, I2C frames and render
+    time, and frames per step (cursor moves included), then the time of
+    listview.slot_of() / page_of() for a small and a big list (O(1)).
+    Frames per step is the bus traffic of scrolling through the list:
+    row mode moves the window on almost every step, so it sends more
+    per step than page mode although each of its moves is cheaper.
+
+    Device names are varied (room + fixture), similar names would make
+    the changed cells only draw look better than it is.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_listview.py [--rows R --cols C] [--devices N] [--laps N]
+    python tools/bench_listview.py --rows 2 --cols 16
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import hostsim
+hostsim.install()
+
+import hd44780
+
+ROOMS = ["Living", "Kitchen", "Bed 1", "Bed 2", "Porch", "Garage", "Study", "Hall"]
+THINGS = ["light", "fan", "lamp", "heater", "socket", "pump"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type = int, default = 4)
+    parser.add_argument("--cols", type = int, default = 20)
+    parser.add_argument("--devices", type = int, default = 23)
+    parser.add_argument("--laps", type = int, default = 2)
+    args = parser.parse_args()
+
+    # Geometry must be set before project modules take it from proj_defines.,
+    import proj_defines
+    proj_defines.I2C_DISPLAY_NUM_ROWS = args.rows
+    proj_defines.I2C_DISPLAY_NUM_COLS = args.cols
+    model = hd44780.attach(args.rows, args.cols)
+
+    import cgram
+    import display
+    display.init()
+    names = ["{0} {1}".format(ROOMS[i % len(ROOMS)], THINGS[(i // len(ROOMS)) % len(THINGS)])
+             for i in range(args.devices)]
+    hostsim.load_devices(args.devices, names = names)
+    os.chdir(tempfile.mkdtemp())
+    import devicectrl
+    devicectrl.init()
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    import layout
+    import listview
+    import rotary
+    import scheduler
+    import deviceconfig
+    layout.init(args.devices)
+    rotary.init(args.devices)
+    scheduler.init(ui.handler_scheduled_event)
+    scheduler.add_timer(1, True, 60000)
+    ui.IconDirty = [False] * layout.per_page
+    # Some devices on, icons differ from row to row.,
+    for d in range(0, args.devices, 3):
+        devicectrl.set_device_onoff(d, True)
+
+    # Slots rendered and time spent rendering them.,
+    rendered = [0, 0.0]
+    render_slot = ui.render_slot
+    def counting_render_slot(*a):
+        t0 = time.perf_counter()
+        render_slot(*a)
+        rendered[0] += 1
+        rendered[1] += time.perf_counter() - t0
+    ui.render_slot = counting_render_slot
+
+    def screen():
+        return [[("glyph", cgram.slot_glyph[c]) if c < 8 else c for c in model.codes(y)]
+                for y in range(model.rows)]
+
+    def expected():
+        rows = [[0x20] * args.cols for y in range(args.rows)]
+        status = deviceconfig.get_device_status()
+        timed = scheduler.get_timed_devices()
+        for slot in range(listview.visible()):
+            row = rows[layout.row[slot]]
+            deviceid = listview.top + slot
+            if deviceid == listview.selected:
+                row[layout.cursor_x[slot]] = ("glyph", cgram.GLYPH_CURSOR)
+            for i, c in enumerate(layout.names[deviceid]):
+                row[layout.name_x[slot] + i] = ord(c)
+            if layout.info_x[slot] >= 0 and deviceid in timed:
+                row[layout.info_x[slot]] = ("glyph", cgram.GLYPH_TIMER)
+            icon = cgram.ICON_ON if 1 == status[str(deviceid)] else cgram.ICON_OFF
+            for i, g in enumerate(icon):
+                row[layout.icon_x[slot] + i] = ("glyph", g)
+        return rows
+
+    def walk(mode):
+        listview.LISTVIEW_SCROLL = mode
+        listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+        ui.select_device(0)
+        display.finish()
+        moves = []
+        steps = []
+        for lap in range(args.laps):
+            for direction in (1, -1):
+                for n in range(args.devices):
+                    display.drop_page(-1)
+                    top = listview.top
+                    rendered[0] = 0
+                    rendered[1] = 0.0
+                    frames = model.frames
+                    if direction > 0:
+                        ui.handler_down_event((listview.selected + 1) % args.devices)
+                    else:
+                        ui.handler_up_event((listview.selected - 1) % args.devices)
+                    display.finish()
+                    assert screen() == expected(), "wrong window on screen ({0})".format(mode)
+                    steps.append(model.frames - frames)
+                    if listview.top != top:
+                        moves.append((rendered[0], model.frames - frames, rendered[1] * 1e6))
+        return listview.mode, moves, steps
+
+    print("{0}x{1}, {2} devices, {3} per window, {4} laps down and up, off-screen pages dropped".format(
+        args.cols, args.rows, args.devices, layout.per_page, args.laps))
+    print("{0:<6} | {1:>5} | {2:>5} | {3:>12} | {4:>15} | {5:>11} | {6:>14}".format(
+        "scroll", "steps", "moves", "slots / move", "frames / move", "frames/step", "render us/move"))
+    per_step = {}
+    for mode in ("page", "row"):
+        used, moves, steps = walk(mode)
+        if "row" == mode and listview.SCROLL_ROW != used:
+            print("{0:<6} | not available, {1} slot columns".format(mode, layout.per_row))
+            continue
+        per_step[mode] = sum(steps) / len(steps)
+        print("{0:<6} | {1:>5} | {2:>5} | {3:>12.1f} | {4:>8.1f} {5:>6} | {6:>11.1f} | {7:>14.0f}".format(
+            mode, len(steps), len(moves), sum(m[0] for m in moves) / len(moves),
+            sum(m[1] for m in moves) / len(moves), "max {0}".format(max(m[1] for m in moves)),
+            sum(steps) / len(steps), sum(m[2] for m in moves) / len(moves)))
+    print("frames / move: I2C frames of a window move (handler and slices), cursor included.")
+    print("frames/step: I2C frames per rotary step, window moves and cursor moves.")
+    if "row" in per_step:
+        print("row vs page per step: {0:.1f} vs {1:.1f} frames ({2:+.0f}%)".format(
+            per_step["row"], per_step["page"], (per_step["row"] / per_step["page"] - 1) * 100))
+    print("render us/move: host CPU time rendering slots (main.render_slot()) per window move.")
+    print("screen checked after every step")
+
+    # Item -> (page, slot) is arithmetic., same time for any list size.
+    for total in (16, 100000):
+        listview.init(total, layout.per_page, 1 == layout.per_row)
+        listview.select(total // 2)
+        items = range(0, total, max(1, total // 1000))
+        t0 = time.perf_counter()
+        for r in range(20):
+            for item in items:
+                listview.slot_of(item)
+                listview.page_of(item)
+        spent = (time.perf_counter() - t0) / (20 * len(items)) * 1e9
+        print("slot_of + page_of, {0:>6} items: {1:6.0f} ns".format(total, spent))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
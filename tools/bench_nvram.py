@@ -0,0 +1,155 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Device state backend benchmark, file vs FRAM vs EEPROM (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Switches random devices (single toggles and scenes) through devicectrl
+    with each STATE_BACKEND:
+      file   - devicestate.json, flash programs and time from lfs_model
+      fram   - nvram.py on the FRAM model (tools/nvmem.py)
+      eeprom - nvram.py on the EEPROM model, main loop passes (nvram.poll())
+               every --pass-ms until the last page write cycle is done
+    Prints bytes written to the storage per toggle, bytes on the bus, time
+    spent in save_device_state() (the UI waits for it) and time until the
+    change is durable.
+    Then checks that states and switch counters come back after a reboot
+    (nvram.init() on the same memory).
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_nvram.py [--devices N] [--toggles N] [--pass-ms N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import json
+import random
+import argparse
+import tempfile
+
+import hostsim
+hostsim.install()
+
+import nvmem
+import lfs_model
+
+
+def run(backend, args):
+    import proj_defines
+    import deviceconfig
+    import devicectrl
+    import nvram
+
+    os.chdir(tempfile.mkdtemp())
+    hostsim.load_devices(args.devices)
+    devicectrl.STATE_BACKEND = nvram.STATE_BACKEND = backend
+    mem = None
+    if "file" != backend:
+        mem = nvmem.attach(backend)
+    devicectrl.init()
+
+    fs = lfs_model.LittleFs()
+    status = deviceconfig.get_device_status()
+    rnd = random.Random(args.seed)
+    flips = [0] * args.devices
+    toggles = 0
+    saves = 0
+    stored = 0
+    bus = 0
+    save_us = 0.0
+    durable_us = 0.0
+    worst_durable_us = 0.0
+
+    for n in range(args.toggles):
+        # Every 8th change is a scene of 8 devices, saved once.,
+        if 7 == n % 8:
+            picked = rnd.sample(range(args.devices), min(8, args.devices))
+        else:
+            picked = [rnd.randrange(args.devices)]
+        states = []
+        for d in picked:
+            states.append([d, 1 - status[str(d)]])
+            flips[d] += 1
+        toggles += len(picked)
+        saves += 1
+
+        if mem is None:
+            devicectrl.set_devices_onoff(states)
+            before = (fs.programmed, fs.time_ms)
+            fs.write_file(proj_defines.devicestatus_cfgfile, len(json.dumps(status)))
+            stored += fs.programmed - before[0]
+            save_us += (fs.time_ms - before[1]) * 1000.0
+            durable_us += (fs.time_ms - before[1]) * 1000.0
+            worst_durable_us = max(worst_durable_us, (fs.time_ms - before[1]) * 1000.0)
+            continue
+
+        before = (mem.bytes, mem.bus_bytes)
+        devicectrl.set_devices_onoff(states)
+        in_save = (mem.bus_bytes - before[1]) * nvmem.BUS_US_PER_BYTE
+        save_us += in_save
+        # Main loop passes until the last page is written and its cycle done.,
+        waited = 0
+        while nvram.pending > 0:
+            hostsim.advance_ms(args.pass_ms)
+            waited += args.pass_ms * 1000
+            nvram.poll()
+        cycle = mem.cycle_us if backend == "eeprom" else 0
+        done = in_save + waited + cycle
+        durable_us += done
+        worst_durable_us = max(worst_durable_us, done)
+        stored += mem.bytes - before[0]
+        bus += mem.bus_bytes - before[1]
+        # Idle until the next change (write cycle over)., not counted.
+        hostsim.advance_ms(args.pass_ms + 10)
+
+    row = (backend, stored / toggles, bus / toggles if mem else float("nan"),
+           save_us / saves, durable_us / saves, worst_durable_us)
+    print("{0:>6} | {1:>10.1f} | {2:>9.1f} | {3:>12.0f} | {4:>12.0f} | {5:>10.0f}".format(*row))
+
+    if mem is None:
+        return
+    # Reboot: states from devicestate.json are stale (not written), the
+    # memory must win.,
+    expected = dict(status)
+    hostsim.load_devices(args.devices)
+    devicectrl.init()
+    status = deviceconfig.get_device_status()
+    for d in range(args.devices):
+        assert status[str(d)] == expected[str(d)], "device {0} state lost".format(d)
+        assert nvram.get_switch_count(d) == flips[d], "device {0} counter".format(d)
+    if backend == "eeprom":
+        assert max(mem.wear) <= saves + 1, "EEPROM byte written more than once per save"
+    del hostsim.I2C.devices[proj_defines.NVRAM_I2C_ADDR]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 24)
+    parser.add_argument("--toggles", type = int, default = 400)
+    parser.add_argument("--pass-ms", type = int, default = 10)
+    parser.add_argument("--seed", type = int, default = 1)
+    args = parser.parse_args()
+
+    print("{0} devices, {1} changes (every 8th a scene of 8), main loop pass {2} ms".format(
+        args.devices, args.toggles, args.pass_ms))
+    print("{0:>6} | {1:>10} | {2:>9} | {3:>12} | {4:>12} | {5:>10}".format(
+        "store", "B/toggle", "bus B/tg", "save us/save", "durable us", "worst us"))
+    for backend in ("file", "fram", "eeprom"):
+        run(backend, args)
+    print("file: flash bytes programmed (LittleFS model), save time is flash program/erase time.")
+    print("states and switch counters restored from FRAM/EEPROM after reboot: OK")
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,175 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Off-screen DDRAM pages check and benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Scrolls main.py's device list page by page on an HD44780 model (with
+    display shift) and a 16x2 mirror panel, running idle main loop passes
+    (prerender_page(), panels.refresh()) between events:
+      1. After every event the visible screen is checked cell by cell
+         against the expected page (names, icons, timer marks, cursor),
+         glyphs compared through the CGRAM slot table.
+      2. Devices on the off-screen page are switched meanwhile (timers,
+         serial), the page must not be shown stale.
+      3. Mirror panel shows the same screen once caught up.
+    Page turns are run twice, off-screen page dropped before every turn
+    (full redraw) and with off-screen pages, and LCD commands, display
+    shifts and I2C frames per page turn are printed for both.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_pages.py [--devices N] [--turns N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+import hostsim
+hostsim.install()
+
+import hd44780
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 12)
+    parser.add_argument("--turns", type = int, default = 24)
+    args = parser.parse_args()
+
+    import proj_defines
+    proj_defines.EXTRA_PANELS = [
+        [proj_defines.I2C_CHANNEL_ID, 0, 1, 38, 2, 16, proj_defines.PANEL_VIEW_MIRROR],
+    ]
+    model  = hd44780.attach()
+    mirror = hd44780.attach(2, 16, 38)
+
+    import cgram
+    import display
+    import panels
+    display.init()
+    assert display.banks == 2, "no off-screen columns for this geometry"
+    hostsim.load_devices(args.devices)
+    os.chdir(tempfile.mkdtemp())
+    import devicectrl
+    devicectrl.init()
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    import layout
+    import listview
+    import rotary
+    import scheduler
+    import deviceconfig
+    import telemetry
+    layout.init(args.devices)
+    rotary.init(args.devices)
+    scheduler.init(ui.handler_scheduled_event)
+    ui.IconDirty = [False] * layout.per_page
+    listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+    ui.draw_page(0)
+    display.show_cursor(layout.cursor_x[0], layout.row[0])
+    display.finish()
+
+    def glyph(code, slot_glyph):
+        return ("glyph", slot_glyph[code]) if code < 8 else code
+
+    def screen(lcd, slot_glyph):
+        return [[glyph(c, slot_glyph) for c in lcd.codes(y)] for y in range(lcd.rows)]
+
+    def expected():
+        rows = [[0x20] * proj_defines.I2C_DISPLAY_NUM_COLS for y in range(proj_defines.I2C_DISPLAY_NUM_ROWS)]
+        status = deviceconfig.get_device_status()
+        timed = scheduler.get_timed_devices()
+        first = listview.top
+        for slot in range(listview.visible()):
+            row = rows[layout.row[slot]]
+            deviceid = first + slot
+            if deviceid == listview.selected:
+                row[layout.cursor_x[slot]] = ("glyph", cgram.GLYPH_CURSOR)
+            for i, c in enumerate(layout.names[deviceid]):
+                row[layout.name_x[slot] + i] = ord(c)
+            if layout.info_x[slot] >= 0 and deviceid in timed:
+                row[layout.info_x[slot]] = ("glyph", cgram.GLYPH_TIMER)
+            icon = cgram.ICON_ON if 1 == status[str(deviceid)] else cgram.ICON_OFF
+            for i, g in enumerate(icon):
+                row[layout.icon_x[slot] + i] = ("glyph", g)
+        return rows
+
+    def idle():
+        # Idle main loop passes until prerendered and panels caught up.,
+        for n in range(1000):
+            ui.flush_device_icons()
+            if display.step():
+                continue
+            panels.refresh()
+            ui.prerender_page()
+            if panels.target[0] == panels.shown[0]:
+                return
+        raise AssertionError("mirror panel does not catch up")
+
+    def deviceid():
+        return listview.selected
+
+    def turn(drop):
+        # Scroll down to the last page, then back up to the first one.,
+        if drop:
+            display.drop_page(-1)
+        model.reset_counters()
+        frames = display.lcd.frames
+        flips = telemetry.counters[telemetry.CNT_PAGE_FLIPS]
+        if (n // (listview.pages() - 1)) % 2:
+            listview.selected = listview.top
+            ui.handler_up_event((deviceid() - 1) % args.devices)
+        else:
+            listview.selected = listview.top + layout.per_page - 1
+            ui.handler_down_event((deviceid() + 1) % args.devices)
+        display.finish()
+        return (model.commands, model.display_shifts, display.lcd.frames - frames,
+                telemetry.counters[telemetry.CNT_PAGE_FLIPS] - flips)
+
+    results = {}
+    for drop in (True, False):
+        ui.select_device(0)
+        idle()
+        stats = []
+        for n in range(args.turns):
+            stats.append(turn(drop))
+            assert screen(model, cgram.slot_glyph) == expected(), "wrong page on screen"
+            # Switch a device of the page off-screen, as timer or serial.,
+            if not drop and display.bank_page[1 - display.bank] >= 0:
+                other = display.bank_page[1 - display.bank]
+                devicectrl.set_device_onoff(other, not deviceconfig.get_device_status()[str(other)])
+                ui.refresh_device_icon(other)
+            idle()
+            assert screen(mirror, panels.slots[0]) == screen(model, cgram.slot_glyph), "mirror differs"
+        results[drop] = stats
+
+    print("{0} devices, {1} pages, {2} page turns (down to last page, up to first)".format(
+        args.devices, listview.pages(), args.turns))
+    print("{0:<28} {1:>6} {2:>9} {3:>7} {4:>11}".format("per page turn", "turns", "commands", "shifts", "i2c frames"))
+    rows = (("full redraw", [s for s in results[True]]),
+            ("off-screen, page shown", [s for s in results[False] if s[3]]),
+            ("off-screen, page missed", [s for s in results[False] if not s[3]]))
+    for label, stats in rows:
+        if stats:
+            print("{0:<28} {1:>6} {2:>9.1f} {3:>7.1f} {4:>11.1f}".format(label, len(stats),
+                sum(s[0] for s in stats) / len(stats), sum(s[1] for s in stats) / len(stats),
+                sum(s[2] for s in stats) / len(stats)))
+    print("screen and mirror panel checked after every turn")
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
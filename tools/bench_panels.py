@@ -0,0 +1,141 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Extra LCD panels check and benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Runs main.py handlers with the main LCD plus two extra panels from
+    panels.py, each one an HD44780 model:
+      - 16x2 mirror panel on the main LCD bus (address 38),
+      - 20x4 summary panel on I2C channel 1 (address 37).
+    For a stream of scroll and click events it checks:
+      1. No extra panel frame is written inside the event handlers (what
+         the user waits for), they cost the same as with no extra panels.
+      2. Idle refresh slices are bounded (PANEL_REFRESH_CELLS) and the
+         panels catch up: mirror shows the main screen, summary shows the
+         device count and the last switched device.
+    Prints per panel frames and bus time (panels.report()).
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_panels.py [--events N] [--devices N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+import hostsim
+hostsim.install()
+
+import hd44780
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type = int, default = 40)
+    parser.add_argument("--devices", type = int, default = 12)
+    args = parser.parse_args()
+
+    import proj_defines
+    proj_defines.EXTRA_PANELS = [
+        [proj_defines.I2C_CHANNEL_ID, 0, 1, 38, 2, 16, proj_defines.PANEL_VIEW_MIRROR],
+        [1, 2, 3, 37, 4, 20, proj_defines.PANEL_VIEW_SUMMARY],
+    ]
+    main_model    = hd44780.attach()
+    mirror_model  = hd44780.attach(2, 16, 38)
+    summary_model = hd44780.attach(4, 20, 37)
+
+    import cgram
+    import display
+    import panels
+    display.init()
+    hostsim.load_devices(args.devices)
+    os.chdir(tempfile.mkdtemp())
+    import devicectrl
+    devicectrl.init()
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    import layout
+    import listview
+    import deviceconfig
+    layout.init(args.devices)
+    ui.IconDirty = [False] * layout.per_page
+    listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+    ui.draw_page(0)
+    display.show_cursor(layout.cursor_x[0], layout.row[0])
+    display.finish()
+
+    def screen(model, slot_glyph):
+        return [[("glyph", slot_glyph[c]) if c < 8 else c for c in model.codes(y)]
+                for y in range(model.rows)]
+
+    def deviceid():
+        return listview.selected
+
+    def idle():
+        # Idle main loop passes until panels caught up., returns passes and
+        # largest slice in frames.
+        passes = 0
+        largest = 0
+        display.finish()
+        while True:
+            before = sum(lcd.frames for lcd in panels.lcds)
+            panels.refresh()
+            spent = sum(lcd.frames for lcd in panels.lcds) - before
+            largest = max(largest, spent)
+            passes += 1
+            if all(panels.target[p] == panels.shown[p] for p in range(len(panels.lcds))):
+                return passes, largest
+
+    idle()
+    handler_frames = []
+    slices = []
+    catchup = []
+    for n in range(args.events):
+        before = display.lcd.frames
+        extra  = sum(lcd.frames for lcd in panels.lcds)
+        if n % 3 == 2:
+            ui.handler_clicked_event(deviceid())
+        else:
+            ui.handler_down_event((deviceid() + 1) % args.devices)
+        assert sum(lcd.frames for lcd in panels.lcds) == extra, "panel written inside handler"
+        handler_frames.append(display.lcd.frames - before)
+        passes, largest = idle()
+        catchup.append(passes)
+        slices.append(largest)
+
+        # Panels have own CGRAM, compare glyphs rather than slot codes.,
+        assert screen(mirror_model, panels.slots[0]) == screen(main_model, cgram.slot_glyph)
+        status = deviceconfig.get_device_status()
+        on = sum(status[str(d)] for d in range(args.devices))
+        assert summary_model.text().startswith("ON {0}/{1}".format(on, args.devices))
+
+    frame_us = panels.bus_time_us(1)
+    print("{0} events, main LCD + 2 extra panels".format(args.events))
+    print("handler frames/event: avg {0:.1f}, max {1}, all on main LCD (0 extra panel frames)".format(
+        sum(handler_frames) / len(handler_frames), max(handler_frames)))
+    print("idle refresh slice: max {0} frames (~{1} us), {2:.1f} idle passes to catch up on average".format(
+        max(slices), max(slices) * frame_us, sum(catchup) / len(catchup)))
+    print("panels consistent after every event (mirror == main, summary count ok)")
+    print()
+    panels.report(display.lcd)
+    print()
+    print(mirror_model.text())
+    print(summary_model.text())
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,242 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Power fail commit check (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Runs bursts of device switching, page draws and main loop passes
+    (deferred saves, POWERFAIL_MODE = "gpio") and fires the power fail pin
+    interrupt at a random point: a trace hook counts executed lines of the
+    project modules and drives the pin low at line N, like a soft IRQ
+    between two bytecodes, in the middle of a save, an EEPROM page write
+    or an LCD write.
+    The interrupted call is completed, then power "dies":
+      - the stored states (devicestate.json or FRAM/EEPROM model, read the
+        way the board reads them at boot) must match the relays,
+      - no LCD frame may follow the interrupt, except the byte being
+        written (4 frames).
+    Per STATE_BACKEND prints trials, failures, saves written in normal
+    operation against changes made, and bytes written from the interrupt
+    until the state is committed.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_powerfail.py [--trials N] [--ops N] [--devices N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import contextlib
+
+import hostsim
+hostsim.install()
+
+import hd44780
+import nvmem
+
+
+class Injector:
+    # Drives the power fail pin low at the n-th traced line of project code.,
+    def __init__(self, pin, at, lcd):
+        self.pin = pin
+        self.at = at
+        self.lcd = lcd
+        self.lines = 0
+        self.frames = None
+
+    def trace(self, frame, event, arg):
+        if not frame.f_code.co_filename.startswith(hostsim.PROJECT_DIR + os.sep):
+            return None
+        if os.sep + "tools" + os.sep in frame.f_code.co_filename:
+            return None
+        if event == "line":
+            self.lines += 1
+            if self.lines == self.at:
+                self.frames = self.lcd.frames
+                hostsim.Pin.drive(self.pin, 0)
+        return self.trace
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 24)
+    parser.add_argument("--ops", type = int, default = 200)
+    parser.add_argument("--trials", type = int, default = 50)
+    parser.add_argument("--seed", type = int, default = 1)
+    args = parser.parse_args()
+
+    import proj_defines
+    model = hd44780.attach()
+    import display
+    display.init()
+    hostsim.load_devices(args.devices)
+    os.chdir(tempfile.mkdtemp())
+    import deviceconfig
+    import devicectrl
+    import nvram
+    import powerfail
+    import layout
+    import listview
+    import rotary
+    import scheduler
+    import telemetry
+    devicectrl.init()
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    layout.init(args.devices)
+    rotary.init(args.devices)
+    scheduler.init(ui.handler_scheduled_event)
+    ui.IconDirty = [False] * layout.per_page
+    listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+    pin = proj_defines.POWERFAIL_GPIO_PIN
+    powerfail.POWERFAIL_MODE = "gpio"
+
+    def boot(backend):
+        # Power on: module state back to reset values, storage kept.,
+        hostsim.Pin.drive(pin, 1)
+        powerfail.failing = False
+        devicectrl.urgent = devicectrl.saving = devicectrl.save_pending = False
+        devicectrl.save_due = None
+        nvram.urgent = nvram.writing = False
+        display.lcd.i2c = display.i2c
+        display.job = None
+        hostsim.load_devices(args.devices)
+        devicectrl.STATE_BACKEND = nvram.STATE_BACKEND = backend
+        with contextlib.redirect_stdout(None):
+            devicectrl.init()
+        powerfail.init()
+        ui.draw_page(0)
+        display.finish()
+
+    def stored(backend):
+        if "file" == backend:
+            with open(proj_defines.devicestatus_cfgfile) as f:
+                return json.load(f)
+        status = {proj_defines.numdevices: args.devices}
+        for d in range(args.devices):
+            status[str(d)] = 0
+        with contextlib.redirect_stdout(None):
+            nvram.init(status)
+        return status
+
+    def burst(rnd):
+        # Returns device changes made., stops after the pass with a power fail.
+        status = deviceconfig.get_device_status()
+        changes = 0
+        for n in range(args.ops):
+            op = rnd.randrange(5)
+            if 0 == op:
+                listview.selected = listview.top + rnd.randrange(listview.visible())
+                ui.handler_clicked_event(listview.selected)
+                changes += 1
+            elif op in (1, 2):
+                picked = rnd.sample(range(args.devices), 6)
+                states = [[d, 1 - status[str(d)]] for d in picked]
+                changes += len(picked)
+                if 1 == op:
+                    devicectrl.set_devices_onoff(states)
+                else:
+                    # Serial bulk, saved by the caller (binproto).,
+                    devicectrl.set_devices_onoff(states, -1, False)
+                    devicectrl.save_device_state()
+                for d in picked:
+                    ui.refresh_device_icon(d)
+                ui.flush_device_icons()
+            elif 3 == op:
+                ui.draw_page(rnd.randrange(listview.pages()))
+            # Main loop pass.,
+            nvram.poll()
+            devicectrl.poll_save()
+            display.step()
+            hostsim.advance_ms(50)
+            if powerfail.failing:
+                break
+        return changes
+
+    def fresh(backend):
+        # Storage with all devices off, then boot., memory model if used.
+        os.chdir(tempfile.mkdtemp())
+        mem = nvmem.attach(backend) if "file" != backend else None
+        hostsim.load_devices(args.devices)
+        with open(proj_defines.devicestatus_cfgfile, "w") as f:
+            json.dump(deviceconfig.get_device_status(), f)
+        boot(backend)
+        return mem
+
+    print("{0} devices, bursts of {1} operations, {2} trials per backend".format(
+        args.devices, args.ops, args.trials))
+    print("{0:>6} | {1:>6} | {2:>8} | {3:>16} | {4:>14} | {5:>10}".format(
+        "store", "trials", "failures", "saves / changes", "B after IRQ", "LCD frames"))
+    for backend in ("file", "fram", "eeprom"):
+        failures = 0
+        late_frames = 0
+        rnd = random.Random(args.seed)
+        for trial in range(args.trials):
+            # Dry run of the same burst gives the number of lines to pick from.,
+            fresh(backend)
+            seed = rnd.random()
+            counter = Injector(pin, -1, model)
+            sys.settrace(counter.trace)
+            burst(random.Random(seed))
+            sys.settrace(None)
+            total = counter.lines
+
+            mem = fresh(backend)
+            injector = Injector(pin, rnd.randrange(1, total), model)
+            sys.settrace(injector.trace)
+            try:
+                burst(random.Random(seed))
+                ok = injector.frames is not None
+            except Exception as e:
+                ok = False
+                print("{0} trial {1}: {2!r}".format(backend, trial, e))
+            sys.settrace(None)
+
+            # Power is gone., storage as the next boot reads it.
+            relays = dict(deviceconfig.get_device_status())
+            if ok:
+                late_frames = max(late_frames, model.frames - injector.frames)
+                ok = (model.frames - injector.frames <= 4)
+            if ok:
+                back = stored(backend)
+                ok = all(back[str(d)] == relays[str(d)] for d in range(args.devices))
+            if not ok:
+                failures += 1
+            if mem is not None:
+                del hostsim.I2C.devices[proj_defines.NVRAM_I2C_ADDR]
+
+        # Saves in normal operation: a burst without power fail, then the
+        # commit when it fails.,
+        mem = fresh(backend)
+        telemetry.reset()
+        changes = burst(random.Random(args.seed))
+        saves = sum(telemetry.get_bucket(telemetry.HIST_SAVE_STATE, b) for b in range(telemetry.HIST_BUCKETS))
+        before = mem.bytes if mem else 0
+        hostsim.Pin.drive(pin, 0)
+        committed = (mem.bytes - before) if mem else len(json.dumps(deviceconfig.get_device_status()))
+        if mem is not None:
+            del hostsim.I2C.devices[proj_defines.NVRAM_I2C_ADDR]
+
+        print("{0:>6} | {1:>6} | {2:>8} | {3:>7} / {4:<6} | {5:>14} | {6:>10}".format(
+            backend, args.trials, failures, saves, changes, committed, late_frames))
+    print("B after IRQ: bytes written by the commit at the end of a burst (file: devicestate.json size).")
+    print("LCD frames: worst LCD frames after the interrupt (byte being written).")
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
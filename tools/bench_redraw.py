@@ -0,0 +1,163 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Sliced page draw check and benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Runs main.py's loop order (display.step(), then input) on an HD44780
+    model with full page redraws (off-screen pages dropped before every
+    page turn), and encoder events (turns, clicks) injected between
+    slices of a draw in progress:
+      1. I2C frames written by one display.step() stay within
+         LCD_SLICE_FRAMES plus one glyph upload.
+      2. Screen is checked cell by cell against the expected page once
+         the draw is complete, devices clicked during the draw must show
+         their new icon.
+    Worst case input latency (LCD frames written before input is read)
+    is printed against drawing the page in the event handler.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_redraw.py [--devices N] [--turns N] [--seed N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import random
+import argparse
+import tempfile
+
+import hostsim
+hostsim.install()
+
+import hd44780
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 12)
+    parser.add_argument("--turns", type = int, default = 200)
+    parser.add_argument("--seed", type = int, default = 1)
+    args = parser.parse_args()
+
+    model = hd44780.attach()
+
+    import proj_defines
+    import cgram
+    import display
+    import panels
+    display.init()
+    hostsim.load_devices(args.devices)
+    os.chdir(tempfile.mkdtemp())
+    import devicectrl
+    devicectrl.init()
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    import layout
+    import listview
+    import rotary
+    import scheduler
+    import deviceconfig
+    layout.init(args.devices)
+    rotary.init(args.devices)
+    scheduler.init(ui.handler_scheduled_event)
+    ui.IconDirty = [False] * layout.per_page
+    listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+    ui.draw_page(0)
+    display.show_cursor(layout.cursor_x[0], layout.row[0])
+    display.finish()
+
+    def screen():
+        return [[("glyph", cgram.slot_glyph[c]) if c < 8 else c for c in model.codes(y)]
+                for y in range(model.rows)]
+
+    def expected():
+        rows = [[0x20] * proj_defines.I2C_DISPLAY_NUM_COLS for y in range(proj_defines.I2C_DISPLAY_NUM_ROWS)]
+        status = deviceconfig.get_device_status()
+        timed = scheduler.get_timed_devices()
+        first = listview.top
+        for slot in range(listview.visible()):
+            row = rows[layout.row[slot]]
+            deviceid = first + slot
+            if deviceid == listview.selected:
+                row[layout.cursor_x[slot]] = ("glyph", cgram.GLYPH_CURSOR)
+            for i, c in enumerate(layout.names[deviceid]):
+                row[layout.name_x[slot] + i] = ord(c)
+            if layout.info_x[slot] >= 0 and deviceid in timed:
+                row[layout.info_x[slot]] = ("glyph", cgram.GLYPH_TIMER)
+            icon = cgram.ICON_ON if 1 == status[str(deviceid)] else cgram.ICON_OFF
+            for i, g in enumerate(icon):
+                row[layout.icon_x[slot] + i] = ("glyph", g)
+        return rows
+
+    def deviceid():
+        return listview.selected
+
+    def page_turn():
+        # Down from last device of the page, full redraw of next page.,
+        display.drop_page(-1)
+        listview.selected = listview.top + listview.visible() - 1
+        ui.handler_down_event((deviceid() + 1) % args.devices)
+
+    # Drawing the page in the handler: input waits for the whole draw.,
+    sync = []
+    for n in range(listview.pages()):
+        frames = display.lcd.frames
+        page_turn()
+        display.finish()
+        sync.append(display.lcd.frames - frames)
+        assert screen() == expected(), "wrong page on screen"
+
+    # Sliced: one slice per loop pass, events between slices.,
+    rng = random.Random(args.seed)
+    slices = []
+    events = 0
+    clicks = 0
+    for n in range(args.turns):
+        page_turn()
+        while display.busy():
+            frames = display.lcd.frames
+            display.step()
+            slices.append(display.lcd.frames - frames)
+            if not display.busy() or rng.random() < 0.5:
+                continue
+            events += 1
+            pick = rng.random()
+            if pick < 0.5:
+                clicks += 1
+                ui.handler_clicked_event(deviceid())
+            elif pick < 0.75 and deviceid() > listview.top:
+                ui.handler_up_event(deviceid() - 1)
+            elif deviceid() < listview.top + listview.visible() - 1:
+                ui.handler_down_event(deviceid() + 1)
+        assert screen() == expected(), "wrong page on screen after draw"
+
+    bound = proj_defines.LCD_SLICE_FRAMES + 4 * (1 + display.UPLOAD_WRITES)
+    assert max(slices) <= bound, "slice of {0} frames".format(max(slices))
+
+    print("{0} devices, {1}x{2}, slice limit {3} frames + 1 glyph upload".format(args.devices,
+        proj_defines.I2C_DISPLAY_NUM_COLS, proj_defines.I2C_DISPLAY_NUM_ROWS, proj_defines.LCD_SLICE_FRAMES))
+    print("{0} sliced page draws, {1} events during draws ({2} clicks), screen checked after every draw".format(
+        args.turns, events, clicks))
+    print("{0:<26} {1:>10} {2:>12}".format("input latency (LCD part)", "i2c frames", "us @ {0} kHz".format(
+        proj_defines.I2C_BUS_FREQUENCY // 1000)))
+    print("{0:<26} {1:>10} {2:>12}".format("draw in handler, worst", max(sync), panels.bus_time_us(max(sync))))
+    print("{0:<26} {1:>10} {2:>12}".format("sliced, worst", max(slices), panels.bus_time_us(max(slices))))
+    print("{0:<26} {1:>10.1f} {2:>12}".format("sliced, mean", sum(slices) / len(slices),
+        panels.bus_time_us(sum(slices) // len(slices))))
+    print("slices per draw: {0:.1f}".format(len(slices) / args.turns))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,90 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Scene application benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Compares switching N devices with N clicks (devicectrl.set_device_onoff
+    per device) against one scene (devicectrl.set_devices_onoff).
+    Reports time, GPIO register writes and devicestate.json writes.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_scenes.py
+
+-------------------------------------------------------------------------------
+"""
+import os
+import time
+import tempfile
+
+import hostsim
+hostsim.install()
+
+import devicectrl
+
+TOTAL_DEVICES = 64
+ROUNDS        = 20
+
+saves = 0
+save_device_state = devicectrl.save_device_state
+
+def counting_save():
+    global saves
+    saves += 1
+    save_device_state()
+
+
+def main():
+    global saves
+
+    # devicestate.json is written to current directory, keep it out of the tree.
+    os.chdir(tempfile.mkdtemp())
+
+    hostsim.load_devices(TOTAL_DEVICES)
+    devicectrl.init()
+    devicectrl.save_device_state = counting_save
+
+    print("{0:>8} | {1:>10} {2:>6} {3:>6} | {4:>10} {5:>6} {6:>6}".format(
+        "members", "clicks ms", "gpio", "saves", "scene ms", "gpio", "saves"))
+
+    members = 1
+    while members <= TOTAL_DEVICES:
+        state = True
+
+        saves = 0
+        t0 = time.perf_counter()
+        for _ in range(ROUNDS):
+            for d in range(members):
+                devicectrl.set_device_onoff(d, state)
+            state = not state
+        clicks_ms = (time.perf_counter() - t0) * 1000 / ROUNDS
+        clicks_saves = saves / ROUNDS
+
+        saves = 0
+        writes = hostsim.mem32.writes
+        t0 = time.perf_counter()
+        for _ in range(ROUNDS):
+            devicectrl.set_devices_onoff([[d, state] for d in range(members)])
+            state = not state
+        scene_ms = (time.perf_counter() - t0) * 1000 / ROUNDS
+        scene_gpio = (hostsim.mem32.writes - writes) / ROUNDS
+        scene_saves = saves / ROUNDS
+
+        print("{0:>8} | {1:>10.3f} {2:>6} {3:>6.0f} | {4:>10.3f} {5:>6.0f} {6:>6.0f}".format(
+            members, clicks_ms, members, clicks_saves, scene_ms, scene_gpio, scene_saves))
+        members *= 2
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
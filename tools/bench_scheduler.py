@@ -0,0 +1,159 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Timer wheel benchmark (host, virtual clock).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Measures timer wheel insert/cancel cost (new_timer()/drop()) and per
+    main loop poll() cost with growing number of pending timers. Main loop
+    is simulated with a virtual clock advancing 10 ms per iteration.
+    add_timer()/cancel() (user commands) add one save to the wheel cost.,
+    a timer added is checked to be in schedule.bin when the call returns.
+    Per device timer counts (has_timer()) are checked against the timers.
+    Schedule saves are part of the poll() numbers (checkpoints, at most
+    one per SCHEDULE_SAVE_MS)., saves and KB written in the simulated
+    time are printed, with the time of one save.
+    Last, schedule.bin is cut short at every length (power loss during a
+    save) and loaded: boot must not fail and the file must be reported
+    as errors.ERR_FILE.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_scheduler.py
+
+-------------------------------------------------------------------------------
+"""
+import io
+import os
+import time
+import random
+import tempfile
+import contextlib
+
+import hostsim
+hostsim.install()
+
+import errors
+import scheduler
+
+LOOP_MS        = 10                 # main loop period
+SIMULATED_MS   = 10 * 60 * 1000     # 10 minutes of main loop
+MAX_DELAY_MS   = 6 * 3600 * 1000    # timers spread over 6 hours
+
+fired = 0
+saves = [0, 0]
+save_schedules = scheduler.save_schedules
+
+def counting_save():
+    saves[0] += 1
+    save_schedules()
+    saves[1] += os.path.getsize(scheduler.schedule_cfgfile)
+
+def count_action(deviceid, state):
+    global fired
+    fired += 1
+
+
+def run(pending):
+    global fired
+    rnd = random.Random(pending)
+
+    scheduler.init(count_action)
+    scheduler.last_tick_ms = 0
+
+    t0 = time.perf_counter()
+    ids = [scheduler.new_timer(i % 64, i & 1, scheduler.SCHEDULE_ONCE, rnd.randint(1000, MAX_DELAY_MS), 0)
+           for i in range(pending)]
+    insert_us = (time.perf_counter() - t0) * 1e6 / max(pending, 1)
+
+    # One save of all pending timers., measured on its own.
+    t0 = time.perf_counter()
+    scheduler.save_schedules()
+    save_us = (time.perf_counter() - t0) * 1e6
+
+    # Saves from here on are checkpoints in poll(), counted in its time.,
+    scheduler.save_schedules = counting_save
+    saves[0] = saves[1] = 0
+
+    fired = 0
+    worst = 0.0
+    polls = 0
+    t0 = time.perf_counter()
+    now = scheduler.SCHEDULER_TICK_MS
+    while now < SIMULATED_MS:
+        now += LOOP_MS
+        p0 = time.perf_counter()
+        scheduler.poll(now)
+        worst = max(worst, time.perf_counter() - p0)
+        polls += 1
+    poll_us = (time.perf_counter() - t0) * 1e6 / polls
+
+    t0 = time.perf_counter()
+    for timerid in ids[: pending // 2]:
+        scheduler.drop(timerid)
+    cancel_us = (time.perf_counter() - t0) * 1e6 / max(pending // 2, 1)
+
+    scheduler.save_schedules = save_schedules
+    timed = set(entry[1] for entry in scheduler.timers.values())
+    assert all(scheduler.has_timer(d) == (d in timed) for d in range(64)), "per device timer count"
+
+    print("{0:>8} | {1:>9.2f} {2:>9.2f} | {3:>9.2f} {4:>10.1f} | {5:>6} | {6:>5} {7:>8.1f} | {8:>9.0f}".format(
+        pending, insert_us, cancel_us, poll_us, worst * 1e6, fired, saves[0], saves[1] / 1024.0, save_us))
+
+
+def main():
+    # schedule.bin is written to current directory, keep it out of the tree.
+    os.chdir(tempfile.mkdtemp())
+
+    print("{0:>8} | {1:>9} {2:>9} | {3:>9} {4:>10} | {5:>6} | {6:>5} {7:>8} | {8:>9}".format(
+        "pending", "insert us", "cancel us", "poll us", "worst us", "fired", "saves", "saved KB", "save us"))
+    for pending in (0, 100, 1000, 5000, 20000):
+        run(pending)
+    print("{0} min of main loop every {1} ms, saves included in poll us (checkpoint every {2} s)".format(
+        SIMULATED_MS // 60000, LOOP_MS, scheduler.SCHEDULE_SAVE_MS // 1000))
+    print("add_timer()/cancel(): insert/cancel us + one save (save us)")
+
+    # Timer given to the user is in the file when add_timer() returns.,
+    scheduler.add_timer(70, True, MAX_DELAY_MS)
+    scheduler.init(count_action)
+    assert scheduler.has_timer(70) and 1 == len(scheduler.get_timed_devices() & {70})
+    scheduler.cancel(min(t for t in scheduler.timers if scheduler.timers[t][1] == 70))
+    scheduler.init(count_action)
+    assert not scheduler.has_timer(70)
+    print("add_timer()/cancel(): saved before returning, restored after power loss")
+
+    # Truncated schedule.bin (power loss while writing) must not stop boot.,
+    os.remove(scheduler.schedule_cfgfile)
+    scheduler.init(count_action)
+    for i in range(3):
+        scheduler.add_timer(i, True, 60000)
+    scheduler.flush()
+    with open(scheduler.schedule_cfgfile, "rb") as f:
+        data = f.read()
+    for cut in range(len(data)):
+        with open(scheduler.schedule_cfgfile, "wb") as f:
+            f.write(data[:cut])
+        errors.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scheduler.init(count_action)
+        assert 0 == len(scheduler.timers), "timers loaded from {0} bytes".format(cut)
+        assert 1 == errors.get_count(errors.ERR_FILE), "not reported, {0} bytes".format(cut)
+    with open(scheduler.schedule_cfgfile, "wb") as f:
+        f.write(data)
+    scheduler.init(count_action)
+    assert 3 == len(scheduler.timers)
+    print("schedule.bin cut at 0..{0} bytes: ignored and reported, boot ok".format(len(data) - 1))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
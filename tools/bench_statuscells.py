@@ -0,0 +1,99 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Status icon update benchmark (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Counts I2C frames, LCD commands and data writes for:
+      - one device toggle (ON/OFF icon redraw),
+      - redraw of all visible icons after a scene change,
+    with the previous per character icon drawing (move_to + putchar per
+    cell) and with display.show_on_off_charset()/update_status_cells().
+    An HD44780 model checks both leave the same characters on screen.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_statuscells.py [--rows R --cols C]
+
+-------------------------------------------------------------------------------
+"""
+import argparse
+
+import hostsim
+hostsim.install()
+
+import hd44780
+
+
+def old_icon(display, x, y, show_on):
+    # Icon drawing before status cells: cursor move + putchar per cell.,
+    start = 0 if show_on else 2
+    for a in range(2):
+        display.lcd.move_to(a + x, y)
+        display.lcd.putchar(chr(a + start))
+
+
+def measure(model, fn):
+    model.reset_counters()
+    fn()
+    return model.frames, model.commands, model.data_writes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type = int, default = 2)
+    parser.add_argument("--cols", type = int, default = 16)
+    args = parser.parse_args()
+
+    import proj_defines
+    proj_defines.I2C_DISPLAY_NUM_ROWS = args.rows
+    proj_defines.I2C_DISPLAY_NUM_COLS = args.cols
+    model = hd44780.attach(args.rows, args.cols)
+    import display
+    display.init()
+    # Load icon glyphs first (ON -> slots 0-1, OFF -> 2-3, as old_icon()
+    # assumes), so measured toggles find them resident.
+    display.show_on_off_charset(0, 0, True)
+    display.show_on_off_charset(0, 0, False)
+    display.clear()
+
+    x = args.cols - 2
+    states = [bool(row & 1) for row in range(args.rows)]
+    print("{0}x{1} LCD, icon at column {2}".format(args.cols, args.rows, x))
+    print("{0:<24} | {1:>7} {2:>9} {3:>6} | {4:>7} {5:>9} {6:>6}".format(
+        "", "frames", "commands", "data", "frames", "commands", "data"))
+    print("{0:<24} | {1:^24} | {2:^24}".format("", "before", "after"))
+
+    results = []
+    before = measure(model, lambda: old_icon(display, x, 0, True))
+    screen = model.text()
+    after = measure(model, lambda: display.show_on_off_charset(x, 0, True))
+    assert model.text() == screen
+    results.append(("toggle (1 icon)", before, after))
+
+    before = measure(model, lambda: [old_icon(display, x, y, states[y]) for y in range(args.rows)])
+    screen = model.text()
+    display.clear()
+    after = measure(model, lambda: display.update_status_cells([[x, y, states[y]] for y in range(args.rows)]))
+    after_screen = model.text()
+    # Only icon cells are compared, clear() above wiped the rest.,
+    assert [line[x:x + 2] for line in after_screen.split("\n")] == [line[x:x + 2] for line in screen.split("\n")]
+    results.append(("scene ({0} icons)".format(args.rows), before, after))
+
+    for name, before, after in results:
+        print("{0:<24} | {1:>7} {2:>9} {3:>6} | {4:>7} {5:>9} {6:>6}".format(name, *(before + after)))
+    print(model.text())
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,208 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Cold vs warm boot, time to relay outputs restored (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Boots the application in a fresh host process per boot, like a reset.
+    Watchdog scratch registers (hostsim.mem32) are carried from one boot to
+    the next, except on power loss:
+      crash  -> scratch kept, next boot is warm (watchdog.py restores the
+                outputs at import of main.py)
+      power  -> states committed (power fail monitor), scratch cleared,
+                next boot is cold (devicestate.json, init_system())
+    Saves are deferred in each boot, so devicestate.json is older than the
+    relays at a crash and the warm boot must take states from scratch.
+    Each boot checks that relay outputs are back in their last levels and
+    that device states match, then switches random devices and ends.
+    Prints per boot type the time from start to outputs restored, board
+    sleeps in it (LCD init, greeting) and files opened before.
+
+    Host times are CPU times of CPython., on the board the warm path is a
+    few register reads and Pin() calls, the cold path is module imports,
+    display init and JSON parsing. Board numbers: tools/startup_report.py
+    (boot_outputs_us, boot_warm).
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/bench_warmboot.py [--boots N] [--devices N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import builtins
+import tempfile
+import subprocess
+
+import hostsim
+
+
+def child(args):
+    hostsim.install()
+    import hd44780
+    hd44780.attach()
+    os.chdir(args.dir)
+    scratch = os.path.join(args.dir, "scratch.json")
+    if os.path.exists(scratch):
+        with open(scratch) as f:
+            hostsim.mem32.regs.update({int(a): v for a, v in json.load(f).items()})
+    with open(os.path.join(args.dir, "relays.json")) as f:
+        expected = json.load(f)
+
+    # Files opened and board sleeps until outputs are restored.,
+    opened = []
+    real_open = builtins.open
+    def counting_open(name, *a, **k):
+        opened.append(name)
+        return real_open(name, *a, **k)
+    builtins.open = counting_open
+
+    marks = {}
+    import watchdog
+    restore = watchdog.restore
+    def timed_restore():
+        warm = restore()
+        if warm:
+            marks["outputs"] = (hostsim.ticks_us(), hostsim.virtual_us, len(opened))
+        return warm
+    watchdog.restore = timed_restore
+
+    start = (hostsim.ticks_us(), hostsim.virtual_us)
+    sys.argv = [sys.argv[0]]
+    import main
+    import proj_defines
+    import deviceconfig
+    import devicectrl
+    import telemetry
+
+    levels_at_import = {g: hostsim.Pin.levels.get(int(g)) for g in expected["gpios"]}
+
+    def load_config():
+        # devices.json has int keys (MicroPython ujson only), devices come
+        # from hostsim., states are read from devicestate.json.
+        real_open("devices.json").read()
+        hostsim.load_devices(args.devices)
+        with open(proj_defines.devicestatus_cfgfile) as f:
+            deviceconfig.devicestatus.update(json.load(f))
+    deviceconfig.init = load_config
+
+    boot_mark = telemetry.boot_mark
+    def timed_mark(counter, at = None):
+        boot_mark(counter, at)
+        if counter == telemetry.CNT_BOOT_OUTPUTS_US and "outputs" not in marks:
+            marks["outputs"] = (hostsim.ticks_us(), hostsim.virtual_us, len(opened))
+    telemetry.boot_mark = timed_mark
+
+    main.init_system()
+    devicectrl.defer_saves(proj_defines.STATE_SAVE_DELAY_MS)
+    builtins.open = real_open
+
+    status = deviceconfig.get_device_status()
+    gpios = devicectrl.devicegpios
+    ok = True
+    if watchdog.warm:
+        ok = all(levels_at_import[str(g)] == expected["gpios"][str(g)] for g in gpios)
+    ok = ok and all(hostsim.Pin.levels[g] == expected["gpios"][str(g)] for g in gpios)
+    ok = ok and all(status[str(d)] == expected["status"][str(d)] for d in range(args.devices))
+
+    # Run: random switching, saves deferred (not written before the end).,
+    rnd = random.Random(args.seed)
+    for n in range(8):
+        d = rnd.randrange(args.devices)
+        devicectrl.set_device_onoff(d, not status[str(d)])
+    if "power" == args.end:
+        devicectrl.flush_device_state()
+
+    with open(os.path.join(args.dir, "relays.json"), "w") as f:
+        json.dump({"gpios": {str(g): hostsim.Pin.levels[g] for g in gpios},
+                   "status": {str(d): status[str(d)] for d in range(args.devices)}}, f)
+    if "crash" == args.end:
+        with open(scratch, "w") as f:
+            json.dump({str(a): v for a, v in hostsim.mem32.regs.items()
+                       if watchdog.SCRATCH <= a < watchdog.SCRATCH + 16}, f)
+    elif os.path.exists(scratch):
+        os.remove(scratch)
+
+    at, sleeps, files = marks["outputs"]
+    print(json.dumps({"warm": watchdog.warm, "ok": ok, "us": at - start[0],
+                      "sleep_us": sleeps - start[1], "files": files}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 12)
+    parser.add_argument("--boots", type = int, default = 24)
+    parser.add_argument("--seed", type = int, default = 1)
+    # Child process (one boot).,
+    parser.add_argument("--dir")
+    parser.add_argument("--end", choices = ("crash", "power"))
+    args = parser.parse_args()
+    if args.dir:
+        child(args)
+        return
+
+    work = tempfile.mkdtemp()
+    hostsim.install()
+    hostsim.load_devices(args.devices)
+    import deviceconfig
+    import proj_defines
+    status = deviceconfig.get_device_status()
+    with open(os.path.join(work, proj_defines.devicestatus_cfgfile), "w") as f:
+        json.dump(status, f)
+    with open(os.path.join(work, "devices.json"), "w") as f:
+        f.write(open(os.path.join(hostsim.PROJECT_DIR, "devices.json")).read())
+    gpios = {str(16 + (d % 13)): 0 for d in range(args.devices)}
+    with open(os.path.join(work, "relays.json"), "w") as f:
+        json.dump({"gpios": gpios, "status": {str(d): 0 for d in range(args.devices)}}, f)
+
+    rnd = random.Random(args.seed)
+    results = {"cold": [], "warm": []}
+    failures = 0
+    for boot in range(args.boots):
+        # Mostly crashes (watchdog), every 4th boot ends with power loss.,
+        end = "power" if 3 == boot % 4 else "crash"
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--dir", work, "--end", end,
+                              "--devices", str(args.devices), "--seed", str(rnd.randrange(1 << 30))],
+                             capture_output = True, text = True, cwd = work)
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if out.returncode != 0 or not lines:
+            print(out.stdout + out.stderr)
+            raise SystemExit("boot {0} failed".format(boot))
+        r = json.loads(lines[-1])
+        results["warm" if r["warm"] else "cold"].append(r)
+        if not r["ok"]:
+            failures += 1
+
+    print("{0} devices, {1} boots (every 4th ends with power loss), saves deferred".format(
+        args.devices, args.boots))
+    print("{0:>5} | {1:>5} | {2:>14} | {3:>16} | {4:>12}".format(
+        "boot", "count", "to outputs us", "board sleeps ms", "files opened"))
+    for kind, rows in results.items():
+        if not rows:
+            continue
+        print("{0:>5} | {1:>5} | {2:>14.0f} | {3:>16.1f} | {4:>12.1f}".format(
+            kind, len(rows), sum(r["us"] for r in rows) / len(rows),
+            sum(r["sleep_us"] for r in rows) / len(rows) / 1000.0,
+            sum(r["files"] for r in rows) / len(rows)))
+    print("relay outputs and device states after each boot: {0}".format(
+        "OK" if 0 == failures else "{0} boots wrong".format(failures)))
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,121 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Precompiled (.mpy) and frozen module build (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Cross compiles all project modules with mpy-cross, so that the board
+    doesn't compile them from source at every boot (time and heap before
+    relays are restored).
+    Output, <out>/board is the board's file system root:
+      board/main.py      -> boot loader (loader.py)
+      board/mpy/*.mpy    -> modules, main.py as app.mpy
+      board/mpy/BUILD    -> .mpy version stamp checked by the loader
+      board/*.py         -> sources, main.py as app.py (fallback if /mpy
+                            doesn't match the firmware), unless --no-source
+    --manifest also writes <out>/frozen/manifest.py to freeze the modules
+    into a firmware build (FROZEN_MANIFEST=...), upload only main.py
+    (loader) and the json files then.
+
+    Modules use @micropython.viper/native, they are compiled for armv6m
+    (RP2040, Cortex-M0+).
+    Startup times of the three ways are compared on the board, see
+    tools/startup_report.py.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC, mpy-cross matching the firmware
+      (pip install mpy-cross==1.24.1.post3 for MicroPython v1.24.1).
+
+Usage:
+    python tools/build_mpy.py [--out build] [--mpy-cross PATH] [--manifest]
+    mpremote cp -r build/board/. :    # plus devices.json, devicestate.json
+
+-------------------------------------------------------------------------------
+"""
+import os
+import re
+import shutil
+import argparse
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Project modules that are not part of the application on the board.,
+NOT_MODULES = ("loader.py",)
+
+
+def modules():
+    # (file name in project, module name on board)., main.py is the app.
+    names = sorted(f for f in os.listdir(PROJECT_DIR) if f.endswith(".py") and f not in NOT_MODULES)
+    return [(f, "app" if "main.py" == f else f[:-3]) for f in names]
+
+
+def mpy_version(mpy_cross):
+    # "MicroPython v1.24.1 on ...; mpy-cross emitting mpy v6.3" -> (6, "v1.24.1")
+    out = subprocess.run([mpy_cross, "--version"], capture_output = True, text = True, check = True).stdout
+    mpy = re.search(r"mpy v(\d+)", out)
+    firmware = re.search(r"MicroPython (v[\w.\-]+)", out)
+    if mpy is None:
+        raise SystemExit("unknown mpy-cross version: " + out.strip())
+    return int(mpy.group(1)), firmware.group(1) if firmware else "?"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default = os.path.join(PROJECT_DIR, "build"))
+    parser.add_argument("--mpy-cross", default = "mpy-cross")
+    parser.add_argument("--march", default = "armv6m")
+    parser.add_argument("--manifest", action = "store_true")
+    parser.add_argument("--no-source", action = "store_true")
+    args = parser.parse_args()
+
+    version, firmware = mpy_version(args.mpy_cross)
+    board = os.path.join(args.out, "board")
+    shutil.rmtree(board, ignore_errors = True)
+    os.makedirs(os.path.join(board, "mpy"))
+    shutil.copy(os.path.join(PROJECT_DIR, "loader.py"), os.path.join(board, "main.py"))
+
+    rows = []
+    for filename, name in modules():
+        source = os.path.join(PROJECT_DIR, filename)
+        target = os.path.join(board, "mpy", name + ".mpy")
+        # -s sets the name in tracebacks, app.py for main.py.,
+        subprocess.run([args.mpy_cross, "-march=" + args.march, "-s", name + ".py",
+                        "-o", target, source], check = True)
+        if not args.no_source:
+            shutil.copy(source, os.path.join(board, name + ".py"))
+        rows.append((name, os.path.getsize(source), os.path.getsize(target)))
+    with open(os.path.join(board, "mpy", "BUILD"), "w") as f:
+        f.write("{0} {1}\n".format(version, firmware))
+
+    if args.manifest:
+        frozen = os.path.join(args.out, "frozen")
+        shutil.rmtree(frozen, ignore_errors = True)
+        os.makedirs(frozen)
+        lines = ['include("$(PORT_DIR)/boards/manifest.py")']
+        for filename, name in modules():
+            shutil.copy(os.path.join(PROJECT_DIR, filename), os.path.join(frozen, name + ".py"))
+            lines.append('module("{0}.py", base_path = "{1}")'.format(name, frozen))
+        with open(os.path.join(frozen, "manifest.py"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    print("mpy v{0} ({1}), {2}".format(version, firmware, args.march))
+    print("{0:<16} {1:>8} {2:>8}".format("module", "source", ".mpy"))
+    for name, src, mpy in rows:
+        print("{0:<16} {1:>8} {2:>8}".format(name, src, mpy))
+    print("{0:<16} {1:>8} {2:>8}".format("total", sum(r[1] for r in rows), sum(r[2] for r in rows)))
+    print("board files in " + board)
+    if args.manifest:
+        print("frozen manifest in " + os.path.join(args.out, "frozen", "manifest.py"))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
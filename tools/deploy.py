@@ -0,0 +1,405 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Delta deployment to one or many boards (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Uploads only changed files to boards over the MicroPython raw REPL:
+      1. Local files are hashed (sha256): project sources, or a build
+         directory from tools/build_mpy.py (--build build/board).
+      2. The board hashes the same paths (hashlib on the board) in one
+         raw REPL call, missing files report "-".
+      3. Changed files are sent base64 encoded, many files and chunks per
+         raw REPL call (BATCH_BYTES), written to <path>.tmp and renamed,
+         so a board reset during upload doesn't leave half files.
+      4. Uploaded files are hashed again on the board and compared.
+    Boards are deployed in parallel (one thread per --port). Bytes on the
+    wire (both ways), file bytes uploaded and wall time are printed per
+    board.
+
+    devicestate.json holds the board's device states, it is uploaded only
+    if missing. devices.json too, unless --config.
+
+    --fake N runs against N simulated boards instead: a raw REPL served on
+    a pty by a child process each, running the received code with CPython
+    in a temporary directory (board file system). It deploys, deploys
+    again (nothing to do), changes and removes files on the boards and
+    deploys once more, checking board files after every run.
+
+Supported Platforms:
+    - CPython 3.8+ on Linux/macOS host PC (pty, termios).
+
+Usage:
+    python tools/deploy.py --port /dev/ttyACM0 [--port /dev/ttyACM1 ...]
+    python tools/deploy.py --port /dev/ttyACM0 --build build/board --reset
+    python tools/deploy.py --fake 4 [--fake-rate BYTES_PER_S]
+
+-------------------------------------------------------------------------------
+"""
+import io
+import os
+import sys
+import time
+import tty
+import base64
+import select
+import shutil
+import hashlib
+import argparse
+import tempfile
+import traceback
+import contextlib
+import subprocess
+
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Board side of the project, main.py is the application.,
+NOT_DEPLOYED = ("loader.py",)
+CONFIG_FILES = ("devices.json", "devicestate.json")
+
+# File bytes per f.write() and per raw REPL call.,
+CHUNK_BYTES = 1024
+BATCH_BYTES = 8192
+# Code is written to raw REPL in pieces, USB-CDC receive buffer is small.,
+WRITE_PIECE = 256
+
+# Hashes files in PATHS on the board, one line per path.,
+HASH_CODE = """
+import hashlib, binascii
+def _h(p):
+    try:
+        f = open(p, "rb")
+    except OSError:
+        return "-"
+    d = hashlib.sha256()
+    b = bytearray(512)
+    while True:
+        n = f.readinto(b)
+        if not n:
+            break
+        d.update(memoryview(b)[:n])
+    f.close()
+    return binascii.hexlify(d.digest()).decode()
+for _p in PATHS:
+    print(_h(_p))
+"""
+
+
+class DeployError(Exception):
+    pass
+
+
+class RawRepl:
+    # MicroPython raw REPL client, counts bytes both ways.,
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(self.fd)
+        self.rx = b""
+        self.tx_bytes = 0
+        self.rx_bytes = 0
+
+    def close(self):
+        os.close(self.fd)
+
+    def write(self, data):
+        self.tx_bytes += len(data)
+        while data:
+            data = data[os.write(self.fd, data):]
+
+    def read_until(self, ending, timeout = 10.0):
+        while ending not in self.rx:
+            if not select.select([self.fd], [], [], timeout)[0]:
+                raise DeployError("timeout waiting for {0!r}".format(ending))
+            data = os.read(self.fd, 4096)
+            self.rx_bytes += len(data)
+            self.rx += data
+        data, self.rx = self.rx.split(ending, 1)
+        return data
+
+    def drain(self, quiet = 0.2):
+        while select.select([self.fd], [], [], quiet)[0]:
+            data = os.read(self.fd, 4096)
+            if not data:
+                break
+            self.rx_bytes += len(data)
+        self.rx = b""
+
+    def enter(self):
+        # Stop main.py (Ctrl-C twice), then raw REPL (Ctrl-A).,
+        self.write(b"\r\x03\x03")
+        self.drain()
+        self.write(b"\r\x01")
+        self.read_until(b"raw REPL; CTRL-B to exit\r\n>")
+
+    def leave(self, reset = False):
+        # Back to friendly REPL (Ctrl-B), soft reset runs main.py (Ctrl-D).,
+        self.write(b"\r\x02")
+        if reset:
+            self.write(b"\x04")
+
+    def run(self, code):
+        data = code.encode()
+        for i in range(0, len(data), WRITE_PIECE):
+            self.write(data[i:i + WRITE_PIECE])
+        self.write(b"\x04")
+        self.read_until(b"OK")
+        out = self.read_until(b"\x04")
+        err = self.read_until(b"\x04")
+        self.read_until(b">")
+        if err:
+            raise DeployError(err.decode(errors = "replace").strip())
+        return out.decode()
+
+
+def local_files(build, config):
+    # {board path: (local path, upload only if missing)}.,
+    files = {}
+    if build:
+        for root, dirs, names in os.walk(build):
+            for name in names:
+                local = os.path.join(root, name)
+                files[os.path.relpath(local, build).replace(os.sep, "/")] = (local, False)
+    else:
+        for name in sorted(os.listdir(PROJECT_DIR)):
+            if name.endswith(".py") and name not in NOT_DEPLOYED:
+                files[name] = (os.path.join(PROJECT_DIR, name), False)
+    for name in CONFIG_FILES:
+        local = os.path.join(PROJECT_DIR, name)
+        if os.path.exists(local) and name not in files:
+            files[name] = (local, not (config and "devices.json" == name))
+    return files
+
+
+def sha256_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def board_hashes(repl, paths):
+    out = repl.run("PATHS = {0!r}\n".format(paths) + HASH_CODE).split()
+    if len(out) != len(paths):
+        raise DeployError("hash listing incomplete")
+    return dict(zip(paths, out))
+
+
+def upload_calls(uploads):
+    # Raw REPL calls (code strings), files split in CHUNK_BYTES writes and
+    # calls filled up to BATCH_BYTES file bytes. Open file stays in 'f'
+    # between calls (raw REPL keeps globals).
+    dirs = sorted(set("/".join(p.split("/")[:n]) for p, local in uploads
+                      for n in range(1, p.count("/") + 1)))
+    calls = []
+    lines = ["import binascii, os"]
+    for d in dirs:
+        lines.append("try:\n    os.mkdir({0!r})\nexcept OSError:\n    pass".format(d))
+    size = 0
+    for path, local in uploads:
+        with open(local, "rb") as f:
+            data = f.read()
+        lines.append("f = open({0!r}, 'wb')".format(path + ".tmp"))
+        for i in range(0, len(data), CHUNK_BYTES):
+            if size >= BATCH_BYTES:
+                calls.append("\n".join(lines))
+                lines = []
+                size = 0
+            lines.append("f.write(binascii.a2b_base64({0!r}))".format(
+                base64.b64encode(data[i:i + CHUNK_BYTES]).decode()))
+            size += min(CHUNK_BYTES, len(data) - i)
+        lines.append("f.close()")
+        lines.append("os.rename({0!r}, {1!r})".format(path + ".tmp", path))
+    calls.append("\n".join(lines))
+    return calls
+
+
+def deploy(port, files, reset = False):
+    # Deploys to one board, returns report dict.,
+    t0 = time.perf_counter()
+    repl = RawRepl(port)
+    try:
+        repl.enter()
+        paths = sorted(files)
+        remote = board_hashes(repl, paths)
+        uploads = []
+        for path in paths:
+            local, only_missing = files[path]
+            if "-" == remote[path] or (not only_missing and remote[path] != sha256_file(local)):
+                uploads.append((path, local))
+        if uploads:
+            for code in upload_calls(uploads):
+                repl.run(code)
+            check = board_hashes(repl, [p for p, local in uploads])
+            for path, local in uploads:
+                if check[path] != sha256_file(local):
+                    raise DeployError("{0} differs after upload".format(path))
+        repl.leave(reset)
+    finally:
+        repl.close()
+    return {
+        "port": port, "files": len(files), "uploaded": len(uploads),
+        "file_bytes": sum(os.path.getsize(local) for p, local in uploads),
+        "tx": repl.tx_bytes, "rx": repl.rx_bytes, "seconds": time.perf_counter() - t0,
+    }
+
+
+def deploy_all(ports, files, reset = False):
+    # One thread per board, errors are reported per board.,
+    def one(port):
+        try:
+            return deploy(port, files, reset)
+        except (DeployError, OSError) as e:
+            return {"port": port, "error": str(e)}
+    with ThreadPoolExecutor(max_workers = max(1, len(ports))) as pool:
+        return list(pool.map(one, ports))
+
+
+def print_reports(title, reports):
+    print(title)
+    print("  {0:<16} {1:>6} {2:>9} {3:>11} {4:>9} {5:>8} {6:>8}".format(
+        "board", "files", "uploaded", "file bytes", "wire tx", "wire rx", "seconds"))
+    for r in reports:
+        if "error" in r:
+            print("  {0:<16} FAILED: {1}".format(r["port"], r["error"]))
+            continue
+        print("  {0:<16} {1:>6} {2:>9} {3:>11} {4:>9} {5:>8} {6:>8.2f}".format(
+            r["port"], r["files"], r["uploaded"], r["file_bytes"],
+            r["tx"], r["rx"], r["seconds"]))
+
+
+"""
+-------------------------------------------------------------------------------
+ Simulated board (--fake)
+-------------------------------------------------------------------------------
+"""
+
+def serve_fake_board(root, rate):
+    # Raw REPL on a pty, code runs with cwd = root (board file system).,
+    # Runs in its own process, prints the pty path and serves forever.
+    os.chdir(root)
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    print(os.ttyname(slave), flush = True)
+    scope = {}
+    raw = False
+    code = b""
+
+    def send(data):
+        if rate:
+            time.sleep(len(data) / rate)
+        os.write(master, data)
+
+    while True:
+        data = os.read(master, 4096)
+        if rate:
+            time.sleep(len(data) / rate)
+        for c in data:
+            if not raw:
+                if 0x03 == c:
+                    send(b"\r\nKeyboardInterrupt: \r\n>>> ")
+                elif 0x01 == c:
+                    raw = True
+                    code = b""
+                    send(b"\r\nraw REPL; CTRL-B to exit\r\n>")
+            elif 0x02 == c:
+                raw = False
+                send(b"\r\n>>> ")
+            elif 0x03 == c:
+                code = b""
+            elif 0x04 == c:
+                out = io.StringIO()
+                err = ""
+                with contextlib.redirect_stdout(out):
+                    try:
+                        exec(code.decode(), scope)
+                    except Exception:
+                        err = traceback.format_exc()
+                send(b"OK" + out.getvalue().replace("\n", "\r\n").encode() + b"\x04" + err.encode() + b"\x04>")
+                code = b""
+            else:
+                code += bytes([c])
+
+
+def start_fake_board(root, rate):
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve-fake", root,
+                             "--fake-rate", str(rate)], stdout = subprocess.PIPE, text = True)
+    return proc, proc.stdout.readline().strip()
+
+
+def check_boards(roots, files):
+    for root in roots:
+        for path, (local, only_missing) in files.items():
+            board = os.path.join(root, path)
+            assert os.path.exists(board), "{0} missing on board".format(path)
+            if not only_missing:
+                assert sha256_file(board) == sha256_file(local), "{0} differs on board".format(path)
+        assert not [n for n in os.listdir(root) if n.endswith(".tmp")], "temporary file left"
+
+
+def fake_run(count, rate, files):
+    roots = [tempfile.mkdtemp(prefix = "board{0}-".format(n)) for n in range(count)]
+    boards = [start_fake_board(root, rate) for root in roots]
+    ports = [port for proc, port in boards]
+    try:
+        reports = deploy_all(ports, files)
+        print_reports("1. empty boards", reports)
+        check_boards(roots, files)
+        assert all(r.get("uploaded") == len(files) for r in reports)
+
+        reports = deploy_all(ports, files)
+        print_reports("2. same files again", reports)
+        assert all(0 == r.get("uploaded") for r in reports)
+
+        # Drift: first board has an old file, last board lost one.,
+        names = sorted(p for p in files if not files[p][1])
+        with open(os.path.join(roots[0], names[0]), "ab") as f:
+            f.write(b"# old\n")
+        os.remove(os.path.join(roots[-1], names[-1]))
+        reports = deploy_all(ports, files)
+        print_reports("3. one file changed on first board, one removed on last board", reports)
+        check_boards(roots, files)
+        assert 1 == reports[0]["uploaded"] and 1 == reports[-1]["uploaded"]
+        print("board files checked after every run")
+    finally:
+        for proc, port in boards:
+            proc.kill()
+        for root in roots:
+            shutil.rmtree(root, ignore_errors = True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", action = "append", default = [])
+    parser.add_argument("--build", help = "deploy this directory (tools/build_mpy.py output)")
+    parser.add_argument("--config", action = "store_true", help = "update devices.json too")
+    parser.add_argument("--reset", action = "store_true", help = "soft reset boards after deploy")
+    parser.add_argument("--fake", type = int, default = 0)
+    parser.add_argument("--fake-rate", type = int, default = 0, help = "simulated link bytes/s, 0 -> no limit")
+    parser.add_argument("--serve-fake", help = argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_fake:
+        serve_fake_board(args.serve_fake, args.fake_rate)
+        return
+    files = local_files(args.build, args.config)
+    if args.fake:
+        fake_run(args.fake, args.fake_rate, files)
+        return
+    if not args.port:
+        parser.error("--port or --fake needed")
+    reports = deploy_all(args.port, files, args.reset)
+    print_reports("deployed {0} files".format(len(files)), reports)
+    if any("error" in r for r in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,354 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Fault injection, non-fatal errors and degraded mode (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Injects one fault at a time into each module while main.py's loop
+    passes run (main_pass(), with the exception policy of serve()):
+      display     - cells out of screen, LCD not ACKing during a page draw
+      main        - page out of range, exception in a loop pass, and one
+                    in every pass (board reset after ERROR_RESET_COUNT)
+      devicectrl  - device ids out of range, single and bulk
+      deviceconfig- group/scene members out of range, bad device name id
+      nvram       - FRAM/EEPROM not ACKing writes, memory missing at boot
+      rotary      - switch held (stuck) for twice WDT_TIMEOUT_MS: loop
+                    passes and watchdog feeds go on, one long press
+    After each fault serial "S" commands must still switch relays
+    (serialctl over a socket pair), the error must be in the errors.py
+    ring with its code, and recoverable errors must show the LCD notice,
+    which goes away after ERROR_NOTICE_MS. NVRAM writes that failed must
+    be in the memory once it answers again.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/fault_inject.py [--devices N]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import json
+import socket
+import argparse
+import tempfile
+import contextlib
+
+import hostsim
+hostsim.install()
+
+import hd44780
+import nvmem
+
+
+class Unplugged:
+    # I2C device that doesn't ACK., replaces a model while a fault lasts.
+    def write(self, buf):
+        raise OSError(5)
+
+    def read(self, n):
+        raise OSError(5)
+
+
+@contextlib.contextmanager
+def unplugged(addr):
+    dev = hostsim.I2C.devices.get(addr)
+    hostsim.I2C.devices[addr] = Unplugged()
+    try:
+        yield
+    finally:
+        if dev is None:
+            del hostsim.I2C.devices[addr]
+        else:
+            hostsim.I2C.devices[addr] = dev
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 12)
+    args = parser.parse_args()
+
+    import proj_defines
+    model = hd44780.attach()
+    import display
+    display.init()
+    hostsim.load_devices(args.devices)
+    os.chdir(tempfile.mkdtemp())
+    import deviceconfig
+    with open(proj_defines.devicestatus_cfgfile, "w") as f:
+        json.dump(deviceconfig.get_device_status(), f)
+    import devicectrl
+    import errors
+    import idle
+    import layout
+    import listview
+    import nvram
+    import profiler
+    import rotary
+    import scheduler
+    import serialctl
+    import telemetry
+    import watchdog
+    with contextlib.redirect_stdout(None):
+        devicectrl.init()
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    layout.init(args.devices)
+    rotary.init(args.devices)
+    scheduler.init(ui.handler_scheduled_event)
+    idle.init()
+    ui.IconDirty = [False] * layout.per_page
+    listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+    host, board = socket.socketpair()
+    host.setblocking(False)
+    serialctl.init(ui.refresh_device_icon, hostsim.FdPort(board.fileno()))
+    ui.remote = serialctl
+    errors.init(ui.show_error_notice, ui.redraw_screen)
+    ui.draw_page(0)
+    display.show_cursor(layout.cursor_x[0], layout.row[0])
+    display.finish()
+
+    seen = {"notice": False}
+
+    def passes(n):
+        # serve()'s loop., the display is kept awake.
+        for i in range(n):
+            idle.activity()
+            with contextlib.redirect_stdout(None), contextlib.redirect_stderr(None):
+                try:
+                    ui.main_pass()
+                    errors.pass_done()
+                except Exception as e:
+                    profiler.unwind()
+                    errors.handler_failed(e)
+            if "ERR:" in model.text():
+                seen["notice"] = True
+
+    reqid = [0]
+
+    def served():
+        # Relays still switched by serial commands, responses come back.,
+        status = deviceconfig.get_device_status()
+        for d in (0, args.devices // 2, args.devices - 1):
+            state = 1 - status[str(d)]
+            reqid[0] += 1
+            host.send("{0} S {1} {2}\n".format(reqid[0], d, state).encode())
+            passes(2)
+            reply = host.recv(4096).decode()
+            if "{0} OK {1} {2}".format(reqid[0], d, state) not in reply:
+                return False
+            if hostsim.Pin.levels[devicectrl.devicegpios[d]] != state:
+                return False
+        return True
+
+    def stored_states():
+        status = {proj_defines.numdevices: args.devices}
+        for d in range(args.devices):
+            status[str(d)] = 0
+        with contextlib.redirect_stdout(None):
+            nvram.init(status)
+        return [status[str(d)] for d in range(args.devices)]
+
+    def relay_states():
+        status = deviceconfig.get_device_status()
+        return [status[str(d)] for d in range(args.devices)]
+
+    # Faults: (module, fault, expected code, injection returning extra check).,
+    def bad_icon():
+        display.show_on_off_charset(99, 0, True)
+
+    def bad_cursor():
+        display.show_cursor(0, 9)
+
+    def bad_cell():
+        # Good cell is drawn, bad one skipped.,
+        before = model.codes(layout.row[1])
+        display.update_status_cells([[40, 0, True], [layout.icon_x[1], layout.row[1], True]])
+        return model.codes(layout.row[1]) != before
+
+    def lcd_nack():
+        with unplugged(proj_defines.I2C_ADDR):
+            ui.draw_page(listview.pages() - 1)
+            passes(3)
+        ui.draw_page(0)
+        display.finish()
+        return display.bank_page[display.bank] == 0
+
+    def bad_page():
+        ui.draw_page(listview.pages() + 3)
+
+    def pass_exception():
+        flush = ui.flush_device_icons
+        def broken():
+            ui.flush_device_icons = flush
+            raise ZeroDivisionError("injected")
+        ui.flush_device_icons = broken
+
+    def bad_device():
+        before = relay_states()
+        devicectrl.set_device_onoff(args.devices + 5, True)
+        devicectrl.set_device_onoff(-1, 1 - before[-1])
+        return relay_states() == before
+
+    def bad_bulk():
+        devicectrl.set_devices_onoff([[0, 1], [args.devices + 5, 1], [1, 1]])
+        return relay_states()[0:2] == [1, 1]
+
+    def bad_group():
+        info = deviceconfig.get_device_info()
+        info[proj_defines.groupstag] = {"G": [0, args.devices + 1]}
+        info[proj_defines.scenestag] = {"S": {"1": 1, str(args.devices + 2): 0}}
+        deviceconfig.load_groups_and_scenes()
+        return (deviceconfig.get_groups() == [["G", [0]]] and
+                deviceconfig.get_scenes() == [["S", [[1, 1]]]])
+
+    def bad_name():
+        return "" == deviceconfig.get_device_name(-5)
+
+    cases = [
+        ("display", "icon out of screen", errors.ERR_ARGUMENTS, bad_icon),
+        ("display", "cursor out of screen", errors.ERR_ARGUMENTS, bad_cursor),
+        ("display", "status cell out of screen", errors.ERR_ARGUMENTS, bad_cell),
+        ("display", "LCD NACK in page draw", errors.ERR_LCD, lcd_nack),
+        ("main", "page out of range", errors.ERR_PAGE, bad_page),
+        ("main", "exception in loop pass", errors.ERR_HANDLER, pass_exception),
+        ("devicectrl", "device id out of range", errors.ERR_DEVICE_ID, bad_device),
+        ("devicectrl", "bulk entry out of range", errors.ERR_DEVICE_ID, bad_bulk),
+        ("deviceconfig", "group/scene member", errors.ERR_CONFIG, bad_group),
+        ("deviceconfig", "device name id", errors.ERR_DEVICE_ID, bad_name),
+    ]
+
+    failures = 0
+    print("{0:<12} | {1:<26} | {2:<16} | {3:>6} | {4:>6} | {5:>5}".format(
+        "module", "fault", "logged", "relays", "notice", "check"))
+
+    def row(module, fault, code, check, warn = False):
+        nonlocal failures
+        logged = errors.get_count(code) > 0
+        ok_served = served()
+        notice = seen["notice"] or warn
+        if not warn:
+            # Notice goes away after ERROR_NOTICE_MS., one that failed to
+            # show (LCD fault) is followed by the handler error notice.
+            for i in range(3):
+                hostsim.advance_ms(proj_defines.ERROR_NOTICE_MS)
+                passes(3)
+                notice = notice or seen["notice"]
+                if "ERR:" not in model.text():
+                    break
+            notice = notice and "ERR:" not in model.text()
+        ok = logged and ok_served and notice and check is not False
+        failures += 0 if ok else 1
+        print("{0:<12} | {1:<26} | {2:<16} | {3:>6} | {4:>6} | {5:>5}".format(
+            module, fault, errors.ERR_NAMES[code] if logged else "-",
+            "OK" if ok_served else "FAIL", "-" if warn else ("OK" if notice else "FAIL"),
+            "FAIL" if check is False else "OK"))
+
+    for module, fault, code, inject in cases:
+        errors.reset()
+        seen["notice"] = False
+        with contextlib.redirect_stdout(None):
+            check = inject()
+            passes(3)
+        row(module, fault, code, check, errors.ERR_CONFIG == code or "name" in fault)
+
+    # Exception in every pass: board reset after ERROR_RESET_COUNT in a row.,
+    errors.reset()
+    flush = ui.flush_device_icons
+    def always():
+        raise ZeroDivisionError("injected")
+    ui.flush_device_icons = always
+    failed = 0
+    with contextlib.redirect_stdout(None), contextlib.redirect_stderr(None):
+        try:
+            passes(proj_defines.ERROR_RESET_COUNT * 2)
+        except ZeroDivisionError:
+            failed = errors.failed_passes
+    ui.flush_device_icons = flush
+    errors.reset()
+    ok = (failed == proj_defines.ERROR_RESET_COUNT)
+    failures += 0 if ok else 1
+    print("{0:<12} | {1:<26} | raised after {2} passes ({3})".format(
+        "main", "exception in every pass", failed, "OK" if ok else "FAIL"))
+
+    # FRAM/EEPROM: writes not ACKed for a while, then back., missing at boot.
+    hostsim.load_devices(args.devices)
+    for backend in ("fram", "eeprom"):
+        errors.reset()
+        seen["notice"] = False
+        mem = nvmem.attach(backend)
+        devicectrl.STATE_BACKEND = nvram.STATE_BACKEND = backend
+        with contextlib.redirect_stdout(None):
+            devicectrl.init()
+            with unplugged(proj_defines.NVRAM_I2C_ADDR):
+                ok_down = served()
+            # Pages left are written by nvram.poll() once it answers.,
+            for i in range(20):
+                hostsim.advance_ms(10)
+                passes(1)
+            check = ok_down and (stored_states() == relay_states())
+        row("nvram", backend + " NACK on save", errors.ERR_NVRAM, check)
+        del hostsim.I2C.devices[proj_defines.NVRAM_I2C_ADDR]
+
+    errors.reset()
+    seen["notice"] = False
+    devicectrl.STATE_BACKEND = nvram.STATE_BACKEND = "fram"
+    with contextlib.redirect_stdout(None), unplugged(proj_defines.NVRAM_I2C_ADDR):
+        devicectrl.init()
+        fallback = ("file" == devicectrl.STATE_BACKEND)
+        passes(3)
+    row("nvram", "memory missing at boot", errors.ERR_NVRAM, fallback)
+    devicectrl.STATE_BACKEND = nvram.STATE_BACKEND = "file"
+
+    # Switch held down (stuck or shorted knob): the loop must not wait for
+    # its release., watchdog fed, serial commands served, one long press.
+    presses = {proj_defines.ROTARY_BTN_PRESSED: 0, proj_defines.ROTARY_BTN_LONG_PRESSED: 0}
+    handlers = (ui.eventhanders, ui.quickhandlers)
+    saved = [dict(h) for h in handlers]
+    for h in handlers:
+        for event in presses:
+            h[event] = lambda deviceid, event = event: presses.__setitem__(event, presses[event] + 1)
+    watchdog.start()
+    passes(1)
+    wdt = watchdog.wdt
+    wdt.longest_ms = 0
+    hostsim.Pin.drive(proj_defines.ROTARY_ENCODER_SWITCH_PIN, 0)
+    held_at = hostsim.ticks_ms()
+    ok_served = None
+    while hostsim.ticks_ms() - held_at < 2 * proj_defines.WDT_TIMEOUT_MS:
+        passes(1)
+        # Serial commands once the switch is held past the watchdog timeout.,
+        if None == ok_served and hostsim.ticks_ms() - held_at > proj_defines.WDT_TIMEOUT_MS:
+            ok_served = served()
+    hostsim.Pin.drive(proj_defines.ROTARY_ENCODER_SWITCH_PIN, 1)
+    passes(3)
+    for h, old in zip(handlers, saved):
+        h.update(old)
+    ok = (ok_served and wdt.longest_ms < wdt.timeout and
+          presses == {proj_defines.ROTARY_BTN_PRESSED: 0, proj_defines.ROTARY_BTN_LONG_PRESSED: 1})
+    failures += 0 if ok else 1
+    print("{0:<12} | {1:<26} | watchdog fed every {2} ms or less, relays {3}, long presses {4} ({5})".format(
+        "rotary", "switch held {0} s".format(2 * proj_defines.WDT_TIMEOUT_MS // 1000), wdt.longest_ms,
+        "OK" if ok_served else "FAIL", presses[proj_defines.ROTARY_BTN_LONG_PRESSED], "OK" if ok else "FAIL"))
+
+    print("logged: error code found in the errors.py ring, relays: serial S commands served after")
+    print("the fault, notice: shown on the LCD and gone after ERROR_NOTICE_MS (- for warnings).")
+    print("counters: warnings {0}, errors {1}, fatal {2}".format(
+        telemetry.get_counter(telemetry.CNT_WARNINGS), telemetry.get_counter(telemetry.CNT_ERRORS),
+        telemetry.get_counter(telemetry.CNT_FATAL_ERRORS)))
+    if failures:
+        raise SystemExit("{0} faults not handled".format(failures))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,156 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Flame graph from profiler dump (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Reads the output of profiler.dump() (copied from REPL into a file),
+    prints profiler overhead and a table of time per scope, and writes a
+    self contained SVG flame graph.
+    --folded writes folded stacks ("a;b;c count") instead, for use with
+    other flame graph tools (flamegraph.pl, speedscope).
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/flamegraph.py profile.txt [-o profile.svg] [--folded]
+
+-------------------------------------------------------------------------------
+"""
+import sys
+import argparse
+import collections
+
+SVG_WIDTH  = 1200
+ROW_HEIGHT = 18
+
+
+def parse(lines):
+    header = {}
+    names = {0: "-"}
+    stacks = collections.Counter()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(">>>"):
+            continue
+        if line.startswith("# profile"):
+            for field in line.split()[2:]:
+                key, value = field.split("=")
+                header[key] = int(value)
+        elif line.startswith("# scope"):
+            _, _, sid, name = line.split(None, 3)
+            names[int(sid)] = name
+        elif line == "-":
+            stacks[("idle",)] += 1
+        elif not line.startswith("#"):
+            stacks[tuple(names.get(int(i), i) for i in line.split())] += 1
+    return header, stacks
+
+
+def print_overhead(header):
+    elapsed = header.get("elapsed_us", 0)
+    if not elapsed:
+        return
+    markers_us = header.get("markers", 0) * header.get("marker_ns", 0) / 2000.0
+    print("samples {0} (kept {1}) over {2:.2f} s".format(
+        header.get("samples", 0), header.get("kept", 0), elapsed / 1e6))
+    print("overhead: sampling {0:.2f}%, scope markers ~{1:.2f}% ({2} markers, {3} ns per pair)".format(
+        100.0 * header.get("sample_us", 0) / elapsed, 100.0 * markers_us / elapsed,
+        header.get("markers", 0), header.get("marker_ns", 0)))
+
+
+def print_table(stacks):
+    total = sum(stacks.values())
+    inclusive = collections.Counter()
+    exclusive = collections.Counter()
+    for stack, count in stacks.items():
+        for name in set(stack):
+            inclusive[name] += count
+        exclusive[stack[-1]] += count
+    print("{0:<20} {1:>8} {2:>8}".format("scope", "total%", "self%"))
+    for name, count in inclusive.most_common():
+        print("{0:<20} {1:>8.1f} {2:>8.1f}".format(name, 100.0 * count / total, 100.0 * exclusive[name] / total))
+
+
+def build_tree(stacks):
+    # node: [count, {child name: node}]
+    root = [0, {}]
+    for stack, count in stacks.items():
+        node = root
+        node[0] += count
+        for name in stack:
+            node = node[1].setdefault(name, [0, {}])
+            node[0] += count
+    return root
+
+
+def color(name):
+    h = sum(ord(c) * 31 for c in name)
+    return "rgb({0},{1},{2})".format(205 + h % 50, 80 + (h // 7) % 120, 40 + (h // 13) % 50)
+
+
+def render_svg(stacks, out):
+    root = build_tree(stacks)
+    total = root[0]
+    rects = []
+
+    def walk(node, name, x, level):
+        width = SVG_WIDTH * node[0] / total
+        rects.append((x, level, width, name, node[0]))
+        for child_name, child in sorted(node[1].items()):
+            walk(child, child_name, x, level + 1)
+            x += SVG_WIDTH * child[0] / total
+
+    walk(root, "all", 0.0, 0)
+    levels = max(r[1] for r in rects) + 1
+    height = levels * ROW_HEIGHT + 10
+
+    out.write('<svg xmlns="http://www.w3.org/2000/svg" width="{0}" height="{1}" font-family="monospace" font-size="11">\n'.format(SVG_WIDTH, height))
+    for x, level, width, name, count in rects:
+        # Root at bottom, like classic flame graphs.,
+        y = height - (level + 1) * ROW_HEIGHT
+        out.write('<g><title>{0} ({1} samples, {2:.1f}%)</title>'.format(name, count, 100.0 * count / total))
+        out.write('<rect x="{0:.1f}" y="{1}" width="{2:.1f}" height="{3}" fill="{4}" stroke="white"/>'.format(
+            x, y, width, ROW_HEIGHT - 1, color(name)))
+        if width > 7 * len(name):
+            out.write('<text x="{0:.1f}" y="{1}">{2}</text>'.format(x + 3, y + ROW_HEIGHT - 5, name))
+        out.write('</g>\n')
+    out.write('</svg>\n')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dump")
+    parser.add_argument("-o", "--output", help = "default: <dump>.svg (or .folded)")
+    parser.add_argument("--folded", action = "store_true")
+    args = parser.parse_args()
+
+    with open(args.dump) as f:
+        header, stacks = parse(f)
+    if not stacks:
+        sys.exit("{0}: no samples".format(args.dump))
+
+    print_overhead(header)
+    print_table(stacks)
+
+    output = args.output or args.dump.rsplit(".", 1)[0] + (".folded" if args.folded else ".svg")
+    with open(output, "w") as out:
+        if args.folded:
+            for stack, count in sorted(stacks.items()):
+                out.write("{0} {1}\n".format(";".join(stack), count))
+        else:
+            render_svg(stacks, out)
+    print("wrote {0}".format(output))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
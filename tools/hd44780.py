@@ -0,0 +1,171 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - HD44780 LCD behind PCF8574 model (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Model of the 16x2 (or 20x4) HD44780 character LCD with PCF8574 I2C
+    backpack, to be registered as a hostsim I2C device. It decodes the
+    I2C frames written by pico_i2c_lcd (nibbles latched on E falling edge,
+    8 bit mode until function set selects 4 bit mode) and keeps DDRAM,
+    CGRAM, address counter and display shift, so host tools can check what
+    is on screen and count commands and data writes.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    import hostsim, hd44780
+    hostsim.install()
+    lcd = hd44780.attach()      # Before importing display.
+    import display
+    ...
+    print(lcd.text())
+
+-------------------------------------------------------------------------------
+"""
+import hostsim
+
+# PCF8574 bits (see pico_i2c_lcd).,
+MASK_RS = 0x01
+MASK_E  = 0x04
+MASK_BL = 0x08
+
+# DDRAM characters per line in two line mode.,
+LINE_LENGTH = 40
+
+
+class Hd44780:
+    def __init__(self, rows = 2, cols = 16):
+        self.rows = rows
+        self.cols = cols
+        self.ddram = bytearray(b" " * 0x80)
+        self.cgram = bytearray(64)
+        self.addr = 0
+        self.shift = 0
+        self.cgram_mode = False
+        self.increment = True
+        self.four_bit = False
+        self.display_on = False
+        self.backlight = False
+        self.pending = None
+        self.last = 0
+        # Counters.,
+        self.frames = 0
+        self.commands = 0
+        self.address_sets = 0
+        self.data_writes = 0
+        self.display_shifts = 0
+
+    def reset_counters(self):
+        self.frames = self.commands = self.address_sets = self.data_writes = 0
+        self.display_shifts = 0
+
+    def write(self, buf):
+        for byte in buf:
+            self.frames += 1
+            self.backlight = bool(byte & MASK_BL)
+            if (self.last & MASK_E) and not (byte & MASK_E):
+                self.latch(self.last & 0xF0, bool(self.last & MASK_RS))
+            self.last = byte
+
+    def latch(self, nibble, rs):
+        if not self.four_bit:
+            # 8 bit mode, lower data lines are not wired (read as 0).,
+            self.execute(nibble, rs)
+            return
+        if self.pending is None:
+            self.pending = nibble
+        else:
+            value = self.pending | (nibble >> 4)
+            self.pending = None
+            self.execute(value, rs)
+
+    def execute(self, value, rs):
+        if rs:
+            self.data_writes += 1
+            if self.cgram_mode:
+                self.cgram[self.addr & 0x3F] = value & 0x1F
+                self.addr = (self.addr + (1 if self.increment else -1)) & 0x3F
+            else:
+                self.ddram[self.addr & 0x7F] = value
+                self.advance()
+            return
+
+        self.commands += 1
+        if value & 0x80:
+            self.address_sets += 1
+            self.addr = value & 0x7F
+            self.cgram_mode = False
+        elif value & 0x40:
+            self.address_sets += 1
+            self.addr = value & 0x3F
+            self.cgram_mode = True
+        elif value & 0x20:
+            self.four_bit = not (value & 0x10)
+        elif value & 0x10:
+            if value & 0x08:
+                # Display shift, left moves the window to higher addresses.,
+                self.display_shifts += 1
+                self.shift = (self.shift + (-1 if value & 0x04 else 1)) % LINE_LENGTH
+            # Cursor move without write is not used by project.,
+        elif value & 0x08:
+            self.display_on = bool(value & 0x04)
+        elif value & 0x04:
+            self.increment = bool(value & 0x02)
+        elif value & 0x02:
+            self.addr = 0
+            self.shift = 0
+            self.cgram_mode = False
+        elif value & 0x01:
+            self.ddram[:] = b" " * 0x80
+            self.addr = 0
+            self.shift = 0
+            self.cgram_mode = False
+            self.increment = True
+
+    def advance(self):
+        # Two line mode: 0x00-0x27 and 0x40-0x67, each wraps into the other.,
+        if self.increment:
+            self.addr = {0x27: 0x40, 0x67: 0x00}.get(self.addr, self.addr + 1)
+        else:
+            self.addr = {0x00: 0x67, 0x40: 0x27}.get(self.addr, self.addr - 1)
+
+    def address(self, x, y):
+        addr = x
+        if y & 1:
+            addr += 0x40
+        if y & 2:
+            addr += self.cols
+        return addr
+
+    def codes(self, y):
+        # Character codes on screen row y., the window over each 40 character
+        # line is moved by display shift.
+        line = 0x40 if y & 1 else 0
+        start = self.cols if y & 2 else 0
+        return bytes(self.ddram[line + (start + self.shift + x) % LINE_LENGTH]
+                     for x in range(self.cols))
+
+    def text(self):
+        # Screen as text., custom characters 0-7 are shown as circled digits.
+        lines = []
+        for y in range(self.rows):
+            lines.append("".join(chr(0x2460 + c) if c < 8 else chr(c) for c in self.codes(y)))
+        return "\n".join(lines)
+
+
+def attach(rows = None, cols = None, addr = None):
+    # Registers a model at the LCD address from proj_defines.,
+    from proj_defines import I2C_ADDR, I2C_DISPLAY_NUM_ROWS, I2C_DISPLAY_NUM_COLS
+    lcd = Hd44780(rows or I2C_DISPLAY_NUM_ROWS, cols or I2C_DISPLAY_NUM_COLS)
+    hostsim.I2C.devices[addr if addr is not None else I2C_ADDR] = lcd
+    return lcd
+
+# End-of-File
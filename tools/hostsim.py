@@ -0,0 +1,587 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Host simulation support.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file provides stand-ins for the MicroPython specific modules
+    (machine, utime, ujson, micropython, rp2) so that project modules can be
+    imported and benchmarked on a host PC with CPython.
+    Sleeps do not block, they advance a virtual clock instead.,
+    rp2.asm_pio programs are recorded and rp2.StateMachine emulates them
+    instruction by instruction (subset used by the project), reading input
+    pins from Pin levels.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC (NOT to be uploaded to the board).
+
+Usage:
+    import hostsim
+    hostsim.install()   # Must be called before importing project modules.
+    import deviceconfig
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import json
+import time
+import types
+import traceback
+import select
+import threading
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+# Project root (one level up from tools/)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Virtual time (in us) added by sleep calls.,
+virtual_us = 0
+
+# Host time of the simulated reset (import of this module)., ticks count
+# from here as they do from reset on RP2040, tool processes are boots.
+reset_at = time.perf_counter()
+
+# True -> sleeps really sleep (for tools running threads, see bench_iocore).,
+real_sleep = False
+
+# Total I2C frames (writeto calls) per address.,
+i2c_frames = {}
+
+"""
+-------------------------------------------------------------------------------
+ Functions and classes
+-------------------------------------------------------------------------------
+"""
+
+"""
+Virtual clock., ticks are host time since the simulated reset plus all the
+time "spent" in sleeps.
+"""
+def ticks_us():
+    return int((time.perf_counter() - reset_at) * 1000000) + virtual_us
+
+def ticks_ms():
+    return ticks_us() // 1000
+
+def ticks_diff(a, b):
+    return a - b
+
+def ticks_add(a, b):
+    return a + b
+
+def sleep_us(us):
+    global virtual_us
+    if real_sleep:
+        time.sleep(us / 1000000.0)
+        return
+    virtual_us += int(us)
+
+def sleep_ms(ms):
+    sleep_us(ms * 1000)
+
+def sleep(s):
+    sleep_us(s * 1000000)
+
+def advance_ms(ms):
+    # Advance virtual clock without any sleep call.,
+    sleep_ms(ms)
+
+
+class Pin:
+    IN       = 0
+    OUT      = 1
+    PULL_UP  = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING  = 8
+
+    # Pin number -> current level, shared by all Pin objects.,
+    levels = {}
+
+    # Pin number -> (handler, trigger, Pin) set with irq(), fired by drive().,
+    handlers = {}
+
+    def __init__(self, pin, mode = IN, pull = None, value = None):
+        self.pin = pin
+        self.mode = mode
+        if value is not None:
+            Pin.levels[pin] = int(value)
+        elif pin not in Pin.levels:
+            Pin.levels[pin] = 1 if pull == Pin.PULL_UP else 0
+
+    def value(self, v = None):
+        if v is None:
+            return Pin.levels[self.pin]
+        Pin.levels[self.pin] = int(v)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def irq(self, handler = None, trigger = None, hard = False):
+        self.handler = handler
+        Pin.handlers[self.pin] = (handler, trigger or (Pin.IRQ_FALLING | Pin.IRQ_RISING), self)
+
+    @staticmethod
+    def drive(pin, level):
+        # External signal on an input pin., runs its IRQ handler on a
+        # matching edge, like the board would.
+        old = Pin.levels.get(pin, 0)
+        Pin.levels[pin] = int(level)
+        handler, trigger, obj = Pin.handlers.get(pin, (None, 0, None))
+        if handler is None or old == int(level):
+            return
+        if (level and trigger & Pin.IRQ_RISING) or (not level and trigger & Pin.IRQ_FALLING):
+            handler(obj)
+
+
+class ADC:
+    # Pin number -> read_u16() value, full scale unless set by a tool.,
+    levels = {}
+
+    def __init__(self, pin):
+        self.pin = pin
+
+    def read_u16(self):
+        return ADC.levels.get(self.pin, 65535)
+
+
+class UART:
+    # Idle line., nothing received, writes are counted and dropped (tools
+    # that talk to the protocol pass an FdPort instead).
+    def __init__(self, id, baudrate = 115200, **kwargs):
+        self.id = id
+        self.baudrate = baudrate
+        self.written = 0
+
+    def readinto(self, buf, nbytes = None):
+        return None
+
+    def write(self, buf):
+        self.written += len(buf)
+        return len(buf)
+
+
+class WDT:
+    # Counts feeds and the longest time without one (virtual clock), a
+    # tool checks it against timeout., never resets the host.
+    def __init__(self, id = 0, timeout = 5000):
+        self.timeout = timeout
+        self.feeds = 0
+        self.fed_at = ticks_ms()
+        self.longest_ms = 0
+
+    def feed(self):
+        now = ticks_ms()
+        self.longest_ms = max(self.longest_ms, now - self.fed_at)
+        self.fed_at = now
+        self.feeds += 1
+
+
+def reset():
+    # machine.reset() does not return., tools catch SystemExit.
+    raise SystemExit("machine.reset()")
+
+
+class Timer:
+    # Periodic timer runs callback on a host thread, like an IRQ it can
+    # interrupt project code at any point.
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id = -1, mode = PERIODIC, freq = None, period = None, callback = None):
+        self.interval = 1.0 / freq if freq else (period or 1000) / 1000.0
+        self.mode = mode
+        self.callback = callback
+        self.stopped = threading.Event()
+        threading.Thread(target = self.run, daemon = True).start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.callback(self)
+            if self.mode == Timer.ONE_SHOT:
+                break
+
+    def deinit(self):
+        self.stopped.set()
+
+
+"""
+PIO stand-in., asm_pio runs the program body with the PIO instructions
+defined as recording functions, StateMachine interprets the recording.
+One instruction per cycle, delays and side-set are not supported.
+"""
+class PIO:
+    SHIFT_LEFT  = 0
+    SHIFT_RIGHT = 1
+    IN_LOW  = 0
+    IN_HIGH = 1
+
+    def __init__(self, id):
+        self.id = id
+
+
+class PioProgram:
+    def __init__(self, config):
+        self.config = config
+        self.code = []
+        self.labels = {}
+        self.wrap_target = 0
+        self.wrap = None
+
+
+def asm_pio(**config):
+    def assemble(fn):
+        prog = PioProgram(config)
+
+        def emit(*ins):
+            prog.code.append(ins)
+
+        def label(name):
+            prog.labels[name] = len(prog.code)
+
+        def wrap_target():
+            prog.wrap_target = len(prog.code)
+
+        def wrap():
+            prog.wrap = len(prog.code) - 1
+
+        def jmp(cond, target = None):
+            if target is None:
+                cond, target = None, cond
+            emit("jmp", cond, target)
+
+        dsl = {
+            "label": label, "wrap_target": wrap_target, "wrap": wrap, "jmp": jmp,
+            "mov":  lambda dst, src: emit("mov", dst, src),
+            "in_":  lambda src, n: emit("in", src, n),
+            "out":  lambda dst, n: emit("out", dst, n),
+            "push": lambda block = True: emit("push", block),
+            "nop":  lambda: emit("mov", "y", "y"),
+            "invert": lambda src: ("~", src),
+            "noblock": False, "block": True,
+            "x_dec": "x_dec", "y_dec": "y_dec", "not_x": "not_x", "not_y": "not_y",
+        }
+        for reg in ("pins", "x", "y", "isr", "osr", "pc", "null"):
+            dsl[reg] = reg
+        types.FunctionType(fn.__code__, dict(fn.__globals__, **dsl))()
+        if prog.wrap is None:
+            prog.wrap = len(prog.code) - 1
+        return prog
+    return assemble
+
+
+class StateMachine:
+    MASK = 0xFFFFFFFF
+
+    def __init__(self, id, prog = None, freq = 125000000, in_base = None, **kw):
+        self.id = id
+        self.prog = prog
+        self.freq = freq
+        self.in_base = in_base.pin if in_base is not None else 0
+        self.regs = {"x": 0, "y": 0, "isr": 0, "osr": 0}
+        self.pc = 0
+        self.rx = []
+        self.cycles = 0
+        self.running = False
+
+    def active(self, v = None):
+        if v is None:
+            return self.running
+        self.running = bool(v)
+
+    def read(self, src):
+        if isinstance(src, tuple):
+            return ~self.read(src[1]) & self.MASK
+        if src == "pins":
+            return sum(Pin.levels.get(self.in_base + i, 0) << i for i in range(32))
+        if src == "null":
+            return 0
+        return self.regs[src]
+
+    def step(self, cycles = 1):
+        code = self.prog.code
+        labels = self.prog.labels
+        for _ in range(cycles):
+            op = code[self.pc]
+            nextpc = self.pc + 1 if self.pc != self.prog.wrap else self.prog.wrap_target
+            if op[0] == "jmp":
+                cond, target = op[1], labels[op[2]]
+                take = True
+                if cond in ("x_dec", "y_dec"):
+                    reg = cond[0]
+                    take = self.regs[reg] != 0
+                    self.regs[reg] = (self.regs[reg] - 1) & self.MASK
+                elif cond in ("not_x", "not_y"):
+                    take = self.regs[cond[-1]] == 0
+                if take:
+                    nextpc = target
+            elif op[0] == "mov":
+                value = self.read(op[2])
+                if op[1] == "pc":
+                    nextpc = value & 31
+                else:
+                    self.regs[op[1]] = value
+            elif op[0] == "in":
+                n = op[2]
+                data = self.read(op[1]) & ((1 << n) - 1)
+                if self.prog.config.get("in_shiftdir", PIO.SHIFT_LEFT) == PIO.SHIFT_LEFT:
+                    self.regs["isr"] = ((self.regs["isr"] << n) | data) & self.MASK
+                else:
+                    self.regs["isr"] = (self.regs["isr"] >> n) | (data << (32 - n))
+            elif op[0] == "out":
+                n = op[2]
+                if self.prog.config.get("out_shiftdir", PIO.SHIFT_RIGHT) == PIO.SHIFT_RIGHT:
+                    data = self.regs["osr"] & ((1 << n) - 1)
+                    self.regs["osr"] >>= n
+                else:
+                    data = self.regs["osr"] >> (32 - n)
+                    self.regs["osr"] = (self.regs["osr"] << n) & self.MASK
+                if op[1] == "pc":
+                    nextpc = data
+                else:
+                    self.regs[op[1]] = data
+            elif op[0] == "push":
+                # Blocking push on a full FIFO is not modelled (dropped too).
+                if len(self.rx) < 4:
+                    self.rx.append(self.regs["isr"])
+                self.regs["isr"] = 0
+            self.pc = nextpc
+            self.cycles += 1
+
+    def rx_fifo(self):
+        return len(self.rx)
+
+    def get(self, buf = None, shift = 0):
+        # Board blocks until state machine pushes., run it until it does.
+        while not self.rx:
+            self.step(1)
+        return self.rx.pop(0) >> shift
+
+
+class I2C:
+    # Address -> device model with write(bytes)., devices not registered here
+    # still ACK and their frames are just counted.
+    devices = {}
+
+    def __init__(self, id, sda = None, scl = None, freq = 400000):
+        self.id = id
+        self.freq = freq
+
+    def writeto(self, addr, buf, stop = True):
+        i2c_frames[addr] = i2c_frames.get(addr, 0) + 1
+        dev = I2C.devices.get(addr)
+        if dev is not None:
+            dev.write(bytes(buf))
+        return len(buf)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize = 8):
+        # Memory address bytes (MSB first) and data in one frame., device
+        # models raise OSError for NACK.
+        self.writeto(addr, memaddr.to_bytes(addrsize // 8, "big") + bytes(buf))
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize = 8):
+        # Address write, repeated start, read.,
+        self.writeto(addr, memaddr.to_bytes(addrsize // 8, "big"), False)
+        i2c_frames[addr] = i2c_frames.get(addr, 0) + 1
+        buf[:] = I2C.devices[addr].read(len(buf))
+
+    def scan(self):
+        return sorted(I2C.devices.keys())
+
+
+class Mem32:
+    # Memory mapped 32 bit registers., RP2040 SIO GPIO output registers are
+    # backed by Pin levels, everything else is plain storage.
+    SIO_GPIO_OUT     = 0xd0000010
+    SIO_GPIO_OUT_SET = 0xd0000014
+    SIO_GPIO_OUT_CLR = 0xd0000018
+    SIO_GPIO_OUT_XOR = 0xd000001c
+
+    def __init__(self):
+        self.regs = {}
+        self.writes = 0
+
+    def _gpio_out(self):
+        value = 0
+        for pin, level in Pin.levels.items():
+            if level and pin < 30:
+                value |= (1 << pin)
+        return value
+
+    def _set_gpio_out(self, value):
+        for pin in range(30):
+            if (value >> pin) & 1 or pin in Pin.levels:
+                Pin.levels[pin] = (value >> pin) & 1
+
+    def __getitem__(self, addr):
+        if addr == Mem32.SIO_GPIO_OUT:
+            return self._gpio_out()
+        return self.regs.get(addr, 0)
+
+    def __setitem__(self, addr, value):
+        # SIO (GPIO) register writes are counted., not watchdog scratch.
+        if addr >= Mem32.SIO_GPIO_OUT & 0xf0000000:
+            self.writes += 1
+        value &= 0xffffffff
+        if addr == Mem32.SIO_GPIO_OUT:
+            self._set_gpio_out(value)
+        elif addr == Mem32.SIO_GPIO_OUT_SET:
+            self._set_gpio_out(self._gpio_out() | value)
+        elif addr == Mem32.SIO_GPIO_OUT_CLR:
+            self._set_gpio_out(self._gpio_out() & ~value)
+        elif addr == Mem32.SIO_GPIO_OUT_XOR:
+            self._set_gpio_out(self._gpio_out() ^ value)
+        else:
+            self.regs[addr] = value
+
+
+mem32 = Mem32()
+
+
+class FdPort:
+    # Serial port (machine.UART like readinto()/write()) over a non-blocking
+    # file descriptor, e.g. pty or socket., used for serial protocol stand-ins.
+    def __init__(self, fd):
+        self.fd = fd
+        os.set_blocking(fd, False)
+
+    def readinto(self, buf, nbytes = None):
+        try:
+            data = os.read(self.fd, nbytes or len(buf))
+        except (BlockingIOError, OSError):
+            return None
+        buf[:len(data)] = data
+        return len(data) or None
+
+    def write(self, buf):
+        data = bytes(buf)
+        while data:
+            try:
+                data = data[os.write(self.fd, data):]
+            except BlockingIOError:
+                select.select([], [self.fd], [])
+        return len(buf)
+
+
+"""
+This function returns total I2C frames sent to 'addr' so far.
+"""
+def frames(addr):
+    return i2c_frames.get(addr, 0)
+
+
+"""
+ujson stand-in., project code opens json files in binary mode.
+"""
+def _json_dump(obj, f):
+    s = json.dumps(obj)
+    try:
+        f.write(s)
+    except TypeError:
+        f.write(s.encode())
+
+def _json_load(f):
+    return json.loads(f.read())
+
+
+"""
+This function registers stand-in modules and adds the project directory
+to sys.path. It is safe to call more than once.
+"""
+def install():
+    if "machine" in sys.modules:
+        return
+
+    utime = types.ModuleType("utime")
+    for fn in (ticks_us, ticks_ms, ticks_diff, ticks_add, sleep, sleep_ms, sleep_us):
+        setattr(utime, fn.__name__, fn)
+
+    machine = types.ModuleType("machine")
+    machine.Pin = Pin
+    machine.I2C = I2C
+    machine.Timer = Timer
+    machine.ADC = ADC
+    machine.reset = reset
+    machine.WDT = WDT
+    machine.UART = UART
+    machine.mem32 = mem32
+    machine.lightsleep = lambda ms = 0: sleep_ms(ms)
+
+    ujson = types.ModuleType("ujson")
+    ujson.dump  = _json_dump
+    ujson.dumps = json.dumps
+    ujson.load  = _json_load
+    ujson.loads = json.loads
+
+    rp2 = types.ModuleType("rp2")
+    rp2.PIO = PIO
+    rp2.asm_pio = asm_pio
+    rp2.StateMachine = StateMachine
+
+    micropython = types.ModuleType("micropython")
+    micropython.const = lambda x: x
+    # Native code emitter is a no-op here., no viper, code checks for it.
+    micropython.native = lambda f: f
+
+    sys.modules["utime"]       = utime
+    sys.modules["machine"]     = machine
+    sys.modules["ujson"]       = ujson
+    sys.modules["micropython"] = micropython
+    sys.modules["rp2"]         = rp2
+
+    # lcd_api uses time.sleep_us which is MicroPython only.,
+    time.sleep_us = sleep_us
+    # MicroPython sys.print_exception() (main.py, errors.py).,
+    if not hasattr(sys, "print_exception"):
+        sys.print_exception = lambda e: traceback.print_exception(type(e), e, e.__traceback__)
+
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+
+
+"""
+This function loads a synthetic configuration of 'count' devices directly
+into deviceconfig, bypassing json files on disk.
+"""
+def load_devices(count, names = None, groups = None, scenes = None):
+    import deviceconfig
+    from proj_defines import numdevices, groupstag, scenestag
+
+    info   = {numdevices: count}
+    if groups:
+        info[groupstag] = groups
+    if scenes:
+        info[scenestag] = scenes
+    status = {numdevices: count}
+    for i in range(count):
+        name = names[i] if names else "Device {0:04d}".format(i)
+        # GPIO pins 16 to 28 are free on the board, wrap around for big configs.
+        info[i] = [name, 16 + (i % 13)]
+        status[str(i)] = 0
+
+    deviceconfig.deviceinfo    = info
+    deviceconfig.devicestatus  = status
+    deviceconfig.total_devices = count
+    deviceconfig.build_name_index()
+    deviceconfig.load_groups_and_scenes()
+
+# End-of-File
@@ -0,0 +1,85 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Device list layout preview (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Builds layout.py templates for the given display geometry, draws the
+    first pages with main.draw_page() on the HD44780 model and prints them,
+    with I2C frames per page redraw. Device 1 gets a pending timer so the
+    timer mark shows on geometries that have room for it.
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/layout_preview.py [--rows R --cols C] [--devices N]
+    python tools/layout_preview.py --rows 4 --cols 20
+    python tools/layout_preview.py --rows 2 --cols 40
+
+-------------------------------------------------------------------------------
+"""
+import sys
+import argparse
+
+import hostsim
+hostsim.install()
+
+import hd44780
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type = int, default = 2)
+    parser.add_argument("--cols", type = int, default = 16)
+    parser.add_argument("--devices", type = int, default = 10)
+    parser.add_argument("--pages", type = int, default = 2)
+    args = parser.parse_args()
+
+    # Geometry must be set before project modules take it from proj_defines.,
+    import proj_defines
+    proj_defines.I2C_DISPLAY_NUM_ROWS = args.rows
+    proj_defines.I2C_DISPLAY_NUM_COLS = args.cols
+    model = hd44780.attach(args.rows, args.cols)
+
+    import display
+    display.init()
+    hostsim.load_devices(args.devices, names = ["{0} Living room light".format(i) for i in range(args.devices)])
+    sys.argv = [sys.argv[0]]
+    import main as ui
+    import layout
+    import listview
+    import scheduler
+    layout.init(args.devices)
+    scheduler.init(lambda deviceid, state: None)
+    scheduler.add_timer(1, True, 60000)
+    ui.IconDirty = [False] * layout.per_page
+    listview.init(args.devices, layout.per_page, 1 == layout.per_row)
+
+    print("{0}x{1}: {2} devices/page, name width {3}, timer mark {4}".format(
+        args.cols, args.rows, layout.per_page, layout.name_width,
+        "yes" if layout.info_x[0] >= 0 else "no"))
+    border = "+" + "-" * args.cols + "+"
+    for page in range(min(args.pages, listview.pages())):
+        model.reset_counters()
+        ui.draw_page(page)
+        if 0 == page:
+            display.show_cursor(layout.cursor_x[0], layout.row[0])
+        display.finish()
+        print("page {0}: {1} I2C frames".format(page, model.frames))
+        print(border)
+        for line in model.text().split("\n"):
+            print("|" + line + "|")
+        print(border)
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,236 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - LittleFS write amplification model (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Models how LittleFS (MicroPython filesystem on RP2040) turns device
+    state saves into flash programs and erases, and compares persistence
+    formats:
+      json   - current devicestate.json, whole dictionary rewritten per change.
+      bitmap - one bit per device in binary file, rewritten per change.
+      log    - 3 byte <device id, state> records appended to an inline log
+               file, folded into the bitmap file when log is full.
+    The model covers inline files (data kept in metadata commits), copy on
+    write data blocks, metadata pair compaction and relocation after
+    block_cycles erases, and a round robin block allocator.
+    For each format it prints bytes programmed and erases per update,
+    worst block wear, estimated flash life at given change rate and
+    estimated save latency.
+
+    --counters <flashwear.bin> decodes counters copied from a board
+    (see flashwear.py).
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    python tools/lfs_model.py [--devices N] [--updates N] [--per-day N]
+    python tools/lfs_model.py --counters flashwear.bin
+
+-------------------------------------------------------------------------------
+"""
+import json
+import math
+import random
+import struct
+import argparse
+import collections
+
+# Pico (2 MB flash, 1.4 MB filesystem) and rp2 port LittleFS settings.,
+BLOCK_SIZE   = 4096
+PROG_SIZE    = 256
+BLOCK_COUNT  = 352
+INLINE_MAX   = 256
+BLOCK_CYCLES = 100
+
+# Approx. tags + CRC of a metadata commit, and per file metadata.,
+COMMIT_OVERHEAD = 32
+FILE_METADATA   = 24
+
+# W25Q16JV typical timings.,
+ERASE_MS = 45.0
+PROG_MS  = 0.4
+
+ENDURANCE = 100000
+
+
+class LittleFs:
+    def __init__(self, block_count = BLOCK_COUNT):
+        self.erases = [0] * block_count
+        self.programmed = 0
+        self.erase_total = 0
+        self.time_ms = 0.0
+        # Root metadata pair is blocks 0 and 1., others are free.
+        self.meta = [0, 1]
+        self.meta_fill = 0
+        self.free = collections.deque(range(2, block_count))
+        # name -> [size, [data blocks]], no blocks -> inline file.
+        self.files = {}
+
+    def erase(self, block):
+        self.erases[block] += 1
+        self.erase_total += 1
+        self.time_ms += ERASE_MS
+
+    def program(self, nbytes):
+        self.programmed += nbytes
+        self.time_ms += math.ceil(nbytes / PROG_SIZE) * PROG_MS
+
+    def alloc(self):
+        block = self.free.popleft()
+        self.erase(block)
+        return block
+
+    def release(self, block):
+        self.free.append(block)
+
+    def live_metadata(self):
+        size = COMMIT_OVERHEAD
+        for name, (length, blocks) in self.files.items():
+            size += len(name) + FILE_METADATA + (8 if blocks else length)
+        return size
+
+    def commit(self, nbytes):
+        cost = math.ceil((nbytes + COMMIT_OVERHEAD) / PROG_SIZE) * PROG_SIZE
+        if self.meta_fill + cost > BLOCK_SIZE:
+            self.compact()
+        self.program(cost)
+        self.meta_fill += cost
+
+    def compact(self):
+        # Compacted metadata goes to the other block of the pair., the pair
+        # is moved to a new block after BLOCK_CYCLES erases (wear leveling).
+        target = self.meta[1]
+        if self.erases[target] and self.erases[target] % BLOCK_CYCLES == 0:
+            self.release(target)
+            target = self.alloc()
+        else:
+            self.erase(target)
+        live = math.ceil(self.live_metadata() / PROG_SIZE) * PROG_SIZE
+        self.program(live)
+        self.meta = [target, self.meta[0]]
+        self.meta_fill = live
+
+    def write_file(self, name, nbytes):
+        # open("w"), write, close.,
+        old = self.files.get(name, [0, []])[1]
+        if nbytes <= INLINE_MAX:
+            self.files[name] = [nbytes, []]
+            self.commit(len(name) + nbytes)
+        else:
+            blocks = [self.alloc() for _ in range(math.ceil(nbytes / (BLOCK_SIZE - 8)))]
+            self.program(nbytes)
+            self.files[name] = [nbytes, blocks]
+            self.commit(len(name) + 8)
+        for block in old:
+            self.release(block)
+
+    def append_sync(self, name, nbytes):
+        # write() + flush() on an open file.,
+        size, blocks = self.files.get(name, [0, []])
+        size += nbytes
+        if not blocks and size <= INLINE_MAX:
+            # Inline file is written again as a whole in each commit.,
+            self.files[name] = [size, []]
+            self.commit(len(name) + size)
+            return
+        # Last block was programmed already, LittleFS copies it before append.,
+        used = size % (BLOCK_SIZE - 8) or (BLOCK_SIZE - 8)
+        if blocks:
+            self.release(blocks.pop())
+        blocks.append(self.alloc())
+        self.program(used)
+        self.files[name] = [size, blocks]
+        self.commit(len(name) + 8)
+
+
+def run_format(fmt, devices, updates, log_max, seed = 1):
+    fs = LittleFs()
+    rnd = random.Random(seed)
+    state = {"numdevices": devices}
+    for d in range(devices):
+        state[str(d)] = 0
+    bitmap_size = 4 + (devices + 7) // 8
+    log_size = 0
+
+    for i in range(updates):
+        d = rnd.randrange(devices)
+        state[str(d)] ^= 1
+        if fmt == "json":
+            fs.write_file("devicestate.json", len(json.dumps(state)))
+        elif fmt == "bitmap":
+            fs.write_file("devicestate.bin", bitmap_size)
+        else:
+            fs.append_sync("devicestate.log", 3)
+            log_size += 3
+            if log_size + 3 > log_max:
+                fs.write_file("devicestate.bin", bitmap_size)
+                fs.write_file("devicestate.log", 0)
+                log_size = 0
+    return fs
+
+
+def report(fmt, fs, updates, per_day):
+    worst = max(fs.erases)
+    mean = sum(fs.erases) / len(fs.erases)
+    # Allocator and metadata relocation spread erases over all blocks, so
+    # life is bound by mean wear (worst stays near BLOCK_CYCLES).,
+    days = ENDURANCE * updates / mean / per_day if mean else float("inf")
+    print("{0:>7} | {1:>8.1f} | {2:>8.4f} | {3:>6} {4:>8.1f} | {5:>9.1f} | {6:>7.2f}".format(
+        fmt, fs.programmed / updates, fs.erase_total / updates, worst, mean,
+        days / 365.0, fs.time_ms / updates))
+
+
+def decode_counters(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, count = struct.unpack_from("<2sBB", data)
+    if magic != b"FW" or version != 1:
+        raise SystemExit("{0}: not a flashwear counter file".format(path))
+    names = ["devicestate.json", "schedule.bin", "flashwear.bin"]
+    offset = 4
+    print("file               writes      bytes  erase blocks")
+    units = 0
+    for i in range(count):
+        writes, nbytes, erase = struct.unpack_from("<III", data, offset)
+        offset += 12
+        units += erase
+        name = names[i] if i < len(names) else str(i)
+        print("{0:<18} {1:>6} {2:>10} {3:>13.1f}".format(name, writes, nbytes, erase * PROG_SIZE / BLOCK_SIZE))
+    uptime = struct.unpack_from("<I", data, offset)[0]
+    blocks = units * PROG_SIZE / BLOCK_SIZE
+    print("uptime {0:.1f} days, {1:.1f} erase blocks, {2:.4f}% of {3} blocks x {4} cycles".format(
+        uptime / 86400.0, blocks, 100.0 * blocks / (BLOCK_COUNT * ENDURANCE), BLOCK_COUNT, ENDURANCE))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type = int, default = 16)
+    parser.add_argument("--updates", type = int, default = 100000)
+    parser.add_argument("--per-day", type = float, default = 200, help = "device changes per day")
+    parser.add_argument("--log-max", type = int, default = INLINE_MAX, help = "log size before fold (bytes)")
+    parser.add_argument("--counters", help = "decode flashwear.bin from a board")
+    args = parser.parse_args()
+
+    if args.counters:
+        decode_counters(args.counters)
+        return
+
+    print("devices {0}, updates {1}, {2:.0f} changes/day, {3} blocks x {4} cycles".format(
+        args.devices, args.updates, args.per_day, BLOCK_COUNT, ENDURANCE))
+    print(" format | prog B/u | erase/u  |  worst     mean |  life (y) | ms/u")
+    for fmt in ("json", "bitmap", "log"):
+        report(fmt, run_format(fmt, args.devices, args.updates, args.log_max), args.updates, args.per_day)
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
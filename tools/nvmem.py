@@ -0,0 +1,135 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - I2C FRAM and EEPROM models (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Models of 24Cxx EEPROM and MB85RC FRAM to be registered as hostsim I2C
+    devices, for nvram.py:
+      Eeprom - page write (address wraps inside the page like the real
+               part), then no ACK for the write cycle (hostsim virtual
+               time), writes during it raise OSError.
+      Fram   - no pages, no write cycle.
+    Both count writes, bytes and bytes on the bus, and keep per byte write
+    counts (wear).
+
+Supported Platforms:
+    - CPython 3.8+ on host PC.
+
+Usage:
+    import hostsim, nvmem
+    hostsim.install()
+    mem = nvmem.attach("eeprom")     # Before nvram.init()
+    ...
+    print(mem.writes, mem.bytes)
+
+-------------------------------------------------------------------------------
+"""
+import hostsim
+
+# 24C32 / MB85RC64 sizes and timings.,
+EEPROM_SIZE     = 4096
+EEPROM_PAGE     = 32
+EEPROM_CYCLE_US = 5000
+FRAM_SIZE       = 8192
+
+# 400 kHz, 9 clocks per byte on the bus., start/stop ignored.
+BUS_US_PER_BYTE = 22.5
+
+
+class Memory:
+    def __init__(self, size, addr_bytes = 2):
+        self.data = bytearray(b"\xff" * size)
+        self.addr_bytes = addr_bytes
+        self.pointer = 0
+        self.wear = [0] * size
+        # Counters., bus_bytes includes I2C and memory address bytes.
+        self.writes = 0
+        self.bytes = 0
+        self.bus_bytes = 0
+
+    def ack(self):
+        pass
+
+    def store(self, addr, data):
+        for i, value in enumerate(data):
+            at = (addr + i) % len(self.data)
+            self.data[at] = value
+            self.wear[at] += 1
+
+    def write(self, buf):
+        self.ack()
+        self.bus_bytes += 1 + len(buf)
+        if len(buf) < self.addr_bytes:
+            # Empty write is an ACK poll., less than the address is not used.
+            return
+        self.pointer = int.from_bytes(buf[:self.addr_bytes], "big") % len(self.data)
+        data = buf[self.addr_bytes:]
+        if data:
+            self.writes += 1
+            self.bytes += len(data)
+            self.store(self.pointer, data)
+
+    def read(self, n):
+        self.ack()
+        self.bus_bytes += 1 + n
+        out = bytes(self.data[(self.pointer + i) % len(self.data)] for i in range(n))
+        self.pointer = (self.pointer + n) % len(self.data)
+        return out
+
+    def bus_us(self):
+        return self.bus_bytes * BUS_US_PER_BYTE
+
+
+class Eeprom(Memory):
+    def __init__(self, size = EEPROM_SIZE, page = EEPROM_PAGE, addr_bytes = 2, cycle_us = EEPROM_CYCLE_US):
+        super().__init__(size, addr_bytes)
+        self.page = page
+        self.cycle_us = cycle_us
+        self.busy_until = None
+        self.nacks = 0
+
+    def ack(self):
+        if self.busy_until is not None:
+            if hostsim.ticks_diff(self.busy_until, hostsim.ticks_us()) > 0:
+                self.nacks += 1
+                raise OSError(5)    # EIO, as machine.I2C on NACK.
+            self.busy_until = None
+
+    def store(self, addr, data):
+        if len(data) > self.page:
+            raise ValueError("page write of {0} bytes".format(len(data)))
+        # Bytes past the page end wrap to its start (datasheet)., the
+        # driver must not let that happen.
+        base = addr - addr % self.page
+        for i, value in enumerate(data):
+            at = base + (addr - base + i) % self.page
+            if at != addr + i:
+                raise ValueError("page write crosses page at 0x{0:x}".format(addr))
+            self.data[at] = value
+            self.wear[at] += 1
+        self.busy_until = hostsim.ticks_add(hostsim.ticks_us(), self.cycle_us)
+
+
+class Fram(Memory):
+    def __init__(self, size = FRAM_SIZE, addr_bytes = 2):
+        super().__init__(size, addr_bytes)
+
+
+def attach(kind, addr = None):
+    # Registers a model at NVRAM_I2C_ADDR from proj_defines.,
+    from proj_defines import NVRAM_I2C_ADDR, NVRAM_ADDR_BYTES, NVRAM_PAGE_SIZE
+    if "eeprom" == kind:
+        mem = Eeprom(page = NVRAM_PAGE_SIZE, addr_bytes = NVRAM_ADDR_BYTES)
+    else:
+        mem = Fram(addr_bytes = NVRAM_ADDR_BYTES)
+    hostsim.I2C.devices[addr if addr is not None else NVRAM_I2C_ADDR] = mem
+    return mem
+
+# End-of-File
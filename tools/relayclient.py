@@ -0,0 +1,156 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Binary protocol host client library.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Host side client for the binary framed protocol implemented by
+    binproto.py on the board (SERIAL_PROTOCOL = "binary").
+    Requests can be pipelined with send()/recv(), or sent one at a time
+    with the blocking helpers (get_all(), set_all(), delta(), ...).
+
+Supported Platforms:
+    - CPython 3.8+ on Linux/macOS host PC.
+
+Usage:
+    from relayclient import RelayClient
+    board = RelayClient("/dev/ttyUSB0")
+    states = board.get_all()
+    board.delta({3: 1, 5: 0})
+
+-------------------------------------------------------------------------------
+"""
+import os
+import tty
+import select
+
+FRAME_SYNC     = 0xA5
+FRAME_OVERHEAD = 6
+RESPONSE_FLAG  = 0x80
+
+OP_PING    = 0x01
+OP_GET_ALL = 0x02
+OP_SET_ALL = 0x03
+OP_DELTA   = 0x04
+OP_SET_ONE = 0x05
+OP_GET_ONE = 0x06
+
+STATUS_TEXT = ["OK", "BAD_CRC", "BAD_LENGTH", "BAD_DEVICE", "BAD_OP"]
+
+
+def crc16(data):
+    # CRC-CCITT, poly 0x1021, init 0xFFFF (same as binproto.crc16).
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+def encode_frame(op, seq, payload = b""):
+    body = bytes([len(payload), op, seq]) + bytes(payload)
+    crc = crc16(body)
+    return bytes([FRAME_SYNC]) + body + bytes([crc & 0xFF, crc >> 8])
+
+
+def to_bitmap(states, numdevices):
+    bitmap = bytearray((numdevices + 7) // 8)
+    for deviceid, state in enumerate(states):
+        if state:
+            bitmap[deviceid >> 3] |= 1 << (deviceid & 7)
+    return bytes(bitmap)
+
+
+def from_bitmap(bitmap, numdevices):
+    return [(bitmap[d >> 3] >> (d & 7)) & 1 for d in range(numdevices)]
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class RelayClient:
+    def __init__(self, port, numdevices = None):
+        # port is a serial device path or an already open file descriptor.
+        if isinstance(port, int):
+            self.fd = port
+        else:
+            self.fd = os.open(port, os.O_RDWR | os.O_NOCTTY)
+            tty.setraw(self.fd)
+        self.rx = bytearray()
+        self.seq = 0
+        self.numdevices = numdevices
+        if self.numdevices is None:
+            self.numdevices = len(self.get_all_bitmap()) * 8
+
+    def send(self, op, payload = b""):
+        # Send request without waiting, returns its sequence number.
+        self.seq = (self.seq + 1) & 0xFF
+        self.write(encode_frame(op, self.seq, payload))
+        return self.seq
+
+    def write(self, data):
+        while data:
+            data = data[os.write(self.fd, data):]
+
+    def recv(self, timeout = 2.0):
+        # Next response as (op, seq, status, data).
+        while True:
+            start = self.rx.find(bytes([FRAME_SYNC]))
+            if start < 0:
+                self.rx.clear()
+            else:
+                del self.rx[:start]
+                if len(self.rx) >= FRAME_OVERHEAD and len(self.rx) >= self.rx[1] + FRAME_OVERHEAD:
+                    length = self.rx[1]
+                    frame = bytes(self.rx[:length + FRAME_OVERHEAD])
+                    if crc16(frame[1:4 + length]) == frame[4 + length] | (frame[5 + length] << 8):
+                        del self.rx[:length + FRAME_OVERHEAD]
+                        return frame[2] & ~RESPONSE_FLAG, frame[3], frame[4], frame[5:4 + length]
+                    del self.rx[:1]
+                    continue
+            if not select.select([self.fd], [], [], timeout)[0]:
+                raise ProtocolError("timeout")
+            self.rx += os.read(self.fd, 4096)
+
+    def call(self, op, payload = b""):
+        seq = self.send(op, payload)
+        while True:
+            rop, rseq, status, data = self.recv()
+            if rseq == seq and rop == op:
+                if status:
+                    raise ProtocolError(STATUS_TEXT[status] if status < len(STATUS_TEXT) else status)
+                return data
+
+    def ping(self):
+        self.call(OP_PING)
+
+    def get_all_bitmap(self):
+        return self.call(OP_GET_ALL)
+
+    def get_all(self):
+        return from_bitmap(self.get_all_bitmap(), self.numdevices)
+
+    def set_all(self, states):
+        self.call(OP_SET_ALL, to_bitmap(states, self.numdevices))
+
+    def delta(self, changes):
+        # changes: {deviceid: state}
+        mask = to_bitmap([d in changes for d in range(self.numdevices)], self.numdevices)
+        bits = to_bitmap([changes.get(d, 0) for d in range(self.numdevices)], self.numdevices)
+        self.call(OP_DELTA, mask + bits)
+
+    def set_one(self, deviceid, state):
+        self.call(OP_SET_ONE, bytes([deviceid & 0xFF, deviceid >> 8, 1 if state else 0]))
+
+    def get_one(self, deviceid):
+        return self.call(OP_GET_ONE, bytes([deviceid & 0xFF, deviceid >> 8]))[2]
+
+# End-of-File
@@ -0,0 +1,129 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Serial line protocol load generator (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Runs serialctl on the host behind a pseudo terminal (pty) as a stand-in
+    for the board, or connects to a real board serial port, and sends
+    pipelined commands. Reports commands per second and latency.
+
+Supported Platforms:
+    - CPython 3.8+ on Linux/macOS host PC (pty, termios).
+
+Usage:
+    python tools/serial_loadgen.py                     # pty stand-in
+    python tools/serial_loadgen.py --port /dev/ttyUSB0 # real board
+    Options: --count N --depth D --devices N --mix get|set|mask
+
+-------------------------------------------------------------------------------
+"""
+import os
+import sys
+import time
+import tty
+import select
+import argparse
+import tempfile
+import threading
+
+import hostsim
+
+
+def start_standin(devices):
+    # Board stand-in: serialctl polled in a thread on pty master side.
+    hostsim.install()
+    os.chdir(tempfile.mkdtemp())
+    import devicectrl
+    import scheduler
+    import serialctl
+
+    hostsim.load_devices(devices)
+    devicectrl.init()
+    scheduler.init(None)
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    serialctl.init(None, hostsim.FdPort(master))
+
+    def run():
+        while True:
+            if 0 == serialctl.poll():
+                select.select([master], [], [], 0.01)
+
+    threading.Thread(target = run, daemon = True).start()
+    return os.ttyname(slave)
+
+
+def command(reqid, mix, devices):
+    dev = reqid % devices
+    if mix == "get":
+        return "{0} G {1}\n".format(reqid, dev)
+    if mix == "set":
+        return "{0} S {1} {2}\n".format(reqid, dev, reqid & 1)
+    width = (min(devices, 32) + 3) // 4
+    return "{0} M {1} {2:0{3}X}\n".format(reqid, "F" * width, reqid & ((1 << (width * 4)) - 1), width)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port")
+    parser.add_argument("--count", type = int, default = 2000)
+    parser.add_argument("--depth", type = int, default = 16)
+    parser.add_argument("--devices", type = int, default = 16)
+    parser.add_argument("--mix", default = "get", choices = ["get", "set", "mask"])
+    args = parser.parse_args()
+
+    path = args.port or start_standin(args.devices)
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+    tty.setraw(fd)
+
+    sent_at = {}
+    latencies = []
+    rx = b""
+    errors = 0
+    next_id = 1
+    t0 = time.perf_counter()
+
+    while len(latencies) < args.count:
+        # Keep 'depth' requests in flight.,
+        batch = []
+        while next_id <= args.count and len(sent_at) < args.depth:
+            sent_at[next_id] = time.perf_counter()
+            batch.append(command(next_id, args.mix, args.devices))
+            next_id += 1
+        if batch:
+            os.write(fd, "".join(batch).encode())
+
+        select.select([fd], [], [], 1.0)
+        rx += os.read(fd, 4096)
+        while b"\n" in rx:
+            text, rx = rx.split(b"\n", 1)
+            fields = text.split()
+            # Board may print debug messages on same port, skip them.
+            if len(fields) < 2 or not fields[0].isdigit() or int(fields[0]) not in sent_at:
+                continue
+            if fields[1] != b"OK":
+                errors += 1
+            latencies.append(time.perf_counter() - sent_at.pop(int(fields[0])))
+
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print("port       : {0}{1}".format(path, "" if args.port else " (host stand-in)"))
+    print("commands   : {0} ({1}), depth {2}, errors {3}".format(args.count, args.mix, args.depth, errors))
+    print("throughput : {0:.0f} commands/s".format(args.count / elapsed))
+    print("latency    : p50 {0:.2f} ms, p99 {1:.2f} ms, max {2:.2f} ms".format(pct(0.5), pct(0.99), latencies[-1] * 1000))
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
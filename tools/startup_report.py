@@ -0,0 +1,152 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - Startup time report, source vs .mpy vs frozen (host).
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    Reads boot counters from the board over the serial control port
+    ("Q" command, SERIAL_PROTOCOL = "text"):
+      boot_code        -> modules loaded from source, .mpy or frozen
+      boot_restored_ms -> ms after reset until device states were restored
+      boot_ready_ms    -> ms after reset until the first page was on screen
+      boot_outputs_us  -> us after reset until relay outputs were driven
+      boot_warm        -> 1 after a watchdog/reset warm restart (watchdog.py)
+    Each reading is appended to a log file (build/startup.json by
+    default, out of the source tree), and the log is printed per way
+    of loading (cold boots) and for warm restarts, so deploy one way, reset the board, run this, then the
+    next way (tools/build_mpy.py).
+    Without --port, serialctl runs on the host behind a pty as a stand-in
+    (source only, host times) to check the tool itself.
+
+Supported Platforms:
+    - CPython 3.8+ on Linux/macOS host PC (pty, termios).
+
+Usage:
+    python tools/startup_report.py --port /dev/ttyUSB0 [--log build/startup.json]
+
+-------------------------------------------------------------------------------
+"""
+import os
+import json
+import tty
+import select
+import argparse
+import tempfile
+import threading
+
+import hostsim
+
+
+def start_standin():
+    # Board stand-in: boot marks, then serialctl polled in a thread.,
+    hostsim.install()
+    os.chdir(tempfile.mkdtemp())
+    import telemetry
+    import devicectrl
+    import scheduler
+    import serialctl
+
+    hostsim.load_devices(8)
+    devicectrl.init()
+    telemetry.boot_mark(telemetry.CNT_BOOT_RESTORED_MS)
+    scheduler.init(None)
+    telemetry.boot_mark(telemetry.CNT_BOOT_READY_MS)
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    serialctl.init(None, hostsim.FdPort(master))
+
+    def run():
+        while True:
+            if 0 == serialctl.poll():
+                select.select([master], [], [], 0.01)
+
+    threading.Thread(target = run, daemon = True).start()
+    return os.ttyname(slave)
+
+
+def query_counters(path):
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+    tty.setraw(fd)
+    os.write(fd, b"7 Q\n")
+    rx = b""
+    while True:
+        if not select.select([fd], [], [], 2.0)[0]:
+            raise SystemExit("no response from " + path)
+        rx += os.read(fd, 4096)
+        while b"\n" in rx:
+            text, rx = rx.split(b"\n", 1)
+            fields = text.split()
+            # Board may print debug messages on same port, skip them.
+            if len(fields) > 2 and fields[0] == b"7" and fields[1] == b"OK":
+                os.close(fd)
+                return [int(f) for f in fields[2:]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port")
+    parser.add_argument("--log", default = os.path.join(hostsim.PROJECT_DIR, "build", "startup.json"))
+    args = parser.parse_args()
+
+    # Stand-in changes to a temporary directory.,
+    log_path = os.path.abspath(args.log)
+    os.makedirs(os.path.dirname(log_path), exist_ok = True)
+    path = args.port or start_standin()
+    hostsim.install()
+    import telemetry
+    counters = query_counters(path)
+    names = telemetry.COUNTER_NAMES
+    if len(counters) < len(names):
+        raise SystemExit("board firmware has no boot counters")
+    boot = {
+        "code": telemetry.BOOT_CODE_NAMES[counters[telemetry.CNT_BOOT_CODE]],
+        "restored_ms": counters[telemetry.CNT_BOOT_RESTORED_MS],
+        "ready_ms": counters[telemetry.CNT_BOOT_READY_MS],
+        "outputs_us": counters[telemetry.CNT_BOOT_OUTPUTS_US],
+        "warm": counters[telemetry.CNT_BOOT_WARM],
+        "port": path if args.port else "host stand-in",
+    }
+    print("this boot: {0}{1}, relay outputs {2} us, relays restored {3} ms, first page {4} ms".format(
+        boot["code"], " (warm)" if boot["warm"] else "", boot["outputs_us"],
+        boot["restored_ms"], boot["ready_ms"]))
+
+    log = []
+    if os.path.exists(log_path):
+        with open(log_path) as f:
+            log = json.load(f)
+    log.append(boot)
+    with open(log_path, "w") as f:
+        json.dump(log, f, indent = 1)
+
+    print("{0:<8} {1:>6} {2:>18} {3:>16}".format("modules", "boots", "relays restored ms", "first page ms"))
+    means = {}
+    for code in telemetry.BOOT_CODE_NAMES:
+        boots = [b for b in log if b["code"] == code and not b.get("warm")]
+        if boots:
+            means[code] = (sum(b["restored_ms"] for b in boots) / len(boots),
+                           sum(b["ready_ms"] for b in boots) / len(boots), len(boots))
+    for code, (restored, ready, count) in means.items():
+        versus = ""
+        if code != "source" and "source" in means:
+            versus = "  ({0:+.0f} ms vs source)".format(restored - means["source"][0])
+        print("{0:<8} {1:>6} {2:>18.0f} {3:>16.0f}{4}".format(code, count, restored, ready, versus))
+    # Warm restarts, any way of loading: outputs are driven before imports.,
+    for kind, boots in (("cold", [b for b in log if "warm" in b and not b["warm"]]),
+                        ("warm", [b for b in log if b.get("warm")])):
+        if boots:
+            print("{0:<8} {1:>6} relay outputs {2:.0f} us after reset".format(
+                kind, len(boots), sum(b["outputs_us"] for b in boots) / len(boots)))
+    print("log: " + log_path)
+
+
+if __name__ == "__main__":
+    main()
+
+# End-of-File
@@ -0,0 +1,304 @@
+"""
+------------------------------------------------------------------------------
+Relay Control Board - A menu based relay control board that can replaces
+                      large number of switches with 16x2 LCD and a rotary encoder.
+                      It also remembers the state of each device to ensure
+                      that it starts with same satate when power is restored.
+------------------------------------------------------------------------------
+
+Author: Jatin Gandhi (https://github.com/LearningCart)
+Created: 2026-10-19
+Updated: 2026-10-19
+Version: v1.0
+License: MIT (see LICENSE file for details)
+
+Description:
+    This file implements watchdog supervision and warm restart.
+    machine.WDT resets the board when the main loop stops feeding it for
+    WDT_TIMEOUT_MS: hang, uncaught exception, error_state().
+    Relay outputs are kept in RP2040 watchdog scratch registers, which
+    survive watchdog, machine.reset() and soft resets (not power loss):
+      scratch0  MAGIC (bits 24-29), number of devices (16-23), check (0-15)
+      scratch1  GPIO mask of device outputs
+      scratch2  GPIO levels of device outputs
+      scratch3  device state bitmap, bit n is device n
+    All values stay below 2^30 (MicroPython small integers), a store is
+    four register writes without allocation, done on every relay change.
+    After a reset restore() drives the outputs back from scratch before
+    any other module is imported., no flash access, no JSON. devicectrl
+    then takes device states from the bitmap (devicestate.json may be
+    older, deferred saves). A wrong check (power on, garbage) is a cold
+    boot, states come from devicestate.json / FRAM / EEPROM as before.
+
+    Ctrl-C stops the watchdog (RP2040 watchdog can't be stopped through
+    machine.WDT, CTRL register is cleared), so REPL tools can take over.
+
+Supported Platforms:
+    - MicroPython v1.24.1 on 2024-11-29;
+    - Board: Raspberry Pi Pico with RP2040
+
+Usage:
+    import watchdog
+    watchdog.restore();             # First thing in main.py
+    watchdog.start();               # Init
+    watchdog.feed();                # Every main loop pass
+    watchdog.mark(deviceid, state); # Every relay change (devicectrl)
+    watchdog.store();
+
+-------------------------------------------------------------------------------
+"""
+"""
+-------------------------------------------------------------------------------
+ Modules
+-------------------------------------------------------------------------------
+"""
+import utime
+
+from machine import Pin
+from machine import WDT
+from machine import mem32
+
+# Import all constants and defines.,
+from proj_defines import *
+
+"""
+-------------------------------------------------------------------------------
+ Global variables
+-------------------------------------------------------------------------------
+"""
+MAGIC        = 0x2D;
+SCRATCH      = WATCHDOG_BASE + WATCHDOG_SCRATCH0;
+CTRL_ENABLE  = 1 << 30;
+GPIO_COUNT   = 30;
+
+wdt = None;
+
+# Set by restore() after a warm restart.,
+warm        = False;
+restored_us = 0;        # utime.ticks_us() when outputs were restored.
+
+# Retained layout, from restore() or arm()., count 0 -> not retained.
+count   = 0;
+pinmask = 0;
+states  = 0;
+
+"""
+-------------------------------------------------------------------------------
+ Functions
+-------------------------------------------------------------------------------
+"""
+
+"""
+This function returns the check word of retained values.
+
+Args:
+    int: ndevices
+    int: mask GPIO mask
+    int: levels GPIO levels
+    int: bits device state bitmap
+
+Returns:
+    int: 16 bit check
+
+Raises:
+
+Notes:
+    - Values are folded to 16 bits before shifts, no big integers.
+"""
+def check(ndevices, mask, levels, bits):
+    x = ((mask & 0xffff) ^ (mask >> 16) ^
+         ((levels & 0x7fff) << 1) ^ (levels >> 15) ^
+         ((bits & 0x3fff) << 2) ^ (bits >> 14) ^
+         (ndevices << 8) ^ 0x5A5A);
+    return (x & 0xffff);
+    # End-of-Function
+
+
+"""
+This function drives relay outputs back to their retained levels.
+
+Args:
+    None
+
+Returns:
+    bool: True -> warm restart, outputs restored.
+
+Raises:
+
+Notes:
+    - Called at import of main.py, before display and configuration.
+"""
+def restore():
+    global warm;
+    global restored_us;
+    global count;
+    global pinmask;
+    global states;
+
+    header = mem32[SCRATCH] & 0xffffffff;
+    mask   = mem32[SCRATCH + 4] & 0x3fffffff;
+    levels = mem32[SCRATCH + 8] & 0x3fffffff;
+    bits   = mem32[SCRATCH + 12] & 0x3fffffff;
+    ndevices = (header >> 16) & 0xff;
+    if ((header >> 24) != MAGIC or (header & 0xffff) != check(ndevices, mask, levels, bits)):
+        return False;
+
+    for gpio in range(GPIO_COUNT):
+        if (mask & (1 << gpio)):
+            Pin(gpio, Pin.OUT, value = (levels >> gpio) & 1);
+    restored_us = utime.ticks_us();
+    warm    = True;
+    count   = ndevices;
+    pinmask = mask;
+    states  = bits;
+    return True;
+    # End-of-Function
+
+
+"""
+This function sets the retained layout for the current configuration.
+
+Args:
+    int: ndevices number of devices
+    int: mask GPIO mask of device outputs
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called by devicectrl.init() before outputs are set, states are
+      marked then and stored.
+    - More than GPIO_COUNT devices (host tools) are not retained.
+"""
+def arm(ndevices, mask):
+    global count;
+    global pinmask;
+    global states;
+
+    count   = ndevices if (ndevices <= GPIO_COUNT) else 0;
+    pinmask = mask;
+    states  = 0;
+    mem32[SCRATCH + 4] = mask;
+    # End-of-Function
+
+
+"""
+This function sets the state of a device in the bitmap., store() retains
+it.
+
+Args:
+    int: deviceid
+    int: state 0/1
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def mark(deviceid, state):
+    global states;
+
+    if (deviceid >= count):
+        return;
+    if state:
+        states = states | (1 << deviceid);
+    else:
+        states = states & ~(1 << deviceid);
+    # End-of-Function
+
+
+"""
+This function retains current relay outputs and device states.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called after every relay change, GPIO levels are read back from SIO.
+    - Header is written last, a reset in between fails the check (cold
+      boot).
+"""
+def store():
+    if (0 == count):
+        return;
+    levels = mem32[SIO_BASE + SIO_GPIO_OUT] & pinmask;
+    mem32[SCRATCH + 8]  = levels;
+    mem32[SCRATCH + 12] = states;
+    mem32[SCRATCH] = (MAGIC << 24) | (count << 16) | check(count, pinmask, levels, states);
+    # End-of-Function
+
+
+"""
+This function starts the watchdog when WDT_ENABLED is set.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+"""
+def start():
+    global wdt;
+
+    if (WDT_ENABLED and None == wdt):
+        wdt = WDT(timeout = WDT_TIMEOUT_MS);
+    # End-of-Function
+
+
+"""
+This function feeds the watchdog.
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Called from main loop every pass.
+"""
+def feed():
+    if (None != wdt):
+        wdt.feed();
+    # End-of-Function
+
+
+"""
+This function stops the watchdog, the REPL takes over (Ctrl-C).
+
+Args:
+    None
+
+Returns:
+    None
+
+Raises:
+
+Notes:
+    - Retained states are kept, next reset is still warm.
+"""
+def stop():
+    global wdt;
+
+    if (None == wdt):
+        return;
+    mem32[WATCHDOG_BASE + WATCHDOG_CTRL] = mem32[WATCHDOG_BASE + WATCHDOG_CTRL] & ~CTRL_ENABLE;
+    wdt = None;
+    # End-of-Function
+
+# End-of-File